@@ -0,0 +1,61 @@
+"""
+Fake pwsh host for PowerShellHostPool tests.
+Speaks the framed JSON protocol of src/core/powershell_host_pool.py without PowerShell.
+
+Commands:
+    $true            -> true
+    Get-HostPid      -> process id
+    Get-Counter      -> commands handled by this process (proves persistence)
+    Write-Stray <s>  -> prints <s> outside a frame, returns "ok"
+    Start-Sleep <n>  -> sleeps n seconds
+    Throw <message>  -> error frame
+    Exit-Host        -> exits without answering
+    anything else    -> echoes the command
+"""
+
+import json
+import os
+import sys
+import time
+
+FRAME_MARKER = '<<<M365-PSHOST>>>'
+
+
+def main():
+    counter = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        command = request['command'].strip()
+        counter += 1
+        response = {'id': request['id'], 'success': True, 'output': None, 'error': None}
+
+        if command == '$true':
+            output = True
+        elif command == 'Get-HostPid':
+            output = os.getpid()
+        elif command == 'Get-Counter':
+            output = counter
+        elif command.startswith('Write-Stray '):
+            print(command[len('Write-Stray '):], flush=True)
+            output = 'ok'
+        elif command.startswith('Start-Sleep '):
+            time.sleep(float(command.split()[1]))
+            output = 'slept'
+        elif command.startswith('Throw '):
+            response['success'] = False
+            response['error'] = {'Message': command[len('Throw '):], 'Type': 'System.Exception'}
+            output = None
+        elif command == 'Exit-Host':
+            sys.exit(3)
+        else:
+            output = command
+
+        if response['success']:
+            response['output'] = json.dumps(output) if request.get('json') else f"{output}\n"
+        print(FRAME_MARKER + json.dumps(response), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Unit tests for the audit hash chain and Merkle checkpoints.
+"""
+
+import sqlite3
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.compliance.audit_chain import (
+    AuditHashChain, EVENT_COLUMNS, CHAIN_COLUMNS, ensure_chain_schema,
+    merkle_root, merkle_proof, verify_merkle_proof
+)
+from src.compliance.audit_writer import AuditEventWriter
+
+
+INSERT_SQL = (f"INSERT INTO audit_events ({', '.join(EVENT_COLUMNS + CHAIN_COLUMNS)}) "
+              f"VALUES ({', '.join('?' * len(EVENT_COLUMNS + CHAIN_COLUMNS))})")
+
+
+def event_row(i):
+    values = {column: f"{column}-{i}" for column in EVENT_COLUMNS}
+    values["timestamp"] = f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"
+    values["retention_period"] = 2555
+    values["encrypted"] = 0
+    return tuple(values[column] for column in EVENT_COLUMNS)
+
+
+def write_events(tmp_path, count, interval=4, batch_size=3):
+    db_path = tmp_path / "audit.db"
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute(f"CREATE TABLE audit_events ({', '.join(EVENT_COLUMNS)}, created_at TEXT)")
+        ensure_chain_schema(conn)
+
+    chain = AuditHashChain(checkpoint_interval=interval)
+    writer = AuditEventWriter(db_path, INSERT_SQL, batch_size=batch_size, flush_interval=0.01,
+                              prepare_batch=chain.prepare_batch)
+    writer.start()
+    for i in range(count):
+        writer.submit(event_row(i))
+        if i % batch_size == 0:
+            assert writer.flush(timeout=5)
+    writer.close()
+    return sqlite3.connect(str(db_path)), chain
+
+
+def problems(result):
+    return {(issue["seq"], issue["problem"]) for issue in result["issues"]}
+
+
+class TestAuditHashChain:
+    """Test suite for AuditHashChain."""
+
+    def test_chain_and_checkpoints_written(self, tmp_path):
+        conn, chain = write_events(tmp_path, 10)
+
+        seqs = [row[0] for row in conn.execute("SELECT seq FROM audit_events ORDER BY rowid")]
+        assert seqs == list(range(1, 11))
+        checkpoints = conn.execute("SELECT start_seq, end_seq FROM audit_checkpoints ORDER BY end_seq").fetchall()
+        assert checkpoints == [(1, 4), (5, 8)]
+
+        result = chain.verify_seq_range(conn, 1, 10)
+        assert result["verified"]
+        assert (result["events_checked"], result["checkpoints_checked"]) == (10, 2)
+
+    def test_range_reads_only_overlapping_blocks(self, tmp_path):
+        conn, chain = write_events(tmp_path, 20)
+
+        result = chain.verify_range(conn, event_row(9)[2], event_row(10)[2])
+
+        assert result["verified"]
+        assert (result["first_seq"], result["last_seq"], result["events_checked"]) == (9, 12, 4)
+
+    def test_modified_row_detected(self, tmp_path):
+        conn, chain = write_events(tmp_path, 12)
+        conn.execute("UPDATE audit_events SET result = 'tampered' WHERE seq = 6")
+
+        assert (6, "modified") in problems(chain.verify_seq_range(conn, 5, 8))
+        assert chain.verify_seq_range(conn, 9, 12)["verified"]
+
+    def test_deleted_row_detected(self, tmp_path):
+        conn, chain = write_events(tmp_path, 12)
+        conn.execute("DELETE FROM audit_events WHERE seq = 7")
+
+        assert (7, "missing") in problems(chain.verify_seq_range(conn, 5, 8))
+
+    def test_reordered_rows_detected(self, tmp_path):
+        conn, chain = write_events(tmp_path, 8)
+        conn.execute("UPDATE audit_events SET seq = -1 WHERE seq = 6")
+        conn.execute("UPDATE audit_events SET seq = 6 WHERE seq = 7")
+        conn.execute("UPDATE audit_events SET seq = 7 WHERE seq = -1")
+
+        result = chain.verify_seq_range(conn, 5, 8)
+
+        assert {(6, "modified"), (7, "modified")} <= problems(result)
+
+    def test_archived_prefix_is_not_an_issue(self, tmp_path):
+        conn, chain = write_events(tmp_path, 12)
+        conn.execute("DELETE FROM audit_events WHERE seq <= 2")
+
+        result = chain.verify_seq_range(conn, 3, 12)
+
+        assert result["verified"] and result["archived_events"] == 2
+
+    def test_writer_restart_continues_chain(self, tmp_path):
+        conn, _ = write_events(tmp_path, 6)
+        conn.close()
+
+        chain = AuditHashChain(checkpoint_interval=4)
+        writer = AuditEventWriter(tmp_path / "audit.db", INSERT_SQL, flush_interval=0.01,
+                                  prepare_batch=chain.prepare_batch)
+        writer.start()
+        for i in range(6, 9):
+            writer.submit(event_row(i))
+        writer.close()
+
+        conn = sqlite3.connect(str(tmp_path / "audit.db"))
+        assert conn.execute("SELECT MAX(seq) FROM audit_events").fetchone()[0] == 9
+        assert conn.execute("SELECT COUNT(*) FROM audit_checkpoints").fetchone()[0] == 2
+        assert chain.verify_seq_range(conn, 1, 9)["verified"]
+
+    def test_merkle_proof(self):
+        leaves = [f"{i:064x}" for i in range(7)]
+        root = merkle_root(leaves)
+
+        for index, leaf in enumerate(leaves):
+            assert verify_merkle_proof(leaf, merkle_proof(leaves, index), root)
+        assert not verify_merkle_proof(leaves[0], merkle_proof(leaves, 1), root)
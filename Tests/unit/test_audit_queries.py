@@ -0,0 +1,89 @@
+"""
+Unit tests for SQL-side compliance report aggregation.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.compliance.audit_chain import EVENT_COLUMNS
+from src.compliance.audit_queries import (
+    INSERT_EVENT_STANDARD_SQL, compliance_counts, ensure_standards_schema, recent_violations, standards_rows
+)
+
+
+INSERT_SQL = f"INSERT INTO audit_events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})"
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+
+def event_row(i, standards=("sox",)):
+    values = {column: f"{column}-{i}" for column in EVENT_COLUMNS}
+    values.update({
+        "event_type": "access" if i % 2 else "login",
+        "timestamp": f"2024-01-{1 + i % 3:02d}T{i % 24:02d}:00:{i % 60:02d}.{i:06d}",
+        "severity": SEVERITIES[i % 4],
+        "compliance_standards": json.dumps(list(standards)),
+    })
+    return tuple(values[column] for column in EVENT_COLUMNS)
+
+
+def make_db(rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"CREATE TABLE audit_events ({', '.join(EVENT_COLUMNS)}, PRIMARY KEY (event_id))")
+    ensure_standards_schema(conn)
+    conn.executemany(INSERT_SQL, rows)
+    conn.executemany(INSERT_EVENT_STANDARD_SQL, standards_rows(rows))
+    return conn
+
+
+class TestComplianceQueries:
+    """Test suite for the compliance aggregation queries."""
+
+    def test_counts_are_exact_beyond_10k_events(self):
+        rows = [event_row(i) for i in range(12000)] + [event_row(i, ("gdpr",)) for i in range(12000, 12010)]
+        conn = make_db(rows)
+
+        counts = compliance_counts(conn, "sox")
+
+        assert counts["total_events"] == 12000
+        assert counts["total_violations"] == 6000
+        assert counts["events_by_type"] == {"access": 6000, "login": 6000}
+        assert counts["events_by_severity"] == {severity: 3000 for severity in SEVERITIES}
+        assert counts["events_by_day"] == {"2024-01-01": 4000, "2024-01-02": 4000, "2024-01-03": 4000}
+        assert compliance_counts(conn, "gdpr")["total_events"] == 10
+
+    def test_time_window_and_violations(self):
+        conn = make_db([event_row(i, ("sox", "gdpr")) for i in range(30)])
+
+        counts = compliance_counts(conn, "gdpr", "2024-01-02", "2024-01-02T23:59:59")
+        violations = recent_violations(conn, "gdpr", "2024-01-02", "2024-01-02T23:59:59", limit=3)
+
+        assert counts["total_events"] == 10 and set(counts["events_by_day"]) == {"2024-01-02"}
+        assert len(violations) == 3
+        assert all(v["severity"] in ("high", "critical") for v in violations)
+        assert [v["timestamp"] for v in violations] == sorted((v["timestamp"] for v in violations), reverse=True)
+
+    def test_uses_standard_index(self):
+        conn = make_db([event_row(i) for i in range(10)])
+
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM audit_event_standards s "
+            "JOIN audit_events e ON e.event_id = s.event_id WHERE s.standard = ? AND s.timestamp >= ?",
+            ("sox", "2024")))
+
+        assert "USING PRIMARY KEY (standard=? AND timestamp>?)" in plan
+
+    def test_existing_events_backfilled(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute(f"CREATE TABLE audit_events ({', '.join(EVENT_COLUMNS)})")
+        conn.executemany(INSERT_SQL, [event_row(0, ("sox", "gdpr")), event_row(1, ())])
+
+        ensure_standards_schema(conn)
+        ensure_standards_schema(conn)  # idempotent
+
+        assert conn.execute("SELECT standard, event_id FROM audit_event_standards ORDER BY standard").fetchall() == [
+            ("gdpr", "event_id-0"), ("sox", "event_id-0")
+        ]
@@ -0,0 +1,127 @@
+"""
+Unit tests for the double-buffered audit event writer.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.compliance.audit_writer import AuditEventWriter
+
+
+INSERT_SQL = "INSERT INTO events (event_id, payload) VALUES (?, ?)"
+
+
+def make_db(tmp_path):
+    db_path = tmp_path / "audit.db"
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute("CREATE TABLE events (event_id TEXT PRIMARY KEY, payload TEXT)")
+    return db_path
+
+
+def read_ids(db_path):
+    with sqlite3.connect(str(db_path)) as conn:
+        return [row[0] for row in conn.execute("SELECT event_id FROM events ORDER BY rowid")]
+
+
+class TestAuditEventWriter:
+    """Test suite for AuditEventWriter."""
+
+    def test_concurrent_producers_written_in_batches(self, tmp_path):
+        db_path = make_db(tmp_path)
+        writer = AuditEventWriter(db_path, INSERT_SQL, batch_size=50, flush_interval=0.05)
+        writer.start()
+
+        def produce(prefix):
+            for i in range(200):
+                assert writer.submit((f"{prefix}-{i}", "x"))
+
+        threads = [threading.Thread(target=produce, args=(p,)) for p in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert writer.flush(timeout=5)
+        ids = read_ids(db_path)
+        assert len(ids) == 800
+        # Per-producer order is preserved
+        assert [i for i in ids if i.startswith("a-")] == [f"a-{i}" for i in range(200)]
+
+        stats = writer.get_stats()
+        assert stats["written"] == 800 and stats["dropped"] == 0 and stats["pending"] == 0
+        assert stats["flushes"] < 800
+        writer.close()
+
+        with sqlite3.connect(str(db_path)) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_close_writes_remaining(self, tmp_path):
+        db_path = make_db(tmp_path)
+        writer = AuditEventWriter(db_path, INSERT_SQL, batch_size=1000, flush_interval=60)
+        writer.start()
+        writer.submit(("one", "x"))
+        writer.submit(("two", "x"))
+
+        writer.close()
+
+        assert read_ids(db_path) == ["one", "two"]
+        assert not writer.running
+
+    def test_backlog_full_drops_and_counts(self, tmp_path):
+        db_path = make_db(tmp_path)
+        # Not started: nothing drains the backlog
+        writer = AuditEventWriter(db_path, INSERT_SQL, max_pending=3)
+
+        accepted = [writer.submit((str(i), "x")) for i in range(5)]
+
+        assert accepted == [True, True, True, False, False]
+        assert writer.get_stats()["dropped"] == 2
+
+    def test_blocking_backpressure_times_out(self, tmp_path):
+        db_path = make_db(tmp_path)
+        writer = AuditEventWriter(db_path, INSERT_SQL, max_pending=1, block_on_full=True, block_timeout=0.05)
+        writer.submit(("a", "x"))
+
+        assert not writer.submit(("b", "x"))
+        stats = writer.get_stats()
+        assert stats["blocked"] == 1 and stats["dropped"] == 1
+
+    def test_failed_batch_retried_then_discarded(self, tmp_path):
+        db_path = make_db(tmp_path)
+        writer = AuditEventWriter(db_path, INSERT_SQL, flush_interval=0.01, max_retries=1)
+        writer.start()
+        writer.submit(("dup", "x"))
+        writer.submit(("dup", "y"))
+
+        assert writer.flush(timeout=5)
+
+        stats = writer.get_stats()
+        assert stats["failed"] == 2 and stats["flush_errors"] == 2
+        assert read_ids(db_path) == []
+
+        # The writer keeps going after a discarded batch
+        writer.submit(("ok", "x"))
+        assert writer.flush(timeout=5)
+        assert read_ids(db_path) == ["ok"]
+        writer.close()
+
+    def test_prepare_batch_runs_in_write_transaction(self, tmp_path):
+        db_path = make_db(tmp_path)
+
+        def prepare(conn, rows):
+            count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            return [(event_id, f"{count + n}") for n, (event_id, _) in enumerate(rows)]
+
+        writer = AuditEventWriter(db_path, INSERT_SQL, flush_interval=0.01, prepare_batch=prepare)
+        writer.start()
+        for i in range(3):
+            writer.submit((str(i), None))
+            assert writer.flush(timeout=5)
+        writer.close()
+
+        with sqlite3.connect(str(db_path)) as conn:
+            assert [row[0] for row in conn.execute("SELECT payload FROM events ORDER BY rowid")] == ["0", "1", "2"]
@@ -0,0 +1,104 @@
+"""
+Unit tests for set-based bulk inserts.
+Uses an in-memory SQLite database and counts statements per request.
+"""
+
+import pytest
+import pytest_asyncio
+from datetime import datetime
+from pathlib import Path
+import sys
+
+from sqlalchemy import event, select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.core.database import Base, User, UserLicense
+from src.api.core.bulk import bulk_insert_new, existing_keys
+
+
+@pytest_asyncio.fixture
+async def database():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(User(user_principal_name="existing@contoso.com", display_name="Existing"))
+        await session.commit()
+
+    statements.clear()
+    yield factory, statements
+    await engine.dispose()
+
+
+def user_rows(count):
+    return [{"user_principal_name": f"new{i}@contoso.com", "display_name": f"New {i}",
+             "created_datetime": datetime(2025, 1, 1)} for i in range(count)]
+
+
+class TestBulkInsertNew:
+    """Test suite for bulk_insert_new."""
+
+    @pytest.mark.asyncio
+    async def test_round_trips_do_not_grow_per_row(self, database):
+        factory, statements = database
+        rows = user_rows(120)
+
+        async with factory() as session:
+            result = await bulk_insert_new(session, User, rows, ["user_principal_name"],
+                                           conflict_columns=["user_principal_name"], batch_size=50)
+            await session.commit()
+
+        assert len(result.inserted) == 120
+        # 3 lookups + 3 inserts (plus transaction statements), not 2 per row
+        assert len([s for s in statements if s.lstrip().upper().startswith(("SELECT", "INSERT"))]) == 6
+
+        inserted = result.inserted
+        assert [u.user_principal_name for u in inserted] == [r["user_principal_name"] for r in rows]
+        # Server-side values are loaded through RETURNING, no refresh needed
+        assert all(u.id is not None and u.created_at is not None and u.account_enabled for u in inserted)
+
+    @pytest.mark.asyncio
+    async def test_duplicates_skipped(self, database):
+        factory, _ = database
+        rows = user_rows(3)
+        rows.insert(1, {"user_principal_name": "existing@contoso.com", "display_name": "Again"})
+        rows.append(dict(rows[0], display_name="Repeated"))
+
+        async with factory() as session:
+            result = await bulk_insert_new(session, User, rows, ["user_principal_name"],
+                                           conflict_columns=["user_principal_name"])
+            await session.commit()
+            total = (await session.execute(select(func.count(User.id)))).scalar_one()
+
+        assert [u.display_name for u in result.inserted] == ["New 0", "New 1", "New 2"]
+        assert sorted(d["display_name"] for d in result.duplicates) == ["Again", "Repeated"]
+        assert total == 4
+
+    @pytest.mark.asyncio
+    async def test_composite_keys(self, database):
+        factory, _ = database
+        async with factory() as session:
+            user_id = (await session.execute(select(User.id))).scalar_one()
+            license_row = {"user_id": user_id, "sku_id": "sku-e3", "sku_part_number": "ENTERPRISEPACK",
+                           "display_name": "Office 365 E3"}
+
+            first = await bulk_insert_new(session, UserLicense, [license_row], ["user_id", "sku_part_number"])
+            second = await bulk_insert_new(
+                session, UserLicense,
+                [license_row, dict(license_row, sku_part_number="EMS", sku_id="sku-ems")],
+                ["user_id", "sku_part_number"]
+            )
+            known = await existing_keys(session, User, ["id"], [(user_id,), (user_id + 100,)])
+
+        assert len(first.inserted) == 1
+        assert [lic.sku_part_number for lic in second.inserted] == ["EMS"]
+        assert second.skipped == 1
+        assert known == {(user_id,)}
@@ -0,0 +1,74 @@
+"""
+Unit tests for CSVGenerator streaming mode.
+Tests byte-for-byte compatibility with generate() and iterator consumption.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.reports.generators.csv_generator import CSVGenerator, compile_formatter, format_value
+
+
+ROWS = [
+    {'ID': 'user-001', '表示名': '山田太郎', '有効': True, '容量': 1.5, '件数': 3,
+     'ライセンス': ['E3', 'E5'], '詳細': {'a': 1}, 'メモ': ' 改行\nあり\r ', '空': None},
+    {'ID': 'user-002', '表示名': 'Smith, "John"', '有効': False, '容量': 2.0, '件数': 0,
+     'ライセンス': (), '詳細': {}, 'メモ': '', '空': None},
+    {'ID': 'user-003', '表示名': '佐藤', '容量': 0.125},
+]
+
+
+@pytest.fixture
+def generator():
+    return CSVGenerator()
+
+
+class TestCSVStreamGenerator:
+    """Test suite for CSVGenerator.generate_stream."""
+
+    def test_stream_matches_generate(self, generator, tmp_path):
+        generator.generate(ROWS, tmp_path / 'list.csv')
+        generator.generate_stream(iter(ROWS), tmp_path / 'stream.csv', chunk_size=2)
+
+        expected = (tmp_path / 'list.csv').read_bytes()
+        assert expected.startswith(b'\xef\xbb\xbf')
+        assert (tmp_path / 'stream.csv').read_bytes() == expected
+
+    def test_explicit_columns_and_types(self, generator, tmp_path):
+        rows = ({'n': i, 'ratio': i / 4, 'extra': 'x'} for i in range(5))
+        path = generator.generate_stream(rows, tmp_path / 'typed.csv', columns=['ratio', 'n'],
+                                         column_types={'ratio': float, 'n': int})
+
+        content = Path(path).read_text(encoding='utf-8-sig')
+        assert content == 'ratio,n\n0,0\n0.25,1\n0.5,2\n0.75,3\n1,4\n'
+
+    def test_empty_stream(self, generator, tmp_path):
+        generator.generate([], tmp_path / 'list.csv')
+        generator.generate_stream(iter([]), tmp_path / 'stream.csv')
+
+        assert (tmp_path / 'stream.csv').read_bytes() == (tmp_path / 'list.csv').read_bytes()
+
+    @pytest.mark.asyncio
+    async def test_async_stream_matches_generate(self, generator, tmp_path):
+        async def rows():
+            for row in ROWS:
+                yield row
+
+        generator.generate(ROWS, tmp_path / 'list.csv')
+        await generator.generate_stream_async(rows(), tmp_path / 'stream.csv', chunk_size=2)
+
+        assert (tmp_path / 'stream.csv').read_bytes() == (tmp_path / 'list.csv').read_bytes()
+
+    def test_compiled_formatter_matches_format_value(self):
+        values = [None, True, False, 0, 7, 1.0, 2.345, 'a\nb', [1, 2], (3,), {'k': 'v'}]
+        untyped = compile_formatter()
+
+        for value in values:
+            assert untyped(value) == format_value(value)
+            assert compile_formatter(type(value))(value) == format_value(value)
+        # Values of another type than declared still format correctly
+        assert compile_formatter(int)(True) == 'はい'
+        assert compile_formatter(float)(None) == ''
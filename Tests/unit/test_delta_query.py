@@ -0,0 +1,160 @@
+"""
+Unit tests for delta query paging and resumable delta links.
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.notifications.delta_query import DeltaQueryManager
+from src.api.notifications.delta_token_store import DeltaTokenStore
+
+
+NEXT_2 = "https://graph.microsoft.com/v1.0/users/delta?$skiptoken=2"
+NEXT_3 = "https://graph.microsoft.com/v1.0/users/delta?$skiptoken=3"
+DELTA = "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=d"
+
+PAGES = {
+    "/users/delta": {"value": [{"id": "1"}, {"id": "2"}], "@odata.nextLink": NEXT_2},
+    NEXT_2: {"value": [{"id": "3", "@removed": {"reason": "deleted"}}], "@odata.nextLink": NEXT_3},
+    NEXT_3: {"value": [{"id": "4"}], "@odata.deltaLink": DELTA},
+}
+
+
+class FakeGraph:
+    """Page fetcher serving PAGES."""
+
+    def __init__(self):
+        self.requested = []
+
+    async def __call__(self, url, params=None):
+        self.requested.append(url)
+        await asyncio.sleep(0)
+        return PAGES[url]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DeltaTokenStore(tmp_path / "tokens")
+
+
+class TestDeltaSync:
+    """Test suite for DeltaQueryManager._sync_resource."""
+
+    def test_round_follows_every_page(self, store):
+        graph = FakeGraph()
+        manager = DeltaQueryManager(token_store=store, fetch_page=graph)
+        batches = []
+
+        async def handler(changes):
+            batches.append([(change.resource_id, change.change_type) for change in changes])
+
+        total = asyncio.run(manager._sync_resource("users", manager.resource_configs["users"], handler=handler))
+
+        assert total == 4
+        assert batches == [[("1", "updated"), ("2", "updated")], [("3", "deleted")], [("4", "updated")]]
+        assert graph.requested == ["/users/delta", NEXT_2, NEXT_3]
+        assert store.get("users")["link"] == DELTA and store.get("users")["kind"] == "delta"
+        assert manager.delta_tokens["users"] == DELTA
+
+    def test_next_link_stored_after_each_page(self, store):
+        manager = DeltaQueryManager(token_store=store, fetch_page=FakeGraph())
+        stored_while_handling = []
+
+        async def handler(changes):
+            entry = store.get("users")
+            stored_while_handling.append((entry["kind"], entry["link"]) if entry else None)
+
+        asyncio.run(manager._sync_resource("users", manager.resource_configs["users"], handler=handler))
+
+        assert stored_while_handling == [None, ("next", NEXT_2), ("next", NEXT_3)]
+
+    def test_next_page_fetched_while_page_is_handled(self, store):
+        graph = FakeGraph()
+        manager = DeltaQueryManager(token_store=store, fetch_page=graph)
+        requested_during_first_page = []
+
+        async def handler(changes):
+            if not requested_during_first_page:
+                await asyncio.sleep(0)
+                requested_during_first_page.extend(graph.requested)
+
+        asyncio.run(manager._sync_resource("users", manager.resource_configs["users"], handler=handler))
+
+        assert requested_during_first_page == ["/users/delta", NEXT_2]
+
+    def test_paused_round_resumes_from_stored_link(self, store):
+        first = DeltaQueryManager(token_store=store, fetch_page=FakeGraph())
+        first.is_running = False
+
+        async def handler(changes):
+            pass
+
+        total = asyncio.run(first._sync_resource("users", first.resource_configs["users"],
+                                                 handler=handler, pausable=True))
+        assert total == 2
+        entry = store.get("users")
+        assert (entry["kind"], entry["link"]) == ("next", NEXT_2)
+
+        # A restarted manager continues with the remaining pages only
+        graph = FakeGraph()
+        second = DeltaQueryManager(token_store=store, fetch_page=graph)
+
+        async def resume():
+            await second._restore_delta_tokens()
+            return await second._sync_resource("users", second.resource_configs["users"], handler=handler)
+
+        assert asyncio.run(resume()) == 2
+        assert graph.requested == [NEXT_2, NEXT_3]
+        assert store.get("users")["link"] == DELTA
+
+    def test_uninitialized_manager_raises(self, store):
+        manager = DeltaQueryManager(token_store=store)
+
+        with pytest.raises(Exception, match="not initialized"):
+            asyncio.run(manager._sync_resource("users", manager.resource_configs["users"]))
+
+    def test_failed_page_is_not_skipped(self, store):
+        manager = DeltaQueryManager(token_store=store, fetch_page=FakeGraph())
+        handled = []
+        failing = {"3"}
+
+        async def handler(changes):
+            if failing & {change.resource_id for change in changes}:
+                raise RuntimeError("database unavailable")
+            handled.append([change.resource_id for change in changes])
+
+        with pytest.raises(RuntimeError, match="database unavailable"):
+            asyncio.run(manager._sync_resource("users", manager.resource_configs["users"], handler=handler))
+
+        # Only the first page was committed; the next round starts at the failed page
+        entry = store.get("users")
+        assert (entry["kind"], entry["link"]) == ("next", NEXT_2)
+
+        failing.clear()
+        graph = FakeGraph()
+        retry = DeltaQueryManager(token_store=store, fetch_page=graph)
+
+        async def resume():
+            await retry._restore_delta_tokens()
+            return await retry._sync_resource("users", retry.resource_configs["users"], handler=handler)
+
+        assert asyncio.run(resume()) == 2
+        assert graph.requested == [NEXT_2, NEXT_3]
+        assert handled == [["1", "2"], ["3"], ["4"]]
+        assert store.get("users")["link"] == DELTA
+
+    def test_default_batch_handler_errors_propagate(self, store, monkeypatch):
+        manager = DeltaQueryManager(token_store=store, fetch_page=FakeGraph())
+
+        async def broken(changes):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(manager, "_save_changes_to_database", broken)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            asyncio.run(manager._sync_resource("users", manager.resource_configs["users"]))
+        assert store.get("users") is None
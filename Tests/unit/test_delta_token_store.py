@@ -0,0 +1,66 @@
+"""
+Unit tests for the durable per-resource delta token store.
+"""
+
+import json
+import pytest
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.notifications.delta_token_store import DeltaTokenStore
+
+
+ENDPOINTS = {"users": "/users/delta", "groups": "/groups/delta"}
+
+
+class TestDeltaTokenStore:
+    """Test suite for DeltaTokenStore."""
+
+    def test_set_get_delete(self, tmp_path):
+        store = DeltaTokenStore(tmp_path / "tokens")
+
+        store.set("users", "https://graph.microsoft.com/v1.0/users/delta?$skiptoken=a", "next")
+        store.set("users", "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=b")
+
+        entry = DeltaTokenStore(tmp_path / "tokens").get("users")
+        assert entry["link"].endswith("$deltatoken=b")
+        assert entry["kind"] == "delta"
+        # No temporary files are left behind
+        assert [p.name for p in (tmp_path / "tokens").iterdir()] == ["users.json"]
+
+        store.delete("users")
+        assert store.get("users") is None
+
+    def test_resources_are_independent(self, tmp_path):
+        store = DeltaTokenStore(tmp_path)
+        store.set("users", "u1")
+        store.set("groups", "g1", "next")
+
+        assert store.load_all(ENDPOINTS) == {
+            "users": store.get("users"),
+            "groups": store.get("groups")
+        }
+        assert store.get("devices") is None
+
+    def test_unreadable_file_ignored(self, tmp_path):
+        (tmp_path / "users.json").write_text("{not json", encoding="utf-8")
+
+        assert DeltaTokenStore(tmp_path).get("users") is None
+
+    def test_rejects_unknown_kind(self, tmp_path):
+        with pytest.raises(ValueError):
+            DeltaTokenStore(tmp_path).set("users", "link", "partial")
+
+    def test_legacy_file_migrated(self, tmp_path):
+        legacy = tmp_path / "delta_tokens.json"
+        legacy.write_text(json.dumps({"users": "tok1", "unknown": "tok2"}), encoding="utf-8")
+        store = DeltaTokenStore(tmp_path / "tokens", legacy)
+
+        entries = store.load_all(ENDPOINTS)
+
+        assert entries["users"]["link"] == "/users/delta?$deltatoken=tok1"
+        assert "unknown" not in entries
+        assert not legacy.exists()
+        assert (tmp_path / "delta_tokens.migrated").exists()
@@ -0,0 +1,238 @@
+"""
+Unit tests for the Microsoft Graph $batch engine.
+Tests envelope packing, dependsOn ordering, throttling re-queue and demultiplexing.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from api.graph.batch import BatchEnvelopeThrottled, BatchRequest, GraphBatchExecutor, MAX_BATCH_SIZE
+
+
+class FakeBatchEndpoint:
+    """Records posted envelopes and answers from a per-request script."""
+
+    def __init__(self, script=None):
+        self.script = script or {}
+        self.envelopes = []
+
+    async def __call__(self, payload):
+        self.envelopes.append(payload)
+        responses = []
+        for item in payload['requests']:
+            queue = self.script.get(item['id'])
+            if queue:
+                status, headers = queue.pop(0)
+            else:
+                status, headers = 200, {}
+            responses.append({
+                'id': item['id'],
+                'status': status,
+                'headers': headers,
+                'body': {'url': item['url']}
+            })
+        # Graph does not guarantee response order
+        return {'responses': list(reversed(responses))}
+
+
+class TestGraphBatchExecutor:
+    """Test suite for GraphBatchExecutor."""
+
+    @pytest.fixture
+    def sleeps(self):
+        return []
+
+    def _executor(self, endpoint, sleeps, **kwargs):
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+        return GraphBatchExecutor(send=endpoint, sleep=fake_sleep, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_packs_twenty_per_envelope(self, sleeps):
+        """Requests are packed into envelopes of at most 20."""
+        endpoint = FakeBatchEndpoint()
+        executor = self._executor(endpoint, sleeps)
+        requests = [BatchRequest(id=str(i), url=f"/users/{i}") for i in range(45)]
+
+        responses = await executor.execute(requests)
+
+        assert [len(e['requests']) for e in endpoint.envelopes] == [20, 20, 5]
+        assert list(responses) == [str(i) for i in range(45)]
+        assert all(r.status == 200 for r in responses.values())
+        assert responses['7'].body == {'url': '/users/7'}
+
+    @pytest.mark.asyncio
+    async def test_strips_graph_version_prefix(self, sleeps):
+        """Absolute Graph URLs are sent relative to the version root."""
+        endpoint = FakeBatchEndpoint()
+        executor = self._executor(endpoint, sleeps)
+
+        await executor.execute([
+            BatchRequest(id="1", url="https://graph.microsoft.com/v1.0/users/a")
+        ])
+
+        assert endpoint.envelopes[0]['requests'][0]['url'] == "/users/a"
+
+    @pytest.mark.asyncio
+    async def test_dependency_chain_kept_in_one_envelope(self, sleeps):
+        """dependsOn targets are packed in the same envelope, dependencies first."""
+        endpoint = FakeBatchEndpoint()
+        executor = self._executor(endpoint, sleeps, batch_size=4)
+        requests = [
+            BatchRequest(id="a", url="/a"),
+            BatchRequest(id="b", url="/b"),
+            BatchRequest(id="c", url="/c"),
+            BatchRequest(id="e", url="/e", depends_on=["d"]),
+            BatchRequest(id="d", url="/d"),
+        ]
+
+        await executor.execute(requests)
+
+        first, second = endpoint.envelopes
+        assert [item['id'] for item in first['requests']] == ["a", "b", "c"]
+        assert [item['id'] for item in second['requests']] == ["d", "e"]
+        assert second['requests'][1]['dependsOn'] == ["d"]
+
+    @pytest.mark.asyncio
+    async def test_requeues_only_throttled_requests(self, sleeps):
+        """Only 429/503 sub-requests are re-sent, after the largest Retry-After."""
+        endpoint = FakeBatchEndpoint({
+            "2": [(429, {"Retry-After": "3"})],
+            "3": [(503, {"retry-after": "5"})],
+        })
+        executor = self._executor(endpoint, sleeps)
+        requests = [BatchRequest(id=str(i), url=f"/users/{i}") for i in range(5)]
+
+        responses = await executor.execute(requests)
+
+        assert sleeps == [5.0]
+        assert [item['id'] for item in endpoint.envelopes[1]['requests']] == ["2", "3"]
+        assert all(r.status == 200 for r in responses.values())
+        assert list(responses) == ["0", "1", "2", "3", "4"]
+        assert executor.stats['requeued'] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_is_requeued_with_throttled_parent(self, sleeps):
+        """A 424 dependent is retried together with its throttled dependency."""
+        endpoint = FakeBatchEndpoint({
+            "parent": [(429, {"Retry-After": "1"})],
+            "child": [(424, {})],
+        })
+        executor = self._executor(endpoint, sleeps)
+
+        responses = await executor.execute([
+            BatchRequest(id="parent", url="/p"),
+            BatchRequest(id="child", url="/c", depends_on=["parent"]),
+        ])
+
+        assert responses['parent'].status == 200
+        assert responses['child'].status == 200
+        retried = endpoint.envelopes[1]['requests']
+        assert [item['id'] for item in retried] == ["parent", "child"]
+        assert retried[1]['dependsOn'] == ["parent"]
+
+    @pytest.mark.asyncio
+    async def test_completed_dependency_dropped_on_retry(self, sleeps):
+        """A dependency that already succeeded is not re-sent with its dependent."""
+        endpoint = FakeBatchEndpoint({"child": [(429, {"Retry-After": "1"})]})
+        executor = self._executor(endpoint, sleeps)
+
+        await executor.execute([
+            BatchRequest(id="parent", url="/p"),
+            BatchRequest(id="child", url="/c", depends_on=["parent"]),
+        ])
+
+        retried = endpoint.envelopes[1]['requests']
+        assert retried == [{"id": "child", "method": "GET", "url": "/c"}]
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted_returns_throttled_response(self, sleeps):
+        """Throttled responses are returned once max_retries is reached."""
+        endpoint = FakeBatchEndpoint({"1": [(429, {})] * 3})
+        executor = self._executor(endpoint, sleeps, max_retries=2, default_retry_after=0.5)
+
+        responses = await executor.execute([BatchRequest(id="1", url="/x")])
+
+        assert responses['1'].status == 429
+        assert sleeps == [0.5, 0.5]
+
+    @pytest.mark.asyncio
+    async def test_envelope_failure_maps_to_error_responses(self, sleeps):
+        """A failed POST yields a 500 response for each sub-request."""
+        async def failing_send(payload):
+            raise ConnectionError("boom")
+        executor = self._executor(failing_send, sleeps)
+
+        responses = await executor.execute([BatchRequest(id="1"), BatchRequest(id="2")])
+
+        assert {r.status for r in responses.values()} == {500}
+        assert responses['1'].error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_throttled_envelope_waits_for_retry_after(self, sleeps):
+        """A 429 on the envelope re-queues every sub-request after its Retry-After."""
+        endpoint = FakeBatchEndpoint()
+        calls = []
+
+        async def throttled_once(payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise BatchEnvelopeThrottled("throttled", status=429, retry_after=7)
+            return await endpoint(payload)
+        executor = self._executor(throttled_once, sleeps, default_retry_after=0.5)
+
+        responses = await executor.execute([BatchRequest(id="1", url="/a"), BatchRequest(id="2", url="/b")])
+
+        assert sleeps == [7.0]
+        assert {r.status for r in responses.values()} == {200}
+        assert len(calls) == 2 and executor.stats['throttled'] == 2
+
+    @pytest.mark.asyncio
+    async def test_throttled_envelope_without_retry_after_uses_default(self, sleeps):
+        async def always_throttled(payload):
+            raise BatchEnvelopeThrottled("busy", status=503)
+        executor = self._executor(always_throttled, sleeps, max_retries=1, default_retry_after=0.5)
+
+        responses = await executor.execute([BatchRequest(id="1")])
+
+        assert sleeps == [0.5]
+        assert responses['1'].status == 503 and responses['1'].error == "busy"
+
+    @pytest.mark.asyncio
+    async def test_long_dependency_chain_requeued_with_throttled_root(self, sleeps):
+        """Every transitive dependent of a throttled request is retried with it."""
+        chain = [BatchRequest(id="0", url="/0")] + [
+            BatchRequest(id=str(i), url=f"/{i}", depends_on=[str(i - 1)]) for i in range(1, MAX_BATCH_SIZE)
+        ]
+        script = {"0": [(429, {'Retry-After': '2'})]}
+        script.update({str(i): [(424, {})] for i in range(1, MAX_BATCH_SIZE)})
+        executor = self._executor(FakeBatchEndpoint(script), sleeps)
+
+        responses = await executor.execute(chain)
+
+        assert sleeps == [2.0]
+        assert {r.status for r in responses.values()} == {200}
+        assert executor.stats['requeued'] == MAX_BATCH_SIZE
+
+    @pytest.mark.asyncio
+    async def test_validation_errors(self, sleeps):
+        """Duplicate IDs, unknown dependencies, cycles and oversized chains are rejected."""
+        executor = self._executor(FakeBatchEndpoint(), sleeps)
+
+        with pytest.raises(ValueError):
+            await executor.execute([BatchRequest(id="1"), BatchRequest(id="1")])
+        with pytest.raises(ValueError):
+            await executor.execute([BatchRequest(id="1", depends_on=["missing"])])
+        with pytest.raises(ValueError):
+            await executor.execute([
+                BatchRequest(id="1", depends_on=["2"]),
+                BatchRequest(id="2", depends_on=["1"]),
+            ])
+        chain = [BatchRequest(id="0")] + [
+            BatchRequest(id=str(i), depends_on=[str(i - 1)]) for i in range(1, MAX_BATCH_SIZE + 1)
+        ]
+        with pytest.raises(ValueError):
+            await executor.execute(chain)
@@ -0,0 +1,167 @@
+"""
+Unit tests for the bounded Microsoft Graph response cache.
+Tests LRU ordering, size accounting, TTL classes and background sweeping.
+"""
+
+import gc
+import pytest
+import time
+import weakref
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from api.graph.cache import GraphResponseCache, estimate_size
+
+
+class TestGraphResponseCache:
+    """Test suite for GraphResponseCache."""
+
+    def _expire(self, cache, key):
+        cache._entries[key].timestamp = datetime.utcnow() - timedelta(days=1)
+
+    def test_hit_and_miss_counting(self):
+        """Hits, misses and hit rate are tracked."""
+        cache = GraphResponseCache()
+        cache.set("a", {"value": [1]})
+
+        assert cache.get("a") == {"value": [1]}
+        assert cache.get("b") is None
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_lru_eviction_by_entry_count(self):
+        """The least recently used entry is evicted first."""
+        cache = GraphResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats['evictions'] == 1
+
+    def test_eviction_by_bytes(self):
+        """Entries are evicted once the byte budget is exceeded."""
+        payload = {"value": "x" * 100}
+        size = estimate_size(payload)
+        cache = GraphResponseCache(max_bytes=size * 3)
+        for key in "abcd":
+            cache.set(key, payload)
+
+        assert len(cache) == 3
+        assert cache.bytes == size * 3
+        assert "a" not in cache
+
+    def test_overwrite_keeps_byte_accounting(self):
+        """Replacing a key does not leak its previous size."""
+        cache = GraphResponseCache()
+        cache.set("a", "x" * 50)
+        cache.set("a", "y")
+
+        assert cache.bytes == estimate_size("y")
+
+    def test_oversized_response_not_cached(self):
+        """A single response larger than the budget is skipped."""
+        cache = GraphResponseCache(max_bytes=10)
+        cache.set("a", "small")
+        cache.set("b", "x" * 100)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats['oversized'] == 1
+
+    def test_ttl_classes_use_longest_prefix(self):
+        """Endpoint TTL classes resolve by longest matching prefix."""
+        cache = GraphResponseCache(default_ttl=60, ttl_classes={'/users': 300, '/users/delta': 10})
+
+        assert cache.ttl_for('/users') == 300
+        assert cache.ttl_for('/users/delta') == 10
+        assert cache.ttl_for('/groups') == 60
+
+        cache.set("k", 1, endpoint='/users/delta')
+        assert cache._entries["k"].ttl == 10
+
+    def test_expired_entry_dropped_on_read(self):
+        """Expired entries are removed when read."""
+        cache = GraphResponseCache()
+        cache.set("a", 1)
+        self._expire(cache, "a")
+
+        assert cache.get("a") is None
+        assert cache.bytes == 0
+        assert cache.stats['expired'] == 1
+
+    def test_sweep_removes_unread_expired_entries(self):
+        """The sweep removes expired entries nobody reads again."""
+        cache = GraphResponseCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self._expire(cache, "a")
+
+        assert cache.sweep_expired() == 1
+        assert len(cache) == 1
+
+    def test_background_sweeper(self):
+        """The sweeper thread evicts expired entries periodically."""
+        cache = GraphResponseCache()
+        cache.set("a", 1)
+        self._expire(cache, "a")
+        cache.start_sweeper(interval=0.01)
+        try:
+            deadline = time.time() + 2
+            while len(cache) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            cache.stop_sweeper()
+
+        assert len(cache) == 0
+
+    def test_sweeper_starts_on_first_write(self):
+        """With sweep_interval the thread starts lazily, once per cache."""
+        cache = GraphResponseCache(sweep_interval=60)
+        assert cache._sweep_thread is None
+
+        cache.set("a", 1)
+        thread = cache._sweep_thread
+        cache.set("b", 2)
+
+        assert thread is not None and thread.is_alive()
+        assert cache._sweep_thread is thread
+        cache.stop_sweeper()
+        assert not thread.is_alive()
+
+        # A stopped cache does not restart the sweeper on later writes
+        cache.set("c", 3)
+        assert cache._sweep_thread is None
+
+    def test_sweeper_exits_when_cache_is_collected(self):
+        """The sweep thread does not keep an abandoned cache alive."""
+        cache = GraphResponseCache(sweep_interval=60)
+        cache.set("a", 1)
+        thread = cache._sweep_thread
+        cache_ref = weakref.ref(cache)
+
+        del cache
+        gc.collect()
+        thread.join(timeout=2)
+
+        assert cache_ref() is None
+        assert not thread.is_alive()
+
+    def test_clear_resets_stats(self):
+        """clear() removes entries and resets counters."""
+        cache = GraphResponseCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.bytes == 0
+        assert cache.stats['hits'] == 0
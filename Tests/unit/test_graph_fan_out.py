@@ -0,0 +1,141 @@
+"""
+Unit tests for GraphClient.fan_out concurrent per-entity requests.
+Tests ordering via result index, throttling adaptation and error isolation.
+"""
+
+import pytest
+import threading
+import time
+from unittest.mock import Mock, patch
+from pathlib import Path
+import sys
+
+import requests_mock
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.graph.client import GraphClient, GraphAPIError, AdaptiveConcurrencyLimiter
+from src.core.config import Config
+
+
+@pytest.fixture
+def graph_client():
+    settings = {'ApiSettings.RetryDelay': 0, 'ApiSettings.RetryCount': 0}
+    config = Mock(spec=Config)
+    config.get.side_effect = lambda key, default=None: settings.get(key, default)
+    client = GraphClient(config)
+    client.access_token = 'token'
+    return client
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test suite for AdaptiveConcurrencyLimiter."""
+
+    def test_throttle_halves_and_success_grows(self):
+        limiter = AdaptiveConcurrencyLimiter(8)
+
+        limiter.record_throttle(0)
+        assert limiter.limit == 4
+        limiter.record_throttle(0)
+        limiter.record_throttle(0)
+        limiter.record_throttle(0)
+        assert limiter.limit == 1
+
+        limiter.record_success()
+        assert limiter.limit == 2
+
+    def test_throttle_pauses_acquire(self):
+        limiter = AdaptiveConcurrencyLimiter(2)
+        limiter.record_throttle(0.2)
+
+        started = time.monotonic()
+        limiter.acquire()
+        limiter.release()
+
+        assert time.monotonic() - started >= 0.15
+
+
+class TestGraphClientFanOut:
+    """Test suite for GraphClient.fan_out."""
+
+    def test_all_paths_yielded_with_index(self, graph_client):
+        paths = [f'/users/{i}/drive' for i in range(25)]
+
+        with patch.object(graph_client, 'get', side_effect=lambda path, params=None, session=None: {'path': path}):
+            results = list(graph_client.fan_out(paths, max_concurrency=4))
+
+        assert sorted(r.index for r in results) == list(range(25))
+        assert all(r.data == {'path': paths[r.index]} for r in results)
+
+    def test_concurrency_is_bounded(self, graph_client):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def slow_get(path, params=None, session=None):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.02)
+            with lock:
+                state['active'] -= 1
+            return {}
+
+        with patch.object(graph_client, 'get', side_effect=slow_get):
+            list(graph_client.fan_out([f'/p/{i}' for i in range(20)], max_concurrency=3))
+
+        assert 1 < state['peak'] <= 3
+
+    def test_throttled_request_is_retried(self, graph_client):
+        calls = {}
+
+        def throttling_get(path, params=None, session=None):
+            calls[path] = calls.get(path, 0) + 1
+            if path == '/p/1' and calls[path] == 1:
+                raise GraphAPIError("throttled", status_code=429, retry_after=0.01)
+            return {'ok': path}
+
+        with patch.object(graph_client, 'get', side_effect=throttling_get):
+            results = {r.index: r for r in graph_client.fan_out(['/p/0', '/p/1'], max_concurrency=2)}
+
+        assert results[1].success
+        assert calls['/p/1'] == 2
+
+    def test_errors_are_isolated(self, graph_client):
+        def failing_get(path, params=None, session=None):
+            if path == '/p/1':
+                raise GraphAPIError("HTTP error 404", status_code=404)
+            return {}
+
+        with patch.object(graph_client, 'get', side_effect=failing_get):
+            results = {r.index: r for r in graph_client.fan_out(['/p/0', '/p/1', '/p/2'])}
+
+        assert results[0].success and results[2].success
+        assert results[1].error.status_code == 404
+
+    def test_http_429_surfaces_retry_after(self, graph_client):
+        url = 'https://graph.microsoft.com/v1.0/users/1/drive'
+        with requests_mock.Mocker() as mocker:
+            mocker.get(url, [
+                {'status_code': 429, 'headers': {'Retry-After': '0'}, 'json': {}},
+                {'status_code': 200, 'json': {'id': 'drive-1'}},
+            ])
+            results = list(graph_client.fan_out(['/users/1/drive']))
+
+        assert results[0].data == {'id': 'drive-1'}
+        assert mocker.call_count == 2
+
+    def test_auth_methods_enrichment_uses_fan_out(self, graph_client):
+        users = {'value': [{'id': str(i)} for i in range(10)]}
+
+        def fake_get(path, params=None, session=None):
+            if path == '/users':
+                return users
+            if path == '/users/3/authentication/methods':
+                raise GraphAPIError("HTTP error 403", status_code=403)
+            return {'value': [{'id': path}]}
+
+        with patch.object(graph_client, 'get', side_effect=fake_get):
+            result = graph_client.get_users_with_auth_methods(limit=10)
+
+        assert result[0]['authenticationMethods'] == [{'id': '/users/0/authentication/methods'}]
+        assert result[3]['authenticationMethods'] == []
@@ -0,0 +1,79 @@
+"""
+Unit tests for streaming Graph pagination.
+Tests page/item iterators, next-page prefetch and the list-returning wrapper.
+"""
+
+import pytest
+import threading
+from unittest.mock import Mock, patch
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.graph.client import GraphClient
+from src.core.config import Config
+
+
+PAGES = {
+    'page2': {'value': [{'id': '3'}, {'id': '4'}], '@odata.nextLink': 'page3'},
+    'page3': {'value': [{'id': '5'}]},
+}
+FIRST_PAGE = {'value': [{'id': '1'}, {'id': '2'}], '@odata.nextLink': 'page2'}
+
+
+@pytest.fixture
+def graph_client():
+    config = Mock(spec=Config)
+    config.get.side_effect = lambda key, default=None: default
+    client = GraphClient(config)
+    client.access_token = 'token'
+    return client
+
+
+class TestGraphClientPagination:
+    """Test suite for GraphClient.iter_pages / iter_items."""
+
+    @pytest.mark.parametrize('prefetch', [True, False])
+    def test_iter_pages_yields_each_page(self, graph_client, prefetch):
+        with patch.object(graph_client, 'get', return_value=FIRST_PAGE), \
+                patch.object(graph_client, '_get_next_page', side_effect=PAGES.get):
+            pages = list(graph_client.iter_pages('/users', prefetch=prefetch))
+
+        assert [[item['id'] for item in page] for page in pages] == [['1', '2'], ['3', '4'], ['5']]
+
+    def test_iter_items_and_get_all_pages(self, graph_client):
+        with patch.object(graph_client, 'get', return_value=FIRST_PAGE), \
+                patch.object(graph_client, '_get_next_page', side_effect=PAGES.get):
+            items = [item['id'] for item in graph_client.iter_items('/users')]
+            all_items = graph_client.get_all_pages('/users')
+
+        assert items == ['1', '2', '3', '4', '5']
+        assert [item['id'] for item in all_items] == items
+
+    def test_next_page_is_prefetched(self, graph_client):
+        fetched = threading.Event()
+
+        def next_page(link):
+            fetched.set()
+            return PAGES[link]
+
+        with patch.object(graph_client, 'get', return_value=FIRST_PAGE), \
+                patch.object(graph_client, '_get_next_page', side_effect=next_page):
+            pages = graph_client.iter_pages('/users')
+            next(pages)
+            # The next page is requested while the caller still holds page 1
+            assert fetched.wait(timeout=2)
+            pages.close()
+
+    def test_stops_fetching_when_consumer_stops(self, graph_client):
+        with patch.object(graph_client, 'get', return_value=FIRST_PAGE), \
+                patch.object(graph_client, '_get_next_page', side_effect=PAGES.get) as mock_next:
+            first_item = next(graph_client.iter_items('/users', prefetch=False))
+
+        assert first_item == {'id': '1'}
+        mock_next.assert_not_called()
+
+    def test_single_object_response(self, graph_client):
+        with patch.object(graph_client, 'get', return_value={'id': 'org'}):
+            assert list(graph_client.iter_items('/organization/1')) == [{'id': 'org'}]
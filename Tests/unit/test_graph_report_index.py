@@ -0,0 +1,207 @@
+"""
+Unit tests for shared Graph usage report indexes.
+Tests UPN-keyed lookup and that report endpoints are fetched once per run.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from unittest.mock import Mock, patch
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.graph.client import GraphClient
+from src.api.graph.reports import ReportIndex, iter_join, join_reports
+from src.core.config import Config
+from src.core.powershell_bridge import PowerShellBridge
+
+
+MAILBOX_REPORT = {
+    'value': [
+        {'userPrincipalName': 'Alice@contoso.com', 'storageUsedInBytes': 1024 ** 2 * 5, 'itemCount': 10},
+        {'userPrincipalName': 'bob@contoso.com', 'storageUsedInBytes': 1024 ** 2, 'itemCount': 3},
+    ]
+}
+
+
+class FakeResponse:
+    """Streamed response stand-in for report downloads."""
+
+    def __init__(self, body, content_type='application/json', chunk=7):
+        self.body = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.headers = {'Content-Type': content_type}
+        self.chunk = chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for start in range(0, len(self.body), self.chunk):
+            yield self.body[start:start + self.chunk]
+
+    def close(self):
+        self.closed = True
+
+
+def serve_report(payload):
+    return lambda url: FakeResponse(payload)
+
+
+class TestReportIndex:
+    """Test suite for ReportIndex."""
+
+    def test_lookup_is_case_insensitive(self):
+        index = ReportIndex(MAILBOX_REPORT['value'])
+
+        assert index.get('alice@contoso.com')['itemCount'] == 10
+        assert 'BOB@contoso.com' in index
+        assert index.get('carol@contoso.com', {}) == {}
+        assert index.get(None) is None
+
+    def test_first_row_wins_and_rows_are_kept(self):
+        rows = [{'id': '1', 'n': 1}, {'id': '1', 'n': 2}, {'n': 3}]
+        index = ReportIndex(rows, key='id')
+
+        assert index.get('1')['n'] == 1
+        assert len(index) == 3
+        assert list(index) == rows
+
+    def test_empty_index_is_truthy(self):
+        assert ReportIndex([])
+
+
+class TestReportJoin:
+    """Test suite for iter_join / join_reports."""
+
+    USERS = [
+        {'userPrincipalName': 'Alice@contoso.com', 'displayName': 'Alice'},
+        {'userPrincipalName': 'bob@contoso.com', 'displayName': 'Bob'},
+        {'displayName': 'No UPN'},
+    ]
+
+    def test_left_and_inner_join(self):
+        pairs = list(iter_join(self.USERS, MAILBOX_REPORT['value'], 'userPrincipalName'))
+        assert [right.get('itemCount') for _, right in pairs] == [10, 3, None]
+
+        inner = list(iter_join(self.USERS[::-1], MAILBOX_REPORT['value'], 'userPrincipalName', how='inner'))
+        assert [left['displayName'] for left, _ in inner] == ['Bob', 'Alice']
+
+    def test_projection_and_different_keys(self):
+        subscriptions = [{'skuId': 'A', 'skuPartNumber': 'E3'}, {'skuId': 'b', 'skuPartNumber': 'E1'}]
+        usage = [{'id': 'a', 'assignedLicenses': 7}]
+
+        rows = join_reports(subscriptions, usage, 'skuId', right_key='id',
+                            left_columns={'skuPartNumber': 'name'}, right_columns=['assignedLicenses'])
+
+        assert rows == [{'name': 'E3', 'assignedLicenses': 7}, {'name': 'E1', 'assignedLicenses': None}]
+        assert join_reports(subscriptions, usage, 'skuId', right_key='id', how='inner')[0] == {
+            'skuId': 'A', 'skuPartNumber': 'E3', 'id': 'a', 'assignedLicenses': 7}
+
+    def test_reuses_report_index_and_validates(self):
+        index = ReportIndex(MAILBOX_REPORT['value'])
+        assert join_reports(self.USERS[:1], index, 'userPrincipalName', right_columns=['itemCount']) == [
+            {'userPrincipalName': 'Alice@contoso.com', 'displayName': 'Alice', 'itemCount': 10}]
+
+        with pytest.raises(ValueError):
+            list(iter_join(self.USERS, index, 'id'))
+        with pytest.raises(ValueError):
+            list(iter_join(self.USERS, [], 'userPrincipalName', how='outer'))
+
+    @pytest.mark.performance
+    def test_benchmark_100k_by_100k(self):
+        size = 100_000
+        users = [{'userPrincipalName': f'user{i}@contoso.com', 'displayName': f'User {i}'} for i in range(size)]
+        devices = [{'userPrincipalName': f'USER{i}@contoso.com', 'usedWeb': i % 2 == 0} for i in range(size - 1, -1, -1)]
+
+        start = time.perf_counter()
+        rows = join_reports(users, devices, 'userPrincipalName', right_columns=['usedWeb'])
+        elapsed = time.perf_counter() - start
+
+        print(f"\n100k x 100k hash join: {elapsed:.2f}s")
+        assert len(rows) == size
+        assert rows[10]['usedWeb'] is True and rows[11]['usedWeb'] is False
+        assert elapsed < 10
+
+
+class TestGraphClientReportIndex:
+    """GraphClient.get_report_index caching and sharing."""
+
+    @pytest.fixture
+    def graph_client(self):
+        config = Mock(spec=Config)
+        config.get.side_effect = lambda key, default=None: default
+        client = GraphClient(config)
+        client.access_token = 'token'
+        return client
+
+    def test_report_fetched_once(self, graph_client):
+        with patch.object(graph_client, '_open_report_page', side_effect=serve_report(MAILBOX_REPORT)) as mock_open:
+            first = graph_client.get_report_index('getMailboxUsageDetail')
+            second = graph_client.get_report_index('getMailboxUsageDetail')
+            rows = graph_client.get_mailbox_usage()
+
+        assert first is second
+        assert len(rows) == 2
+        mock_open.assert_called_once_with("/reports/getMailboxUsageDetail(period='D7')")
+
+    def test_clear_report_indexes_forces_refetch(self, graph_client):
+        with patch.object(graph_client, '_open_report_page', side_effect=serve_report(MAILBOX_REPORT)) as mock_open:
+            graph_client.get_report_index('getMailboxUsageDetail')
+            graph_client.clear_report_indexes()
+            graph_client.get_report_index('getMailboxUsageDetail')
+
+        assert mock_open.call_count == 2
+
+    def test_different_reports_download_concurrently(self, graph_client):
+        # Each download waits until the other one is in flight too
+        both_open = threading.Barrier(2, timeout=2)
+
+        def open_page(url):
+            both_open.wait()
+            return FakeResponse(MAILBOX_REPORT)
+
+        with patch.object(graph_client, '_open_report_page', side_effect=open_page):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [pool.submit(graph_client.get_report_index, report)
+                           for report in ('getMailboxUsageDetail', 'getOneDriveUsageAccountDetail')]
+                indexes = [future.result(timeout=5) for future in futures]
+
+        assert not both_open.broken
+        assert [len(index) for index in indexes] == [2, 2]
+
+    def test_same_report_downloaded_once_under_concurrency(self, graph_client):
+        def open_page(url):
+            time.sleep(0.05)
+            return FakeResponse(MAILBOX_REPORT)
+
+        with patch.object(graph_client, '_open_report_page', side_effect=open_page) as mock_open:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                indexes = list(pool.map(lambda _: graph_client.get_report_index('getMailboxUsageDetail'), range(4)))
+
+        assert mock_open.call_count == 1
+        assert all(index is indexes[0] for index in indexes)
+
+    def test_exchange_statistics_use_single_report_fetch(self, graph_client):
+        from src.api.exchange.client import ExchangeClient
+
+        users = [
+            {'id': str(i), 'displayName': f'User {i}', 'mail': f'u{i}@contoso.com',
+             'userPrincipalName': f'u{i}@contoso.com'}
+            for i in range(50)
+        ]
+        users[0]['userPrincipalName'] = 'alice@contoso.com'
+
+        with patch.object(PowerShellBridge, '_find_powershell', return_value='pwsh'):
+            exchange = ExchangeClient(graph_client.config, graph_client=graph_client)
+
+        with patch.object(graph_client, 'get_users', return_value=users), \
+                patch.object(graph_client, '_open_report_page', side_effect=serve_report(MAILBOX_REPORT)) as mock_open:
+            result = exchange._get_mailbox_statistics_graph(None, 1000)
+
+        assert result.success
+        assert mock_open.call_count == 1
+        assert result.data[0]['使用容量(MB)'] == 5.0
+        assert result.data[0]['アイテム数'] == 10
+        assert result.data[1]['アイテム数'] == 0
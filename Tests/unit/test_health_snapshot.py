@@ -0,0 +1,82 @@
+"""
+Unit tests for the published health snapshot.
+"""
+
+import dataclasses
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.monitoring.health_snapshot import CheckSnapshot, HealthSnapshot, evaluate
+
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def check(name, status="healthy", critical=False, age=0.0, max_age=60.0):
+    return CheckSnapshot(name=name, status=status, message=f"{name} {status}", critical=critical,
+                         checked_at=NOW - timedelta(seconds=age), max_age=max_age)
+
+
+class TestEvaluate:
+    """Test suite for overall status evaluation."""
+
+    @pytest.mark.parametrize("checks,expected", [
+        ([check("a"), check("b")], "healthy"),
+        ([check("a"), check("b", "warning")], "warning"),
+        ([check("a", "critical", critical=True), check("b", "warning")], "critical"),
+        # Failing non-critical checks do not fail the service
+        ([check("a"), check("b", "critical")], "healthy"),
+        # A critical check without a current result is a warning
+        ([check("a", critical=True, age=120)], "warning"),
+        ([CheckSnapshot("a", "unknown", "Not checked yet", critical=True)], "warning"),
+    ])
+    def test_overall_status(self, checks, expected):
+        assert evaluate(checks, NOW)["status"] == expected
+
+    def test_stale_results_reported_unknown(self):
+        result = evaluate([check("db", "critical", critical=True, age=90), check("graph", age=10)], NOW)
+
+        assert result["services"] == {"db": "unknown", "graph": "healthy"}
+        assert result["details"]["db"]["stale"] is True
+        assert result["summary"]["stale_services"] == ["db"]
+        assert result["summary"]["critical_services"] == []
+
+
+class TestHealthSnapshot:
+    """Test suite for HealthSnapshot."""
+
+    def test_view_reuses_payload_until_first_expiry(self):
+        snapshot = HealthSnapshot.build(
+            [check("system", age=50), check("graph", age=10, max_age=300), check("old", age=500)],
+            sequence=3, started_at=NOW - timedelta(hours=1), now=NOW
+        )
+
+        assert snapshot.fresh_until == NOW + timedelta(seconds=10)
+
+        fresh = snapshot.view(NOW + timedelta(seconds=5))
+        assert fresh["details"] is snapshot.payload["details"]
+        assert fresh["services"] == {"system": "healthy", "graph": "healthy", "old": "unknown"}
+        assert fresh["uptime_seconds"] == 3605
+        assert fresh["snapshot"]["sequence"] == 3 and fresh["snapshot"]["age_seconds"] == 5
+
+        expired = snapshot.view(NOW + timedelta(seconds=11))
+        assert expired["services"]["system"] == "unknown"
+        assert expired["services"]["graph"] == "healthy"
+
+    def test_snapshot_is_immutable(self):
+        snapshot = HealthSnapshot.build([check("a")], now=NOW)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.sequence = 2
+        with pytest.raises(TypeError):
+            snapshot.checks["b"] = check("b")
+
+    def test_empty_snapshot_is_healthy_and_never_expires(self):
+        snapshot = HealthSnapshot.build([], now=NOW)
+
+        assert snapshot.fresh_until is None
+        assert snapshot.view(NOW + timedelta(days=1))["status"] == "healthy"
@@ -0,0 +1,72 @@
+"""
+Unit tests for HTMLGenerator large-report mode.
+Tests the columnar row payload, chunked writing and automatic mode selection.
+"""
+
+import json
+import re
+import pytest
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.reports.generators.html_generator import HTMLGenerator
+
+
+def read_payload(content):
+    """Decode the row chunks written into the document."""
+    chunks = re.findall(r'<script>__reportChunks\.push\((.*?)\);</script>', content)
+    return [row for chunk in chunks for row in json.loads(chunk)]
+
+
+@pytest.fixture
+def generator():
+    return HTMLGenerator()
+
+
+class TestHTMLLargeReport:
+    """Test suite for HTMLGenerator.generate_large."""
+
+    def test_rows_written_as_columnar_chunks(self, generator, tmp_path):
+        rows = ({'ID': i, '名前': f'ユーザー{i}', 'ステータス': '正常', 'メモ': None} for i in range(25))
+        path = generator.generate_large(rows, tmp_path / 'large.html', 'signin_logs', chunk_size=10)
+
+        content = Path(path).read_text(encoding='utf-8')
+        assert content.count('__reportChunks.push(') == 3
+        assert '<td' not in content
+        payload = read_payload(content)
+        assert len(payload) == 25
+        assert payload[3] == ['3', 'ユーザー3', '正常', '']
+        assert 'const __reportColumns = ["ID","名前","ステータス","メモ"];' in content
+        assert content.rstrip().endswith('</html>')
+
+    def test_script_breakout_is_escaped(self, generator, tmp_path):
+        rows = [{'値': '</script><script>alert(1)</script>'}]
+        path = generator.generate_large(rows, tmp_path / 'escape.html', 'user_list')
+
+        content = Path(path).read_text(encoding='utf-8')
+        assert 'alert(1)</script>' not in content
+        assert read_payload(content) == [['</script><script>alert(1)</script>']]
+
+    def test_record_count_for_sized_input(self, generator, tmp_path):
+        rows = [{'ID': i} for i in range(1200)]
+        path = generator.generate_large(rows, tmp_path / 'count.html', 'user_list')
+
+        assert '<span data-record-count>1,200</span>' in Path(path).read_text(encoding='utf-8')
+
+    def test_generate_switches_mode_by_threshold(self, generator, tmp_path, monkeypatch):
+        monkeypatch.setattr(HTMLGenerator, 'LARGE_REPORT_THRESHOLD', 3)
+        small = [{'ID': i} for i in range(3)]
+        large = [{'ID': i} for i in range(4)]
+
+        small_html = Path(generator.generate(small, tmp_path / 'small.html', 'user_list')).read_text(encoding='utf-8')
+        large_html = Path(generator.generate(large, tmp_path / 'large.html', 'user_list')).read_text(encoding='utf-8')
+
+        assert '<td>2</td>' in small_html and '__reportChunks' not in small_html
+        assert '<td' not in large_html and len(read_payload(large_html)) == 4
+
+    def test_empty_input(self, generator, tmp_path):
+        path = generator.generate_large(iter([]), tmp_path / 'empty.html', 'user_list')
+
+        assert 'データが見つかりません' in Path(path).read_text(encoding='utf-8')
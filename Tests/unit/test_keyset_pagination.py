@@ -0,0 +1,140 @@
+"""
+Unit tests for keyset (cursor) pagination.
+Uses an in-memory SQLite database to walk listings page by page.
+"""
+
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.core.database import Base, User, AuditLog, USER_SORT_NAME
+from src.api.core.exceptions import ValidationError
+from src.api.core.pagination import (
+    fetch_keyset_page, count_rows, encode_cursor, decode_cursor, contains_pattern
+)
+
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+USER_KEYS = [(USER_SORT_NAME, False), (User.id, False)]
+AUDIT_KEYS = [(AuditLog.created_at, True), (AuditLog.id, True)]
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        for i in range(23):
+            session.add(User(
+                user_principal_name=f"user{i}@contoso.com",
+                # Duplicate and missing names exercise the (name, id) tie-break
+                display_name=None if i % 7 == 0 else f"User {i % 5}",
+                department="Sales" if i % 2 else "IT"
+            ))
+            session.add(AuditLog(
+                operation="user.update",
+                resource_type="user",
+                status="success",
+                created_at=BASE_TIME + timedelta(minutes=i // 3)
+            ))
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def walk(session, stmt, keys, size):
+    items, cursor = [], None
+    while True:
+        page = await fetch_keyset_page(session, stmt, keys, size, cursor=cursor)
+        items.extend(page.items)
+        if not page.has_next:
+            assert page.next_cursor is None
+            return items
+        cursor = page.next_cursor
+
+
+class TestKeysetPagination:
+    """Test suite for fetch_keyset_page."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_walk_matches_full_ordering(self, session_factory):
+        async with session_factory() as session:
+            expected = (await session.execute(
+                select(User).order_by(USER_SORT_NAME, User.id)
+            )).scalars().all()
+            walked = await walk(session, select(User), USER_KEYS, 4)
+
+        assert [u.id for u in walked] == [u.id for u in expected]
+
+    @pytest.mark.asyncio
+    async def test_descending_datetime_keys(self, session_factory):
+        async with session_factory() as session:
+            walked = await walk(session, select(AuditLog), AUDIT_KEYS, 5)
+
+        assert [log.id for log in walked] == list(range(23, 0, -1))
+
+    @pytest.mark.asyncio
+    async def test_filters_and_offset(self, session_factory):
+        stmt = select(User).where(User.department == "Sales")
+        async with session_factory() as session:
+            walked = await walk(session, stmt, USER_KEYS, 3)
+            page = await fetch_keyset_page(session, stmt, USER_KEYS, 3, offset=3)
+
+        assert len(walked) == 11
+        assert [u.id for u in page.items] == [u.id for u in walked[3:6]]
+
+    @pytest.mark.asyncio
+    async def test_count_modes(self, session_factory):
+        stmt = select(User).where(User.department == "IT")
+        async with session_factory() as session:
+            assert await count_rows(session, stmt, "exact") == 12
+            # Estimates fall back to an exact count outside PostgreSQL
+            assert await count_rows(session, stmt, "estimate") == 12
+            assert await count_rows(session, stmt, "none") is None
+            with pytest.raises(ValidationError):
+                await count_rows(session, stmt, "approximate")
+
+    @pytest.mark.asyncio
+    async def test_postgresql_only_indexes_skipped(self, session_factory):
+        async with session_factory() as session:
+            result = await session.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'users'")
+            )
+            names = set(result.scalars())
+
+        assert "ix_users_sort_name_id" in names
+        assert "ix_users_display_name_trgm" not in names
+
+
+class TestCursorEncoding:
+    """Test suite for cursor encoding."""
+
+    def test_round_trip(self):
+        values = ["Adele", BASE_TIME, 42]
+        keys = [(USER_SORT_NAME, False), (AuditLog.created_at, True), (User.id, False)]
+
+        assert decode_cursor(keys, encode_cursor(keys, values)) == values
+
+    def test_rejects_other_sort_order(self):
+        cursor = encode_cursor(AUDIT_KEYS, [BASE_TIME, 1])
+
+        with pytest.raises(ValidationError):
+            decode_cursor([(AuditLog.created_at, False), (AuditLog.id, False)], cursor)
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValidationError):
+            decode_cursor(USER_KEYS, "not-a-cursor")
+
+    def test_contains_pattern_escapes_wildcards(self):
+        assert contains_pattern("50%_off\\") == "%50\\%\\_off\\\\%"
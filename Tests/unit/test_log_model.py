@@ -0,0 +1,119 @@
+"""
+Unit tests for the ring-buffer log model used by the GUI log viewers.
+"""
+
+import time
+import pytest
+from pathlib import Path
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from PyQt6.QtCore import Qt
+from src.gui.components.log_model import LogBuffer, LogListModel, LogListView, LogRecord, RingBuffer
+
+
+def record(i, level="INFO"):
+    return LogRecord(f"12:00:{i % 60:02d}", level, f"message {i}")
+
+
+class TestRingBuffer:
+    """Test suite for RingBuffer."""
+
+    def test_append_evicts_oldest(self):
+        ring = RingBuffer(3)
+        evicted = [ring.append(i) for i in range(5)]
+
+        assert evicted == [None, None, None, 0, 1]
+        assert list(ring) == [2, 3, 4]
+        assert ring[0] == 2 and ring[2] == 4
+        assert ring.popleft() == 2 and list(ring) == [3, 4]
+        with pytest.raises(IndexError):
+            ring[2]
+
+
+class TestLogBuffer:
+    """Test suite for LogBuffer level filtering and eviction."""
+
+    def test_rows_follow_filter_and_eviction(self):
+        buffer = LogBuffer(capacity=4, levels=["error", "WARNING"])
+        buffer.extend([record(0, "ERROR"), record(1), record(2, "WARNING"), record(3)])
+
+        assert [r.message for r in buffer.rows] == ["message 0", "message 2"]
+
+        buffer.extend([record(4, "ERROR"), record(5)])
+        assert [r.message for r in buffer.rows] == ["message 2", "message 4"]
+
+        buffer.set_levels(exclude=["ERROR"])
+        assert [r.message for r in buffer.rows] == ["message 2", "message 3", "message 5"]
+
+    def test_rows_among_oldest(self):
+        buffer = LogBuffer(capacity=3, levels=["ERROR"])
+        buffer.extend([record(0, "ERROR"), record(1), record(2, "ERROR")])
+
+        assert buffer.overflow(2) == 2
+        assert buffer.rows_among_oldest(2) == 1
+
+
+class TestLogListModel:
+    """Test suite for LogListModel."""
+
+    def test_appends_are_coalesced_until_flush(self, qtbot):
+        model = LogListModel(capacity=100, levels=["ERROR"])
+        inserted = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        for i in range(10):
+            model.append(record(i, "ERROR" if i % 2 else "INFO"))
+
+        assert model.rowCount() == 0 and model.pending_count == 10
+        qtbot.waitUntil(lambda: model.rowCount() == 5, timeout=1000)
+        assert inserted == [(0, 4)]
+        assert model.data(model.index(0), Qt.ItemDataRole.DisplayRole).endswith("ERROR message 1")
+        assert model.data(model.index(0), LogListModel.RecordRole) == record(1, "ERROR")
+
+    def test_flush_removes_evicted_rows_before_inserting(self, qtbot):
+        model = LogListModel(capacity=5)
+        removed = []
+        model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+
+        for i in range(5):
+            model.append(record(i))
+        model.flush()
+        for i in range(5, 8):
+            model.append(record(i))
+        model.flush()
+
+        assert removed == [(0, 2)]
+        assert [model.data(model.index(row), LogListModel.RecordRole).message for row in range(5)] == [
+            f"message {i}" for i in range(3, 8)
+        ]
+
+    def test_view_text_and_clear(self, qtbot):
+        view = LogListView(LogListModel(capacity=10))
+        qtbot.addWidget(view)
+
+        view.model().append_entry("12:00:00", "WARNING", "disk low", "System")
+        assert view.toPlainText() == "[12:00:00] ⚠️ WARNING (System) disk low\n"
+
+        view.clear()
+        assert view.toPlainText() == "" and view.model().rowCount() == 0
+
+    @pytest.mark.performance
+    def test_bulk_append_cost_does_not_grow_with_lines(self, qtbot):
+        model = LogListModel(capacity=10000)
+
+        def append_batch(offset):
+            start = time.perf_counter()
+            for i in range(offset, offset + 5000):
+                model.append(record(i))
+            model.flush()
+            return time.perf_counter() - start
+
+        first = append_batch(0)
+        later = [append_batch(offset) for offset in range(5000, 50000, 5000)]
+
+        print(f"\n5000 lines: first batch {first * 1000:.1f} ms, "
+              f"batches at capacity {max(later) * 1000:.1f} ms max")
+        assert model.rowCount() == 10000
+        assert max(later) < first * 5 + 0.05
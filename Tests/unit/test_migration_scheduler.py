@@ -0,0 +1,247 @@
+"""
+Unit tests for the foreign key ordered, resumable migration scheduler.
+"""
+
+import importlib
+import sys
+import types
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pandas as pd
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy.orm import declarative_base
+
+# src.database cannot be imported here (models.py does not import under the
+# installed SQLAlchemy and the package pulls in redis), so the migration
+# modules are loaded from an alias package with only models.py replaced.
+DATABASE_DIR = Path(__file__).parent.parent.parent / "src" / "database"
+PACKAGE = "_migration_under_test"
+package = types.ModuleType(PACKAGE)
+package.__path__ = [str(DATABASE_DIR)]
+sys.modules.setdefault(PACKAGE, package)
+models = types.ModuleType(f"{PACKAGE}.models")
+for name in ('Base', 'User', 'MFAStatus', 'SignInLog', 'Mailbox', 'MailFlowAnalysis', 'TeamsUsage',
+             'OneDriveStorageAnalysis', 'LicenseAnalysis', 'ReportMetadata', 'DailySecurityReport',
+             'PerformanceMonitoring'):
+    setattr(models, name, Mock(name=name))
+sys.modules.setdefault(f"{PACKAGE}.models", models)
+
+data_migration = importlib.import_module(f"{PACKAGE}.data_migration")
+scheduler_module = importlib.import_module(f"{PACKAGE}.migration_scheduler")
+MigrationCheckpoint = scheduler_module.MigrationCheckpoint
+MigrationResult = data_migration.MigrationResult
+MigrationScheduler = scheduler_module.MigrationScheduler
+build_dependency_graph = scheduler_module.build_dependency_graph
+topological_levels = scheduler_module.topological_levels
+
+
+Base = declarative_base()
+
+
+class Tenant(Base):
+    __tablename__ = 'tenants'
+    id = Column(Integer, primary_key=True)
+
+
+class Account(Base):
+    __tablename__ = 'accounts'
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey('tenants.id'))
+    manager_id = Column(Integer, ForeignKey('accounts.id'))
+
+
+class Mailbox(Base):
+    __tablename__ = 'mailboxes'
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'))
+
+
+class SignIn(Base):
+    __tablename__ = 'signins'
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'))
+
+
+class AuditEntry(Base):
+    __tablename__ = 'audit_entries'
+    id = Column(Integer, primary_key=True)
+
+
+TABLE_MAPPINGS = {
+    'tenants': {'model': Tenant},
+    'accounts': {'model': Account},
+    'mailboxes': {'model': Mailbox},
+    'signins': {'model': SignIn},
+    'audit': {'model': AuditEntry},
+}
+
+
+def result(table_name, status='success', migrated=1):
+    now = datetime.utcnow()
+    return MigrationResult(source_file=table_name, target_table=table_name, records_processed=migrated,
+                           records_migrated=migrated, records_skipped=0, records_failed=0,
+                           start_time=now, end_time=now, status=status, errors=[])
+
+
+class FakeMigrator:
+    """In-process stand-in for PowerShellDataMigrator (no database)."""
+
+    calls = []
+    fail_tables = set()
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.table_mappings = TABLE_MAPPINGS
+        self.bulk_loader = Mock(stats={'rows_loaded': 0}, **{'get_stats.return_value': {'rows_loaded': 1}})
+
+    def migrate_table_data(self, table_name, source_files, backup=True, start_row=0, on_chunk_committed=None):
+        with FakeMigrator.lock:
+            FakeMigrator.calls.append((table_name, source_files[0].name, start_row))
+        if table_name in FakeMigrator.fail_tables:
+            return result(table_name, status='error')
+        return result(table_name)
+
+
+@pytest.fixture
+def fake_migrator(monkeypatch):
+    FakeMigrator.calls = []
+    FakeMigrator.fail_tables = set()
+    monkeypatch.setattr(scheduler_module, 'PowerShellDataMigrator', FakeMigrator)
+    monkeypatch.setitem(data_migration.MIGRATION_CONFIG, 'dry_run_mode', False)
+    return FakeMigrator
+
+
+@pytest.fixture
+def source_files(tmp_path):
+    files = {}
+    for table_name in TABLE_MAPPINGS:
+        path = tmp_path / f"{table_name}.csv"
+        path.write_text("Id\n1\n")
+        files[table_name] = [path]
+    return files
+
+
+def make_scheduler(tmp_path, progress=None):
+    return MigrationScheduler(FakeMigrator(), max_workers=3, checkpoint_dir=tmp_path / "checkpoints",
+                              progress_callback=progress, executor_factory=lambda n: ThreadPoolExecutor(n))
+
+
+class TestDependencyGraph:
+    """Test suite for build_dependency_graph / topological_levels."""
+
+    def test_graph_from_foreign_keys(self):
+        graph = build_dependency_graph(TABLE_MAPPINGS)
+
+        # Self references (accounts.manager_id) are ignored
+        assert graph == {'tenants': set(), 'accounts': {'tenants'}, 'mailboxes': {'accounts'},
+                         'signins': {'accounts'}, 'audit': set()}
+
+    def test_levels(self):
+        levels = topological_levels(build_dependency_graph(TABLE_MAPPINGS))
+
+        assert [sorted(level) for level in levels] == [['audit', 'tenants'], ['accounts'], ['mailboxes', 'signins']]
+
+    def test_cycle_is_rejected(self):
+        with pytest.raises(ValueError, match='Circular'):
+            topological_levels({'a': {'b'}, 'b': {'c'}, 'c': {'a'}, 'd': set()})
+
+
+class TestMigrationScheduler:
+    """Test suite for MigrationScheduler.run with an in-process executor."""
+
+    def test_tables_run_after_their_dependencies(self, tmp_path, fake_migrator, source_files):
+        events = []
+        results = make_scheduler(tmp_path, lambda *args: events.append(args[:2])).run(source_files)
+
+        order = [table_name for table_name, status in events if status == 'success']
+        assert sorted(order) == sorted(TABLE_MAPPINGS)
+        assert order.index('tenants') < order.index('accounts') < order.index('mailboxes')
+        assert order.index('accounts') < order.index('signins')
+        started = [table_name for table_name, status in events if status == 'running']
+        assert started.index('accounts') > order.index('tenants')
+        assert {r.target_table: r.status for r in results} == dict.fromkeys(TABLE_MAPPINGS, 'success')
+
+    def test_failed_table_skips_dependents_and_resume_skips_done_files(self, tmp_path, fake_migrator, source_files):
+        fake_migrator.fail_tables = {'accounts'}
+
+        first = {r.target_table: r.status for r in make_scheduler(tmp_path).run(source_files)}
+
+        assert first == {'tenants': 'success', 'audit': 'success', 'accounts': 'error',
+                         'mailboxes': 'skipped_dependency_failed', 'signins': 'skipped_dependency_failed'}
+
+        # Second run: checkpointed files are not migrated again
+        fake_migrator.calls = []
+        fake_migrator.fail_tables = set()
+        second = {r.target_table: r.status for r in make_scheduler(tmp_path).run(source_files)}
+
+        assert sorted(table_name for table_name, _, _ in fake_migrator.calls) == ['accounts', 'mailboxes', 'signins']
+        assert second['tenants'] == 'resumed' and second['mailboxes'] == 'success'
+
+    def test_cycle_fails_before_any_migration(self, tmp_path, fake_migrator, source_files):
+        scheduler = make_scheduler(tmp_path)
+        scheduler.graph = {'tenants': {'audit'}, 'audit': {'tenants'}}
+
+        with pytest.raises(ValueError):
+            scheduler.run(source_files)
+        assert fake_migrator.calls == []
+
+
+class TestChunkCheckpoint:
+    """Test suite for resuming a partially migrated file."""
+
+    def test_checkpoint_progress_and_done(self, tmp_path, source_files):
+        checkpoint = MigrationCheckpoint(tmp_path / "checkpoints")
+        path = source_files['signins'][0]
+
+        checkpoint.mark_progress('signins', path, 4)
+        assert checkpoint.rows_done('signins', path) == 4
+        assert checkpoint.has_state('signins') and not checkpoint.is_done('signins', path)
+
+        checkpoint.mark_done('signins', path, result('signins'))
+        assert checkpoint.rows_done('signins', path) == 0 and checkpoint.is_done('signins', path)
+
+    def test_interrupted_file_resumes_after_last_committed_chunk(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'pandas', pd)
+        monkeypatch.setitem(data_migration.MIGRATION_CONFIG, 'dry_run_mode', False)
+        monkeypatch.setitem(data_migration.MIGRATION_CONFIG, 'bulk_copy_enabled', True)
+        monkeypatch.setitem(data_migration.MIGRATION_CONFIG, 'bulk_chunk_size', 2)
+        monkeypatch.setattr(data_migration, 'get_session', contextmanager(lambda: (yield Mock())))
+
+        source = tmp_path / "signins.csv"
+        source.write_text("Id\n" + "".join(f"{i}\n" for i in range(1, 8)))
+        loaded = []
+
+        def load_chunk(chunk_df, table_name, mapping):
+            if len(loaded) == 2:
+                raise KeyboardInterrupt  # the process dies during the third chunk
+            loaded.append(chunk_df['Id'].tolist())
+            return len(chunk_df)
+
+        migrator = data_migration.PowerShellDataMigrator.__new__(data_migration.PowerShellDataMigrator)
+        migrator.table_mappings = {'signins': {'model': SignIn, 'field_mappings': {'Id': 'id'}}}
+        migrator._migrate_chunk_bulk = load_chunk
+        checkpoint = MigrationCheckpoint(tmp_path / "checkpoints")
+
+        def committed(path, rows):
+            checkpoint.mark_progress('signins', path, rows)
+
+        with pytest.raises(KeyboardInterrupt):
+            migrator.migrate_table_data('signins', [source], backup=False, on_chunk_committed=committed)
+        assert checkpoint.rows_done('signins', source) == 4
+
+        loaded.clear()
+        migrator._migrate_chunk_bulk = lambda chunk_df, table_name, mapping: loaded.append(
+            chunk_df['Id'].tolist()) or len(chunk_df)
+        resumed = migrator.migrate_table_data('signins', [source], backup=False,
+                                              start_row=checkpoint.rows_done('signins', source),
+                                              on_chunk_committed=committed)
+
+        assert loaded == [[5, 6], [7]]
+        assert (resumed.status, resumed.records_migrated) == ('success', 3)
+        assert checkpoint.rows_done('signins', source) == 7
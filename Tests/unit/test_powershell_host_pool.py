@@ -0,0 +1,189 @@
+"""
+Unit tests for the persistent PowerShell host pool.
+Uses a fake pwsh stub (Tests/fixtures/fake_pwsh_host.py) that speaks the framed JSON protocol.
+"""
+
+import pytest
+import threading
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from core.powershell_bridge import PowerShellBridge
+from core.powershell_host_pool import PowerShellHostPool, PowerShellHostError
+
+FAKE_HOST = [sys.executable, str(Path(__file__).parent.parent / "fixtures" / "fake_pwsh_host.py")]
+
+
+class TestPowerShellHostPool:
+    """Test suite for PowerShellHostPool."""
+
+    @pytest.fixture
+    def pool(self):
+        pool = PowerShellHostPool(FAKE_HOST, size=2, max_commands_per_host=5)
+        yield pool
+        pool.shutdown()
+
+    def test_hosts_are_reused(self, pool):
+        """Sequential commands run in the same long-lived process."""
+        first = pool.execute('Get-HostPid')
+        before = pool.execute('Get-Counter')
+        after = pool.execute('Get-Counter')
+        second = pool.execute('Get-HostPid')
+
+        assert first.output == second.output
+        assert int(after.output) == int(before.output) + 1
+        assert pool.get_stats()['hosts_started'] == 1
+
+    def test_recycle_after_max_commands(self, pool):
+        """A host is replaced after max_commands_per_host commands."""
+        pids = {pool.execute('Get-HostPid').output for _ in range(6)}
+
+        assert len(pids) == 2
+        assert pool.get_stats()['hosts_recycled'] == 1
+
+    def test_stray_output_is_separated(self, pool):
+        """Lines outside the frame do not corrupt the response."""
+        response = pool.execute('Write-Stray hello')
+
+        assert response.output == '"ok"'
+        assert response.stray_output == ['hello']
+
+    def test_error_frame(self, pool):
+        """Command errors come back as error frames and keep the host alive."""
+        response = pool.execute('Throw Access denied')
+
+        assert response.success is False
+        assert response.error['Message'] == 'Access denied'
+        assert pool.execute('$true').success
+
+    def test_dead_host_is_replaced(self, pool):
+        """A host that exits is discarded and a new one is started."""
+        with pytest.raises(PowerShellHostError):
+            pool.execute('Exit-Host')
+
+        assert pool.execute('$true').success
+        stats = pool.get_stats()
+        assert stats['hosts_failed'] == 1
+        assert stats['hosts_started'] == 2
+
+    def test_timeout_discards_host(self, pool):
+        """A timed-out host is discarded because its state is unknown."""
+        with pytest.raises(TimeoutError):
+            pool.execute('Start-Sleep 5', timeout=0.3)
+
+        assert pool.get_stats()['timeouts'] == 1
+        assert pool.execute('$true').success
+
+    def test_max_concurrency(self, pool):
+        """No more than `size` hosts exist even under contention."""
+        results = []
+
+        def worker():
+            results.append(pool.execute('Start-Sleep 0.2').output)
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['"slept"'] * 6
+        assert pool.get_stats()['hosts_started'] == 2
+
+    def test_health_check_on_idle_host(self):
+        """Idle hosts are pinged before reuse."""
+        pool = PowerShellHostPool(FAKE_HOST, size=1, health_check_interval=0)
+        try:
+            pool.execute('$true')
+            pool.execute('$true')
+            # startup ping + 2 commands + 1 health check ping
+            assert pool.get_stats()['commands_executed'] == 2
+            assert pool._hosts[0].commands_executed == 3
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_rejects_new_work(self, pool):
+        """The pool refuses commands after shutdown."""
+        pool.execute('$true')
+        pool.shutdown()
+
+        with pytest.raises(PowerShellHostError):
+            pool.execute('$true')
+
+
+class TestPowerShellBridgeHostPool:
+    """PowerShellBridge dispatching onto the host pool."""
+
+    @pytest.fixture
+    def bridge(self):
+        with patch.object(PowerShellBridge, '_find_powershell', return_value='pwsh'):
+            bridge = PowerShellBridge(use_host_pool=True, host_pool_size=2,
+                                      host_command_line=FAKE_HOST)
+        yield bridge
+        bridge.cleanup()
+
+    def test_execute_batch_uses_pool(self, bridge):
+        """execute_batch runs on pooled hosts and keeps input order."""
+        with patch('core.powershell_bridge.subprocess.run') as mock_run:
+            results = bridge.execute_batch(['a', 'b', 'Get-HostPid', 'Get-HostPid'], parallel=False)
+
+        mock_run.assert_not_called()
+        assert [r.data for r in results[:2]] == ['a', 'b']
+        assert results[2].data == results[3].data
+        assert all(r.success for r in results)
+
+    def test_execute_batch_parallel(self, bridge):
+        """Parallel batches are bounded by the pool size."""
+        results = bridge.execute_batch([f'cmd{i}' for i in range(8)], parallel=True)
+
+        assert [r.data for r in results] == [f'cmd{i}' for i in range(8)]
+        assert bridge.host_pool.get_stats()['hosts_started'] <= 2
+
+    @pytest.mark.asyncio
+    async def test_execute_command_async_uses_pool(self, bridge):
+        """execute_command_async dispatches onto the pool."""
+        results = await bridge.execute_batch_async(['x', 'Throw boom'])
+
+        assert results[0].data == 'x'
+        assert results[1].success is False
+        assert results[1].error_message == 'boom'
+
+    def test_cleanup_stops_hosts(self, bridge):
+        """cleanup() shuts the pool down."""
+        bridge.execute_pooled('$true')
+        pool = bridge.host_pool
+        bridge.cleanup()
+
+        assert pool.get_stats()['hosts_alive'] == 0
+
+    def test_concurrent_access_creates_one_pool(self):
+        """Threads racing on the lazy host_pool property share a single pool."""
+        with patch.object(PowerShellBridge, '_find_powershell', return_value='pwsh'):
+            bridge = PowerShellBridge(use_host_pool=True, host_command_line=FAKE_HOST)
+        created = []
+        start = threading.Barrier(8)
+
+        def slow_pool(*args, **kwargs):
+            created.append(args)
+            threading.Event().wait(0.05)
+            return object()
+
+        def access():
+            start.wait()
+            return bridge.host_pool
+
+        with patch('core.powershell_bridge.PowerShellHostPool', side_effect=slow_pool):
+            seen = []
+            threads = [threading.Thread(target=lambda: seen.append(access())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(created) == 1
+        assert len(seen) == 8 and all(pool is seen[0] for pool in seen)
+        bridge._host_pool = None
+        bridge.cleanup()
@@ -0,0 +1,134 @@
+"""
+Unit tests for the concurrent report composition layer.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import Mock, patch
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.graph.report_composer import ReportComposer, ReportSection, ReportSectionError
+from src.api.graph.services import ReportService, TeamsService, UserService
+
+
+def slow(value, delay=0.2, calls=None):
+    def fetch():
+        if calls is not None:
+            calls.append(value)
+        time.sleep(delay)
+        return value
+    return fetch
+
+
+class TestReportComposer:
+    """Test suite for ReportComposer."""
+
+    def test_independent_sources_run_concurrently(self):
+        composer = ReportComposer({name: slow([name]) for name in 'abcde'})
+        sections = [ReportSection(name, (name,), lambda **data: list(data.values())[0]) for name in 'abcde']
+
+        start = time.perf_counter()
+        result = composer.compose(sections)
+        elapsed = time.perf_counter() - start
+
+        assert result.rows() == list('abcde')
+        assert elapsed < 0.6
+        assert set(result.fetch_seconds) == set('abcde')
+
+    def test_shared_source_fetched_once(self):
+        calls = []
+        composer = ReportComposer({'users': slow([{'id': 1}, {'id': 2}], 0.05, calls)})
+
+        result = composer.compose([
+            ReportSection('count', ('users',), lambda users: len(users)),
+            ReportSection('ids', ('users',), lambda users: [u['id'] for u in users]),
+        ])
+
+        assert calls == [[{'id': 1}, {'id': 2}]]
+        assert result.get('count') == 2 and result.get('ids') == [1, 2]
+
+    def test_failure_and_timeout_give_partial_results(self):
+        release = threading.Event()
+
+        def failing():
+            raise RuntimeError('Graph unavailable')
+
+        composer = ReportComposer({'ok': lambda: ['row'], 'broken': failing,
+                                   'hung': lambda: release.wait(5) and []})
+        try:
+            start = time.perf_counter()
+            result = composer.compose([
+                ReportSection('ok', ('ok',), lambda ok: ok),
+                ReportSection('broken', ('broken',), lambda broken: broken),
+                ReportSection('hung', ('hung',), lambda hung: hung),
+                ReportSection('unknown', ('missing',), lambda missing: missing),
+                ReportSection('bad_build', ('ok',), lambda ok: 1 / 0),
+            ], timeout=0.2)
+            elapsed = time.perf_counter() - start
+        finally:
+            release.set()
+
+        assert elapsed < 1
+        assert result.rows() == ['row']
+        assert result.failed == ['broken', 'hung', 'unknown', 'bad_build']
+        assert 'Graph unavailable' in result.sections['broken'].error
+        assert result.sections['hung'].timed_out
+        with pytest.raises(ReportSectionError, match='timed out'):
+            result.get('hung')
+
+    def test_compose_async_awaits_coroutine_sources(self):
+        async def users():
+            await asyncio.sleep(0.05)
+            return ['alice']
+
+        composer = ReportComposer({'users': users, 'activity': lambda: {'alice': 3}})
+        result = asyncio.run(composer.compose_async([
+            ReportSection('report', ('users', 'activity'),
+                          lambda users, activity: [(u, activity[u]) for u in users])
+        ]))
+
+        assert result.get('report') == [('alice', 3)]
+
+
+class TestDailyReport:
+    """Test suite for ReportService.generate_daily_report."""
+
+    def test_daily_report_runs_services_concurrently(self):
+        def delayed(value):
+            def fetch(*args, **kwargs):
+                time.sleep(0.2)
+                return value
+            return fetch
+
+        service = ReportService(Mock())
+        with patch.object(UserService, 'get_all_users', delayed([{'accountEnabled': True}])), \
+                patch('src.api.graph.services.LicenseService.get_license_analysis', delayed([])), \
+                patch.object(TeamsService, 'get_teams_usage', delayed([{'今月の投稿数': 3}])), \
+                patch('src.api.graph.services.OneDriveService.get_storage_analysis', delayed([])), \
+                patch('src.api.graph.services.ExchangeService.get_mailbox_analysis', delayed([])):
+            start = time.perf_counter()
+            report = service.generate_daily_report()
+            elapsed = time.perf_counter() - start
+
+        assert [row['カテゴリ'] for row in report] == [
+            'ユーザー管理', 'ライセンス管理', 'Teams活用', 'ストレージ', 'Exchange Online'
+        ]
+        assert report[0]['値'] == 1 and report[2]['値'] == 1
+        assert elapsed < 0.6
+
+    def test_daily_report_omits_failed_sections(self):
+        def failing(*args, **kwargs):
+            raise RuntimeError('boom')
+
+        service = ReportService(Mock())
+        with patch.object(TeamsService, 'get_teams_usage', failing):
+            report = service.generate_daily_report()
+
+        categories = [row['カテゴリ'] for row in report]
+        assert 'Teams活用' not in categories
+        assert 'ユーザー管理' in categories
@@ -0,0 +1,136 @@
+"""
+Unit tests for the streaming Graph report fetcher.
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import Mock
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.graph.report_fetcher import ReportFetcher, csv_column_name, iter_csv_rows, iter_json_page
+from src.api.graph.services import ExchangeService
+
+
+class FakeResponse:
+    """Streamed response stand-in."""
+
+    def __init__(self, body, content_type, chunk=5):
+        self.body = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.headers = {'Content-Type': content_type}
+        self.chunk = chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for start in range(0, len(self.body), self.chunk):
+            yield self.body[start:start + self.chunk]
+
+    def close(self):
+        self.closed = True
+
+
+def chunked(data, size=3):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestReportParsing:
+    """Test suite for CSV / JSON report parsing."""
+
+    def test_csv_rows_are_typed_and_renamed(self):
+        body = ('﻿Report Refresh Date,User Principal Name,Is Deleted,Storage Used (Byte),'
+                'Assigned Products,Display Name\r\n'
+                '2024-01-07,a@contoso.com,False,1024,OFFICE 365 E3+MICROSOFT TEAMS,"Doe, ""Jane"""\r\n'
+                '2024-01-07,b@contoso.com,True,,,"multi\r\nline"\r\n'
+                '2024-01-07,c@contoso.com,,2048,,1234\r\n').encode('utf-8')
+
+        rows = list(iter_csv_rows(chunked(body)))
+
+        assert rows == [
+            {'reportRefreshDate': '2024-01-07', 'userPrincipalName': 'a@contoso.com', 'isDeleted': False,
+             'storageUsedInBytes': 1024, 'assignedProducts': ['OFFICE 365 E3', 'MICROSOFT TEAMS'],
+             'displayName': 'Doe, "Jane"'},
+            {'reportRefreshDate': '2024-01-07', 'userPrincipalName': 'b@contoso.com', 'isDeleted': True,
+             'storageUsedInBytes': 0, 'assignedProducts': [], 'displayName': 'multi\r\nline'},
+            # Text columns are never converted, whatever they look like
+            {'reportRefreshDate': '2024-01-07', 'userPrincipalName': 'c@contoso.com', 'isDeleted': False,
+             'storageUsedInBytes': 2048, 'assignedProducts': [], 'displayName': '1234'},
+        ]
+
+    def test_empty_numeric_cells_feed_mailbox_analysis(self):
+        body = ('User Principal Name,User Display Name,Storage Used (Byte),Prohibit Send Quota (Byte),'
+                'Deleted Item Size (Byte),Item Count,Has Archive\r\n'
+                'a@contoso.com,true,,,,,\r\n'
+                'b@contoso.com,B,2097152,104857600,1048576,12,True\r\n').encode('utf-8')
+        client = Mock()
+        client.get_mailbox_usage.return_value = list(iter_csv_rows(chunked(body)))
+
+        result = ExchangeService(client).get_mailbox_analysis()
+
+        assert [(r['ユーザー名'], r['メールボックス容量(MB)'], r['クォータ(MB)'], r['アイテム数'], r['アーカイブ有効'])
+                for r in result] == [('true', 0.0, 0.0, 0, False), ('B', 2.0, 100.0, 12, True)]
+
+    def test_csv_column_name(self):
+        assert csv_column_name('Storage Used (Byte)') == 'storageUsedInBytes'
+        assert csv_column_name('Last Activity Date') == 'lastActivityDate'
+
+    def test_json_page_items_and_next_link(self):
+        page = {'@odata.context': 'ctx', 'value': [{'id': i, 'size': 12345678901, 'name': 'ü'} for i in range(3)],
+                '@odata.nextLink': 'https://next'}
+
+        items, properties = iter_json_page(chunked(json.dumps(page, ensure_ascii=False).encode('utf-8'), 2))
+
+        assert list(items) == page['value']
+        assert properties == {'@odata.context': 'ctx', '@odata.nextLink': 'https://next'}
+
+
+class TestReportFetcher:
+    """Test suite for ReportFetcher."""
+
+    def make_fetcher(self, pages, cache_dir=None):
+        opened = []
+
+        def open_page(url):
+            opened.append(url)
+            return FakeResponse(json.dumps(pages[url]), 'application/json')
+        return ReportFetcher(open_page, cache_dir=cache_dir, chunk_size=7), opened
+
+    def test_follows_next_links(self):
+        first = ReportFetcher.endpoint('getMailboxUsageDetail', 'D7')
+        fetcher, opened = self.make_fetcher({
+            first: {'value': [{'id': 1}], '@odata.nextLink': 'page2'},
+            'page2': {'value': [{'id': 2}, {'id': 3}]},
+        })
+
+        assert [row['id'] for row in fetcher.get_rows('getMailboxUsageDetail', 'D7')] == [1, 2, 3]
+        assert opened == [first, 'page2']
+
+    def test_csv_body_is_single_page(self):
+        fetcher = ReportFetcher(lambda url: FakeResponse('Site Id,File Count\r\nx,3\r\n', 'application/octet-stream'))
+
+        assert fetcher.get_rows('getSharePointSiteUsageDetail') == [{'siteId': 'x', 'fileCount': 3}]
+
+    def test_daily_cache_downloads_once_and_prunes(self, tmp_path):
+        endpoint = ReportFetcher.endpoint('getOffice365ActiveUserDetail', 'D30')
+        fetcher, opened = self.make_fetcher({endpoint: {'value': [{'id': 'a'}]}}, cache_dir=tmp_path)
+        stale = tmp_path / 'getOffice365ActiveUserDetail_D30_20000101.jsonl'
+        stale.write_text('{"id": "old"}\n')
+
+        assert fetcher.prefetch([('getOffice365ActiveUserDetail', 'D30')]) == {
+            ('getOffice365ActiveUserDetail', 'D30'): None}
+        rows = fetcher.get_rows('getOffice365ActiveUserDetail', 'D30')
+
+        assert rows == [{'id': 'a'}]
+        assert len(opened) == 1 and fetcher.download_count == 1
+        assert not stale.exists()
+        assert [p.name for p in tmp_path.iterdir()] == [fetcher.cache_path('getOffice365ActiveUserDetail', 'D30').name]
+
+    def test_failed_download_leaves_no_cache_file(self, tmp_path):
+        def open_page(url):
+            raise RuntimeError('throttled')
+        fetcher = ReportFetcher(open_page, cache_dir=tmp_path)
+
+        result = fetcher.prefetch([('getMailboxUsageDetail', 'D7')])
+
+        assert result == {('getMailboxUsageDetail', 'D7'): 'throttled'}
+        assert list(tmp_path.iterdir()) == []
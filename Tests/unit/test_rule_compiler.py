@@ -0,0 +1,132 @@
+"""
+Unit tests for the compliance rule compiler and event_type rule index.
+"""
+
+import time
+import pytest
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.compliance.rule_compiler import (
+    CompiledRuleIndex, RuleSyntaxError, compile_condition, ANY_EVENT_TYPE
+)
+
+
+class EventType(Enum):
+    LOGIN = "login"
+    ACCESS = "access"
+    DELETION = "deletion"
+
+
+FIELDS = {"event_type", "resource", "data_classification", "source_ip", "retention_period", "details"}
+
+
+def make_event(event_type=EventType.LOGIN, resource="/api/users", data_classification="internal",
+               source_ip="10.0.0.1", retention_period=365, details=None):
+    return SimpleNamespace(event_type=event_type, resource=resource, data_classification=data_classification,
+                           source_ip=source_ip, retention_period=retention_period, details=details or {})
+
+
+class TestCompileCondition:
+    """Test suite for compile_condition."""
+
+    @pytest.mark.parametrize("condition,event,expected", [
+        ("event_type IN ('login', 'logout', 'access')", make_event(EventType.ACCESS), True),
+        ("event_type IN ('login', 'logout', 'access')", make_event(EventType.DELETION), False),
+        ("resource LIKE '%financial%' OR resource LIKE '%accounting%'", make_event(resource="/Accounting/q1"), True),
+        ("resource LIKE '/api/_sers'", make_event(), True),
+        ("resource LIKE '/api'", make_event(), False),
+        ("data_classification = 'personal'", make_event(data_classification="personal"), True),
+        ("data_classification = 'personal'", make_event(data_classification="non-personal"), False),
+        ("event_type = 'login' AND NOT resource LIKE '%health%'", make_event(resource="/health"), False),
+        ("(event_type = 'access' OR event_type = 'login') AND retention_period >= 365", make_event(), True),
+        ("source_ip IS NULL", make_event(source_ip=None), True),
+        ("source_ip IS NOT NULL AND source_ip NOT IN ('10.0.0.1')", make_event(), False),
+        ("details.export.rows > 1000", make_event(details={"export": {"rows": 5000}}), True),
+        ("details.export.rows > 1000", make_event(details={"export": "n/a"}), False),
+        ("resource = 'it''s'", make_event(resource="it's"), True),
+        ("retention_period < 'abc'", make_event(), False),
+    ])
+    def test_evaluation(self, condition, event, expected):
+        assert compile_condition(condition, FIELDS)(event) is expected
+
+    @pytest.mark.parametrize("condition,event_types", [
+        ("event_type IN ('login', 'access')", frozenset({"login", "access"})),
+        ("event_type = 'login' AND resource LIKE '%x%'", frozenset({"login"})),
+        ("event_type = 'login' OR event_type IN ('access')", frozenset({"login", "access"})),
+        ("event_type IN ('login', 'access') AND event_type = 'access'", frozenset({"access"})),
+        ("event_type = 'login' OR resource LIKE '%x%'", ANY_EVENT_TYPE),
+        ("NOT event_type = 'login'", ANY_EVENT_TYPE),
+        ("event_type NOT IN ('login')", ANY_EVENT_TYPE),
+    ])
+    def test_event_type_narrowing(self, condition, event_types):
+        assert compile_condition(condition).event_types == event_types
+
+    @pytest.mark.parametrize("condition", [
+        "", "event_type IN ('login'", "resource LIKE 5", "unknown_field = 'x'",
+        "event_type = 'login' AND", "resource NOT = 'x'", "resource = 'x' extra", "resource ~ 'x'",
+    ])
+    def test_syntax_errors(self, condition):
+        with pytest.raises(RuleSyntaxError):
+            compile_condition(condition, FIELDS)
+
+
+class TestCompiledRuleIndex:
+    """Test suite for CompiledRuleIndex."""
+
+    def test_candidates_by_event_type_in_registration_order(self):
+        index = CompiledRuleIndex()
+        index.add("a", "rule-a", compile_condition("event_type = 'login'"))
+        index.add("b", "rule-b", compile_condition("resource LIKE '%x%'"))
+        index.add("c", "rule-c", compile_condition("event_type IN ('access', 'login')"))
+
+        assert [rule for rule, _ in index.candidates("login")] == ["rule-a", "rule-b", "rule-c"]
+        assert [rule for rule, _ in index.candidates("deletion")] == ["rule-b"]
+
+        # Replacing keeps the original position; removal invalidates the cache
+        index.add("a", "rule-a2", compile_condition("event_type = 'deletion'"))
+        index.remove("b")
+        assert [rule for rule, _ in index.candidates("login")] == ["rule-c"]
+        assert [rule for rule, _ in index.candidates("deletion")] == ["rule-a2"]
+        assert len(index) == 2
+
+    @pytest.mark.performance
+    def test_benchmark_500_rules(self):
+        event_types = [f"type_{i}" for i in range(25)]
+        index = CompiledRuleIndex()
+        naive = []
+        for i in range(500):
+            if i % 25 == 0:
+                condition = f"resource LIKE '%secret_{i}%' OR data_classification = 'class_{i}'"
+            else:
+                condition = (f"event_type IN ('{event_types[i % 25]}', '{event_types[(i + 1) % 25]}') "
+                             f"AND resource LIKE '%/api/{i}/%'")
+            compiled = compile_condition(condition, FIELDS)
+            index.add(f"rule_{i}", i, compiled)
+            naive.append(compiled)
+
+        events = [make_event(event_type=event_types[i % 25], resource=f"/api/{i}/items") for i in range(2000)]
+
+        def run(select_rules):
+            matched = 0
+            start = time.perf_counter()
+            for event in events:
+                for condition in select_rules(event):
+                    if condition(event):
+                        matched += 1
+            return (time.perf_counter() - start) / len(events), matched
+
+        indexed_per_event, indexed_matched = run(
+            lambda event: [condition for _, condition in index.candidates(event.event_type)])
+        naive_per_event, naive_matched = run(lambda event: naive)
+
+        print(f"\n500 rules: indexed {indexed_per_event * 1e6:.1f} us/event, "
+              f"all rules {naive_per_event * 1e6:.1f} us/event, "
+              f"{len(index.candidates('type_0'))} candidate rules per event type")
+        assert indexed_matched == naive_matched
+        assert len(index.candidates("type_0")) < 100
+        assert indexed_per_event < naive_per_event
@@ -0,0 +1,181 @@
+"""
+Unit tests for the shared single-pass statistics layer.
+Uses an in-memory SQLite database to check aggregate results and round trips.
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.core.database import Base, User, Report
+from src.api.core.stats import AggregateQuery, StatsCache, grouped_counts
+
+
+@pytest_asyncio.fixture
+async def database():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    now = datetime.utcnow()
+    async with factory() as session:
+        for i in range(10):
+            session.add(User(
+                user_principal_name=f"user{i}@contoso.com",
+                is_licensed=i < 6,
+                account_enabled=i != 0,
+                mfa_enabled=i % 2 == 0,
+                last_signin_datetime=None if i >= 8 else now - timedelta(days=i * 4)
+            ))
+        for i, (report_type, file_format, state) in enumerate([
+            ("daily", "csv", "completed"), ("daily", "html", "completed"),
+            ("weekly", "csv", "failed"), ("monthly", "csv", "pending")
+        ]):
+            session.add(Report(report_type=report_type, report_name=f"r{i}", file_format=file_format,
+                               status=state, file_size=100 * (i + 1), generation_time=float(i)))
+        await session.commit()
+
+    statements.clear()
+    yield factory, statements
+    await engine.dispose()
+
+
+class TestAggregateQuery:
+    """Test suite for AggregateQuery and grouped_counts."""
+
+    @pytest.mark.asyncio
+    async def test_counters_in_one_query(self, database):
+        factory, statements = database
+        week_ago = datetime.utcnow() - timedelta(days=7)
+        query = (
+            AggregateQuery()
+            .count('total_users')
+            .count('licensed_users', User.is_licensed == True)
+            .count('enabled_users', User.account_enabled == True)
+            .count('mfa_enabled_users', User.mfa_enabled == True)
+            .count('last_signin_7_days', User.last_signin_datetime >= week_ago)
+            .count('never_signed_in', User.last_signin_datetime.is_(None))
+        )
+
+        async with factory() as session:
+            stats = await query.fetch(session)
+
+        assert stats == {
+            'total_users': 10, 'licensed_users': 6, 'enabled_users': 9,
+            'mfa_enabled_users': 5, 'last_signin_7_days': 2, 'never_signed_in': 2
+        }
+        assert len(statements) == 1
+        assert "FILTER (WHERE" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_filters_sum_avg(self, database):
+        factory, _ = database
+        query = (
+            AggregateQuery(Report.file_format == "csv")
+            .count('total')
+            .sum('total_file_size', Report.file_size)
+            .avg('average_generation_time', Report.generation_time)
+            .count_distinct('types', Report.report_type)
+        )
+
+        async with factory() as session:
+            stats = await query.fetch(session)
+
+        assert stats == {'total': 3, 'total_file_size': 800, 'average_generation_time': 5 / 3, 'types': 3}
+
+    @pytest.mark.asyncio
+    async def test_grouped_counts_folds_dimensions(self, database):
+        factory, statements = database
+
+        async with factory() as session:
+            breakdowns = await grouped_counts(session, {
+                'type': Report.report_type,
+                'format': Report.file_format
+            })
+
+        assert breakdowns['type'] == {'daily': 2, 'weekly': 1, 'monthly': 1}
+        assert breakdowns['format'] == {'csv': 3, 'html': 1}
+        assert len(statements) == 1
+
+
+class TestStatsCache:
+    """Test suite for StatsCache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_computation(self):
+        cache = StatsCache(default_ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'total': 1}
+
+        results = await asyncio.gather(*(cache.get_or_compute(('users.stats',), compute) for _ in range(5)))
+
+        assert results == [{'total': 1}] * 5
+        assert len(calls) == 1
+        assert cache.get_stats()['misses'] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_recomputed(self):
+        cache = StatsCache(default_ttl=0)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert await cache.get_or_compute('key', compute) == 1
+        assert await cache.get_or_compute('key', compute) == 2
+
+    def test_invalidate_by_prefix(self):
+        cache = StatsCache()
+        cache.set(('audit.stats', None, None), 1)
+        cache.set(('users.stats',), 2)
+
+        cache.invalidate('audit.')
+
+        assert cache.get(('audit.stats', None, None)) is None
+        assert cache.get(('users.stats',)) == 2
+
+    @pytest.mark.asyncio
+    async def test_locks_are_pruned_with_entries(self):
+        cache = StatsCache(default_ttl=60, max_entries=3)
+
+        async def compute():
+            return 1
+
+        for i in range(20):
+            await cache.get_or_compute(('report.stats', i), compute)
+
+        assert len(cache._locks) == len(cache._entries) == 3
+
+        cache.invalidate('report.')
+
+        assert cache._locks == {} and cache._entries == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_computation_drops_its_lock(self):
+        cache = StatsCache()
+
+        async def compute():
+            raise RuntimeError("database unavailable")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute('key', compute)
+
+        assert cache._locks == {}
@@ -0,0 +1,232 @@
+"""
+Unit tests for the Graph to database user sync engine.
+Uses an in-memory SQLite database and a scripted Graph page fetcher.
+"""
+
+import asyncio
+import threading
+import pytest
+import pytest_asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+import sys
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Import the module to test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.api.core.database import Base, User
+from src.api.core.user_sync import (
+    UserSyncEngine, DeltaResyncRequired, lazy_graph_page_fetcher, map_graph_user, USER_DELTA_ENDPOINT
+)
+
+
+def graph_user(index, **overrides):
+    user = {
+        "id": f"00000000-0000-0000-0000-{index:012d}",
+        "userPrincipalName": f"User{index}@contoso.com",
+        "displayName": f"User {index}",
+        "department": "Sales",
+        "accountEnabled": True,
+        "createdDateTime": "2024-05-01T09:30:00Z",
+        "assignedLicenses": [{"skuId": "sku"}] if index % 2 else []
+    }
+    user.update(overrides)
+    return user
+
+
+class ScriptedGraph:
+    """Serves pages keyed by request URL and records the requests."""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        self.expired = set()
+
+    def serve(self, url, pages, delta_link):
+        links = [url] + [f"https://graph.microsoft.com/v1.0/users/delta?$skiptoken={url}-{i}"
+                         for i in range(1, len(pages))]
+        for i, items in enumerate(pages):
+            page = {"value": items}
+            if i + 1 < len(pages):
+                page["@odata.nextLink"] = links[i + 1]
+            else:
+                page["@odata.deltaLink"] = delta_link
+            self.pages[links[i]] = page
+
+    async def fetch(self, url, params=None):
+        self.requests.append((url, params))
+        if url in self.expired:
+            raise DeltaResyncRequired("410 Gone")
+        return self.pages[url]
+
+
+@pytest_asyncio.fixture
+async def sync_env():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def get_session():
+        async with factory() as session:
+            yield session
+
+    graph = ScriptedGraph()
+    yield UserSyncEngine(get_session, graph.fetch, batch_size=2), graph, factory
+    await engine.dispose()
+
+
+async def users_by_upn(factory):
+    async with factory() as session:
+        result = await session.execute(select(User))
+        return {user.user_principal_name: user for user in result.scalars()}
+
+
+async def run_sync(engine, force_full=False):
+    job, created = await engine.start_job(force_full=force_full)
+    assert created
+    return await engine.run(job.id)
+
+
+class TestUserSyncEngine:
+    """Test suite for UserSyncEngine."""
+
+    @pytest.mark.asyncio
+    async def test_full_then_delta(self, sync_env):
+        engine, graph, factory = sync_env
+        graph.serve(USER_DELTA_ENDPOINT, [[graph_user(i) for i in range(3)], [graph_user(i) for i in range(3, 5)]],
+                    "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=one")
+
+        job = await run_sync(engine)
+
+        assert (job.status, job.mode, job.pages_fetched, job.records_created) == ("completed", "full", 2, 5)
+        assert graph.requests[0][1]["$select"].startswith("id,userPrincipalName")
+        users = await users_by_upn(factory)
+        assert users["user1@contoso.com"].is_licensed and not users["user2@contoso.com"].is_licensed
+        assert users["user1@contoso.com"].created_datetime == datetime(2024, 5, 1, 9, 30)
+
+        # Delta: one partial update, one removal, one new user, one unchanged
+        graph.serve("https://graph.microsoft.com/v1.0/users/delta?$deltatoken=one", [[
+            {"id": graph_user(0)["id"], "department": "IT"},
+            {"id": graph_user(1)["id"], "@removed": {"reason": "deleted"}},
+            graph_user(7),
+            graph_user(2),
+        ]], "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=two")
+
+        job = await run_sync(engine)
+
+        assert job.mode == "delta"
+        assert (job.records_updated, job.records_deleted, job.records_created, job.records_unchanged) == (1, 1, 1, 1)
+        assert job.delta_link.endswith("deltatoken=two")
+        users = await users_by_upn(factory)
+        assert users["user0@contoso.com"].department == "IT"
+        assert users["user0@contoso.com"].display_name == "User 0"
+        assert users["user1@contoso.com"].deleted_at is not None
+        assert not users["user1@contoso.com"].account_enabled
+
+    @pytest.mark.asyncio
+    async def test_full_sync_links_api_users_and_deletes_missing(self, sync_env):
+        engine, graph, factory = sync_env
+        async with factory() as session:
+            session.add(User(user_principal_name="user0@contoso.com", display_name="Created by API"))
+            session.add(User(user_principal_name="gone@contoso.com", azure_ad_id="removed-id"))
+            await session.commit()
+        graph.serve(USER_DELTA_ENDPOINT, [[graph_user(0)]], "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=x")
+
+        job = await run_sync(engine)
+
+        assert (job.records_updated, job.records_created, job.records_deleted) == (1, 0, 1)
+        users = await users_by_upn(factory)
+        assert users["user0@contoso.com"].azure_ad_id == graph_user(0)["id"]
+        assert users["gone@contoso.com"].deleted_at is not None
+
+    @pytest.mark.asyncio
+    async def test_mixed_case_api_user_is_linked_not_duplicated(self, sync_env):
+        engine, graph, factory = sync_env
+        async with factory() as session:
+            session.add(User(user_principal_name="Alice@Contoso.com", display_name="Alice"))
+            await session.commit()
+        graph.serve(USER_DELTA_ENDPOINT, [[graph_user(0, userPrincipalName="alice@CONTOSO.com", displayName="Alice")]],
+                    "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=x")
+
+        job = await run_sync(engine)
+
+        assert (job.records_created, job.records_updated) == (0, 1)
+        users = await users_by_upn(factory)
+        # The stored case is kept; only the Graph id is linked
+        assert list(users) == ["Alice@Contoso.com"]
+        assert users["Alice@Contoso.com"].azure_ad_id == graph_user(0)["id"]
+
+    @pytest.mark.asyncio
+    async def test_expired_delta_link_falls_back_to_full(self, sync_env):
+        engine, graph, factory = sync_env
+        graph.serve(USER_DELTA_ENDPOINT, [[graph_user(0)]], "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=old")
+        await run_sync(engine)
+        graph.expired.add("https://graph.microsoft.com/v1.0/users/delta?$deltatoken=old")
+        graph.serve(USER_DELTA_ENDPOINT, [[graph_user(0)]], "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=new")
+
+        job = await run_sync(engine)
+
+        assert (job.status, job.mode, job.records_unchanged) == ("completed", "full", 1)
+        assert job.delta_link.endswith("deltatoken=new")
+
+    @pytest.mark.asyncio
+    async def test_failed_job_and_single_active_job(self, sync_env):
+        engine, graph, _ = sync_env
+
+        first, created = await engine.start_job()
+        second, created_again = await engine.start_job()
+        assert created and not created_again and second.id == first.id
+
+        job = await engine.run(first.id)  # no pages scripted: the fetch raises
+        assert job.status == "failed" and job.error_message
+
+    @pytest.mark.asyncio
+    async def test_concurrent_starts_create_one_job(self, sync_env):
+        engine, _, _ = sync_env
+
+        started = await asyncio.gather(*(engine.start_job() for _ in range(5)))
+
+        assert [created for _, created in started].count(True) == 1
+        assert len({job.id for job, _ in started}) == 1
+
+    @pytest.mark.asyncio
+    async def test_graph_client_created_lazily_in_worker_thread(self, sync_env):
+        _, graph, _ = sync_env
+        graph.serve(USER_DELTA_ENDPOINT, [[graph_user(0)]], "https://graph.microsoft.com/v1.0/users/delta?$deltatoken=x")
+        attempts = []
+
+        class FakeGraphClient:
+            def get(self, url, params=None):
+                return graph.pages[url]
+
+        def create_client():
+            attempts.append(threading.current_thread() is threading.main_thread())
+            if len(attempts) == 1:
+                raise RuntimeError("certificate not found")
+            return FakeGraphClient()
+
+        engine = UserSyncEngine(sync_env[0].session_factory, lazy_graph_page_fetcher(create_client))
+
+        # Creating the job does not touch Graph
+        job, created = await engine.start_job()
+        assert created and attempts == []
+
+        # A credential error fails the job instead of the request ...
+        failed = await engine.run(job.id)
+        assert failed.status == "failed" and "certificate not found" in failed.error_message
+
+        # ... and the client is created again for the next job
+        job = await run_sync(engine)
+        assert job.status == "completed" and job.records_created == 1
+        assert attempts == [False, False]
+
+    def test_map_graph_user_partial(self):
+        assert map_graph_user({"id": "x", "displayName": "New"}) == {"display_name": "New"}
+        assert map_graph_user({"userPrincipalName": "A@B.com", "assignedLicenses": []}) == {
+            "user_principal_name": "a@b.com", "is_licensed": False
+        }
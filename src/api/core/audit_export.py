@@ -0,0 +1,218 @@
+"""
+Streaming audit log export.
+Reads audit logs in keyset batches and encodes CSV / JSON / NDJSON incrementally,
+so memory use does not depend on the number of exported rows.
+"""
+
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, and_, or_, desc
+
+from .database import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Base export columns (order matches the historical export format)
+EXPORT_COLUMNS = (
+    "id", "operation", "resource_type", "resource_id", "user_principal_name",
+    "ip_address", "user_agent", "status", "error_message", "created_at", "details"
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns selected from the table (no ORM entities, no identity map growth)
+_SELECT_COLUMNS = (
+    AuditLog.id, AuditLog.operation, AuditLog.resource_type, AuditLog.resource_id,
+    AuditLog.user_principal_name, AuditLog.ip_address, AuditLog.user_agent,
+    AuditLog.status, AuditLog.error_message, AuditLog.created_at, AuditLog.details
+)
+
+
+def parse_details(details: Optional[str]) -> Any:
+    """Parse the details JSON string (raw text if it is not JSON)."""
+    if not details:
+        return None
+    try:
+        return json.loads(details)
+    except (ValueError, TypeError):
+        return details
+
+
+def build_export_record(row) -> Dict[str, Any]:
+    """Build one export record from a selected row."""
+    return {
+        "id": row.id,
+        "operation": row.operation,
+        "resource_type": row.resource_type,
+        "resource_id": row.resource_id,
+        "user_principal_name": row.user_principal_name,
+        "ip_address": row.ip_address,
+        "user_agent": row.user_agent,
+        "status": row.status,
+        "error_message": row.error_message,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "details": parse_details(row.details)
+    }
+
+
+async def iter_audit_batches(session, filters: Sequence[Any],
+                             columns: Sequence[Any] = _SELECT_COLUMNS,
+                             batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[Any]]:
+    """
+    Iterate over matching audit rows newest first, in keyset batches.
+
+    Each batch is a separate bounded query continuing after the last
+    (created_at, id) seen, so no offset scans and no full result buffering.
+    """
+    last = None
+    while True:
+        stmt = select(*columns, AuditLog.created_at.label("_key_created_at"), AuditLog.id.label("_key_id"))
+        conditions = list(filters)
+        if last is not None:
+            last_created_at, last_id = last
+            conditions.append(or_(
+                AuditLog.created_at < last_created_at,
+                and_(AuditLog.created_at == last_created_at, AuditLog.id < last_id)
+            ))
+        if conditions:
+            stmt = stmt.where(and_(*conditions))
+        stmt = stmt.order_by(desc(AuditLog.created_at), desc(AuditLog.id)).limit(batch_size)
+
+        result = await session.execute(stmt)
+        rows = result.all()
+        if not rows:
+            break
+
+        yield rows
+
+        if len(rows) < batch_size:
+            break
+        last = (rows[-1]._key_created_at, rows[-1]._key_id)
+
+
+async def discover_details_keys(session, filters: Sequence[Any],
+                                batch_size: int = DEFAULT_BATCH_SIZE * 10) -> List[str]:
+    """
+    Lightweight first pass collecting the keys of JSON object details.
+
+    Only the details column is read; keys are returned in first-seen order.
+    """
+    keys: Dict[str, None] = {}
+    details_filters = list(filters) + [AuditLog.details.isnot(None)]
+    async for rows in iter_audit_batches(session, details_filters, columns=(AuditLog.details,),
+                                         batch_size=batch_size):
+        for row in rows:
+            details = parse_details(row.details)
+            if isinstance(details, dict):
+                for key in details:
+                    keys.setdefault(key, None)
+    return list(keys)
+
+
+def flatten_record(record: Dict[str, Any], details_keys: Sequence[str]) -> List[str]:
+    """Flatten an export record into a CSV row (details_* columns from details)."""
+    details = record["details"]
+    row = ["" if record[column] is None else record[column] for column in EXPORT_COLUMNS[:-1]]
+    row.append(str(details) if details else "")
+    if isinstance(details, dict):
+        row.extend("" if details.get(key) is None else str(details[key]) for key in details_keys)
+    else:
+        row.extend("" for _ in details_keys)
+    return row
+
+
+class AuditExportEncoder:
+    """Incremental encoders producing bytes chunks per batch."""
+
+    def __init__(self, fmt: str, details_keys: Sequence[str] = ()):
+        self.format = fmt
+        self.details_keys = list(details_keys)
+        self._first = True
+
+    def header(self) -> bytes:
+        if self.format == "csv":
+            columns = list(EXPORT_COLUMNS) + [f"details_{key}" for key in self.details_keys]
+            return self._csv_lines([columns])
+        if self.format == "json":
+            return b"["
+        return b""
+
+    def encode(self, records: List[Dict[str, Any]]) -> bytes:
+        if self.format == "csv":
+            return self._csv_lines(flatten_record(record, self.details_keys) for record in records)
+
+        lines = [json.dumps(record, default=str, ensure_ascii=False) for record in records]
+        if self.format == "ndjson":
+            return ("\n".join(lines) + "\n").encode("utf-8")
+
+        separator = "\n" if self._first else ",\n"
+        self._first = False
+        return (separator + ",\n".join(lines)).encode("utf-8")
+
+    def footer(self) -> bytes:
+        if self.format == "json":
+            return b"\n]" if not self._first else b"]"
+        return b""
+
+    @staticmethod
+    def _csv_lines(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\r\n").writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-compress a bytes stream incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def stream_audit_export(session_factory: Callable, filters: Sequence[Any], fmt: str,
+                              details_keys: Optional[Sequence[str]] = None,
+                              batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    Stream an audit export as encoded bytes chunks.
+
+    Args:
+        session_factory: Async context manager factory yielding a session
+        filters: SQLAlchemy filter expressions
+        fmt: csv, json or ndjson
+        details_keys: Declared details_* columns for CSV; discovered in a
+            first pass over the details column when omitted
+        batch_size: Rows per database batch (and per output chunk)
+    """
+    exported = 0
+    async with session_factory() as session:
+        if fmt == "csv" and details_keys is None:
+            details_keys = await discover_details_keys(session, filters)
+
+        encoder = AuditExportEncoder(fmt, details_keys or ())
+        header = encoder.header()
+        if header:
+            yield header
+
+        async for rows in iter_audit_batches(session, filters, batch_size=batch_size):
+            exported += len(rows)
+            yield encoder.encode([build_export_record(row) for row in rows])
+
+        footer = encoder.footer()
+        if footer:
+            yield footer
+
+    logger.info(f"Audit export streamed: {exported} rows ({fmt})")
+
+
+def export_filename(fmt: str, compress: bool = False) -> str:
+    """Build the download filename for an export."""
+    filename = f"audit_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return f"{filename}.gz" if compress else filename
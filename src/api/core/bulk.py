@@ -0,0 +1,116 @@
+"""
+Set-based bulk inserts for the bulk API endpoints.
+Duplicates are detected with one IN lookup per batch and new rows are
+inserted with a multi-row INSERT ... RETURNING, so a bulk request costs a
+few round trips per batch instead of two per row.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, insert, tuple_
+
+logger = logging.getLogger(__name__)
+
+# Maximum rows accepted by one bulk request
+BULK_MAX_ROWS = 10000
+
+# Rows per lookup / INSERT statement (keeps bind parameters below driver limits)
+BULK_BATCH_SIZE = 500
+
+
+@dataclass
+class BulkInsertResult:
+    """Result of bulk_insert_new."""
+    inserted: List[Any] = field(default_factory=list)
+    duplicates: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def skipped(self) -> int:
+        return len(self.duplicates)
+
+
+def _batches(items: Sequence[Any], batch_size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+async def existing_keys(session, model, key_names: Sequence[str], keys: Sequence[Tuple[Any, ...]],
+                        batch_size: int = BULK_BATCH_SIZE) -> Set[Tuple[Any, ...]]:
+    """Return the subset of keys already present in the model's table."""
+    columns = [getattr(model, name) for name in key_names]
+    found: Set[Tuple[Any, ...]] = set()
+
+    for chunk in _batches(list(keys), batch_size):
+        if len(columns) == 1:
+            condition = columns[0].in_([key[0] for key in chunk])
+        else:
+            condition = tuple_(*columns).in_(chunk)
+        result = await session.execute(select(*columns).where(condition))
+        found.update(tuple(row) for row in result)
+
+    return found
+
+
+def _insert_statement(session, model, conflict_columns: Optional[Sequence[str]]):
+    dialect = session.get_bind().dialect.name
+    if conflict_columns and dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif conflict_columns and dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(model)
+    # Rows inserted concurrently since the lookup are skipped instead of failing the batch
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+
+async def bulk_insert_new(session, model, rows: Sequence[Dict[str, Any]], key_names: Sequence[str],
+                          conflict_columns: Optional[Sequence[str]] = None,
+                          batch_size: int = BULK_BATCH_SIZE) -> BulkInsertResult:
+    """
+    Insert the rows whose key does not exist yet.
+
+    Args:
+        session: Async database session (the caller commits)
+        model: ORM model class
+        rows: Column value dicts
+        key_names: Columns identifying a duplicate; the first row wins within the request
+        conflict_columns: Unique index columns for ON CONFLICT DO NOTHING
+            (PostgreSQL / SQLite), guarding against concurrent inserts
+        batch_size: Rows per lookup and INSERT statement
+
+    Returns:
+        BulkInsertResult with the inserted ORM objects (in request order,
+        fully loaded through RETURNING) and the skipped duplicate rows
+    """
+    result = BulkInsertResult()
+    unique: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for row in rows:
+        key = tuple(row[name] for name in key_names)
+        if key in unique:
+            result.duplicates.append(row)
+        else:
+            unique[key] = row
+
+    present = await existing_keys(session, model, key_names, list(unique), batch_size)
+    new_keys = [key for key in unique if key not in present]
+    result.duplicates.extend(unique[key] for key in unique if key in present)
+
+    stmt = _insert_statement(session, model, conflict_columns).returning(model)
+    inserted: Dict[Tuple[Any, ...], Any] = {}
+    for chunk in _batches(new_keys, batch_size):
+        objects = await session.scalars(stmt, [unique[key] for key in chunk])
+        for obj in objects:
+            inserted[tuple(getattr(obj, name) for name in key_names)] = obj
+
+    for key in new_keys:
+        if key in inserted:
+            result.inserted.append(inserted[key])
+        else:
+            result.duplicates.append(unique[key])
+
+    if result.duplicates:
+        logger.info(f"Bulk insert into {model.__tablename__}: {len(result.inserted)} inserted, "
+                    f"{result.skipped} duplicates skipped")
+    return result
@@ -7,7 +7,7 @@ import asyncio
 import logging
 from typing import Optional, Dict, Any, List, AsyncGenerator
 from contextlib import asynccontextmanager
-from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey
+from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, Index, DDL, event, func
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, Session
 from sqlalchemy.pool import StaticPool
@@ -40,6 +40,24 @@ class Base(DeclarativeBase):
     pass
 
 
+# Trigram indexes for substring search need the pg_trgm extension (PostgreSQL only)
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+
+def trigram_index(name: str, expression, label: str) -> Index:
+    """GIN trigram index for LIKE/ILIKE '%term%' searches on PostgreSQL."""
+    return Index(
+        name,
+        expression.label(label),
+        postgresql_using="gin",
+        postgresql_ops={label: "gin_trgm_ops"}
+    ).ddl_if(dialect="postgresql")
+
+
 class User(Base):
     """
     User model for Microsoft 365 users.
@@ -48,6 +66,7 @@ class User(Base):
     __tablename__ = "users"
     
     id: Mapped[int] = mapped_column(primary_key=True)
+    azure_ad_id: Mapped[Optional[str]] = mapped_column(String(36), unique=True, index=True)
     user_principal_name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     display_name: Mapped[Optional[str]] = mapped_column(String(255))
     mail: Mapped[Optional[str]] = mapped_column(String(255))
@@ -61,6 +80,7 @@ class User(Base):
     created_datetime: Mapped[Optional[datetime]] = mapped_column(DateTime)
     last_signin_datetime: Mapped[Optional[datetime]] = mapped_column(DateTime)
     mfa_enabled: Mapped[bool] = mapped_column(Boolean, default=False)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # soft delete (removed in Entra ID)
     
     # Relationships
     licenses: Mapped[List["UserLicense"]] = relationship(back_populates="user", cascade="all, delete-orphan")
@@ -74,6 +94,14 @@ class User(Base):
         return f"User(id={self.id!r}, upn={self.user_principal_name!r}, display_name={self.display_name!r})"
 
 
+# Keyset pagination order and search predicates of the /users listing
+USER_SORT_NAME = func.coalesce(User.display_name, "")
+Index("ix_users_sort_name_id", USER_SORT_NAME, User.id)
+Index("ix_users_department_lower", func.lower(User.department))
+trigram_index("ix_users_display_name_trgm", func.lower(User.display_name), "display_name_lower")
+trigram_index("ix_users_upn_trgm", func.lower(User.user_principal_name), "upn_lower")
+
+
 class UserLicense(Base):
     """
     User license model for Microsoft 365 license assignments.
@@ -162,6 +190,10 @@ class Report(Base):
         return f"Report(id={self.id!r}, type={self.report_type!r}, status={self.status!r})"
 
 
+Index("ix_reports_created_at_id", Report.created_at, Report.id)
+trigram_index("ix_reports_report_type_trgm", Report.report_type, "report_type")
+
+
 class ApiCache(Base):
     """
     API cache model for caching Microsoft Graph API responses.
@@ -209,6 +241,42 @@ class AuditLog(Base):
         return f"AuditLog(id={self.id!r}, operation={self.operation!r}, status={self.status!r})"
 
 
+Index("ix_audit_logs_created_at_id", AuditLog.created_at, AuditLog.id)
+trigram_index("ix_audit_logs_operation_trgm", AuditLog.operation, "operation")
+trigram_index("ix_audit_logs_upn_trgm", AuditLog.user_principal_name, "user_principal_name")
+
+
+class SyncJob(Base):
+    """
+    Synchronization job model for Microsoft Graph to database syncs.
+    Tracks progress and keeps the delta link for the next incremental run.
+    """
+    __tablename__ = "sync_jobs"
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    resource_type: Mapped[str] = mapped_column(String(50), index=True)
+    mode: Mapped[str] = mapped_column(String(20))  # full, delta
+    status: Mapped[str] = mapped_column(String(50), default="pending")
+    pages_fetched: Mapped[int] = mapped_column(Integer, default=0)
+    records_seen: Mapped[int] = mapped_column(Integer, default=0)
+    records_created: Mapped[int] = mapped_column(Integer, default=0)
+    records_updated: Mapped[int] = mapped_column(Integer, default=0)
+    records_unchanged: Mapped[int] = mapped_column(Integer, default=0)
+    records_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    records_skipped: Mapped[int] = mapped_column(Integer, default=0)
+    delta_link: Mapped[Optional[str]] = mapped_column(Text)
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    
+    # Metadata
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"SyncJob(id={self.id!r}, resource={self.resource_type!r}, status={self.status!r})"
+
+
 class DatabaseManager:
     """
     Database manager for handling connections, sessions, and operations.
@@ -0,0 +1,190 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+Pages continue after the sort key of the last returned row instead of using
+OFFSET, so deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, and_, or_, asc, desc, tuple_, text
+
+from .exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# (key expression, descending) pairs; the last key must be unique (usually the primary key)
+SortKeys = Sequence[Tuple[Any, bool]]
+
+# Total count modes for list endpoints
+COUNT_MODES = ("exact", "estimate", "none")
+
+
+@dataclass
+class KeysetPage:
+    """One page of a keyset paginated listing."""
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    has_next: bool = False
+
+
+def _keys_signature(keys: SortKeys) -> str:
+    return ",".join(f"{getattr(expression, 'key', None) or str(expression)}:{'d' if descending else 'a'}"
+                    for expression, descending in keys)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(keys: SortKeys, values: Sequence[Any]) -> str:
+    """Encode the sort key values of the last row as an opaque cursor."""
+    payload = {"k": _keys_signature(keys), "v": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(keys: SortKeys, cursor: str) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor for the same sort keys.
+
+    Raises:
+        ValidationError: If the cursor is malformed or was issued for another sort order
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload["v"]]
+        signature = payload["k"]
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError("Invalid pagination cursor", field="cursor")
+
+    if signature != _keys_signature(keys) or len(values) != len(keys):
+        raise ValidationError("Pagination cursor does not match the requested sort order", field="cursor")
+    return values
+
+
+def keyset_condition(keys: SortKeys, values: Sequence[Any]):
+    """
+    Build the "after this row" condition for the given sort keys.
+
+    A uniform sort direction uses a row value comparison, which PostgreSQL
+    can answer with a single index range scan on the key columns.
+    """
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        left = tuple_(*(expression for expression, _ in keys))
+        right = tuple_(*values)
+        return left < right if directions.pop() else left > right
+
+    conditions = []
+    for index, (expression, descending) in enumerate(keys):
+        equal_prefix = [keys[i][0] == values[i] for i in range(index)]
+        after = expression < values[index] if descending else expression > values[index]
+        conditions.append(and_(*equal_prefix, after))
+    return or_(*conditions)
+
+
+async def fetch_keyset_page(session, stmt, keys: SortKeys, size: int,
+                            cursor: Optional[str] = None, offset: int = 0) -> KeysetPage:
+    """
+    Fetch one page of stmt ordered by keys.
+
+    Args:
+        session: Async database session
+        stmt: SELECT of one entity (or column set) with filters applied
+        keys: Sort keys; the last one must make the order unique
+        size: Page size
+        cursor: Cursor from the previous page's next_cursor
+        offset: Legacy page offset, used only without a cursor
+
+    Returns:
+        KeysetPage with the items and the cursor for the following page
+    """
+    item_width = len(stmt.column_descriptions)
+
+    if cursor:
+        stmt = stmt.where(keyset_condition(keys, decode_cursor(keys, cursor)))
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    stmt = (
+        stmt.add_columns(*(expression.label(f"_page_key_{i}") for i, (expression, _) in enumerate(keys)))
+        .order_by(None)
+        .order_by(*(desc(expression) if descending else asc(expression) for expression, descending in keys))
+        .limit(size + 1)
+    )
+
+    result = await session.execute(stmt)
+    rows = result.all()
+    has_next = len(rows) > size
+    rows = rows[:size]
+
+    items = [row[0] if item_width == 1 else tuple(row[:item_width]) for row in rows]
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(keys, list(rows[-1][item_width:]))
+
+    return KeysetPage(items=items, next_cursor=next_cursor, has_next=has_next)
+
+
+async def count_rows(session, stmt, mode: str = "exact") -> Optional[int]:
+    """
+    Count the rows matched by stmt.
+
+    Args:
+        mode: exact (COUNT over the filtered query), estimate (planner row
+            estimate on PostgreSQL, exact elsewhere) or none
+
+    Returns:
+        The row count, or None for mode "none"
+    """
+    if mode not in COUNT_MODES:
+        raise ValidationError(f"Invalid count mode: {mode}", field="count")
+    if mode == "none":
+        return None
+
+    stmt = stmt.order_by(None).limit(None).offset(None)
+    if mode == "estimate":
+        estimate = await _estimate_rows(session, stmt)
+        if estimate is not None:
+            return estimate
+
+    result = await session.execute(select(func.count()).select_from(stmt.subquery()))
+    return result.scalar_one()
+
+
+async def _estimate_rows(session, stmt) -> Optional[int]:
+    dialect = session.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+
+    try:
+        compiled = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        # Escape colons so literals are not parsed as bind parameters
+        result = await session.execute(text("EXPLAIN (FORMAT JSON) " + compiled.replace(":", "\\:")))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug(f"Row estimate unavailable, counting exactly: {e}")
+        return None
+
+
+def contains_pattern(term: str) -> str:
+    """LIKE pattern matching term anywhere, with LIKE wildcards escaped (escape char: backslash)."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
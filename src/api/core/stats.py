@@ -0,0 +1,178 @@
+"""
+Shared single-pass statistics layer for the stats endpoints.
+Computes all counters of an entity in one aggregate query using
+COUNT(*) FILTER (WHERE ...) and caches results for a short TTL.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, and_
+
+logger = logging.getLogger(__name__)
+
+# Dashboard polling interval is well below this; counters may lag by up to the TTL
+DEFAULT_STATS_TTL = 30.0
+
+
+class AggregateQuery:
+    """
+    Builder for a single aggregate SELECT over one table.
+
+    Every metric is a labelled aggregate expression; conditional metrics use
+    an aggregate FILTER clause, so N counters cost one table scan and one
+    round trip instead of N.
+    """
+
+    def __init__(self, *filters):
+        self.filters = [f for f in filters if f is not None]
+        self._metrics: List[Tuple[str, Any]] = []
+
+    def _add(self, name: str, aggregate, condition=None) -> "AggregateQuery":
+        if condition is not None:
+            aggregate = aggregate.filter(condition)
+        self._metrics.append((name, aggregate.label(name)))
+        return self
+
+    def count(self, name: str, condition=None) -> "AggregateQuery":
+        return self._add(name, func.count(), condition)
+
+    def count_distinct(self, name: str, column, condition=None) -> "AggregateQuery":
+        return self._add(name, func.count(func.distinct(column)), condition)
+
+    def sum(self, name: str, column, condition=None) -> "AggregateQuery":
+        return self._add(name, func.sum(column), condition)
+
+    def avg(self, name: str, column, condition=None) -> "AggregateQuery":
+        return self._add(name, func.avg(column), condition)
+
+    def max(self, name: str, column, condition=None) -> "AggregateQuery":
+        return self._add(name, func.max(column), condition)
+
+    def statement(self):
+        stmt = select(*(expression for _, expression in self._metrics))
+        if self.filters:
+            stmt = stmt.where(and_(*self.filters))
+        return stmt
+
+    async def fetch(self, session) -> Dict[str, Any]:
+        """Execute the aggregate and return {metric name: value}."""
+        result = await session.execute(self.statement())
+        row = result.one()
+        return {name: row._mapping[name] for name, _ in self._metrics}
+
+
+async def grouped_counts(session, dimensions: Dict[str, Any],
+                         filters: Sequence[Any] = ()) -> Dict[str, Dict[Any, int]]:
+    """
+    Count rows per value of several columns with one GROUP BY query.
+
+    Rows are grouped by the combination of all dimensions and folded per
+    dimension in Python; the number of combinations is small compared to
+    the table, and one scan replaces one query per dimension.
+
+    Returns:
+        {dimension name: {value: count}}
+    """
+    names = list(dimensions)
+    columns = [dimensions[name] for name in names]
+    stmt = select(*columns, func.count().label("row_count")).group_by(*columns)
+    filters = [f for f in filters if f is not None]
+    if filters:
+        stmt = stmt.where(and_(*filters))
+
+    folded: Dict[str, Dict[Any, int]] = {name: defaultdict(int) for name in names}
+    result = await session.execute(stmt)
+    for row in result:
+        for index, name in enumerate(names):
+            folded[name][row[index]] += row.row_count
+    return {name: dict(counts) for name, counts in folded.items()}
+
+
+class StatsCache:
+    """
+    Short-TTL cache for computed statistics.
+
+    Concurrent requests for the same key share one computation, so a burst
+    of dashboard polls results in a single database query. Per-key locks
+    live only as long as their entry (or a computation in flight).
+    """
+
+    def __init__(self, default_ttl: float = DEFAULT_STATS_TTL, max_entries: int = 256):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            for stale in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                self._discard(stale)
+            if len(self._entries) >= self.max_entries:
+                self._discard(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + (self.default_ttl if ttl is None else ttl), value)
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                             ttl: Optional[float] = None) -> Any:
+        """Return the cached value for key or compute and cache it."""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have filled the entry while we waited
+                value = self.get(key)
+                if value is not None:
+                    return value
+                self.misses += 1
+                value = await compute()
+                self.set(key, value, ttl)
+                return value
+        finally:
+            # A failed computation leaves no entry, so its lock is dropped as well
+            if key not in self._entries and not lock.locked() and self._locks.get(key) is lock:
+                del self._locks[key]
+
+    def _discard(self, key: Hashable):
+        """Remove an entry together with its lock (unless a computation holds it)."""
+        self._entries.pop(key, None)
+        lock = self._locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._locks[key]
+
+    def invalidate(self, prefix: Optional[str] = None):
+        """Drop all entries, or those whose key starts with prefix."""
+        if prefix is None:
+            keys = list(self._entries)
+        else:
+            keys = [k for k in self._entries if str(k[0] if isinstance(k, tuple) else k).startswith(prefix)]
+        for key in keys:
+            self._discard(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 2) if total else 0.0
+        }
+
+
+# Shared cache for the stats endpoints
+stats_cache = StatsCache()
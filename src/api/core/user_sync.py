@@ -0,0 +1,365 @@
+"""
+Incremental Microsoft Graph to database user synchronization.
+Pages /users/delta with a $select projection, diffs each page against the
+users table by azure_ad_id and applies batched inserts, updates and soft
+deletes. The final delta link is kept on the job so the next run only
+fetches changes.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, desc, func
+
+from .database import User, SyncJob
+from .bulk import bulk_insert_new, BULK_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Graph property -> users column
+GRAPH_USER_FIELDS = {
+    "userPrincipalName": "user_principal_name",
+    "displayName": "display_name",
+    "mail": "mail",
+    "jobTitle": "job_title",
+    "department": "department",
+    "officeLocation": "office_location",
+    "country": "country",
+    "usageLocation": "usage_location",
+    "accountEnabled": "account_enabled",
+    "createdDateTime": "created_datetime",
+}
+
+# $select projection of the delta query
+USER_SYNC_SELECT = ["id", *GRAPH_USER_FIELDS, "assignedLicenses"]
+
+USER_DELTA_ENDPOINT = "/users/delta"
+
+# Job statuses that block starting another job for the same resource
+ACTIVE_JOB_STATUSES = ("pending", "running")
+
+# (url or endpoint, params) -> Graph JSON response
+PageFetcher = Callable[[str, Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+
+
+class DeltaResyncRequired(Exception):
+    """The stored delta link expired; a full sync is required."""
+
+
+def _parse_graph_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Graph ISO 8601 timestamp into a naive UTC datetime."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def map_graph_user(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a Graph user to users column values.
+
+    Only properties present in the item are mapped: delta pages may carry
+    just the changed properties of an updated user.
+    """
+    values: Dict[str, Any] = {}
+    for graph_name, column in GRAPH_USER_FIELDS.items():
+        if graph_name in item:
+            values[column] = item[graph_name]
+    if "user_principal_name" in values and values["user_principal_name"]:
+        values["user_principal_name"] = values["user_principal_name"].lower()
+    if "created_datetime" in values:
+        values["created_datetime"] = _parse_graph_datetime(values["created_datetime"])
+    if "assignedLicenses" in item:
+        values["is_licensed"] = bool(item["assignedLicenses"])
+    return values
+
+
+def graph_page_fetcher(graph_client) -> PageFetcher:
+    """Adapt the blocking GraphClient to a PageFetcher (requests run in a worker thread)."""
+    async def fetch(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        try:
+            if url.startswith("https://"):
+                return await asyncio.to_thread(graph_client._get_next_page, url)
+            return await asyncio.to_thread(graph_client.get, url, params)
+        except Exception as e:
+            response = getattr(e, "response", None)
+            status_code = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+            if status_code == 410:
+                raise DeltaResyncRequired(str(e)) from e
+            raise
+    return fetch
+
+
+
+def lazy_graph_page_fetcher(create_client: Callable[[], Any]) -> PageFetcher:
+    """
+    PageFetcher that creates the Graph client on its first request.
+
+    create_client (config loading and credential setup) is blocking and runs
+    in a worker thread; a failure is raised to that request and retried on
+    the next one.
+    """
+    fetch: Optional[PageFetcher] = None
+    lock = asyncio.Lock()
+
+    async def fetch_page(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        nonlocal fetch
+        if fetch is None:
+            async with lock:
+                if fetch is None:
+                    fetch = graph_page_fetcher(await asyncio.to_thread(create_client))
+        return await fetch(url, params)
+    return fetch_page
+
+class UserSyncEngine:
+    """
+    Graph to database user sync.
+
+    Each page is applied in its own transaction together with the job
+    counters, so progress is visible while the job runs and memory use is
+    bounded by the page size. The delta link is stored only when the job
+    completes; a failed run is retried from the previous link, which is
+    safe because applying a change twice is a no-op.
+    """
+
+    def __init__(self, session_factory: Callable, fetch_page: PageFetcher,
+                 batch_size: int = BULK_BATCH_SIZE):
+        """
+        Args:
+            session_factory: Async context manager factory yielding a session
+                (e.g. DatabaseManager.get_session)
+            fetch_page: Coroutine fetching one Graph page
+            batch_size: Rows per lookup / write statement
+        """
+        self.session_factory = session_factory
+        self.fetch_page = fetch_page
+        self.batch_size = batch_size
+        # Serializes the active-job check and insert of start_job
+        self._start_lock = asyncio.Lock()
+
+    async def get_job(self, job_id: int) -> Optional[SyncJob]:
+        async with self.session_factory() as session:
+            return await session.get(SyncJob, job_id)
+
+    async def start_job(self, force_full: bool = False) -> Tuple[SyncJob, bool]:
+        """
+        Create a pending sync job.
+
+        Returns:
+            (job, created); an already active job is returned with created=False
+        """
+        async with self._start_lock, self.session_factory() as session:
+            result = await session.execute(
+                select(SyncJob)
+                .where(SyncJob.resource_type == "users", SyncJob.status.in_(ACTIVE_JOB_STATUSES))
+                .order_by(desc(SyncJob.id))
+                .limit(1)
+            )
+            active = result.scalar_one_or_none()
+            if active:
+                return active, False
+
+            delta_link = None if force_full else await self._last_delta_link(session)
+            job = SyncJob(resource_type="users", mode="delta" if delta_link else "full",
+                          status="pending", delta_link=delta_link)
+            session.add(job)
+            await session.commit()
+            return job, True
+
+    @staticmethod
+    async def _last_delta_link(session) -> Optional[str]:
+        result = await session.execute(
+            select(SyncJob.delta_link)
+            .where(SyncJob.resource_type == "users", SyncJob.status == "completed",
+                   SyncJob.delta_link.isnot(None))
+            .order_by(desc(SyncJob.id))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def run(self, job_id: int) -> SyncJob:
+        """Run a job created by start_job to completion."""
+        async with self.session_factory() as session:
+            job = await session.get(SyncJob, job_id)
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            await session.commit()
+
+        try:
+            try:
+                delta_link = await self._sync(job_id, job.mode, job.delta_link)
+            except DeltaResyncRequired:
+                logger.warning("User delta link expired, falling back to a full sync")
+                async with self.session_factory() as session:
+                    job = await session.get(SyncJob, job_id)
+                    job.mode = "full"
+                    await session.commit()
+                delta_link = await self._sync(job_id, "full", None)
+
+            async with self.session_factory() as session:
+                job = await session.get(SyncJob, job_id)
+                job.status = "completed"
+                job.delta_link = delta_link
+                job.completed_at = datetime.utcnow()
+                await session.commit()
+
+            logger.info(f"User sync job {job_id} completed ({job.mode}): {job.records_created} created, "
+                        f"{job.records_updated} updated, {job.records_deleted} deleted")
+
+        except Exception as e:
+            logger.error(f"User sync job {job_id} failed: {e}")
+            async with self.session_factory() as session:
+                job = await session.get(SyncJob, job_id)
+                job.status = "failed"
+                job.error_message = str(e)
+                job.completed_at = datetime.utcnow()
+                await session.commit()
+
+        return job
+
+    async def _sync(self, job_id: int, mode: str, delta_link: Optional[str]) -> Optional[str]:
+        """Page through the delta query; returns the final delta link."""
+        if mode == "delta" and delta_link:
+            url, params = delta_link, None
+        else:
+            url, params = USER_DELTA_ENDPOINT, {"$select": ",".join(USER_SYNC_SELECT)}
+
+        seen: Optional[Set[str]] = set() if mode == "full" else None
+        data = await self.fetch_page(url, params)
+        while True:
+            next_link = data.get("@odata.nextLink")
+            # Fetch the next page while this one is written
+            next_page = asyncio.ensure_future(self.fetch_page(next_link, None)) if next_link else None
+            try:
+                await self._apply_page(job_id, data.get("value") or [], seen)
+            except BaseException:
+                if next_page:
+                    next_page.cancel()
+                raise
+
+            if not next_page:
+                break
+            data = await next_page
+
+        if seen is not None:
+            await self._delete_unseen(job_id, seen)
+        return data.get("@odata.deltaLink")
+
+    async def _apply_page(self, job_id: int, items: List[Dict[str, Any]], seen: Optional[Set[str]]):
+        removed = [item["id"] for item in items if "@removed" in item]
+        changes = {item["id"]: map_graph_user(item) for item in items if "@removed" not in item}
+        if seen is not None:
+            seen.update(changes)
+
+        counters = {"records_created": 0, "records_updated": 0, "records_unchanged": 0,
+                    "records_deleted": 0, "records_skipped": 0}
+
+        async with self.session_factory() as session:
+            now = datetime.utcnow()
+            # Removals first, so a re-created account can take over its UPN
+            for start in range(0, len(removed), self.batch_size):
+                counters["records_deleted"] += await self._soft_delete(
+                    session, User.azure_ad_id.in_(removed[start:start + self.batch_size]), now)
+
+            existing = await self._load_existing(session, changes)
+            new_rows, updates = [], []
+
+            for azure_ad_id, values in changes.items():
+                row = existing.get(azure_ad_id)
+                if row is None:
+                    if not values.get("user_principal_name"):
+                        counters["records_skipped"] += 1
+                        continue
+                    new_rows.append({**values, "azure_ad_id": azure_ad_id})
+                    continue
+
+                diff = {column: value for column, value in values.items()
+                        if getattr(row, column) != value}
+                # UPNs match case-insensitively; keep the case the row was stored with
+                if (row.user_principal_name or "").lower() == diff.get("user_principal_name"):
+                    del diff["user_principal_name"]
+                if row.azure_ad_id != azure_ad_id:
+                    diff["azure_ad_id"] = azure_ad_id
+                if row.deleted_at is not None:
+                    diff["deleted_at"] = None
+                if diff:
+                    updates.append({"id": row.id, **diff, "updated_at": now})
+                else:
+                    counters["records_unchanged"] += 1
+
+            if new_rows:
+                result = await bulk_insert_new(session, User, new_rows, ["azure_ad_id"],
+                                               conflict_columns=["azure_ad_id"], batch_size=self.batch_size)
+                counters["records_created"] = len(result.inserted)
+                counters["records_skipped"] += result.skipped
+
+            # ORM bulk UPDATE by primary key (executemany per batch)
+            for start in range(0, len(updates), self.batch_size):
+                await session.execute(update(User), updates[start:start + self.batch_size])
+            counters["records_updated"] = len(updates)
+
+            job = await session.get(SyncJob, job_id)
+            job.pages_fetched += 1
+            job.records_seen += len(items)
+            for name, value in counters.items():
+                setattr(job, name, getattr(job, name) + value)
+            await session.commit()
+
+    async def _load_existing(self, session, changes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Existing rows by azure_ad_id; rows not matched by id are matched by UPN."""
+        if not changes:
+            return {}
+
+        columns = [User.id, User.azure_ad_id, User.user_principal_name, User.deleted_at,
+                   *{getattr(User, column) for values in changes.values() for column in values}]
+        existing: Dict[str, Any] = {}
+        ids = list(changes)
+        for start in range(0, len(ids), self.batch_size):
+            result = await session.execute(
+                select(*columns).where(User.azure_ad_id.in_(ids[start:start + self.batch_size])))
+            existing.update({row.azure_ad_id: row for row in result})
+
+        # Users created through the API before their first sync have no azure_ad_id yet,
+        # and a re-created account reuses the UPN of the deleted one
+        # (matched case-insensitively: API-created rows keep the case they were submitted with)
+        unlinked = {values["user_principal_name"].lower(): azure_ad_id for azure_ad_id, values in changes.items()
+                    if azure_ad_id not in existing and values.get("user_principal_name")}
+        upns = list(unlinked)
+        for start in range(0, len(upns), self.batch_size):
+            result = await session.execute(
+                select(*columns).where(func.lower(User.user_principal_name).in_(upns[start:start + self.batch_size])))
+            for row in result:
+                existing.setdefault(unlinked[row.user_principal_name.lower()], row)
+
+        return existing
+
+    @staticmethod
+    async def _soft_delete(session, condition, now: datetime) -> int:
+        result = await session.execute(
+            update(User)
+            .where(condition, User.deleted_at.is_(None))
+            .values(deleted_at=now, account_enabled=False, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def _delete_unseen(self, job_id: int, seen: Set[str]):
+        """After a full sync, soft-delete synced users that no longer exist in Graph."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(User.azure_ad_id).where(User.azure_ad_id.isnot(None), User.deleted_at.is_(None)))
+            missing = [azure_ad_id for azure_ad_id in result.scalars() if azure_ad_id not in seen]
+
+            now = datetime.utcnow()
+            deleted = 0
+            for start in range(0, len(missing), self.batch_size):
+                deleted += await self._soft_delete(
+                    session, User.azure_ad_id.in_(missing[start:start + self.batch_size]), now)
+
+            job = await session.get(SyncJob, job_id)
+            job.records_deleted += deleted
+            await session.commit()
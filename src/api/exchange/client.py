@@ -17,6 +17,7 @@ from urllib3.util.retry import Retry
 from src.core.config import Config
 from src.core.powershell_bridge import PowerShellBridge
 from src.api.graph.client import GraphClient
+from src.api.graph.reports import ReportIndex, iter_join
 
 
 @dataclass
@@ -163,39 +164,42 @@ class ExchangeClient:
                 limit=limit
             )
             
+            mailbox_users = [user for user in users if user.get('mail')]  # Users with a mailbox
+            
             mailboxes = []
-            for user in users:
-                if user.get('mail'):  # User has a mailbox
-                    mailbox = {
-                        'ユーザー名': user.get('displayName', ''),
-                        'メールアドレス': user.get('mail', ''),
-                        'UPN': user.get('userPrincipalName', ''),
-                        'アカウント状態': '有効' if user.get('accountEnabled') else '無効',
-                        'メールボックスタイプ': 'UserMailbox',
-                        'GUID': user.get('id', ''),
-                        'プライマリSMTPアドレス': user.get('mail', ''),
-                        'エイリアス': user.get('mailNickname', ''),
-                        'データベース': 'N/A (Graph API)',
-                        'サーバー': 'N/A (Graph API)'
-                    }
-                    
-                    # Add statistics if requested
-                    if include_statistics:
-                        try:
-                            stats = self.graph_client.get(f'/users/{user["id"]}/mailboxSettings')
-                            mailbox.update({
-                                '自動返信': stats.get('automaticRepliesSetting', {}).get('status', 'Disabled'),
-                                '言語': stats.get('language', {}).get('displayName', 'Default'),
-                                'タイムゾーン': stats.get('timeZone', 'UTC')
-                            })
-                        except:
-                            mailbox.update({
-                                '自動返信': 'Unknown',
-                                '言語': 'Unknown',
-                                'タイムゾーン': 'Unknown'
-                            })
-                    
-                    mailboxes.append(mailbox)
+            for user in mailbox_users:
+                mailbox = {
+                    'ユーザー名': user.get('displayName', ''),
+                    'メールアドレス': user.get('mail', ''),
+                    'UPN': user.get('userPrincipalName', ''),
+                    'アカウント状態': '有効' if user.get('accountEnabled') else '無効',
+                    'メールボックスタイプ': 'UserMailbox',
+                    'GUID': user.get('id', ''),
+                    'プライマリSMTPアドレス': user.get('mail', ''),
+                    'エイリアス': user.get('mailNickname', ''),
+                    'データベース': 'N/A (Graph API)',
+                    'サーバー': 'N/A (Graph API)'
+                }
+                mailboxes.append(mailbox)
+            
+            # Add statistics if requested (mailboxSettings fetched concurrently)
+            if include_statistics:
+                paths = [f'/users/{user["id"]}/mailboxSettings' for user in mailbox_users]
+                for result in self.graph_client.fan_out(paths):
+                    mailbox = mailboxes[result.index]
+                    if result.success:
+                        stats = result.data
+                        mailbox.update({
+                            '自動返信': stats.get('automaticRepliesSetting', {}).get('status', 'Disabled'),
+                            '言語': stats.get('language', {}).get('displayName', 'Default'),
+                            'タイムゾーン': stats.get('timeZone', 'UTC')
+                        })
+                    else:
+                        mailbox.update({
+                            '自動返信': 'Unknown',
+                            '言語': 'Unknown',
+                            'タイムゾーン': 'Unknown'
+                        })
             
             return ExchangeResult(
                 success=True,
@@ -392,35 +396,32 @@ class ExchangeClient:
                     limit=limit
                 )
             
+            # Mailbox usage report is fetched once and looked up by UPN
+            try:
+                usage_index = self.graph_client.get_report_index('getMailboxUsageDetail', 'D7')
+            except Exception as e:
+                self.logger.warning(f"Mailbox usage report unavailable: {e}")
+                usage_index = ReportIndex([])
+            
             statistics = []
-            for user in users:
-                if user.get('mail'):  # Has mailbox
-                    # Try to get mailbox usage from reports API
-                    try:
-                        usage = self.graph_client.get(f'/reports/getMailboxUsageDetail(period=\'D7\')')
-                        user_usage = next(
-                            (u for u in usage.get('value', []) if u.get('userPrincipalName') == user.get('userPrincipalName')),
-                            {}
-                        )
-                    except:
-                        user_usage = {}
-                    
-                    stat = {
-                        'ユーザー名': user.get('displayName', ''),
-                        'メールアドレス': user.get('mail', ''),
-                        'メールボックスGUID': user.get('id', ''),
-                        '使用容量(MB)': round(user_usage.get('storageUsedInBytes', 0) / (1024**2), 2),
-                        'アイテム数': user_usage.get('itemCount', 0),
-                        '削除済みアイテム数': 'N/A (Graph API)',
-                        '削除済みアイテム容量(MB)': 'N/A (Graph API)',
-                        '最終ログオン時刻': user_usage.get('lastActivityDate', ''),
-                        '最終ログオフ時刻': 'N/A (Graph API)',
-                        'データベース': 'N/A (Graph API)',
-                        'サーバー': 'N/A (Graph API)',
-                        'ストレージクォータ': 'N/A (Graph API)',
-                        'アーカイブ状態': 'N/A (Graph API)'
-                    }
-                    statistics.append(stat)
+            mailbox_users = [user for user in users if user.get('mail')]  # Has mailbox
+            for user, user_usage in iter_join(mailbox_users, usage_index, 'userPrincipalName'):
+                stat = {
+                    'ユーザー名': user.get('displayName', ''),
+                    'メールアドレス': user.get('mail', ''),
+                    'メールボックスGUID': user.get('id', ''),
+                    '使用容量(MB)': round(user_usage.get('storageUsedInBytes', 0) / (1024**2), 2),
+                    'アイテム数': user_usage.get('itemCount', 0),
+                    '削除済みアイテム数': 'N/A (Graph API)',
+                    '削除済みアイテム容量(MB)': 'N/A (Graph API)',
+                    '最終ログオン時刻': user_usage.get('lastActivityDate', ''),
+                    '最終ログオフ時刻': 'N/A (Graph API)',
+                    'データベース': 'N/A (Graph API)',
+                    'サーバー': 'N/A (Graph API)',
+                    'ストレージクォータ': 'N/A (Graph API)',
+                    'アーカイブ状態': 'N/A (Graph API)'
+                }
+                statistics.append(stat)
             
             return ExchangeResult(
                 success=True,
@@ -536,8 +537,7 @@ class ExchangeClient:
             period = f'D{days}'
             
             try:
-                activity = self.graph_client.get(f'/reports/getEmailActivityUserDetail(period=\'{period}\')')
-                activity_data = activity.get('value', [])
+                activity_data = self.graph_client.get_report_rows('getEmailActivityUserDetail', period)
             except:
                 activity_data = []
             
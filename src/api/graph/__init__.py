@@ -1,6 +1,9 @@
 """Microsoft Graph API integration module."""
 
 from .client import GraphClient
+from .batch import BatchEnvelopeThrottled, BatchRequest, BatchResponse, GraphBatchExecutor
+from .cache import GraphResponseCache
+from .report_composer import ReportComposer, ReportSection, ReportSectionError
 from .services import (
     UserService, LicenseService, TeamsService,
     OneDriveService, ExchangeService, ReportService
@@ -8,6 +11,9 @@ from .services import (
 
 __all__ = [
     'GraphClient',
+    'BatchEnvelopeThrottled', 'BatchRequest', 'BatchResponse', 'GraphBatchExecutor',
+    'GraphResponseCache',
+    'ReportComposer', 'ReportSection', 'ReportSectionError',
     'UserService', 'LicenseService', 'TeamsService',
     'OneDriveService', 'ExchangeService', 'ReportService'
 ]
\ No newline at end of file
@@ -0,0 +1,340 @@
+"""
+Microsoft Graph JSON batching ($batch) engine.
+Packs sub-requests into 20-request envelopes, honours dependsOn ordering,
+re-queues throttled sub-requests according to Retry-After and demultiplexes
+the responses back to the originating request IDs.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Microsoft Graph limit: 20 sub-requests per $batch envelope
+MAX_BATCH_SIZE = 20
+
+# Sub-request statuses that are re-queued instead of returned to the caller
+RETRYABLE_STATUS_CODES = (429, 503)
+
+# Graph answers dependents of a failed sub-request with 424 Failed Dependency
+FAILED_DEPENDENCY_STATUS = 424
+
+
+@dataclass
+class BatchRequest:
+    """Microsoft Graph Batch Request"""
+    id: str
+    method: str = "GET"
+    url: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[Dict[str, Any]] = None
+    depends_on: Optional[List[str]] = None
+
+
+@dataclass
+class BatchResponse:
+    """Microsoft Graph Batch Response"""
+    id: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class BatchEnvelopeThrottled(Exception):
+    """The /$batch envelope itself was throttled (429/503)."""
+
+    def __init__(self, message: str, status: int = 429, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+BatchSender = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class GraphBatchExecutor:
+    """
+    Execute BatchRequests through Microsoft Graph's /$batch endpoint.
+
+    The transport is injected as ``send``: an awaitable that POSTs one
+    ``{"requests": [...]}`` envelope and returns the decoded JSON body.
+    A throttled envelope is reported by raising BatchEnvelopeThrottled;
+    its sub-requests are then re-queued after the envelope's Retry-After.
+    """
+
+    def __init__(self,
+                 send: BatchSender,
+                 batch_size: int = MAX_BATCH_SIZE,
+                 max_retries: int = 3,
+                 default_retry_after: float = 1.0,
+                 max_retry_after: float = 120.0,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        """
+        Args:
+            send: Coroutine function that posts one batch envelope
+            batch_size: Sub-requests per envelope (capped at 20)
+            max_retries: Re-queue rounds for throttled sub-requests
+            default_retry_after: Delay used when Retry-After is missing
+            max_retry_after: Upper bound for a single Retry-After wait
+            sleep: Sleep coroutine (injectable for tests)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.send = send
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self.sleep = sleep
+        self.stats = {
+            'envelopes_sent': 0,
+            'sub_requests_sent': 0,
+            'throttled': 0,
+            'requeued': 0,
+            'retry_wait_seconds': 0.0
+        }
+
+    async def execute(self, requests: Iterable[BatchRequest]) -> Dict[str, BatchResponse]:
+        """
+        Execute requests and return responses keyed by request ID,
+        in submission order.
+        """
+        requests = list(requests)
+        if not requests:
+            return {}
+        self._validate(requests)
+
+        order = {req.id: index for index, req in enumerate(requests)}
+        responses: Dict[str, BatchResponse] = {}
+        pending = requests
+
+        for attempt in range(self.max_retries + 1):
+            throttled: Dict[str, BatchResponse] = {}
+            by_id = {req.id: req for req in pending}
+
+            for batch in self._pack(pending, completed=responses):
+                for response in await self._send_envelope(batch):
+                    if response.status in RETRYABLE_STATUS_CODES:
+                        throttled[response.id] = response
+                    else:
+                        responses[response.id] = response
+
+            # Dependents of throttled requests fail with 424; retry them together
+            for req in pending:
+                response = responses.get(req.id)
+                if (response is not None
+                        and response.status == FAILED_DEPENDENCY_STATUS
+                        and self._depends_on_any(req, throttled, by_id)):
+                    throttled[req.id] = responses.pop(req.id)
+
+            if not throttled:
+                break
+
+            self.stats['throttled'] += len(throttled)
+
+            if attempt == self.max_retries:
+                logger.warning(f"Batch retries exhausted, {len(throttled)} sub-requests still throttled")
+                responses.update(throttled)
+                break
+
+            delay = max(self._retry_after(response) for response in throttled.values())
+            logger.info(f"Re-queueing {len(throttled)} throttled sub-requests after {delay}s "
+                        f"(round {attempt + 1}/{self.max_retries})")
+            self.stats['requeued'] += len(throttled)
+            self.stats['retry_wait_seconds'] += delay
+            await self.sleep(delay)
+
+            pending = [req for req in pending if req.id in throttled]
+
+        return {req_id: responses[req_id] for req_id in sorted(responses, key=order.__getitem__)}
+
+    def _validate(self, requests: List[BatchRequest]):
+        """Reject duplicate IDs and dependencies outside the request set."""
+        ids = set()
+        for req in requests:
+            if req.id in ids:
+                raise ValueError(f"Duplicate batch request id: {req.id}")
+            ids.add(req.id)
+
+        for req in requests:
+            for dependency in req.depends_on or []:
+                if dependency not in ids:
+                    raise ValueError(f"Batch request {req.id} depends on unknown request {dependency}")
+
+    @staticmethod
+    def _depends_on_any(req: BatchRequest,
+                        failed: Dict[str, BatchResponse],
+                        by_id: Dict[str, BatchRequest]) -> bool:
+        """Whether req (transitively) depends on one of the failed requests."""
+        stack = list(req.depends_on or [])
+        seen = set()
+        while stack:
+            dependency = stack.pop()
+            if dependency in failed:
+                return True
+            if dependency in seen or dependency not in by_id:
+                continue
+            seen.add(dependency)
+            stack.extend(by_id[dependency].depends_on or [])
+        return False
+
+    def _pack(self,
+              requests: List[BatchRequest],
+              completed: Dict[str, BatchResponse]) -> List[List[BatchRequest]]:
+        """
+        Pack requests into envelopes of at most batch_size.
+
+        Graph requires every dependsOn target to be in the same envelope,
+        so dependency-connected requests are packed as one unit in
+        topological order. Dependencies that already completed in an
+        earlier round are dropped.
+        """
+        by_id = {req.id: req for req in requests}
+        parent = {req.id: req.id for req in requests}
+
+        def find(req_id: str) -> str:
+            while parent[req_id] != req_id:
+                parent[req_id] = parent[parent[req_id]]
+                req_id = parent[req_id]
+            return req_id
+
+        for req in requests:
+            for dependency in req.depends_on or []:
+                if dependency in by_id:
+                    parent[find(req.id)] = find(dependency)
+
+        groups: Dict[str, List[BatchRequest]] = {}
+        for req in requests:
+            groups.setdefault(find(req.id), []).append(req)
+
+        batches: List[List[BatchRequest]] = []
+        current: List[BatchRequest] = []
+        for group in groups.values():
+            if len(group) > self.batch_size:
+                raise ValueError(
+                    f"Dependency chain of {len(group)} requests exceeds batch size {self.batch_size}"
+                )
+            if len(current) + len(group) > self.batch_size:
+                batches.append(current)
+                current = []
+            current.extend(self._topological_order(group, completed))
+        if current:
+            batches.append(current)
+
+        return batches
+
+    @staticmethod
+    def _topological_order(group: List[BatchRequest],
+                           completed: Dict[str, BatchResponse]) -> List[BatchRequest]:
+        """Order a dependency group so that dependencies come first."""
+        by_id = {req.id: req for req in group}
+        ordered: List[BatchRequest] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(req: BatchRequest):
+            if state.get(req.id) == 2:
+                return
+            if state.get(req.id) == 1:
+                raise ValueError(f"Circular dependsOn detected at request {req.id}")
+            state[req.id] = 1
+            for dependency in req.depends_on or []:
+                if dependency in by_id:
+                    visit(by_id[dependency])
+            state[req.id] = 2
+
+            depends_on = [d for d in (req.depends_on or []) if d in by_id and d not in completed]
+            if depends_on != (req.depends_on or []):
+                req = BatchRequest(
+                    id=req.id, method=req.method, url=req.url,
+                    headers=req.headers, body=req.body,
+                    depends_on=depends_on or None
+                )
+            ordered.append(req)
+
+        for req in group:
+            visit(req)
+        return ordered
+
+    async def _send_envelope(self, batch: List[BatchRequest]) -> List[BatchResponse]:
+        """POST one envelope and map every sub-request to a response."""
+        payload = {"requests": [self._serialize(req) for req in batch]}
+        self.stats['envelopes_sent'] += 1
+        self.stats['sub_requests_sent'] += len(batch)
+
+        try:
+            raw = await self.send(payload)
+        except BatchEnvelopeThrottled as e:
+            logger.warning(f"Batch envelope with {len(batch)} requests throttled ({e.status}), "
+                           f"Retry-After {e.retry_after}")
+            headers = {'Retry-After': str(e.retry_after)} if e.retry_after is not None else {}
+            return [BatchResponse(id=req.id, status=e.status, headers=headers, error=str(e)) for req in batch]
+        except Exception as e:
+            logger.error(f"Batch envelope with {len(batch)} requests failed: {str(e)}")
+            return [BatchResponse(id=req.id, status=500, error=str(e)) for req in batch]
+
+        received = {}
+        for item in (raw or {}).get('responses', []):
+            response = self._parse(item)
+            received[response.id] = response
+
+        results = []
+        for req in batch:
+            if req.id in received:
+                results.append(received[req.id])
+            else:
+                results.append(BatchResponse(
+                    id=req.id, status=500, error="No response returned for batch sub-request"
+                ))
+        return results
+
+    @staticmethod
+    def _serialize(req: BatchRequest) -> Dict[str, Any]:
+        """Convert a BatchRequest to the Graph $batch wire format."""
+        url = req.url
+        # Sub-request URLs are relative to the version root
+        for prefix in ("https://graph.microsoft.com/v1.0", "https://graph.microsoft.com/beta"):
+            if url.startswith(prefix):
+                url = url[len(prefix):]
+                break
+
+        item: Dict[str, Any] = {"id": req.id, "method": req.method.upper(), "url": url}
+        headers = dict(req.headers or {})
+        if req.body is not None:
+            item["body"] = req.body
+            headers.setdefault("Content-Type", "application/json")
+        if headers:
+            item["headers"] = headers
+        if req.depends_on:
+            item["dependsOn"] = list(req.depends_on)
+        return item
+
+    @staticmethod
+    def _parse(item: Dict[str, Any]) -> BatchResponse:
+        """Convert a $batch sub-response to a BatchResponse."""
+        status = int(item.get('status', 500))
+        body = item.get('body')
+        error = None
+        if status >= 400:
+            error = f"HTTP {status}"
+            if isinstance(body, dict) and isinstance(body.get('error'), dict):
+                error = body['error'].get('message') or error
+        return BatchResponse(
+            id=str(item.get('id')),
+            status=status,
+            headers=item.get('headers') or {},
+            body=body,
+            error=error
+        )
+
+    def _retry_after(self, response: BatchResponse) -> float:
+        """Seconds to wait before re-queueing a throttled sub-request."""
+        for name, value in (response.headers or {}).items():
+            if name.lower() == 'retry-after':
+                try:
+                    return min(max(float(value), 0.0), self.max_retry_after)
+                except (TypeError, ValueError):
+                    break
+        return self.default_retry_after
@@ -0,0 +1,248 @@
+"""
+Bounded LRU/TTL response cache for Microsoft Graph clients.
+Evicts by entry count and approximate byte size, expires entries per
+endpoint TTL class and sweeps expired entries in the background.
+"""
+
+import json
+import logging
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Endpoint prefix -> TTL seconds (longest matching prefix wins)
+DEFAULT_TTL_CLASSES: Dict[str, int] = {
+    '/users': 300,            # 5 minutes
+    '/groups': 600,           # 10 minutes
+    '/subscribedSkus': 1800,  # 30 minutes
+    '/reports': 3600,         # 1 hour, reports refresh daily
+    '/auditLogs': 120,        # 2 minutes
+}
+
+
+@dataclass
+class CacheEntry:
+    """Cache Entry for Microsoft Graph responses"""
+    data: Any
+    timestamp: datetime
+    ttl: int = 300  # 5 minutes default
+    size: int = 0
+
+    @property
+    def is_expired(self) -> bool:
+        """Check if cache entry is expired"""
+        return datetime.utcnow() > self.timestamp + timedelta(seconds=self.ttl)
+
+
+def estimate_size(data: Any) -> int:
+    """Approximate the memory footprint of a cached response in bytes."""
+    try:
+        return len(json.dumps(data, default=str, separators=(',', ':')).encode('utf-8'))
+    except (TypeError, ValueError):
+        return sys.getsizeof(data)
+
+
+class GraphResponseCache:
+    """
+    Thread-safe LRU cache bounded by entry count and approximate bytes.
+
+    Entries expire after the TTL of their endpoint class; expired entries
+    are dropped on read and by a periodic background sweep. With
+    sweep_interval set, the sweep thread starts on the first write and
+    exits once the cache is stopped or garbage collected.
+    """
+
+    def __init__(self,
+                 max_entries: int = 5000,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: int = 300,
+                 ttl_classes: Optional[Dict[str, int]] = None,
+                 sweep_interval: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum approximate size of all cached responses
+            default_ttl: TTL for endpoints without a TTL class
+            ttl_classes: Endpoint prefix -> TTL seconds
+            sweep_interval: Start the background sweep on first write (None disables it)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_classes = dict(DEFAULT_TTL_CLASSES if ttl_classes is None else ttl_classes)
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+
+        self.sweep_interval = sweep_interval
+        self._sweep_thread: Optional[threading.Thread] = None
+        self._sweep_stop = threading.Event()
+        # Wake the sweep thread so it exits when the cache is collected
+        weakref.finalize(self, self._sweep_stop.set)
+
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'oversized': 0,
+            'total_requests': 0
+        }
+
+    def ttl_for(self, endpoint: Optional[str]) -> int:
+        """Resolve the TTL class for an endpoint path."""
+        if endpoint:
+            best = None
+            for prefix in self.ttl_classes:
+                if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                    best = prefix
+            if best is not None:
+                return self.ttl_classes[best]
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached data and mark it most recently used."""
+        with self._lock:
+            self.stats['total_requests'] += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not entry.is_expired:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry.data
+                self._remove(key)
+                self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key: str, data: Any, ttl: Optional[int] = None, endpoint: Optional[str] = None):
+        """Store data, evicting least recently used entries over the bounds."""
+        size = estimate_size(data)
+        with self._lock:
+            if size > self.max_bytes:
+                # Never let a single response flush the whole cache
+                self.stats['oversized'] += 1
+                self._remove(key)
+                logger.debug(f"Response too large to cache ({size} bytes): {key}")
+                return
+
+            self._remove(key)
+            self._entries[key] = CacheEntry(
+                data=data,
+                timestamp=datetime.utcnow(),
+                ttl=ttl if ttl is not None else self.ttl_for(endpoint),
+                size=size
+            )
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats['evictions'] += 1
+
+            if self.sweep_interval and self._sweep_thread is None:
+                self.start_sweeper(self.sweep_interval)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, key: str):
+        """Remove a single entry."""
+        with self._lock:
+            self._remove(key)
+
+    def sweep_expired(self) -> int:
+        """Remove every expired entry and return how many were dropped."""
+        with self._lock:
+            expired_keys = [key for key, entry in self._entries.items() if entry.is_expired]
+            for key in expired_keys:
+                self._remove(key)
+            self.stats['expired'] += len(expired_keys)
+        if expired_keys:
+            logger.debug(f"Cache sweep removed {len(expired_keys)} expired entries")
+        return len(expired_keys)
+
+    def start_sweeper(self, interval: float = 60.0):
+        """Start the background TTL sweep thread (one per cache)."""
+        with self._lock:
+            self.sweep_interval = interval
+            if self._sweep_thread and self._sweep_thread.is_alive():
+                return
+            self._sweep_stop.clear()
+
+            # The thread only holds a weak reference, so it never keeps the cache alive
+            cache_ref = weakref.ref(self)
+            stop = self._sweep_stop
+
+            def run():
+                while not stop.wait(interval):
+                    cache = cache_ref()
+                    if cache is None:
+                        return
+                    try:
+                        cache.sweep_expired()
+                    except Exception as e:
+                        logger.error(f"Cache sweep failed: {str(e)}")
+                    del cache
+
+            self._sweep_thread = threading.Thread(target=run, name="graph-cache-sweeper", daemon=True)
+            self._sweep_thread.start()
+
+    def stop_sweeper(self):
+        """Stop the background TTL sweep thread and disable the lazy start."""
+        with self._lock:
+            self.sweep_interval = None
+            self._sweep_stop.set()
+            thread, self._sweep_thread = self._sweep_thread, None
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def clear(self):
+        """Remove all entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.stats = self._empty_stats()
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of cache statistics."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hit_rate
+            })
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not entry.is_expired
@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
 from msal import ConfidentialClientApplication, PublicClientApplication
 import requests
 from requests.adapters import HTTPAdapter
@@ -19,6 +22,8 @@ from src.core.config import Config
 from src.core.auth.retry_handler import RetryHandler
 from src.security.security_manager import get_security_manager
 from src.security.data_sanitizer import sanitize_for_logging
+from .reports import ReportIndex
+from .report_fetcher import ReportFetcher
 
 
 @dataclass
@@ -50,6 +55,79 @@ class PerformanceMetrics:
             self.last_reset_time = datetime.now()
 
 
+class GraphAPIError(Exception):
+    """Graph API HTTP error carrying the status code and Retry-After."""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class FanOutResult:
+    """Result of one request in a GraphClient.fan_out() call."""
+    index: int
+    path: str
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+    
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit shared by fan-out workers.
+    Halves the limit and pauses all workers on 429, then grows it back
+    by one after every `limit` successful requests.
+    """
+    
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.throttle_count = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._condition = threading.Condition()
+    
+    def acquire(self) -> None:
+        with self._condition:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                    continue
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._condition.wait()
+    
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+    
+    def record_success(self) -> None:
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+    
+    def record_throttle(self, retry_after: float) -> None:
+        with self._condition:
+            self.throttle_count += 1
+            self._successes = 0
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+
+
 class GraphClient:
     """
     Microsoft Graph API client with authentication support.
@@ -66,6 +144,8 @@ class GraphClient:
         self.access_token = None
         self.app = None
         self.session = self._create_session()
+        self._fan_out_session = None
+        self._token_lock = threading.Lock()
         self.retry_handler = RetryHandler()
         self.security_manager = get_security_manager()
         
@@ -79,6 +159,20 @@ class GraphClient:
             'reports': CacheEntry(None, None, 1800),   # 30 minutes
         }
         
+        # Usage report indexes shared by Exchange/OneDrive/Teams clients
+        # (report, period, key) -> CacheEntry(ReportIndex)
+        self.report_indexes: Dict[tuple, CacheEntry] = {}
+        # One lock per cache key, so different reports download in parallel;
+        # _report_lock only guards the lock table and the index dict
+        self._report_locks: Dict[tuple, threading.Lock] = {}
+        self._report_lock = threading.Lock()
+        
+        # /reports downloads (all pages, CSV or JSON), cached per day on disk when configured
+        self.report_fetcher = ReportFetcher(
+            lambda url: self._open_report_page(url),
+            cache_dir=self.config.get('Reports.GraphReportCacheDirectory', None)
+        )
+        
         # Performance metrics (matches PowerShell implementation)
         self.performance_metrics = PerformanceMetrics()
         
@@ -273,9 +367,11 @@ class GraphClient:
             raise
     
     def _ensure_token(self) -> None:
-        """Ensure we have a valid access token."""
+        """Ensure we have a valid access token (shared across worker threads)."""
         if not self.access_token:
-            self.acquire_token()
+            with self._token_lock:
+                if not self.access_token:
+                    self.acquire_token()
     
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests."""
@@ -286,22 +382,25 @@ class GraphClient:
             'Accept': 'application/json'
         }
     
-    def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def get(self, endpoint: str, params: Optional[Dict] = None,
+            session: Optional[requests.Session] = None) -> Dict[str, Any]:
         """
         Make GET request to Graph API with enhanced error handling.
         
         Args:
             endpoint: API endpoint (e.g., '/users', '/me/messages')
             params: Query parameters
+            session: HTTP session to use (defaults to the retrying session)
             
         Returns:
             JSON response
         """
         url = f"{self.GRAPH_API_ENDPOINT}/{self.config.get('ApiSettings.GraphApiVersion', 'v1.0')}{endpoint}"
+        session = session or self.session
         
         try:
             self.logger.debug(f"GET request: {endpoint}")
-            response = self.session.get(
+            response = session.get(
                 url,
                 headers=self._get_headers(),
                 params=params,
@@ -312,7 +411,7 @@ class GraphClient:
             if response.status_code == 401:
                 self.logger.warning("認証エラー - トークンを再取得します")
                 self.access_token = None  # Force token refresh
-                response = self.session.get(
+                response = session.get(
                     url,
                     headers=self._get_headers(),
                     params=params,
@@ -335,7 +434,11 @@ class GraphClient:
                 error_msg = f"HTTP error {e.response.status_code}: {endpoint}"
             
             self.logger.error(error_msg)
-            raise Exception(error_msg)
+            raise GraphAPIError(
+                error_msg,
+                status_code=e.response.status_code,
+                retry_after=self._parse_retry_after(e.response)
+            )
         except requests.exceptions.RequestException as e:
             error_msg = f"ネットワークエラー: {endpoint} - {str(e)}"
             self.logger.error(error_msg)
@@ -345,6 +448,108 @@ class GraphClient:
             self.logger.error(error_msg)
             raise
     
+    @staticmethod
+    def _parse_retry_after(response: Optional[requests.Response]) -> Optional[float]:
+        """Parse the Retry-After header (seconds) of a response."""
+        if response is None or response.headers is None:
+            return None
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+    
+    def _get_fan_out_session(self, pool_size: int) -> requests.Session:
+        """
+        Session for fan-out requests.
+        429 is not retried by urllib3 here so that fan_out() can adapt its
+        concurrency; connection pool is sized for the worker count.
+        """
+        if self._fan_out_session is None:
+            session = requests.Session()
+            retry_strategy = Retry(
+                total=self.config.get('ApiSettings.RetryCount', 3),
+                backoff_factor=self.config.get('ApiSettings.RetryDelay', 5),
+                status_forcelist=[500, 502, 503, 504],
+            )
+            adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._fan_out_session = session
+        return self._fan_out_session
+    
+    def fan_out(self, paths: Iterable[str], params: Optional[Dict] = None,
+                max_concurrency: Optional[int] = None,
+                max_throttle_retries: int = 5) -> Iterator[FanOutResult]:
+        """
+        Issue GET requests for many per-entity paths concurrently.
+        
+        Results are yielded as they complete (use FanOutResult.index to map
+        them back to the input order). Concurrency adapts to throttling:
+        every 429 halves the number of in-flight requests and pauses all
+        workers for Retry-After seconds; successes grow it back.
+        
+        Args:
+            paths: API endpoints (e.g., '/users/{id}/drive')
+            params: Query parameters applied to every request
+            max_concurrency: Upper bound of in-flight requests
+            max_throttle_retries: Retries per request after a 429
+            
+        Yields:
+            FanOutResult for every path
+        """
+        max_concurrency = max_concurrency or self.config.get('ApiSettings.MaxConcurrency', 8)
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+        session = self._get_fan_out_session(max_concurrency)
+        default_retry_after = self.config.get('ApiSettings.RetryDelay', 5)
+        
+        def fetch(index: int, path: str) -> FanOutResult:
+            for attempt in range(max_throttle_retries + 1):
+                limiter.acquire()
+                try:
+                    data = self.get(path, params, session=session)
+                except GraphAPIError as e:
+                    if e.status_code == 429 and attempt < max_throttle_retries:
+                        limiter.record_throttle(e.retry_after or default_retry_after)
+                        continue
+                    return FanOutResult(index, path, error=e)
+                except Exception as e:
+                    return FanOutResult(index, path, error=e)
+                finally:
+                    limiter.release()
+                limiter.record_success()
+                return FanOutResult(index, path, data=data)
+        
+        started = time.time()
+        completed = 0
+        path_iter = enumerate(paths)
+        # Keep a bounded window of queued work so huge inputs stay streaming
+        window = max_concurrency * 2
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="graph-fanout") as executor:
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < window:
+                    try:
+                        index, path = next(path_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(fetch, index, path))
+                
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    completed += 1
+                    yield future.result()
+        
+        self.performance_metrics.api_call_count += completed
+        self.logger.info(
+            f"Fan-out completed: {completed} requests in {time.time() - started:.1f}s "
+            f"(throttled {limiter.throttle_count} times, final concurrency {limiter.limit})"
+        )
+    
     def post(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Make POST request to Graph API.
@@ -368,6 +573,59 @@ class GraphClient:
         response.raise_for_status()
         return response.json()
     
+    def _get_next_page(self, next_link: str) -> Dict[str, Any]:
+        """Fetch a page by its @odata.nextLink."""
+        response = self.session.get(
+            next_link,
+            headers=self._get_headers(),
+            timeout=self.config.get('ApiSettings.Timeout', 300)
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def iter_pages(self, endpoint: str, params: Optional[Dict] = None,
+                   prefetch: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Iterate over the pages of a paginated endpoint as they arrive.
+        
+        Only the current page (and, with prefetch, the next one) is held in
+        memory. With prefetch enabled the request for @odata.nextLink is
+        issued in the background while the caller processes the current page.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            prefetch: Fetch the next page while the current one is consumed
+            
+        Yields:
+            List of items per page
+        """
+        data = self.get(endpoint, params)
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-prefetch") if prefetch else None
+        try:
+            while True:
+                next_link = data.get('@odata.nextLink')
+                next_page = executor.submit(self._get_next_page, next_link) if (executor and next_link) else None
+                
+                yield data['value'] if 'value' in data else [data]
+                
+                if not next_link:
+                    break
+                data = next_page.result() if next_page else self._get_next_page(next_link)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def iter_items(self, endpoint: str, params: Optional[Dict] = None,
+                   prefetch: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all items of a paginated endpoint without materializing
+        the whole result set (see iter_pages).
+        """
+        for page in self.iter_pages(endpoint, params, prefetch=prefetch):
+            yield from page
+    
     def get_all_pages(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """
         Get all pages of results from paginated endpoint.
@@ -379,33 +637,7 @@ class GraphClient:
         Returns:
             List of all results
         """
-        results = []
-        next_link = None
-        
-        while True:
-            if next_link:
-                response = self.session.get(
-                    next_link,
-                    headers=self._get_headers(),
-                    timeout=self.config.get('ApiSettings.Timeout', 300)
-                )
-                response.raise_for_status()
-                data = response.json()
-            else:
-                data = self.get(endpoint, params)
-            
-            # Add results
-            if 'value' in data:
-                results.extend(data['value'])
-            else:
-                results.append(data)
-            
-            # Check for next page
-            next_link = data.get('@odata.nextLink')
-            if not next_link:
-                break
-                
-        return results
+        return list(self.iter_items(endpoint, params, prefetch=False))
     
     # Convenience methods for common operations
     
@@ -448,16 +680,96 @@ class GraphClient:
         }
         users = self.get('/users', params).get('value', [])
         
-        # Get authentication methods for each user (simplified for demo)
-        for user in users:
-            try:
-                auth_methods = self.get(f"/users/{user['id']}/authentication/methods")
-                user['authenticationMethods'] = auth_methods.get('value', [])
-            except:
-                user['authenticationMethods'] = []
+        # Get authentication methods for all users concurrently
+        paths = [f"/users/{user['id']}/authentication/methods" for user in users]
+        for result in self.fan_out(paths):
+            user = users[result.index]
+            user['authenticationMethods'] = result.data.get('value', []) if result.success else []
         
         return users
     
+    def get_report_index(self, report: str, period: str = 'D7',
+                         key: str = 'userPrincipalName') -> ReportIndex:
+        """
+        Get a usage report indexed by a key column.
+        
+        The report is downloaded once and shared by every caller using this
+        client until the 'reports' cache TTL expires.
+        
+        Args:
+            report: Report function name (e.g., 'getMailboxUsageDetail')
+            period: Report period (D7, D30, D90, D180)
+            key: Column to index rows by
+            
+        Returns:
+            ReportIndex over the report rows
+        """
+        cache_key = (report, period, key)
+        ttl = self.data_cache['reports'].ttl
+        
+        with self._report_lock:
+            key_lock = self._report_locks.setdefault(cache_key, threading.Lock())
+        
+        with key_lock:
+            with self._report_lock:
+                entry = self.report_indexes.get(cache_key)
+            if entry and entry.is_valid():
+                self.performance_metrics.cache_hit_count += 1
+                return entry.data
+            
+            self.logger.info(f"Fetching report {report} (period={period})")
+            rows = self.report_fetcher.get_rows(report, period)
+            index = ReportIndex(rows, key=key)
+            with self._report_lock:
+                self.report_indexes[cache_key] = CacheEntry(index, datetime.now(), ttl)
+            return index
+    
+    def _open_report_page(self, url: str) -> requests.Response:
+        """Open a streamed /reports response (endpoint or @odata.nextLink URL)."""
+        if not url.startswith('http'):
+            url = f"{self.GRAPH_API_ENDPOINT}/{self.config.get('ApiSettings.GraphApiVersion', 'v1.0')}{url}"
+        
+        def open_stream() -> requests.Response:
+            headers = self._get_headers()
+            # Report endpoints answer with CSV downloads or JSON pages
+            headers['Accept'] = 'application/json, text/csv'
+            return self.session.get(url, headers=headers, stream=True,
+                                    timeout=self.config.get('ApiSettings.Timeout', 300))
+        
+        response = open_stream()
+        if response.status_code == 401:
+            response.close()
+            self.access_token = None  # Force token refresh
+            response = open_stream()
+        
+        if response.status_code >= 400:
+            response.close()
+            raise GraphAPIError(
+                f"HTTP error {response.status_code}: {url}",
+                status_code=response.status_code,
+                retry_after=self._parse_retry_after(response)
+            )
+        self.performance_metrics.api_call_count += 1
+        return response
+    
+    def get_report_rows(self, report: str, period: str = 'D7') -> List[Dict[str, Any]]:
+        """Get all rows of a usage report (shared through the report index cache)."""
+        return list(self.get_report_index(report, period).rows)
+    
+    def prefetch_reports(self, reports: Iterable[str], periods: Iterable[str] = ('D7',)) -> Dict[tuple, Optional[str]]:
+        """
+        Download reports into the daily report cache (nightly job).
+        
+        Returns:
+            (report, period) -> None on success or the error message
+        """
+        return self.report_fetcher.prefetch((report, period) for report in reports for period in periods)
+    
+    def clear_report_indexes(self) -> None:
+        """Drop cached report indexes (start of a new run)."""
+        with self._report_lock:
+            self.report_indexes.clear()
+    
     def get_subscriptions(self) -> List[Dict[str, Any]]:
         """Get organization subscriptions."""
         return self.get_all_pages('/subscribedSkus')
@@ -493,7 +805,7 @@ class GraphClient:
     def get_license_usage(self) -> List[Dict[str, Any]]:
         """Get license usage statistics."""
         try:
-            return self.get('/reports/getOffice365ServicesUserCounts(period=\'D7\')').get('value', [])
+            return self.get_report_rows('getOffice365ServicesUserCounts', 'D7')
         except:
             # Fallback to basic subscription data
             return self.get_subscriptions()
@@ -501,8 +813,7 @@ class GraphClient:
     def get_teams_usage_reports(self) -> List[Dict[str, Any]]:
         """Get Teams usage reports."""
         try:
-            teams_data = self.get('/reports/getTeamsUserActivityUserDetail(period=\'D7\')').get('value', [])
-            return teams_data
+            return self.get_report_rows('getTeamsUserActivityUserDetail', 'D7')
         except:
             # Return mock data if reporting APIs are not available
             return []
@@ -510,13 +821,13 @@ class GraphClient:
     def get_onedrive_usage(self) -> List[Dict[str, Any]]:
         """Get OneDrive usage data."""
         try:
-            return self.get('/reports/getOneDriveUsageAccountDetail(period=\'D7\')').get('value', [])
+            return self.get_report_rows('getOneDriveUsageAccountDetail', 'D7')
         except:
             return []
     
     def get_mailbox_usage(self) -> List[Dict[str, Any]]:
         """Get mailbox usage data."""
         try:
-            return self.get('/reports/getMailboxUsageDetail(period=\'D7\')').get('value', [])
+            return self.get_report_rows('getMailboxUsageDetail', 'D7')
         except:
             return []
\ No newline at end of file
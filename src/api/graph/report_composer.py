@@ -0,0 +1,225 @@
+"""
+Report composition layer.
+Reports declare their sections and the data sources each section needs;
+the composer fetches every required source once, runs independent fetches
+concurrently and builds each section from whatever finished in time, so one
+slow or failing service only costs its own sections.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sources may be plain functions or return awaitables (async clients)
+DataSource = Callable[[], Any]
+
+DEFAULT_MAX_WORKERS = 5
+DEFAULT_TIMEOUT = 300.0
+
+
+class ReportSectionError(Exception):
+    """Raised when a required section could not be built."""
+
+
+@dataclass
+class ReportSection:
+    """A report section built from named data sources."""
+    name: str
+    requires: Tuple[str, ...]
+    # Called with the required sources as keyword arguments
+    build: Callable[..., Any]
+
+
+@dataclass
+class SectionResult:
+    """Outcome of one section."""
+    name: str
+    data: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class CompositionResult:
+    """Sections in declaration order plus per-source fetch timings."""
+    sections: Dict[str, SectionResult] = field(default_factory=dict)
+    fetch_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, section in self.sections.items() if not section.success]
+
+    def get(self, name: str) -> Any:
+        """Section data; raises ReportSectionError if the section failed."""
+        section = self.sections[name]
+        if not section.success:
+            raise ReportSectionError(f"Section '{name}' failed: {section.error}")
+        return section.data
+
+    def rows(self) -> List[Any]:
+        """Concatenated rows of the successful list-valued sections."""
+        rows: List[Any] = []
+        for section in self.sections.values():
+            if section.success and isinstance(section.data, list):
+                rows.extend(section.data)
+        return rows
+
+
+@dataclass
+class _Fetch:
+    value: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+class ReportComposer:
+    """Concurrent, deduplicating report section builder."""
+
+    def __init__(self, sources: Optional[Dict[str, DataSource]] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT):
+        """
+        Args:
+            sources: Data source name -> fetch function
+            max_workers: Maximum concurrent fetches
+            timeout: Seconds to wait for all fetches (None waits indefinitely)
+        """
+        self.sources: Dict[str, DataSource] = dict(sources or {})
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def add_source(self, name: str, fetch: DataSource):
+        self.sources[name] = fetch
+
+    def _required(self, sections: Iterable[ReportSection]) -> List[str]:
+        """Known sources needed by the sections, each listed once."""
+        required: List[str] = []
+        for section in sections:
+            for name in section.requires:
+                if name in self.sources and name not in required:
+                    required.append(name)
+        return required
+
+    def _run_source(self, name: str, timings: Dict[str, float]) -> Any:
+        started = time.perf_counter()
+        try:
+            value = self.sources[name]()
+            if inspect.isawaitable(value):
+                value = asyncio.run(_awaited(value))
+            return value
+        finally:
+            timings[name] = time.perf_counter() - started
+
+    def compose(self, sections: List[ReportSection], timeout: Optional[float] = None) -> CompositionResult:
+        """Fetch the sources on a thread pool and build the sections."""
+        timeout = self.timeout if timeout is None else timeout
+        required = self._required(sections)
+        result = CompositionResult()
+        fetches: Dict[str, _Fetch] = {}
+
+        if required:
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(required)),
+                                          thread_name_prefix='report-source')
+            try:
+                futures = {name: executor.submit(self._run_source, name, result.fetch_seconds)
+                           for name in required}
+                wait(futures.values(), timeout=timeout)
+            finally:
+                # Do not block on fetches that overran the deadline
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            for name, future in futures.items():
+                if not future.done():
+                    fetches[name] = _Fetch(error=f"timed out after {timeout}s", timed_out=True)
+                elif future.cancelled():
+                    fetches[name] = _Fetch(error="cancelled", timed_out=True)
+                elif future.exception() is not None:
+                    fetches[name] = _Fetch(error=str(future.exception()) or type(future.exception()).__name__)
+                else:
+                    fetches[name] = _Fetch(value=future.result())
+
+        return self._assemble(sections, fetches, result)
+
+    async def compose_async(self, sections: List[ReportSection],
+                            timeout: Optional[float] = None) -> CompositionResult:
+        """Like compose(), awaiting coroutine sources on the running loop."""
+        timeout = self.timeout if timeout is None else timeout
+        required = self._required(sections)
+        result = CompositionResult()
+        fetches: Dict[str, _Fetch] = {}
+        if not required:
+            return self._assemble(sections, fetches, result)
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(required)),
+                                      thread_name_prefix='report-source')
+
+        async def fetch(name: str) -> Any:
+            started = time.perf_counter()
+            try:
+                value = await loop.run_in_executor(executor, self.sources[name])
+                if inspect.isawaitable(value):
+                    value = await value
+                return value
+            finally:
+                result.fetch_seconds[name] = time.perf_counter() - started
+
+        tasks = {name: asyncio.ensure_future(fetch(name)) for name in required}
+        try:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                fetches[name] = _Fetch(error=f"timed out after {timeout}s", timed_out=True)
+            elif task.exception() is not None:
+                fetches[name] = _Fetch(error=str(task.exception()) or type(task.exception()).__name__)
+            else:
+                fetches[name] = _Fetch(value=task.result())
+
+        return self._assemble(sections, fetches, result)
+
+    def _assemble(self, sections: List[ReportSection], fetches: Dict[str, _Fetch],
+                  result: CompositionResult) -> CompositionResult:
+        for section in sections:
+            section_result = SectionResult(name=section.name)
+            values: Dict[str, Any] = {}
+            for name in section.requires:
+                fetched = fetches.get(name)
+                if fetched is None:
+                    section_result.error = f"unknown data source '{name}'"
+                elif fetched.error is not None:
+                    section_result.error = f"{name}: {fetched.error}"
+                    section_result.timed_out = fetched.timed_out
+                else:
+                    values[name] = fetched.value
+                    continue
+                break
+
+            if section_result.success:
+                try:
+                    section_result.data = section.build(**values)
+                except Exception as e:
+                    section_result.error = f"build failed: {e}"
+
+            if not section_result.success:
+                logger.warning(f"Report section '{section.name}' unavailable: {section_result.error}")
+            result.sections[section.name] = section_result
+
+        return result
+
+
+async def _awaited(awaitable: Any) -> Any:
+    return await awaitable
@@ -0,0 +1,354 @@
+"""
+Fetcher for Microsoft Graph /reports endpoints.
+Follows every page, parses CSV and JSON bodies incrementally into typed
+rows and optionally caches each report per (name, period, day) on disk, so
+one nightly download feeds every report that needs it.
+"""
+
+import codecs
+import csv
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# url or endpoint -> streamed HTTP response (requests.Response compatible)
+PageOpener = Callable[[str], Any]
+
+CHUNK_SIZE = 64 * 1024
+
+# CSV header (camelCased) -> JSON property name where the two differ
+CSV_COLUMN_ALIASES = {
+    'storageUsedByte': 'storageUsedInBytes',
+    'storageAllocatedByte': 'storageAllocatedInBytes',
+    'deletedItemSizeByte': 'deletedItemSizeInBytes',
+    'issueWarningQuotaByte': 'issueWarningQuotaInBytes',
+    'prohibitSendQuotaByte': 'prohibitSendQuotaInBytes',
+    'prohibitSendReceiveQuotaByte': 'prohibitSendReceiveQuotaInBytes',
+    'usedIOS': 'usedIOs',
+}
+
+# CSV columns holding '+'-separated lists (JSON arrays)
+CSV_LIST_COLUMNS = {'assignedProducts', 'products'}
+
+# Typed CSV columns (after renaming); every other column stays a string
+CSV_COLUMN_TYPES: Dict[str, type] = {
+    **dict.fromkeys((
+        # Mailbox / OneDrive usage
+        'storageUsedInBytes', 'storageAllocatedInBytes', 'deletedItemSizeInBytes',
+        'issueWarningQuotaInBytes', 'prohibitSendQuotaInBytes', 'prohibitSendReceiveQuotaInBytes',
+        'itemCount', 'deletedItemCount', 'fileCount', 'activeFileCount', 'reportPeriod',
+        # Email activity
+        'sendCount', 'receiveCount', 'readCount', 'meetingCreatedCount', 'meetingInteractedCount',
+        # Teams user activity
+        'teamChatMessageCount', 'privateChatMessageCount', 'callCount', 'meetingCount',
+        'meetingsOrganizedCount', 'meetingsAttendedCount', 'postMessages', 'replyMessages',
+        'urgentMessages',
+        # Office 365 services user counts
+        'exchangeActive', 'exchangeInactive', 'oneDriveActive', 'oneDriveInactive',
+        'sharePointActive', 'sharePointInactive', 'skypeForBusinessActive', 'skypeForBusinessInactive',
+        'yammerActive', 'yammerInactive', 'teamsActive', 'teamsInactive',
+        'office365Active', 'office365Inactive',
+    ), int),
+    **dict.fromkeys((
+        'isDeleted', 'hasArchive', 'isLicensed', 'isExternal', 'hasOtherAction',
+        # Teams device usage
+        'usedWeb', 'usedWindowsPhone', 'usedIOs', 'usedMac', 'usedAndroidPhone', 'usedWindows',
+        'usedChromeOS', 'usedLinux',
+    ), bool),
+}
+
+_CSV_BOOLEANS = {'true': True, 'yes': True, 'false': False, 'no': False}
+
+
+def csv_column_name(header: str) -> str:
+    """'Storage Used (Byte)' -> 'storageUsedInBytes'"""
+    words = re.findall(r'[A-Za-z0-9]+', header)
+    if not words:
+        return header
+    name = words[0][0].lower() + words[0][1:] + ''.join(w[0].upper() + w[1:] for w in words[1:])
+    return CSV_COLUMN_ALIASES.get(name, name)
+
+
+def csv_value(column: str, value: str) -> Any:
+    """
+    Convert a CSV cell to the type Graph uses in JSON responses.
+
+    Only columns in CSV_COLUMN_TYPES / CSV_LIST_COLUMNS are converted; empty
+    numeric and boolean cells become 0 / False so callers can do arithmetic on
+    them, and unparsable values are kept as the original string.
+    """
+    if column in CSV_LIST_COLUMNS:
+        return [item.strip() for item in value.split('+') if item.strip()]
+    kind = CSV_COLUMN_TYPES.get(column)
+    if kind is None:
+        return value
+    value = value.strip()
+    if kind is bool:
+        return _CSV_BOOLEANS.get(value.lower(), value) if value else False
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _decode_chunks(chunks: Iterable[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _lines(texts: Iterable[str]) -> Iterator[str]:
+    """Split decoded text into lines, keeping line endings for quoted newlines."""
+    pending = ''
+    for text in texts:
+        lines = (pending + text).splitlines(keepends=True)
+        # A trailing '\r' may be the first half of '\r\n'
+        pending = lines.pop() if lines and not lines[-1].endswith('\n') else ''
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_csv_rows(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Parse a CSV report body row by row."""
+    reader = csv.reader(_lines(_decode_chunks(chunks)))
+    header = next(reader, None)
+    if not header:
+        return
+    columns = [csv_column_name(h) for h in header]
+    for record in reader:
+        if record:
+            yield {column: csv_value(column, value) for column, value in zip(columns, record)}
+
+
+class _JsonStream:
+    """Incremental reader of one JSON page: yields 'value' items, keeps the other properties."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._texts = _decode_chunks(chunks)
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        self.properties: Dict[str, Any] = {}
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        text = next(self._texts, None)
+        if text is None:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return True
+
+    def _skip_space(self) -> str:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position].isspace():
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON report page")
+
+    def _expect(self, characters: str) -> str:
+        character = self._skip_space()
+        if character not in characters:
+            raise ValueError(f"Unexpected {character!r} in JSON report page")
+        self._position += 1
+        return character
+
+    def _value(self) -> Any:
+        self._skip_space()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+                # A value ending at the buffer end may be a truncated number
+                if end < len(self._buffer) or self._eof:
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._fill():
+                if self._eof and self._buffer:
+                    continue
+                raise ValueError("Unexpected end of JSON report page")
+
+    def items(self) -> Iterator[Dict[str, Any]]:
+        self._expect('{')
+        if self._skip_space() == '}':
+            self._position += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'value':
+                self._expect('[')
+                if self._skip_space() == ']':
+                    self._position += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.properties[key] = self._value()
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_json_page(chunks: Iterable[bytes]) -> Tuple[Iterator[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse a JSON report page incrementally.
+
+    Returns:
+        (items iterator, properties dict); the properties (e.g. @odata.nextLink)
+        are complete once the iterator is exhausted
+    """
+    stream = _JsonStream(chunks)
+    return stream.items(), stream.properties
+
+
+class ReportFetcher:
+    """
+    Downloads Graph usage reports page by page.
+
+    With a cache directory each report is written once per UTC day as JSON
+    lines (to a temporary file replaced on completion) and later calls read
+    that file, so concurrent or repeated callers never download it twice.
+    """
+
+    def __init__(self, open_page: PageOpener, cache_dir: Optional[Path] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            open_page: Opens a streamed response for an endpoint or nextLink URL
+            cache_dir: Directory of the daily report cache (None disables it)
+            chunk_size: Bytes read per response chunk
+        """
+        self.open_page = open_page
+        # Anything other than a non-empty path (e.g. an unset config value) disables the cache
+        self.cache_dir = Path(cache_dir) if isinstance(cache_dir, (str, os.PathLike)) and cache_dir else None
+        self.chunk_size = chunk_size
+        self.download_count = 0
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def endpoint(report: str, period: str) -> str:
+        return f"/reports/{report}(period='{period}')"
+
+    def cache_path(self, report: str, period: str, day: Optional[str] = None) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        day = day or datetime.utcnow().strftime('%Y%m%d')
+        return self.cache_dir / f"{report}_{period}_{day}.jsonl"
+
+    def _lock(self, report: str, period: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((report, period), threading.Lock())
+
+    def download(self, report: str, period: str) -> Iterator[Dict[str, Any]]:
+        """Stream the rows of every page of a report (no cache)."""
+        self.download_count += 1
+        url: Optional[str] = self.endpoint(report, period)
+        pages = 0
+        while url:
+            response = self.open_page(url)
+            pages += 1
+            try:
+                chunks = response.iter_content(chunk_size=self.chunk_size)
+                content_type = (response.headers or {}).get('Content-Type', '')
+                if 'json' in content_type:
+                    items, properties = iter_json_page(chunks)
+                    yield from items
+                    url = properties.get('@odata.nextLink')
+                else:
+                    # CSV downloads are a single file
+                    yield from iter_csv_rows(chunks)
+                    url = None
+            finally:
+                response.close()
+        logger.info(f"Downloaded report {report} (period={period}, {pages} pages)")
+
+    def iter_rows(self, report: str, period: str = 'D7') -> Iterator[Dict[str, Any]]:
+        """Rows of a report, from today's cache file when available."""
+        path = self.ensure_cached(report, period)
+        if path is None:
+            yield from self.download(report, period)
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def get_rows(self, report: str, period: str = 'D7') -> List[Dict[str, Any]]:
+        return list(self.iter_rows(report, period))
+
+    def ensure_cached(self, report: str, period: str) -> Optional[Path]:
+        """Download today's copy of a report into the cache unless present."""
+        path = self.cache_path(report, period)
+        if path is None:
+            return None
+        with self._lock(report, period):
+            if path.exists():
+                return path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=f".{path.stem}.", suffix='.tmp', dir=path.parent)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    for row in self.download(report, period):
+                        f.write(json.dumps(row, ensure_ascii=False))
+                        f.write('\n')
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+            self._prune(report, period, path)
+        return path
+
+    def _prune(self, report: str, period: str, current: Path):
+        """Remove earlier days of the same report."""
+        for old in self.cache_dir.glob(f"{report}_{period}_*.jsonl"):
+            if old != current:
+                try:
+                    old.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove cached report {old}: {e}")
+
+    def prefetch(self, reports: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Fill the cache for (report, period) pairs, e.g. from a nightly job.
+
+        Returns:
+            (report, period) -> None on success or the error message
+        """
+        results: Dict[Tuple[str, str], Optional[str]] = {}
+        for report, period in reports:
+            try:
+                self.ensure_cached(report, period)
+                results[(report, period)] = None
+            except Exception as e:
+                logger.error(f"Prefetch of report {report} (period={period}) failed: {e}")
+                results[(report, period)] = str(e)
+        return results
@@ -0,0 +1,132 @@
+"""
+Keyed indexes and hash joins over Microsoft Graph usage report rows.
+Report endpoints (/reports/get*Detail) return one row per user for the whole
+tenant, so they are fetched once per run and joined by key afterwards.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+JOIN_TYPES = ('left', 'inner')
+
+# Column projection: a list of column names, or a mapping of source column -> output column
+Projection = Union[Sequence[str], Mapping[str, str]]
+
+
+def normalize_key(value: Any) -> Optional[str]:
+    """Normalize a join key (UPNs are case-insensitive)."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value.lower() if value else None
+
+
+class ReportIndex:
+    """
+    Report rows indexed by a key column (userPrincipalName by default).
+    Lookups are O(1) dictionary reads instead of linear scans.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], key: str = 'userPrincipalName'):
+        self.rows = rows
+        self.key = key
+        self._index: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            row_key = normalize_key(row.get(key))
+            if row_key is not None and row_key not in self._index:
+                self._index[row_key] = row
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get the row for a key value."""
+        row_key = normalize_key(key)
+        if row_key is None:
+            return default
+        return self._index.get(row_key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        row_key = normalize_key(key)
+        return row_key is not None and row_key in self._index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __bool__(self) -> bool:
+        # An empty report is still a valid (cached) result
+        return True
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.rows)
+
+
+def _as_index(rows: Union[ReportIndex, Iterable[Dict[str, Any]]], key: str) -> ReportIndex:
+    if isinstance(rows, ReportIndex):
+        if rows.key != key:
+            raise ValueError(f"ReportIndex is keyed by {rows.key!r}, not {key!r}")
+        return rows
+    return ReportIndex(list(rows), key=key)
+
+
+def iter_join(left: Iterable[Dict[str, Any]],
+              right: Union[ReportIndex, Iterable[Dict[str, Any]]],
+              left_key: str,
+              right_key: Optional[str] = None,
+              how: str = 'left') -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Hash join of report rows, yielding (left_row, right_row) pairs in left order.
+
+    The right side is indexed once by its key (an existing ReportIndex, e.g.
+    from GraphClient.get_report_index, is reused as is), so the join is
+    O(len(left) + len(right)). Keys are normalized like ReportIndex keys and
+    the first right row per key wins. Unmatched left rows are paired with an
+    empty dict for how='left' and dropped for how='inner'.
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unsupported join type: {how}")
+    index = _as_index(right, right_key or left_key)
+    for row in left:
+        match = index.get(row.get(left_key))
+        if match is not None:
+            yield row, match
+        elif how == 'left':
+            yield row, {}
+
+
+def _project(row: Dict[str, Any], columns: Optional[Projection], target: Dict[str, Any]):
+    if columns is None:
+        target.update(row)
+    elif isinstance(columns, Mapping):
+        for source, name in columns.items():
+            target[name] = row.get(source)
+    else:
+        for name in columns:
+            target[name] = row.get(name)
+
+
+def join_reports(left: Iterable[Dict[str, Any]],
+                 right: Union[ReportIndex, Iterable[Dict[str, Any]]],
+                 left_key: str,
+                 right_key: Optional[str] = None,
+                 how: str = 'left',
+                 left_columns: Optional[Projection] = None,
+                 right_columns: Optional[Projection] = None) -> List[Dict[str, Any]]:
+    """
+    Hash join of report rows into flat dictionaries.
+
+    Args:
+        left: Rows kept in order (e.g. users)
+        right: Rows or ReportIndex looked up by key (e.g. a usage report)
+        left_key: Join column of the left rows
+        right_key: Join column of the right rows (defaults to left_key)
+        how: 'left' or 'inner'
+        left_columns: Left columns to keep (None keeps all)
+        right_columns: Right columns to add (None adds all); right values
+            overwrite left values with the same output name. Missing
+            columns of unmatched rows are None.
+    """
+    result = []
+    for left_row, right_row in iter_join(left, right, left_key, right_key, how):
+        row: Dict[str, Any] = {}
+        _project(left_row, left_columns, row)
+        if right_row or right_columns is not None:
+            _project(right_row, right_columns, row)
+        result.append(row)
+    return result
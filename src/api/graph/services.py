@@ -10,6 +10,8 @@ import asyncio
 from dataclasses import dataclass
 
 from .client import GraphClient
+from .reports import iter_join
+from .report_composer import CompositionResult, ReportComposer, ReportSection
 
 
 @dataclass
@@ -173,13 +175,11 @@ class LicenseService(BaseService):
             license_usage = self.client.get_license_usage()
             
             result = []
-            for sub in subscriptions:
+            # Usage rows are hash-indexed by skuId
+            for sub, usage in iter_join(subscriptions, license_usage, 'skuId'):
                 sku_id = sub.get('skuId', '')
                 sku_name = sub.get('skuPartNumber', '')
                 
-                # Find corresponding usage data
-                usage = next((u for u in license_usage if u.get('skuId') == sku_id), {})
-                
                 total_licenses = sub.get('totalLicenses', 0)
                 assigned_licenses = usage.get('assignedLicenses', 0)
                 available_licenses = total_licenses - assigned_licenses
@@ -428,78 +428,22 @@ class ExchangeService(BaseService):
 class ReportService(BaseService):
     """Centralized reporting service."""
     
-    def generate_daily_report(self) -> List[Dict[str, Any]]:
-        """Generate comprehensive daily report."""
+    def generate_daily_report(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Generate comprehensive daily report.
+
+        The five service pulls run concurrently; sections whose data failed
+        or timed out are left out instead of failing the whole report.
+        """
         try:
             self.logger.info("Generating daily report")
             
-            # Collect data from various services
-            user_service = UserService(self.client)
-            license_service = LicenseService(self.client)
-            teams_service = TeamsService(self.client)
-            onedrive_service = OneDriveService(self.client)
-            exchange_service = ExchangeService(self.client)
-            
-            # Get summary data
-            users = user_service.get_all_users(limit=100)
-            licenses = license_service.get_license_analysis()
-            teams = teams_service.get_teams_usage()
-            storage = onedrive_service.get_storage_analysis()
-            mailboxes = exchange_service.get_mailbox_analysis()
-            
-            # Create summary report
-            report_data = []
-            
-            # User summary
-            active_users = len([u for u in users if u.get('accountEnabled')])
-            report_data.append({
-                'カテゴリ': 'ユーザー管理',
-                '項目': '総ユーザー数',
-                '値': len(users),
-                '詳細': f'アクティブ: {active_users}, 無効: {len(users) - active_users}',
-                '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-            # License summary
-            total_licenses = sum(l.get('総ライセンス数', 0) for l in licenses)
-            assigned_licenses = sum(l.get('割り当て済み', 0) for l in licenses)
-            report_data.append({
-                'カテゴリ': 'ライセンス管理',
-                '項目': 'ライセンス使用状況',
-                '値': f'{assigned_licenses}/{total_licenses}',
-                '詳細': f'利用率: {(assigned_licenses/total_licenses*100):.1f}%' if total_licenses > 0 else '0%',
-                '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-            # Teams summary
-            active_teams = len([t for t in teams if t.get('今月の投稿数', 0) > 0])
-            report_data.append({
-                'カテゴリ': 'Teams活用',
-                '項目': 'アクティブチーム数',
-                '値': active_teams,
-                '詳細': f'総チーム数: {len(teams)}',
-                '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-            # Storage summary
-            total_storage = sum(s.get('使用容量(GB)', 0) for s in storage)
-            report_data.append({
-                'カテゴリ': 'ストレージ',
-                '項目': '総使用容量',
-                '値': f'{total_storage:.1f} GB',
-                '詳細': f'平均使用率: {sum(s.get("使用率(%)", 0) for s in storage)/len(storage):.1f}%' if storage else '0%',
-                '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            
-            # Mailbox summary
-            total_mailbox_size = sum(m.get('メールボックス容量(MB)', 0) for m in mailboxes)
-            report_data.append({
-                'カテゴリ': 'Exchange Online',
-                '項目': '総メールボックス容量',
-                '値': f'{total_mailbox_size/1024:.1f} GB',
-                '詳細': f'平均使用率: {sum(m.get("使用率(%)", 0) for m in mailboxes)/len(mailboxes):.1f}%' if mailboxes else '0%',
-                '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
+            result = self.compose(self.daily_report_sections(), timeout=timeout)
+            report_data = result.rows()
+            if result.failed:
+                self.logger.warning(f"Daily report is missing sections: {', '.join(result.failed)}")
+            if not report_data:
+                return self._generate_mock_daily_report()
             
             self.logger.info(f"Generated daily report with {len(report_data)} items")
             return report_data
@@ -508,6 +452,85 @@ class ReportService(BaseService):
             self.logger.error(f"Failed to generate daily report: {e}")
             return self._generate_mock_daily_report()
     
+    def report_composer(self) -> ReportComposer:
+        """Composer with the data sources shared by the report sections."""
+        return ReportComposer({
+            'users': lambda: UserService(self.client).get_all_users(limit=100),
+            'licenses': lambda: LicenseService(self.client).get_license_analysis(),
+            'teams': lambda: TeamsService(self.client).get_teams_usage(),
+            'storage': lambda: OneDriveService(self.client).get_storage_analysis(),
+            'mailboxes': lambda: ExchangeService(self.client).get_mailbox_analysis(),
+        })
+    
+    def compose(self, sections: List[ReportSection], timeout: Optional[float] = None) -> CompositionResult:
+        """Build report sections, fetching each data source once."""
+        return self.report_composer().compose(sections, timeout=timeout)
+    
+    def daily_report_sections(self) -> List[ReportSection]:
+        return [
+            ReportSection('users', ('users',), self._user_summary),
+            ReportSection('licenses', ('licenses',), self._license_summary),
+            ReportSection('teams', ('teams',), self._teams_summary),
+            ReportSection('storage', ('storage',), self._storage_summary),
+            ReportSection('mailboxes', ('mailboxes',), self._mailbox_summary),
+        ]
+    
+    @staticmethod
+    def _user_summary(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        active_users = len([u for u in users if u.get('accountEnabled')])
+        return [{
+            'カテゴリ': 'ユーザー管理',
+            '項目': '総ユーザー数',
+            '値': len(users),
+            '詳細': f'アクティブ: {active_users}, 無効: {len(users) - active_users}',
+            '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }]
+    
+    @staticmethod
+    def _license_summary(licenses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        total_licenses = sum(l.get('総ライセンス数', 0) for l in licenses)
+        assigned_licenses = sum(l.get('割り当て済み', 0) for l in licenses)
+        return [{
+            'カテゴリ': 'ライセンス管理',
+            '項目': 'ライセンス使用状況',
+            '値': f'{assigned_licenses}/{total_licenses}',
+            '詳細': f'利用率: {(assigned_licenses/total_licenses*100):.1f}%' if total_licenses > 0 else '0%',
+            '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }]
+    
+    @staticmethod
+    def _teams_summary(teams: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        active_teams = len([t for t in teams if t.get('今月の投稿数', 0) > 0])
+        return [{
+            'カテゴリ': 'Teams活用',
+            '項目': 'アクティブチーム数',
+            '値': active_teams,
+            '詳細': f'総チーム数: {len(teams)}',
+            '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }]
+    
+    @staticmethod
+    def _storage_summary(storage: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        total_storage = sum(s.get('使用容量(GB)', 0) for s in storage)
+        return [{
+            'カテゴリ': 'ストレージ',
+            '項目': '総使用容量',
+            '値': f'{total_storage:.1f} GB',
+            '詳細': f'平均使用率: {sum(s.get("使用率(%)", 0) for s in storage)/len(storage):.1f}%' if storage else '0%',
+            '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }]
+    
+    @staticmethod
+    def _mailbox_summary(mailboxes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        total_mailbox_size = sum(m.get('メールボックス容量(MB)', 0) for m in mailboxes)
+        return [{
+            'カテゴリ': 'Exchange Online',
+            '項目': '総メールボックス容量',
+            '値': f'{total_mailbox_size/1024:.1f} GB',
+            '詳細': f'平均使用率: {sum(m.get("使用率(%)", 0) for m in mailboxes)/len(mailboxes):.1f}%' if mailboxes else '0%',
+            '最終更新': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }]
+    
     def _generate_mock_daily_report(self) -> List[Dict[str, Any]]:
         """Generate mock daily report data."""
         import random
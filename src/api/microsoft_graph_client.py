@@ -25,50 +25,20 @@ from kiota_abstractions.response_handler import ResponseHandler
 from kiota_abstractions.serialization import Parsable
 
 from src.auth.azure_key_vault_auth import AzureKeyVaultAuth
+from src.api.graph.batch import BatchEnvelopeThrottled, BatchRequest, BatchResponse, GraphBatchExecutor
+from src.api.graph.cache import CacheEntry, GraphResponseCache
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class BatchRequest:
-    """Microsoft Graph Batch Request"""
-    id: str
-    method: str = "GET"
-    url: str = ""
-    headers: Dict[str, str] = field(default_factory=dict)
-    body: Optional[Dict[str, Any]] = None
-    depends_on: Optional[List[str]] = None
-
-
-@dataclass
-class BatchResponse:
-    """Microsoft Graph Batch Response"""
-    id: str
-    status: int
-    headers: Dict[str, str] = field(default_factory=dict)
-    body: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
-
-
-@dataclass
-class CacheEntry:
-    """Cache Entry for Microsoft Graph responses"""
-    data: Any
-    timestamp: datetime
-    ttl: int = 300  # 5 minutes default
-    
-    @property
-    def is_expired(self) -> bool:
-        """Check if cache entry is expired"""
-        return datetime.utcnow() > self.timestamp + timedelta(seconds=self.ttl)
-
-
 class MicrosoftGraphClient:
     """
     Microsoft Graph API Client - Enterprise Production
     Batching・Pagination・Caching・最適化・高性能処理
     """
     
+    BATCH_ENDPOINT = "https://graph.microsoft.com/v1.0/$batch"
+    
     def __init__(self,
                  tenant_id: str = None,
                  client_id: str = None,
@@ -82,7 +52,11 @@ class MicrosoftGraphClient:
                  retry_delay: float = 1.0,
                  request_timeout: float = 30.0,
                  use_key_vault: bool = True,
-                 key_vault_url: str = None):
+                 key_vault_url: str = None,
+                 cache_max_entries: int = 5000,
+                 cache_max_bytes: int = 64 * 1024 * 1024,
+                 cache_ttl_classes: Dict[str, int] = None,
+                 cache_sweep_interval: float = 60.0):
         """
         Initialize Microsoft Graph Client
         
@@ -100,6 +74,10 @@ class MicrosoftGraphClient:
             request_timeout: Request timeout in seconds
             use_key_vault: Use Azure Key Vault for credentials
             key_vault_url: Azure Key Vault URL
+            cache_max_entries: Maximum number of cached responses
+            cache_max_bytes: Maximum approximate size of cached responses
+            cache_ttl_classes: Endpoint prefix -> TTL seconds
+            cache_sweep_interval: Background TTL sweep interval in seconds (started on first cache write)
         """
         self.tenant_id = tenant_id
         self.client_id = client_id
@@ -133,17 +111,22 @@ class MicrosoftGraphClient:
         )
         
         # Initialize cache
-        self.cache: Dict[str, CacheEntry] = {}
-        self.cache_stats = {
-            'hits': 0,
-            'misses': 0,
-            'expired': 0,
-            'total_requests': 0
-        }
+        self.cache = GraphResponseCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            ttl_classes=cache_ttl_classes,
+            sweep_interval=cache_sweep_interval if self.enable_caching else None
+        )
         
         # Initialize batching
         self.pending_requests: List[BatchRequest] = []
         self.batch_responses: Dict[str, BatchResponse] = {}
+        self.batch_stats = {
+            'envelopes_sent': 0,
+            'sub_requests_sent': 0,
+            'throttled': 0,
+            'requeued': 0
+        }
         
         # Initialize performance monitoring
         self.performance_stats = {
@@ -195,35 +178,27 @@ class MicrosoftGraphClient:
             key_data += f":{json.dumps(params, sort_keys=True)}"
         return hashlib.md5(key_data.encode()).hexdigest()
     
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hit/miss/eviction counters"""
+        return self.cache.stats
+    
     def _get_cached_response(self, cache_key: str) -> Optional[Any]:
         """Get cached response if available and not expired"""
         if not self.enable_caching:
             return None
         
-        if cache_key in self.cache:
-            entry = self.cache[cache_key]
-            if not entry.is_expired:
-                self.cache_stats['hits'] += 1
-                logger.debug(f"Cache hit for key: {cache_key}")
-                return entry.data
-            else:
-                self.cache_stats['expired'] += 1
-                del self.cache[cache_key]
-                logger.debug(f"Cache expired for key: {cache_key}")
-        
-        self.cache_stats['misses'] += 1
-        return None
+        data = self.cache.get(cache_key)
+        if data is not None:
+            logger.debug(f"Cache hit for key: {cache_key}")
+        return data
     
-    def _set_cached_response(self, cache_key: str, data: Any, ttl: int = 300):
-        """Set cached response"""
+    def _set_cached_response(self, cache_key: str, data: Any, ttl: int = None, endpoint: str = None):
+        """Set cached response (TTL defaults to the endpoint's TTL class)"""
         if not self.enable_caching:
             return
         
-        self.cache[cache_key] = CacheEntry(
-            data=data,
-            timestamp=datetime.utcnow(),
-            ttl=ttl
-        )
+        self.cache.set(cache_key, data, ttl=ttl, endpoint=endpoint)
         logger.debug(f"Cached response for key: {cache_key}")
     
     def _update_performance_stats(self, response_time: float, success: bool):
@@ -244,11 +219,7 @@ class MicrosoftGraphClient:
             )
             
             # Cache hit rate
-            total_cache_requests = self.cache_stats['hits'] + self.cache_stats['misses']
-            if total_cache_requests > 0:
-                self.performance_stats['cache_hit_rate'] = (
-                    self.cache_stats['hits'] / total_cache_requests
-                )
+            self.performance_stats['cache_hit_rate'] = self.cache.hit_rate
     
     async def _execute_with_retry(self, request_func, *args, **kwargs) -> Any:
         """Execute request with retry logic"""
@@ -261,6 +232,10 @@ class MicrosoftGraphClient:
                 self._update_performance_stats(response_time, True)
                 return result
                 
+            except BatchEnvelopeThrottled:
+                # GraphBatchExecutor re-queues throttled envelopes after Retry-After
+                self._update_performance_stats(time.time() - start_time, False)
+                raise
             except Exception as e:
                 response_time = time.time() - start_time
                 self._update_performance_stats(response_time, False)
@@ -389,7 +364,7 @@ class MicrosoftGraphClient:
             
             # Cache response
             if use_cache:
-                self._set_cached_response(cache_key, result)
+                self._set_cached_response(cache_key, result, endpoint="/users")
             
             logger.info(f"Retrieved {result['count']} users")
             return result
@@ -478,7 +453,7 @@ class MicrosoftGraphClient:
             
             # Cache response
             if use_cache and result:
-                self._set_cached_response(cache_key, result)
+                self._set_cached_response(cache_key, result, endpoint=f"/users/{user_id}")
             
             if result:
                 logger.info(f"Retrieved user: {result['userPrincipalName']}")
@@ -597,7 +572,7 @@ class MicrosoftGraphClient:
             
             # Cache response
             if use_cache:
-                self._set_cached_response(cache_key, result)
+                self._set_cached_response(cache_key, result, endpoint="/groups")
             
             logger.info(f"Retrieved {result['count']} groups")
             return result
@@ -609,51 +584,95 @@ class MicrosoftGraphClient:
             logger.error(f"Error getting groups: {str(e)}")
             raise
     
-    async def get_all_pages(self, 
-                           initial_response: Dict[str, Any],
-                           request_func,
-                           max_pages: int = None) -> List[Dict[str, Any]]:
+    async def iter_pages(self,
+                         initial_response: Dict[str, Any],
+                         request_func,
+                         max_pages: int = None,
+                         prefetch: bool = True) -> AsyncIterator[List[Dict[str, Any]]]:
         """
-        Get all pages from a paginated response
+        Iterate over pages of a paginated response as they arrive
+        
+        With prefetch enabled, the request for the next @odata.nextLink runs
+        as a background task while the caller processes the current page,
+        so at most two pages are held in memory.
         
         Args:
             initial_response: Initial response with @odata.nextLink
-            request_func: Function to call for next page
+            request_func: Coroutine function to call for next page
             max_pages: Maximum number of pages to retrieve
+            prefetch: Fetch the next page while the current one is consumed
         
-        Returns:
-            List of all items from all pages
+        Yields:
+            List of items per page
         """
-        all_items = []
         current_response = initial_response
         page_count = 0
+        item_count = 0
         
         while True:
-            # Add items from current page
-            if 'value' in current_response and current_response['value']:
-                all_items.extend(current_response['value'])
+            items = current_response.get('value') or []
             
             # Check if there's a next page
             next_link = current_response.get('nextLink') or current_response.get('@odata.nextLink')
-            if not next_link:
-                break
-            
-            # Check max pages limit
             page_count += 1
-            if max_pages and page_count >= max_pages:
+            if next_link and max_pages and page_count >= max_pages:
                 logger.info(f"Reached maximum pages limit: {max_pages}")
+                next_link = None
+            
+            next_task = None
+            if next_link and prefetch:
+                next_task = asyncio.ensure_future(request_func(next_link))
+            
+            try:
+                item_count += len(items)
+                yield items
+            except BaseException:
+                if next_task:
+                    next_task.cancel()
+                raise
+            
+            if not next_link:
                 break
             
             try:
                 # Get next page
-                current_response = await request_func(next_link)
-                logger.debug(f"Retrieved page {page_count + 1}, total items: {len(all_items)}")
+                current_response = await (next_task if next_task else request_func(next_link))
+                logger.debug(f"Retrieved page {page_count + 1}, total items: {item_count}")
                 
             except Exception as e:
                 logger.error(f"Error retrieving page {page_count + 1}: {str(e)}")
                 break
         
-        logger.info(f"Retrieved {len(all_items)} total items across {page_count + 1} pages")
+        logger.info(f"Retrieved {item_count} total items across {page_count} pages")
+    
+    async def iter_items(self,
+                         initial_response: Dict[str, Any],
+                         request_func,
+                         max_pages: int = None,
+                         prefetch: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over items of a paginated response without materializing all pages"""
+        async for page in self.iter_pages(initial_response, request_func, max_pages, prefetch):
+            for item in page:
+                yield item
+    
+    async def get_all_pages(self, 
+                           initial_response: Dict[str, Any],
+                           request_func,
+                           max_pages: int = None) -> List[Dict[str, Any]]:
+        """
+        Get all pages from a paginated response
+        
+        Args:
+            initial_response: Initial response with @odata.nextLink
+            request_func: Function to call for next page
+            max_pages: Maximum number of pages to retrieve
+        
+        Returns:
+            List of all items from all pages
+        """
+        all_items = []
+        async for page in self.iter_pages(initial_response, request_func, max_pages, prefetch=False):
+            all_items.extend(page)
         return all_items
     
     def add_batch_request(self, request: BatchRequest):
@@ -664,116 +683,99 @@ class MicrosoftGraphClient:
         self.pending_requests.append(request)
         logger.debug(f"Added request to batch: {request.id}")
     
+    async def _post_batch(self, session, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST one envelope to the Graph /$batch endpoint"""
+        import aiohttp
+
+        token = await asyncio.to_thread(self.credential.get_token, *self.scopes)
+        headers = {
+            "Authorization": f"Bearer {token.token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+
+        async with session.post(self.BATCH_ENDPOINT, json=payload, headers=headers) as response:
+            if response.status in (429, 503):
+                # Throttled envelope: the executor waits for Retry-After, not exponential backoff
+                try:
+                    retry_after = float(response.headers.get('Retry-After'))
+                except (TypeError, ValueError):
+                    retry_after = None
+                raise BatchEnvelopeThrottled(
+                    f"Batch envelope throttled (HTTP {response.status})",
+                    status=response.status,
+                    retry_after=retry_after
+                )
+            if response.status >= 400:
+                # Other envelope-level failures go through _execute_with_retry
+                text = await response.text()
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=text[:500],
+                    headers=response.headers
+                )
+            return await response.json()
+
     async def execute_batch(self) -> Dict[str, BatchResponse]:
-        """Execute batch requests"""
+        """Execute pending requests through the Graph /$batch endpoint"""
         if not self.enable_batching:
             raise ValueError("Batching is disabled")
         
         if not self.pending_requests:
             return {}
         
-        # Split requests into batches
-        batches = []
-        for i in range(0, len(self.pending_requests), self.batch_size):
-            batch = self.pending_requests[i:i + self.batch_size]
-            batches.append(batch)
-        
-        responses = {}
-        
-        for batch_index, batch in enumerate(batches):
-            try:
-                logger.info(f"Executing batch {batch_index + 1}/{len(batches)} with {len(batch)} requests")
-                
-                # Build batch request
-                batch_body = {
-                    "requests": [
-                        {
-                            "id": req.id,
-                            "method": req.method,
-                            "url": req.url,
-                            "headers": req.headers,
-                            "body": req.body
-                        }
-                        for req in batch
-                    ]
-                }
-                
-                # Execute batch
-                async def batch_request_func():
-                    # Note: This is a simplified implementation
-                    # In practice, you'd use the Graph client's batch functionality
-                    # For now, we'll simulate batch execution
-                    batch_responses = []
-                    
-                    for req in batch:
-                        try:
-                            # Simulate individual request execution
-                            # In real implementation, this would be done as a batch
-                            response = BatchResponse(
-                                id=req.id,
-                                status=200,
-                                body={"simulated": True, "request_id": req.id}
-                            )
-                            batch_responses.append(response)
-                        except Exception as e:
-                            error_response = BatchResponse(
-                                id=req.id,
-                                status=500,
-                                error=str(e)
-                            )
-                            batch_responses.append(error_response)
-                    
-                    return batch_responses
-                
-                batch_responses = await self._execute_with_retry(batch_request_func)
-                
-                # Process responses
-                for response in batch_responses:
-                    responses[response.id] = response
-                
-                logger.info(f"Batch {batch_index + 1} completed successfully")
-                
-            except Exception as e:
-                logger.error(f"Error executing batch {batch_index + 1}: {str(e)}")
-                
-                # Create error responses for failed batch
-                for req in batch:
-                    responses[req.id] = BatchResponse(
-                        id=req.id,
-                        status=500,
-                        error=str(e)
-                    )
-        
-        # Clear pending requests
+        import aiohttp
+
+        requests = list(self.pending_requests)
         self.pending_requests.clear()
         
+        logger.info(f"Executing {len(requests)} requests via $batch (batch size {self.batch_size})")
+
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            executor = GraphBatchExecutor(
+                send=lambda payload: self._execute_with_retry(self._post_batch, session, payload),
+                batch_size=self.batch_size,
+                max_retries=self.max_retries,
+                default_retry_after=self.retry_delay
+            )
+            responses = await executor.execute(requests)
+
+        # Demultiplex responses back to request IDs
+        self.batch_responses.update(responses)
+        for name in ('envelopes_sent', 'sub_requests_sent', 'throttled', 'requeued'):
+            self.batch_stats[name] += executor.stats[name]
+        
         # Update batch efficiency
         total_requests = len(responses)
         successful_requests = sum(1 for r in responses.values() if r.status < 400)
         if total_requests > 0:
             self.performance_stats['batch_efficiency'] = successful_requests / total_requests
         
-        logger.info(f"Batch execution completed: {successful_requests}/{total_requests} successful")
+        logger.info(f"Batch execution completed: {successful_requests}/{total_requests} successful "
+                    f"in {executor.stats['envelopes_sent']} envelopes")
         return responses
     
+    def get_batch_response(self, request_id: str) -> Optional[BatchResponse]:
+        """Get (and release) the response for a previously executed batch request"""
+        return self.batch_responses.pop(request_id, None)
+    
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
         return {
             'performance': self.performance_stats.copy(),
-            'cache': self.cache_stats.copy(),
+            'cache': self.cache.get_stats(),
             'cache_size': len(self.cache),
-            'pending_batch_requests': len(self.pending_requests)
+            'cache_bytes': self.cache.bytes,
+            'pending_batch_requests': len(self.pending_requests),
+            'batch': self.batch_stats.copy()
         }
     
     def clear_cache(self):
         """Clear all cached responses"""
         self.cache.clear()
-        self.cache_stats = {
-            'hits': 0,
-            'misses': 0,
-            'expired': 0,
-            'total_requests': 0
-        }
         logger.info("Cache cleared")
     
     def close(self):
@@ -785,7 +787,8 @@ class MicrosoftGraphClient:
             if self.key_vault_auth:
                 self.key_vault_auth.close()
             
-            # Clear cache and pending requests
+            # Stop cache sweeper, clear cache and pending requests
+            self.cache.stop_sweeper()
             self.clear_cache()
             self.pending_requests.clear()
             
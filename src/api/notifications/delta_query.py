@@ -4,22 +4,27 @@ Microsoft 365 データの変更をリアルタイムで検知・通知
 """
 
 import asyncio
-import json
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, Callable
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Callable, Tuple
+from pathlib import Path
 from dataclasses import dataclass, asdict
 from urllib.parse import urljoin
 import aiohttp
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..graph.client import GraphClient
-from ...core.config import settings
+from ..core.user_sync import DeltaResyncRequired, PageFetcher, graph_page_fetcher
+from .delta_token_store import DeltaTokenStore
+from ...core.config import Config
 from ...core.logging_config import get_logger
-from ...core.database import get_async_session
 
 logger = get_logger(__name__)
 
+# Delta Token 保存先 (リソース毎の JSON ファイル)
+DELTA_TOKEN_DIR = Path("delta_tokens")
+LEGACY_DELTA_TOKEN_FILE = Path("delta_tokens.json")
+
 @dataclass
 class DeltaQueryConfig:
     """Delta Query設定"""
@@ -51,9 +56,17 @@ class ChangeNotification:
 class DeltaQueryManager:
     """Delta Query管理"""
     
-    def __init__(self):
+    def __init__(self, token_store: Optional[DeltaTokenStore] = None,
+                 fetch_page: Optional[PageFetcher] = None):
+        """
+        Args:
+            token_store: 再開用リンクの保存先
+            fetch_page: Graph ページ取得コルーチン (省略時は initialize で GraphClient から生成)
+        """
         self.graph_client: Optional[GraphClient] = None
-        self.delta_tokens: Dict[str, str] = {}  # リソースタイプ: Delta Token
+        self.fetch_page = fetch_page
+        self.token_store = token_store or DeltaTokenStore(DELTA_TOKEN_DIR, LEGACY_DELTA_TOKEN_FILE)
+        self.delta_tokens: Dict[str, str] = {}  # リソースタイプ: 再開用リンク (Delta / Next Link)
         self.subscriptions: Dict[str, str] = {}  # リソースタイプ: Subscription ID
         self.webhooks: Dict[str, Callable] = {}  # Webhook コールバック
         self.polling_tasks: Dict[str, asyncio.Task] = {}
@@ -96,8 +109,13 @@ class DeltaQueryManager:
     async def initialize(self):
         """初期化"""
         try:
-            self.graph_client = GraphClient()
-            await self.graph_client.initialize()
+            if self.fetch_page is None:
+                config = Config()
+                config.load()
+                self.graph_client = GraphClient(config)
+                # 証明書・資格情報の読み込みはブロッキングのためワーカースレッドで実行
+                await asyncio.to_thread(self.graph_client.initialize)
+                self.fetch_page = graph_page_fetcher(self.graph_client)
             
             # 既存のDelta Tokenを復元
             await self._restore_delta_tokens()
@@ -174,14 +192,10 @@ class DeltaQueryManager:
         
         while self.is_running:
             try:
-                changes = await self._get_delta_changes(resource_type, config)
+                total = await self._sync_resource(resource_type, config, pausable=True)
                 
-                if changes:
-                    logger.info(f"Found {len(changes)} changes for {resource_type}")
-                    
-                    # 変更通知処理
-                    for change in changes:
-                        await self._process_change_notification(change)
+                if total:
+                    logger.info(f"Found {total} changes for {resource_type}")
                 
                 # 次のポーリングまで待機
                 await asyncio.sleep(config.poll_interval_seconds)
@@ -189,70 +203,136 @@ class DeltaQueryManager:
             except asyncio.CancelledError:
                 logger.info(f"Delta polling cancelled for {resource_type}")
                 break
+            except DeltaResyncRequired as e:
+                # 保存済みリンクの期限切れ: 破棄して次のラウンドをフル取得にする
+                logger.warning(f"Delta link for {resource_type} expired, resyncing: {e}")
+                self.delta_tokens.pop(resource_type, None)
+                await asyncio.to_thread(self.token_store.delete, resource_type)
             except Exception as e:
                 logger.error(f"Error in delta polling for {resource_type}: {e}")
                 
                 # エラー時は短い間隔で再試行
                 await asyncio.sleep(config.retry_delay_seconds)
 
-    async def _get_delta_changes(self, resource_type: str, config: DeltaQueryConfig) -> List[ChangeNotification]:
-        """Delta変更取得"""
-        if not self.graph_client:
-            raise Exception("Graph client not initialized")
+    def _start_url(self, resource_type: str, config: DeltaQueryConfig) -> str:
+        """取得開始 URL (保存済みリンクがあれば差分 / ラウンド途中から再開)"""
+        return self.delta_tokens.get(resource_type) or config.endpoint
+
+    @staticmethod
+    def _parse_delta_page(resource_type: str, response: Dict[str, Any]) -> List[ChangeNotification]:
+        """Delta レスポンス 1 ページ分の変更通知を生成"""
+        changes = []
+        timestamp = datetime.utcnow()
         
-        try:
-            # Delta Token取得
-            delta_token = self.delta_tokens.get(resource_type)
-            
-            # Delta Query実行
-            if delta_token:
-                # 差分取得
-                url = f"{config.endpoint}?$deltatoken={delta_token}"
+        for item in response.get("value") or []:
+            # 削除項目チェック
+            if "@removed" in item:
+                change_type = "deleted"
+                resource_data = {"id": item.get("id"), "deleted": True}
             else:
-                # 初回フル取得
-                url = config.endpoint
-                
-            response = await self.graph_client._make_request("GET", url)
-            
-            if not response.get("value"):
-                return []
-            
-            changes = []
-            
-            # レスポンス解析
-            for item in response["value"]:
-                # 削除項目チェック
-                if "@removed" in item:
-                    change_type = "deleted"
-                    resource_data = {"id": item.get("id"), "deleted": True}
-                else:
-                    # 新規作成 vs 更新判定
-                    change_type = "updated"  # 厳密には作成時刻で判定が必要
-                    resource_data = item
-                
-                change = ChangeNotification(
-                    resource_type=resource_type,
-                    change_type=change_type,
-                    resource_id=item.get("id", ""),
-                    resource_data=resource_data,
-                    timestamp=datetime.utcnow()
-                )
-                changes.append(change)
+                # 新規作成 vs 更新判定
+                change_type = "updated"  # 厳密には作成時刻で判定が必要
+                resource_data = item
+            
+            changes.append(ChangeNotification(
+                resource_type=resource_type,
+                change_type=change_type,
+                resource_id=item.get("id", ""),
+                resource_data=resource_data,
+                timestamp=timestamp
+            ))
+        
+        return changes
+
+    async def _iter_delta_pages(self, resource_type: str,
+                                config: DeltaQueryConfig) -> AsyncIterator[Tuple[List[ChangeNotification], str, str]]:
+        """
+        Delta ページ列挙
+        
+        @odata.nextLink を最後まで辿り、ページ毎に (変更通知, 再開用リンク, リンク種別) を返す。
+        次ページの取得は現在ページの処理中に先行して実行する。
+        """
+        if not self.fetch_page:
+            raise Exception("Graph client not initialized")
+        
+        url = self._start_url(resource_type, config)
+        response = await self.fetch_page(url, None)
+        
+        while True:
+            next_link = response.get("@odata.nextLink")
+            next_task = asyncio.ensure_future(self.fetch_page(next_link, None)) if next_link else None
             
-            # Delta Token更新
-            delta_link = response.get("@odata.deltaLink")
-            if delta_link:
-                # Delta Token抽出
-                if "$deltatoken=" in delta_link:
-                    new_token = delta_link.split("$deltatoken=")[1].split("&")[0]
-                    self.delta_tokens[resource_type] = new_token
-                    logger.debug(f"Updated delta token for {resource_type}")
+            changes = self._parse_delta_page(resource_type, response)
+            link, kind = (next_link, "next") if next_link else (response.get("@odata.deltaLink"), "delta")
             
-            return changes
+            try:
+                yield changes, link, kind
+            except BaseException:
+                if next_task:
+                    next_task.cancel()
+                raise
             
+            if not next_task:
+                break
+            response = await next_task
+
+    async def _sync_resource(self, resource_type: str, config: DeltaQueryConfig,
+                             handler: Optional[Callable] = None, pausable: bool = False) -> int:
+        """
+        1 ラウンド分の差分取得・処理
+        
+        ページ単位でバッチ処理し、処理完了後に再開用リンクを保存する。
+        途中で停止・再起動してもフル再取得にはならない。
+        ハンドラーの例外はそのまま送出し、失敗したページのリンクは保存しない
+        (次のラウンドは同じページから再処理する)。
+        
+        Args:
+            pausable: 監視停止時はページ境界で中断する (ポーリング用)
+        
+        Returns:
+            処理した変更件数
+        """
+        handler = handler or self._process_change_batch
+        total = 0
+        
+        async for changes, link, kind in self._iter_delta_pages(resource_type, config):
+            if changes:
+                await handler(changes)
+                total += len(changes)
+            
+            if link:
+                await self._store_link(resource_type, link, kind)
+            elif kind == "delta":
+                logger.warning(f"Delta round for {resource_type} ended without @odata.deltaLink")
+            
+            if pausable and not self.is_running and kind == "next":
+                logger.info(f"Delta sync for {resource_type} paused; will resume from the stored link")
+                break
+        
+        return total
+
+    async def _get_delta_changes(self, resource_type: str, config: DeltaQueryConfig) -> List[ChangeNotification]:
+        """Delta変更取得 (全ページ、リンク保存込み)"""
+        collected: List[ChangeNotification] = []
+        
+        async def collect(changes: List[ChangeNotification]):
+            collected.extend(changes)
+        
+        try:
+            await self._sync_resource(resource_type, config, handler=collect)
         except Exception as e:
             logger.error(f"Failed to get delta changes for {resource_type}: {e}")
-            return []
+        
+        return collected
+
+    async def _store_link(self, resource_type: str, link: str, kind: str):
+        """再開用リンクをアトミックに保存"""
+        self.delta_tokens[resource_type] = link
+        try:
+            await asyncio.to_thread(self.token_store.set, resource_type, link, kind)
+            logger.debug(f"Stored {kind} link for {resource_type}")
+        except Exception as e:
+            logger.error(f"Failed to store delta link for {resource_type}: {e}")
 
     async def _create_subscription(self, resource_type: str, config: DeltaQueryConfig):
         """Webhook Subscription作成"""
@@ -291,41 +371,46 @@ class DeltaQueryManager:
             logger.error(f"Failed to delete subscription {subscription_id}: {e}")
 
     async def _process_change_notification(self, change: ChangeNotification):
-        """変更通知処理"""
+        """変更通知処理 (1 件)"""
+        await self._process_change_batch([change])
+
+    async def _process_change_batch(self, changes: List[ChangeNotification]):
+        """
+        変更通知のバッチ処理
+        
+        キャッシュ無効化はリソースタイプ毎に 1 回にまとめる。
+        失敗時は例外を再送出し、呼び出し元 (_sync_resource) がこのページの
+        再開用リンクを保存しないようにする。
+        """
         try:
             # データベースに記録
-            await self._save_change_to_database(change)
+            await self._save_changes_to_database(changes)
             
             # Webhook通知
-            await self._send_webhook_notification(change)
+            for change in changes:
+                await self._send_webhook_notification(change)
             
             # キャッシュ無効化
-            await self._invalidate_cache(change)
+            for resource_type in {change.resource_type for change in changes}:
+                await self._invalidate_cache(resource_type)
             
-            logger.debug(f"Processed change notification: {change.resource_type}/{change.resource_id}")
+            logger.debug(f"Processed {len(changes)} change notifications")
             
         except Exception as e:
-            logger.error(f"Failed to process change notification: {e}")
+            logger.error(f"Failed to process change notifications: {e}")
+            raise
 
     async def _save_change_to_database(self, change: ChangeNotification):
-        """変更をデータベースに保存"""
-        try:
-            async with get_async_session() as session:
-                # ChangeLog テーブルに保存（テーブル定義は省略）
-                change_log = {
-                    "resource_type": change.resource_type,
-                    "change_type": change.change_type,
-                    "resource_id": change.resource_id,
-                    "resource_data": json.dumps(change.resource_data),
-                    "timestamp": change.timestamp,
-                    "processed": True
-                }
-                
-                # 実際のINSERT処理は省略
-                logger.debug(f"Saved change to database: {change.resource_id}")
-                
-        except Exception as e:
-            logger.error(f"Failed to save change to database: {e}")
+        """変更をデータベースに保存 (1 件)"""
+        await self._save_changes_to_database([change])
+
+    async def _save_changes_to_database(self, changes: List[ChangeNotification]):
+        """
+        変更をデータベースに一括保存
+        
+        変更履歴テーブルが未定義のため、現状は件数のログ出力のみ。
+        """
+        logger.debug(f"Change log table not defined; skipped saving {len(changes)} changes")
 
     async def _send_webhook_notification(self, change: ChangeNotification):
         """Webhook通知送信"""
@@ -337,21 +422,21 @@ class DeltaQueryManager:
             except Exception as e:
                 logger.error(f"Webhook handler error for {change.resource_type}: {e}")
 
-    async def _invalidate_cache(self, change: ChangeNotification):
+    async def _invalidate_cache(self, resource_type: str):
         """関連キャッシュ無効化"""
         try:
             # パフォーマンス最適化モジュールのキャッシュマネージャーを使用
             from ..optimization.performance_optimizer import cache_manager
             
             # リソースタイプ別キャッシュ無効化
-            await cache_manager.invalidate_pattern(change.resource_type, "*")
+            await cache_manager.invalidate_pattern(resource_type, "*")
             
             # 関連キャッシュも無効化
-            if change.resource_type == "users":
+            if resource_type == "users":
                 await cache_manager.invalidate_pattern("user_data", "*")
                 await cache_manager.invalidate_pattern("license_data", "*")
             
-            logger.debug(f"Invalidated cache for {change.resource_type}")
+            logger.debug(f"Invalidated cache for {resource_type}")
             
         except Exception as e:
             logger.error(f"Failed to invalidate cache: {e}")
@@ -359,31 +444,17 @@ class DeltaQueryManager:
     async def _restore_delta_tokens(self):
         """Delta Token復元"""
         try:
-            # 実際はデータベースから復元
-            # 今回は簡易実装でファイルから復元
-            import os
-            token_file = "delta_tokens.json"
-            
-            if os.path.exists(token_file):
-                with open(token_file, 'r') as f:
-                    self.delta_tokens = json.load(f)
-                logger.info(f"Restored {len(self.delta_tokens)} delta tokens")
+            endpoints = {name: config.endpoint for name, config in self.resource_configs.items()}
+            entries = await asyncio.to_thread(self.token_store.load_all, endpoints)
+            self.delta_tokens = {name: entry["link"] for name, entry in entries.items()}
+            logger.info(f"Restored {len(self.delta_tokens)} delta tokens")
             
         except Exception as e:
             logger.error(f"Failed to restore delta tokens: {e}")
 
     async def _save_delta_tokens(self):
-        """Delta Token保存"""
-        try:
-            import os
-            token_file = "delta_tokens.json"
-            
-            with open(token_file, 'w') as f:
-                json.dump(self.delta_tokens, f, indent=2)
-            logger.info(f"Saved {len(self.delta_tokens)} delta tokens")
-            
-        except Exception as e:
-            logger.error(f"Failed to save delta tokens: {e}")
+        """Delta Token保存 (リンクはページ処理毎に保存済み)"""
+        logger.info(f"Delta tokens persisted for {len(self.delta_tokens)} resources")
 
     def register_webhook(self, resource_type: str, handler: Callable[[ChangeNotification], None]):
         """Webhook ハンドラー登録"""
@@ -417,19 +488,15 @@ class DeltaQueryManager:
             raise ValueError(f"Unknown resource type: {resource_type}")
         
         # Delta Token削除（フルスキャン強制）
-        if resource_type in self.delta_tokens:
-            del self.delta_tokens[resource_type]
+        self.delta_tokens.pop(resource_type, None)
+        await asyncio.to_thread(self.token_store.delete, resource_type)
         
-        # 即座に変更取得実行
+        # 即座に変更取得・処理実行 (ページ単位のバッチ処理)
         config = self.resource_configs[resource_type]
-        changes = await self._get_delta_changes(resource_type, config)
-        
-        # 変更処理
-        for change in changes:
-            await self._process_change_notification(change)
+        total = await self._sync_resource(resource_type, config)
         
-        logger.info(f"Force refresh completed for {resource_type}: {len(changes)} changes")
-        return len(changes)
+        logger.info(f"Force refresh completed for {resource_type}: {total} changes")
+        return total
 
 # グローバルインスタンス
 delta_query_manager = DeltaQueryManager()
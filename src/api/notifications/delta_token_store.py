@@ -0,0 +1,116 @@
+"""
+Delta Token 永続化ストア
+リソース毎に Delta / Next Link をアトミックに保存し、再起動後に差分取得を再開する
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# リンク種別: delta = ラウンド完了 (@odata.deltaLink)、next = ラウンド途中 (@odata.nextLink)
+LINK_KINDS = ("delta", "next")
+
+
+class DeltaTokenStore:
+    """
+    リソース単位の Delta Link ストア
+
+    1 リソース = 1 JSON ファイル。一時ファイルへ書き込み fsync 後に
+    os.replace で置き換えるため、書き込み途中でプロセスが停止しても
+    直前の状態が残る。
+    """
+
+    def __init__(self, directory: Path, legacy_file: Optional[Path] = None):
+        """
+        Args:
+            directory: 保存先ディレクトリ
+            legacy_file: 旧形式 (全リソースの Token を 1 ファイルに保存) の移行元
+        """
+        self.directory = Path(directory)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self._lock = threading.Lock()
+
+    def _path(self, resource_type: str) -> Path:
+        return self.directory / f"{resource_type}.json"
+
+    def get(self, resource_type: str) -> Optional[Dict[str, str]]:
+        """保存済みリンク取得 ({"link", "kind", "updated_at"})"""
+        path = self._path(resource_type)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("link") and entry.get("kind") in LINK_KINDS:
+                return entry
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable delta token file {path}: {e}")
+        return None
+
+    def set(self, resource_type: str, link: str, kind: str = "delta"):
+        """リンク保存 (アトミック置き換え)"""
+        if kind not in LINK_KINDS:
+            raise ValueError(f"Unknown link kind: {kind}")
+
+        entry = {"link": link, "kind": kind, "updated_at": datetime.utcnow().isoformat()}
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=f".{resource_type}.", suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self._path(resource_type))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+
+    def delete(self, resource_type: str):
+        """リンク削除 (次回はフル取得)"""
+        with self._lock:
+            path = self._path(resource_type)
+            if path.exists():
+                path.unlink()
+
+    def load_all(self, endpoints: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+        """
+        全リソースのリンク取得
+
+        Args:
+            endpoints: リソースタイプ -> Delta エンドポイント (旧形式 Token の変換用)
+        """
+        self._migrate_legacy(endpoints)
+        entries = {}
+        for resource_type in endpoints:
+            entry = self.get(resource_type)
+            if entry:
+                entries[resource_type] = entry
+        return entries
+
+    def _migrate_legacy(self, endpoints: Dict[str, str]):
+        """旧形式ファイルの Token を Delta Link として取り込む"""
+        if not self.legacy_file or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                tokens = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable legacy delta token file {self.legacy_file}: {e}")
+            return
+
+        for resource_type, token in tokens.items():
+            endpoint = endpoints.get(resource_type)
+            if endpoint and token and not self._path(resource_type).exists():
+                self.set(resource_type, f"{endpoint}?$deltatoken={token}", "delta")
+                logger.info(f"Migrated legacy delta token for {resource_type}")
+
+        self.legacy_file.rename(self.legacy_file.with_suffix(".migrated"))
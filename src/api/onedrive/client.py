@@ -161,8 +161,7 @@ class OneDriveClient:
         try:
             # Get OneDrive usage reports
             try:
-                usage_data = self.graph_client.get(f'/reports/getOneDriveUsageAccountDetail(period=\'D7\')')
-                users_data = usage_data.get('value', [])
+                users_data = self.graph_client.get_report_rows('getOneDriveUsageAccountDetail', 'D7')
             except:
                 users_data = []
             
@@ -173,26 +172,29 @@ class OneDriveClient:
                     limit=limit
                 )
                 
+                # Get users' drive information concurrently
+                drives = {}
+                paths = [f'/users/{user["id"]}/drive' for user in users]
+                for result in self.graph_client.fan_out(paths):
+                    # Skip users without drives
+                    if result.success and result.data:
+                        drives[result.index] = result.data
+                
                 users_data = []
-                for user in users:
-                    try:
-                        # Get user's drive information
-                        drive_data = self.graph_client.get(f'/users/{user["id"]}/drive')
-                        if drive_data:
-                            user_storage = {
-                                'userDisplayName': user.get('displayName', ''),
-                                'userPrincipalName': user.get('userPrincipalName', ''),
-                                'siteUrl': drive_data.get('webUrl', ''),
-                                'storageUsedInBytes': drive_data.get('quota', {}).get('used', 0),
-                                'storageAllocatedInBytes': drive_data.get('quota', {}).get('total', 0),
-                                'fileCount': drive_data.get('quota', {}).get('fileCount', 0),
-                                'lastActivityDate': drive_data.get('lastModifiedDateTime', ''),
-                                'isDeleted': drive_data.get('deleted') is not None
-                            }
-                            users_data.append(user_storage)
-                    except:
-                        # Skip users without drives
-                        continue
+                for index, user in enumerate(users):
+                    drive_data = drives.get(index)
+                    if drive_data:
+                        user_storage = {
+                            'userDisplayName': user.get('displayName', ''),
+                            'userPrincipalName': user.get('userPrincipalName', ''),
+                            'siteUrl': drive_data.get('webUrl', ''),
+                            'storageUsedInBytes': drive_data.get('quota', {}).get('used', 0),
+                            'storageAllocatedInBytes': drive_data.get('quota', {}).get('total', 0),
+                            'fileCount': drive_data.get('quota', {}).get('fileCount', 0),
+                            'lastActivityDate': drive_data.get('lastModifiedDateTime', ''),
+                            'isDeleted': drive_data.get('deleted') is not None
+                        }
+                        users_data.append(user_storage)
             
             # Process storage data
             storage_data = []
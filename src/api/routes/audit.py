@@ -3,26 +3,38 @@ Audit API Router - Microsoft 365 Audit Trail Management
 Provides read-only access to audit logs with PowerShell compatibility.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, Response, status
 from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import logging
 import json
-import io
-import csv
 
 from pydantic import BaseModel, Field, validator
 from sqlalchemy import select, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import DatabaseManager, AuditLog, get_db_manager
+from ..core.audit_export import stream_audit_export, gzip_chunks, export_filename
+from ..core.pagination import fetch_keyset_page
+from ..core.stats import AggregateQuery, grouped_counts, stats_cache
 from ..core.auth import get_auth_manager, AuthManager
 from ..core.exceptions import M365Exception, ValidationError, NotFoundError
 from ..dependencies.advanced_dependencies import get_authenticated_user, require_permissions, get_request_context
 
 logger = logging.getLogger(__name__)
 
+# Sortable columns of the audit listing (nullable columns are coalesced for keyset paging)
+AUDIT_SORT_COLUMNS = {
+    "created_at": AuditLog.created_at,
+    "id": AuditLog.id,
+    "operation": AuditLog.operation,
+    "resource_type": AuditLog.resource_type,
+    "status": AuditLog.status,
+    "user_principal_name": func.coalesce(AuditLog.user_principal_name, ""),
+    "ip_address": func.coalesce(AuditLog.ip_address, "")
+}
+
 # Pydantic models
 class AuditLogResponse(BaseModel):
     """Audit log response model."""
@@ -63,12 +75,16 @@ class AuditExportRequest(BaseModel):
     resource_type: Optional[str] = Field(None, description="Filter by resource type")
     user_principal_name: Optional[str] = Field(None, description="Filter by user")
     status: Optional[str] = Field(None, description="Filter by status")
-    format: str = Field("csv", description="Export format (csv, json)")
+    format: str = Field("csv", description="Export format (csv, json, ndjson)")
+    compress: bool = Field(False, description="Gzip-compress the export")
+    details_columns: Optional[List[str]] = Field(
+        None, description="Declared details_* CSV columns (discovered from the data when omitted)"
+    )
     
     @validator('format')
     def validate_format(cls, v):
-        if v.lower() not in ["csv", "json"]:
-            raise ValueError("Format must be csv or json")
+        if v.lower() not in ["csv", "json", "ndjson"]:
+            raise ValueError("Format must be csv, json or ndjson")
         return v.lower()
 
 class AuditSearchRequest(BaseModel):
@@ -92,8 +108,10 @@ router = APIRouter(
 
 @router.get("/", response_model=List[AuditLogResponse], summary="Get audit logs")
 async def get_audit_logs(
-    page: int = Query(1, ge=1, description="Page number"),
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     size: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     operation: Optional[str] = Query(None, description="Filter by operation"),
     resource_type: Optional[str] = Query(None, description="Filter by resource type"),
     user_principal_name: Optional[str] = Query(None, description="Filter by user"),
@@ -110,6 +128,8 @@ async def get_audit_logs(
     Retrieve audit logs with advanced filtering and pagination.
     
     **PowerShell Equivalent**: `Get-M365AuditLogs`
+    
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
     try:
         async with db_manager.get_session() as session:
@@ -137,19 +157,18 @@ async def get_audit_logs(
             if ip_address:
                 stmt = stmt.where(AuditLog.ip_address == ip_address)
             
-            # Apply sorting
-            sort_column = getattr(AuditLog, sort_by, AuditLog.created_at)
-            if sort_order.lower() == "desc":
-                stmt = stmt.order_by(desc(sort_column))
-            else:
-                stmt = stmt.order_by(sort_column)
-            
-            # Apply pagination
-            offset = (page - 1) * size
-            stmt = stmt.offset(offset).limit(size)
+            # Keyset pagination on (sort column, id)
+            sort_column = AUDIT_SORT_COLUMNS.get(sort_by, AuditLog.created_at)
+            descending = sort_order.lower() == "desc"
+            keys = [(sort_column, descending), (AuditLog.id, descending)]
+            if sort_column is AuditLog.id:
+                keys = keys[1:]
             
-            result = await session.execute(stmt)
-            audit_logs = result.scalars().all()
+            offset = 0 if cursor else (page - 1) * size
+            result_page = await fetch_keyset_page(session, stmt, keys, size, cursor=cursor, offset=offset)
+            audit_logs = result_page.items
+            if result_page.next_cursor:
+                response.headers["X-Next-Cursor"] = result_page.next_cursor
             
             # Convert details JSON string to dict
             audit_responses = []
@@ -164,6 +183,9 @@ async def get_audit_logs(
             
             return audit_responses
             
+    except ValidationError as e:
+        # The status query parameter shadows fastapi.status here
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to retrieve audit logs: {str(e)}")
         raise HTTPException(
@@ -184,135 +206,95 @@ async def get_audit_stats(
     **PowerShell Equivalent**: `Get-M365AuditStats`
     """
     try:
-        async with db_manager.get_session() as session:
-            # Base query with optional date filtering
-            base_filter = []
-            if start_date:
-                base_filter.append(AuditLog.created_at >= start_date)
-            if end_date:
-                base_filter.append(AuditLog.created_at <= end_date)
-            
-            # Total logs
-            total_stmt = select(func.count(AuditLog.id))
-            if base_filter:
-                total_stmt = total_stmt.where(and_(*base_filter))
-            total_result = await session.execute(total_stmt)
-            total_logs = total_result.scalar_one()
-            
-            # Successful operations
-            success_stmt = select(func.count(AuditLog.id)).where(AuditLog.status == "success")
-            if base_filter:
-                success_stmt = success_stmt.where(and_(*base_filter))
-            success_result = await session.execute(success_stmt)
-            successful_operations = success_result.scalar_one()
-            
-            # Failed operations
-            failed_stmt = select(func.count(AuditLog.id)).where(AuditLog.status == "error")
-            if base_filter:
-                failed_stmt = failed_stmt.where(and_(*base_filter))
-            failed_result = await session.execute(failed_stmt)
-            failed_operations = failed_result.scalar_one()
-            
-            # Unique users
-            unique_users_stmt = select(func.count(func.distinct(AuditLog.user_principal_name)))
-            if base_filter:
-                unique_users_stmt = unique_users_stmt.where(and_(*base_filter))
-            unique_users_result = await session.execute(unique_users_stmt)
-            unique_users = unique_users_result.scalar_one()
-            
-            # Unique operations
-            unique_ops_stmt = select(func.count(func.distinct(AuditLog.operation)))
-            if base_filter:
-                unique_ops_stmt = unique_ops_stmt.where(and_(*base_filter))
-            unique_ops_result = await session.execute(unique_ops_stmt)
-            unique_operations = unique_ops_result.scalar_one()
-            
-            # Operations by type
-            ops_by_type_stmt = select(AuditLog.operation, func.count(AuditLog.id)).group_by(AuditLog.operation)
-            if base_filter:
-                ops_by_type_stmt = ops_by_type_stmt.where(and_(*base_filter))
-            ops_by_type_result = await session.execute(ops_by_type_stmt)
-            operations_by_type = {row[0]: row[1] for row in ops_by_type_result}
-            
-            # Operations by resource
-            ops_by_resource_stmt = select(AuditLog.resource_type, func.count(AuditLog.id)).group_by(AuditLog.resource_type)
-            if base_filter:
-                ops_by_resource_stmt = ops_by_resource_stmt.where(and_(*base_filter))
-            ops_by_resource_result = await session.execute(ops_by_resource_stmt)
-            operations_by_resource = {row[0]: row[1] for row in ops_by_resource_result}
-            
-            # Operations by status
-            ops_by_status_stmt = select(AuditLog.status, func.count(AuditLog.id)).group_by(AuditLog.status)
-            if base_filter:
-                ops_by_status_stmt = ops_by_status_stmt.where(and_(*base_filter))
-            ops_by_status_result = await session.execute(ops_by_status_stmt)
-            operations_by_status = {row[0]: row[1] for row in ops_by_status_result}
-            
-            # Operations by hour (last 24 hours)
-            from sqlalchemy import extract
-            hour_stmt = select(
-                extract('hour', AuditLog.created_at).label('hour'),
-                func.count(AuditLog.id)
-            ).where(
-                AuditLog.created_at >= datetime.utcnow() - timedelta(hours=24)
-            ).group_by(extract('hour', AuditLog.created_at))
-            hour_result = await session.execute(hour_stmt)
-            operations_by_hour = {f"{int(row[0]):02d}:00": row[1] for row in hour_result}
-            
-            # Top users by activity
-            top_users_stmt = select(
-                AuditLog.user_principal_name,
-                func.count(AuditLog.id).label('activity_count')
-            ).where(
-                AuditLog.user_principal_name.is_not(None)
-            ).group_by(
-                AuditLog.user_principal_name
-            ).order_by(
-                desc(func.count(AuditLog.id))
-            ).limit(10)
-            
-            if base_filter:
-                top_users_stmt = top_users_stmt.where(and_(*base_filter))
-            
-            top_users_result = await session.execute(top_users_stmt)
-            top_users = [
-                {"user": row[0], "activity_count": row[1]} 
-                for row in top_users_result
-            ]
-            
-            # Recent failures (last 10)
-            recent_failures_stmt = select(AuditLog).where(
-                AuditLog.status == "error"
-            ).order_by(
-                desc(AuditLog.created_at)
-            ).limit(10)
-            
-            recent_failures_result = await session.execute(recent_failures_stmt)
-            recent_failures_logs = recent_failures_result.scalars().all()
-            
-            recent_failures = []
-            for log in recent_failures_logs:
-                log_dict = log.__dict__.copy()
-                if log.details:
-                    try:
-                        log_dict['details'] = json.loads(log.details)
-                    except:
-                        log_dict['details'] = None
-                recent_failures.append(AuditLogResponse(**log_dict))
-            
-            return AuditStats(
-                total_logs=total_logs,
-                successful_operations=successful_operations,
-                failed_operations=failed_operations,
-                unique_users=unique_users,
-                unique_operations=unique_operations,
-                operations_by_type=operations_by_type,
-                operations_by_resource=operations_by_resource,
-                operations_by_status=operations_by_status,
-                operations_by_hour=operations_by_hour,
-                top_users=top_users,
-                recent_failures=recent_failures
-            )
+        async def compute_stats() -> AuditStats:
+            async with db_manager.get_session() as session:
+                # Base query with optional date filtering
+                base_filter = []
+                if start_date:
+                    base_filter.append(AuditLog.created_at >= start_date)
+                if end_date:
+                    base_filter.append(AuditLog.created_at <= end_date)
+                
+                # Counters in a single aggregate query
+                totals = await (
+                    AggregateQuery(*base_filter)
+                    .count('total_logs')
+                    .count('successful_operations', AuditLog.status == "success")
+                    .count('failed_operations', AuditLog.status == "error")
+                    .count_distinct('unique_users', AuditLog.user_principal_name)
+                    .count_distinct('unique_operations', AuditLog.operation)
+                ).fetch(session)
+                
+                # Operations by type, resource and status in one grouped scan
+                breakdowns = await grouped_counts(session, {
+                    'operation': AuditLog.operation,
+                    'resource_type': AuditLog.resource_type,
+                    'status': AuditLog.status
+                }, base_filter)
+                
+                # Operations by hour (last 24 hours)
+                from sqlalchemy import extract
+                hour_stmt = select(
+                    extract('hour', AuditLog.created_at).label('hour'),
+                    func.count(AuditLog.id)
+                ).where(
+                    AuditLog.created_at >= datetime.utcnow() - timedelta(hours=24)
+                ).group_by(extract('hour', AuditLog.created_at))
+                hour_result = await session.execute(hour_stmt)
+                operations_by_hour = {f"{int(row[0]):02d}:00": row[1] for row in hour_result}
+                
+                # Top users by activity
+                top_users_stmt = select(
+                    AuditLog.user_principal_name,
+                    func.count(AuditLog.id).label('activity_count')
+                ).where(
+                    AuditLog.user_principal_name.is_not(None)
+                ).group_by(
+                    AuditLog.user_principal_name
+                ).order_by(
+                    desc(func.count(AuditLog.id))
+                ).limit(10)
+                
+                if base_filter:
+                    top_users_stmt = top_users_stmt.where(and_(*base_filter))
+                
+                top_users_result = await session.execute(top_users_stmt)
+                top_users = [
+                    {"user": row[0], "activity_count": row[1]} 
+                    for row in top_users_result
+                ]
+                
+                # Recent failures (last 10)
+                recent_failures_stmt = select(AuditLog).where(
+                    AuditLog.status == "error"
+                ).order_by(
+                    desc(AuditLog.created_at)
+                ).limit(10)
+                
+                recent_failures_result = await session.execute(recent_failures_stmt)
+                recent_failures_logs = recent_failures_result.scalars().all()
+                
+                recent_failures = []
+                for log in recent_failures_logs:
+                    log_dict = log.__dict__.copy()
+                    if log.details:
+                        try:
+                            log_dict['details'] = json.loads(log.details)
+                        except:
+                            log_dict['details'] = None
+                    recent_failures.append(AuditLogResponse(**log_dict))
+                
+                return AuditStats(
+                    operations_by_type=breakdowns['operation'],
+                    operations_by_resource=breakdowns['resource_type'],
+                    operations_by_status=breakdowns['status'],
+                    operations_by_hour=operations_by_hour,
+                    top_users=top_users,
+                    recent_failures=recent_failures,
+                    **totals
+                )
+        
+        return await stats_cache.get_or_compute(('audit.stats', start_date, end_date), compute_stats)
             
     except Exception as e:
         logger.error(f"Failed to get audit statistics: {str(e)}")
@@ -443,106 +425,59 @@ async def export_audit_logs(
     user: Dict[str, Any] = Depends(require_permissions("audit.export"))
 ):
     """
-    Export audit logs to CSV or JSON format.
+    Export audit logs to CSV, JSON or NDJSON format.
+    
+    Rows are read in keyset batches and encoded incrementally while the
+    response is sent, optionally gzip-compressed.
     
     **PowerShell Equivalent**: `Export-M365AuditLogs`
     """
     try:
-        async with db_manager.get_session() as session:
-            stmt = select(AuditLog)
-            
-            # Apply filters
-            filters = []
-            if export_request.start_date:
-                filters.append(AuditLog.created_at >= export_request.start_date)
-            
-            if export_request.end_date:
-                filters.append(AuditLog.created_at <= export_request.end_date)
-            
-            if export_request.operation:
-                filters.append(AuditLog.operation.ilike(f"%{export_request.operation}%"))
-            
-            if export_request.resource_type:
-                filters.append(AuditLog.resource_type.ilike(f"%{export_request.resource_type}%"))
-            
-            if export_request.user_principal_name:
-                filters.append(AuditLog.user_principal_name.ilike(f"%{export_request.user_principal_name}%"))
-            
-            if export_request.status:
-                filters.append(AuditLog.status == export_request.status)
-            
-            if filters:
-                stmt = stmt.where(and_(*filters))
-            
-            stmt = stmt.order_by(desc(AuditLog.created_at))
-            
-            result = await session.execute(stmt)
-            audit_logs = result.scalars().all()
-            
-            # Prepare data for export
-            export_data = []
-            for log in audit_logs:
-                log_data = {
-                    "id": log.id,
-                    "operation": log.operation,
-                    "resource_type": log.resource_type,
-                    "resource_id": log.resource_id,
-                    "user_principal_name": log.user_principal_name,
-                    "ip_address": log.ip_address,
-                    "user_agent": log.user_agent,
-                    "status": log.status,
-                    "error_message": log.error_message,
-                    "created_at": log.created_at.isoformat() if log.created_at else None
-                }
-                
-                # Parse details if JSON
-                if log.details:
-                    try:
-                        details = json.loads(log.details)
-                        log_data["details"] = details
-                    except:
-                        log_data["details"] = log.details
-                else:
-                    log_data["details"] = None
-                
-                export_data.append(log_data)
-            
-            # Generate export file
-            if export_request.format == "csv":
-                output = io.StringIO()
-                if export_data:
-                    # Flatten details for CSV
-                    flattened_data = []
-                    for row in export_data:
-                        flat_row = row.copy()
-                        if row["details"] and isinstance(row["details"], dict):
-                            # Add details as separate columns
-                            for key, value in row["details"].items():
-                                flat_row[f"details_{key}"] = str(value) if value is not None else ""
-                        flat_row["details"] = str(row["details"]) if row["details"] else ""
-                        flattened_data.append(flat_row)
-                    
-                    writer = csv.DictWriter(output, fieldnames=flattened_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(flattened_data)
-                
-                content = output.getvalue()
-                output.close()
-                
-                filename = f"audit_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-                media_type = "text/csv"
-                
-            else:  # JSON
-                content = json.dumps(export_data, indent=2, default=str)
-                filename = f"audit_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-                media_type = "application/json"
-            
-            # Return as streaming response
-            return StreamingResponse(
-                io.BytesIO(content.encode('utf-8')),
-                media_type=media_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
-            )
+        # Apply filters
+        filters = []
+        if export_request.start_date:
+            filters.append(AuditLog.created_at >= export_request.start_date)
+        
+        if export_request.end_date:
+            filters.append(AuditLog.created_at <= export_request.end_date)
+        
+        if export_request.operation:
+            filters.append(AuditLog.operation.ilike(f"%{export_request.operation}%"))
+        
+        if export_request.resource_type:
+            filters.append(AuditLog.resource_type.ilike(f"%{export_request.resource_type}%"))
+        
+        if export_request.user_principal_name:
+            filters.append(AuditLog.user_principal_name.ilike(f"%{export_request.user_principal_name}%"))
+        
+        if export_request.status:
+            filters.append(AuditLog.status == export_request.status)
+        
+        content = stream_audit_export(
+            db_manager.get_session,
+            filters,
+            export_request.format,
+            details_keys=export_request.details_columns
+        )
+        
+        media_type = {
+            "csv": "text/csv",
+            "json": "application/json",
+            "ndjson": "application/x-ndjson"
+        }[export_request.format]
+        
+        if export_request.compress:
+            content = gzip_chunks(content)
+            media_type = "application/gzip"
+        
+        filename = export_filename(export_request.format, export_request.compress)
+        
+        # Return as streaming response
+        return StreamingResponse(
+            content,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
             
     except Exception as e:
         logger.error(f"Failed to export audit logs: {str(e)}")
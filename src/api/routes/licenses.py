@@ -14,6 +14,8 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import DatabaseManager, UserLicense, User, get_db_manager
+from ..core.stats import AggregateQuery, stats_cache
+from ..core.bulk import bulk_insert_new, existing_keys, BULK_MAX_ROWS
 from ..core.auth import get_auth_manager, AuthManager
 from ..core.exceptions import M365Exception, ValidationError, NotFoundError
 from ..dependencies.advanced_dependencies import get_authenticated_user, require_permissions, get_request_context
@@ -170,8 +172,8 @@ async def get_license_analysis(
             stmt = select(
                 UserLicense.sku_part_number,
                 UserLicense.display_name,
-                func.sum(UserLicense.enabled_units).label('total_units'),
-                func.sum(UserLicense.consumed_units).label('consumed_units'),
+                func.coalesce(func.sum(UserLicense.enabled_units), 0).label('total_units'),
+                func.coalesce(func.sum(UserLicense.consumed_units), 0).label('consumed_units'),
                 func.count(UserLicense.id).label('assigned_users'),
                 func.max(UserLicense.assigned_datetime).label('last_assignment')
             ).group_by(
@@ -219,55 +221,40 @@ async def get_license_usage(
     **PowerShell Equivalent**: `Get-M365LicenseUsage`
     """
     try:
-        async with db_manager.get_session() as session:
-            # Get total statistics
-            total_licenses_result = await session.execute(select(func.count(UserLicense.id)))
-            total_licenses = total_licenses_result.scalar_one()
-            
-            active_licenses_result = await session.execute(
-                select(func.count(UserLicense.id)).where(UserLicense.consumed_units > 0)
-            )
-            active_licenses = active_licenses_result.scalar_one()
-            
-            suspended_licenses_result = await session.execute(
-                select(func.count(UserLicense.id)).where(UserLicense.suspended_units > 0)
-            )
-            suspended_licenses = suspended_licenses_result.scalar_one()
-            
-            warning_licenses_result = await session.execute(
-                select(func.count(UserLicense.id)).where(UserLicense.warning_units > 0)
+        async def compute_usage() -> LicenseUsageResponse:
+            # All counters in a single aggregate query
+            query = (
+                AggregateQuery()
+                .count('total_licenses')
+                .count('active_licenses', UserLicense.consumed_units > 0)
+                .count('suspended_licenses', UserLicense.suspended_units > 0)
+                .count('warning_licenses', UserLicense.warning_units > 0)
+                .count_distinct('total_users_licensed', UserLicense.user_id)
             )
-            warning_licenses = warning_licenses_result.scalar_one()
             
-            # Get unique licensed users
-            licensed_users_result = await session.execute(
-                select(func.count(func.distinct(UserLicense.user_id)))
-            )
-            total_users_licensed = licensed_users_result.scalar_one()
-            
-            # Get top used licenses
-            top_used_stmt = select(
+            # Per-SKU usage in one grouped query; top used and underutilized
+            # lists are both derived from it
+            sku_stmt = select(
                 UserLicense.sku_part_number,
                 UserLicense.display_name,
-                func.sum(UserLicense.enabled_units).label('total_units'),
-                func.sum(UserLicense.consumed_units).label('consumed_units'),
+                func.coalesce(func.sum(UserLicense.enabled_units), 0).label('total_units'),
+                func.coalesce(func.sum(UserLicense.consumed_units), 0).label('consumed_units'),
                 func.count(UserLicense.id).label('assigned_users'),
                 func.max(UserLicense.assigned_datetime).label('last_assignment')
             ).group_by(
                 UserLicense.sku_part_number,
                 UserLicense.display_name
-            ).order_by(
-                func.sum(UserLicense.consumed_units).desc()
-            ).limit(5)
+            )
             
-            top_used_result = await session.execute(top_used_stmt)
-            top_used_licenses = []
+            async with db_manager.get_session() as session:
+                totals = await query.fetch(session)
+                sku_rows = (await session.execute(sku_stmt)).all()
             
-            for row in top_used_result:
+            def to_response(row) -> LicenseAnalysisResponse:
                 available_units = row.total_units - row.consumed_units
                 utilization_percentage = (row.consumed_units / row.total_units * 100) if row.total_units > 0 else 0
                 
-                top_used_licenses.append(LicenseAnalysisResponse(
+                return LicenseAnalysisResponse(
                     sku_part_number=row.sku_part_number,
                     display_name=row.display_name,
                     total_units=row.total_units,
@@ -276,55 +263,24 @@ async def get_license_usage(
                     utilization_percentage=round(utilization_percentage, 2),
                     assigned_users=row.assigned_users,
                     last_assignment=row.last_assignment
-                ))
-            
-            # Get underutilized licenses (utilization < 50%)
-            underutilized_stmt = select(
-                UserLicense.sku_part_number,
-                UserLicense.display_name,
-                func.sum(UserLicense.enabled_units).label('total_units'),
-                func.sum(UserLicense.consumed_units).label('consumed_units'),
-                func.count(UserLicense.id).label('assigned_users'),
-                func.max(UserLicense.assigned_datetime).label('last_assignment')
-            ).group_by(
-                UserLicense.sku_part_number,
-                UserLicense.display_name
-            ).having(
-                and_(
-                    func.sum(UserLicense.enabled_units) > 0,
-                    (func.sum(UserLicense.consumed_units) / func.sum(UserLicense.enabled_units)) < 0.5
                 )
-            ).order_by(
-                (func.sum(UserLicense.consumed_units) / func.sum(UserLicense.enabled_units)).asc()
-            ).limit(5)
             
-            underutilized_result = await session.execute(underutilized_stmt)
-            underutilized_licenses = []
+            top_used = sorted(sku_rows, key=lambda row: row.consumed_units, reverse=True)[:5]
             
-            for row in underutilized_result:
-                available_units = row.total_units - row.consumed_units
-                utilization_percentage = (row.consumed_units / row.total_units * 100) if row.total_units > 0 else 0
-                
-                underutilized_licenses.append(LicenseAnalysisResponse(
-                    sku_part_number=row.sku_part_number,
-                    display_name=row.display_name,
-                    total_units=row.total_units,
-                    consumed_units=row.consumed_units,
-                    available_units=available_units,
-                    utilization_percentage=round(utilization_percentage, 2),
-                    assigned_users=row.assigned_users,
-                    last_assignment=row.last_assignment
-                ))
+            # Underutilized licenses (utilization < 50%)
+            underutilized = sorted(
+                (row for row in sku_rows
+                 if row.total_units > 0 and row.consumed_units / row.total_units < 0.5),
+                key=lambda row: row.consumed_units / row.total_units
+            )[:5]
             
             return LicenseUsageResponse(
-                total_licenses=total_licenses,
-                active_licenses=active_licenses,
-                suspended_licenses=suspended_licenses,
-                warning_licenses=warning_licenses,
-                total_users_licensed=total_users_licensed,
-                top_used_licenses=top_used_licenses,
-                underutilized_licenses=underutilized_licenses
+                top_used_licenses=[to_response(row) for row in top_used],
+                underutilized_licenses=[to_response(row) for row in underutilized],
+                **totals
             )
+        
+        return await stats_cache.get_or_compute(('licenses.usage',), compute_usage)
             
     except Exception as e:
         logger.error(f"Failed to get license usage: {str(e)}")
@@ -537,48 +493,34 @@ async def bulk_assign_licenses(
     **PowerShell Equivalent**: `Import-M365LicenseAssignments`
     """
     try:
-        if len(assignments) > 1000:
-            raise ValidationError("Bulk assignment limited to 1000 licenses at a time")
+        if len(assignments) > BULK_MAX_ROWS:
+            raise ValidationError(f"Bulk assignment limited to {BULK_MAX_ROWS} licenses at a time")
         
         async with db_manager.get_session() as session:
-            created_licenses = []
+            # Check which users exist with one IN lookup
+            known_users = await existing_keys(
+                session, User, ["id"], list({(assignment.user_id,) for assignment in assignments})
+            )
             
+            rows = []
             for assignment in assignments:
-                # Check if user exists
-                user_stmt = select(User).where(User.id == assignment.user_id)
-                user_result = await session.execute(user_stmt)
-                user_obj = user_result.scalar_one_or_none()
-                
-                if not user_obj:
+                if (assignment.user_id,) not in known_users:
                     logger.warning(f"Skipping assignment: User {assignment.user_id} not found")
                     continue
-                
-                # Check for duplicate
-                existing_stmt = select(UserLicense).where(
-                    and_(
-                        UserLicense.user_id == assignment.user_id,
-                        UserLicense.sku_part_number == assignment.sku_part_number
-                    )
-                )
-                existing_result = await session.execute(existing_stmt)
-                existing_license = existing_result.scalar_one_or_none()
-                
-                if existing_license:
-                    logger.warning(f"Skipping duplicate assignment: {assignment.sku_part_number} for user {assignment.user_id}")
-                    continue
-                
-                license_obj = UserLicense(
+                rows.append({
                     **assignment.dict(),
-                    assigned_datetime=assignment.assigned_datetime or datetime.utcnow()
-                )
-                session.add(license_obj)
-                created_licenses.append(license_obj)
+                    "assigned_datetime": assignment.assigned_datetime or datetime.utcnow()
+                })
             
-            await session.commit()
+            result = await bulk_insert_new(
+                session, UserLicense, rows, key_names=["user_id", "sku_part_number"]
+            )
+            created_licenses = result.inserted
             
-            # Refresh all created licenses
-            for license_obj in created_licenses:
-                await session.refresh(license_obj)
+            for duplicate in result.duplicates:
+                logger.warning(f"Skipping duplicate assignment: {duplicate['sku_part_number']} for user {duplicate['user_id']}")
+            
+            await session.commit()
             
             return [LicenseResponse.from_orm(license_obj) for license_obj in created_licenses]
             
@@ -3,7 +3,7 @@ Reports API Router - Microsoft 365 Report Management
 Provides CRUD operations for report generation with PowerShell compatibility.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, Response, status, BackgroundTasks
 from fastapi.responses import JSONResponse, FileResponse
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
@@ -17,6 +17,8 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import DatabaseManager, Report, get_db_manager
+from ..core.pagination import fetch_keyset_page
+from ..core.stats import AggregateQuery, grouped_counts, stats_cache
 from ..core.auth import get_auth_manager, AuthManager
 from ..core.exceptions import M365Exception, ValidationError, NotFoundError
 from ..dependencies.advanced_dependencies import get_authenticated_user, require_permissions, get_request_context
@@ -96,8 +98,10 @@ router = APIRouter(
 
 @router.get("/", response_model=List[ReportResponse], summary="Get all reports")
 async def get_reports(
-    page: int = Query(1, ge=1, description="Page number"),
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     size: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     report_type: Optional[str] = Query(None, description="Filter by report type"),
     status: Optional[str] = Query(None, description="Filter by status"),
     file_format: Optional[str] = Query(None, description="Filter by file format"),
@@ -110,6 +114,8 @@ async def get_reports(
     Retrieve reports with advanced filtering and pagination.
     
     **PowerShell Equivalent**: `Get-M365Reports`
+    
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
     try:
         async with db_manager.get_session() as session:
@@ -131,12 +137,15 @@ async def get_reports(
             if end_date:
                 stmt = stmt.where(Report.created_at <= end_date)
             
-            # Apply pagination
-            offset = (page - 1) * size
-            stmt = stmt.offset(offset).limit(size).order_by(Report.created_at.desc())
-            
-            result = await session.execute(stmt)
-            reports = result.scalars().all()
+            # Keyset pagination on (created_at, id), newest first
+            offset = 0 if cursor else (page - 1) * size
+            result_page = await fetch_keyset_page(
+                session, stmt, [(Report.created_at, True), (Report.id, True)],
+                size, cursor=cursor, offset=offset
+            )
+            reports = result_page.items
+            if result_page.next_cursor:
+                response.headers["X-Next-Cursor"] = result_page.next_cursor
             
             # Convert parameters JSON string to dict
             report_responses = []
@@ -151,6 +160,9 @@ async def get_reports(
             
             return report_responses
             
+    except ValidationError as e:
+        # The status query parameter shadows fastapi.status here
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to retrieve reports: {str(e)}")
         raise HTTPException(
@@ -169,61 +181,40 @@ async def get_report_stats(
     **PowerShell Equivalent**: `Get-M365ReportStats`
     """
     try:
-        async with db_manager.get_session() as session:
-            # Total reports
-            total_reports_result = await session.execute(select(func.count(Report.id)))
-            total_reports = total_reports_result.scalar_one()
-            
-            # Reports by status
-            completed_reports_result = await session.execute(
-                select(func.count(Report.id)).where(Report.status == "completed")
-            )
-            completed_reports = completed_reports_result.scalar_one()
-            
-            pending_reports_result = await session.execute(
-                select(func.count(Report.id)).where(Report.status == "pending")
-            )
-            pending_reports = pending_reports_result.scalar_one()
-            
-            failed_reports_result = await session.execute(
-                select(func.count(Report.id)).where(Report.status == "failed")
+        async def compute_stats() -> ReportStats:
+            # Counters and totals in a single aggregate query
+            query = (
+                AggregateQuery()
+                .count('total_reports')
+                .count('completed_reports', Report.status == "completed")
+                .count('pending_reports', Report.status == "pending")
+                .count('failed_reports', Report.status == "failed")
+                .avg('average_generation_time', Report.generation_time)
+                .sum('total_file_size', Report.file_size)
             )
-            failed_reports = failed_reports_result.scalar_one()
             
-            # Average generation time
-            avg_time_result = await session.execute(
-                select(func.avg(Report.generation_time)).where(Report.generation_time.is_not(None))
-            )
-            average_generation_time = avg_time_result.scalar_one()
-            
-            # Total file size
-            total_size_result = await session.execute(
-                select(func.sum(Report.file_size)).where(Report.file_size.is_not(None))
-            )
-            total_file_size = total_size_result.scalar_one()
-            
-            # Reports by type
-            type_stats_result = await session.execute(
-                select(Report.report_type, func.count(Report.id)).group_by(Report.report_type)
-            )
-            reports_by_type = {row[0]: row[1] for row in type_stats_result}
-            
-            # Reports by format
-            format_stats_result = await session.execute(
-                select(Report.file_format, func.count(Report.id)).group_by(Report.file_format)
-            )
-            reports_by_format = {row[0]: row[1] for row in format_stats_result}
+            async with db_manager.get_session() as session:
+                totals = await query.fetch(session)
+                
+                # Reports by type and by format in one grouped scan
+                breakdowns = await grouped_counts(session, {
+                    'type': Report.report_type,
+                    'format': Report.file_format
+                })
             
+            average_generation_time = totals['average_generation_time']
             return ReportStats(
-                total_reports=total_reports,
-                completed_reports=completed_reports,
-                pending_reports=pending_reports,
-                failed_reports=failed_reports,
+                total_reports=totals['total_reports'],
+                completed_reports=totals['completed_reports'],
+                pending_reports=totals['pending_reports'],
+                failed_reports=totals['failed_reports'],
                 average_generation_time=round(average_generation_time, 2) if average_generation_time else None,
-                total_file_size=total_file_size,
-                reports_by_type=reports_by_type,
-                reports_by_format=reports_by_format
+                total_file_size=totals['total_file_size'],
+                reports_by_type=breakdowns['type'],
+                reports_by_format=breakdowns['format']
             )
+        
+        return await stats_cache.get_or_compute(('reports.stats',), compute_stats)
             
     except Exception as e:
         logger.error(f"Failed to get report statistics: {str(e)}")
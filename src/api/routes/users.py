@@ -3,7 +3,7 @@ Users API Router - Microsoft 365 User Management
 Provides CRUD operations for user data with full PowerShell compatibility.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, Request, status, BackgroundTasks
 from fastapi.responses import JSONResponse
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
@@ -13,7 +13,11 @@ from pydantic import BaseModel, Field, EmailStr, validator
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.database import DatabaseManager, User, UserLicense, get_db_manager
+from ..core.database import DatabaseManager, User, UserLicense, SyncJob, USER_SORT_NAME, get_db_manager
+from ..core.pagination import fetch_keyset_page, count_rows, contains_pattern
+from ..core.bulk import bulk_insert_new, BULK_MAX_ROWS
+from ..core.stats import AggregateQuery, stats_cache
+from ..core.user_sync import UserSyncEngine, lazy_graph_page_fetcher
 from ..core.auth import get_auth_manager, AuthManager
 from ..core.exceptions import M365Exception, ValidationError, NotFoundError
 from ..dependencies.advanced_dependencies import get_authenticated_user, require_permissions
@@ -74,11 +78,12 @@ class UserResponse(UserBase):
 class UserListResponse(BaseModel):
     """User list response with pagination."""
     users: List[UserResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 class UserStatsResponse(BaseModel):
     """User statistics response."""
@@ -90,6 +95,27 @@ class UserStatsResponse(BaseModel):
     last_signin_30_days: int
     never_signed_in: int
 
+class SyncJobResponse(BaseModel):
+    """Synchronization job response."""
+    id: int
+    resource_type: str
+    mode: str
+    status: str
+    pages_fetched: int
+    records_seen: int
+    records_created: int
+    records_updated: int
+    records_unchanged: int
+    records_deleted: int
+    records_skipped: int
+    error_message: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 # Router setup
 router = APIRouter(
     prefix="/users",
@@ -105,8 +131,10 @@ router = APIRouter(
 
 @router.get("/", response_model=UserListResponse, summary="Get all users")
 async def get_users(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     size: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    count: str = Query("exact", description="Total count mode (exact, estimate, none)"),
     search: Optional[str] = Query(None, description="Search term for display name or UPN"),
     department: Optional[str] = Query(None, description="Filter by department"),
     licensed_only: bool = Query(False, description="Show only licensed users"),
@@ -122,56 +150,45 @@ async def get_users(
     **PowerShell Equivalent**: `Get-M365AllUsers`
     
     Features:
-    - Pagination support
+    - Cursor (keyset) pagination ordered by display name; page numbers are still accepted
     - Search by name/UPN
     - Filter by department, license, enabled status, MFA status
-    - Statistics included
+    - Exact, estimated or no total count
     """
     try:
         async with db_manager.get_session() as session:
-            # Build query
-            stmt = select(User)
-            count_stmt = select(func.count(User.id))
+            # Build query (users removed in Entra ID are soft-deleted)
+            stmt = select(User).where(User.deleted_at.is_(None))
             
             # Apply filters
             if search:
-                search_filter = func.lower(User.display_name).contains(search.lower()) | \
-                               func.lower(User.user_principal_name).contains(search.lower())
-                stmt = stmt.where(search_filter)
-                count_stmt = count_stmt.where(search_filter)
+                pattern = contains_pattern(search.lower())
+                stmt = stmt.where(
+                    func.lower(User.display_name).like(pattern, escape="\\") |
+                    func.lower(User.user_principal_name).like(pattern, escape="\\")
+                )
             
             if department:
-                dept_filter = func.lower(User.department) == department.lower()
-                stmt = stmt.where(dept_filter)
-                count_stmt = count_stmt.where(dept_filter)
+                stmt = stmt.where(func.lower(User.department) == department.lower())
             
             if licensed_only:
                 stmt = stmt.where(User.is_licensed == True)
-                count_stmt = count_stmt.where(User.is_licensed == True)
             
             if enabled_only:
                 stmt = stmt.where(User.account_enabled == True)
-                count_stmt = count_stmt.where(User.account_enabled == True)
                 
             if mfa_enabled_only:
                 stmt = stmt.where(User.mfa_enabled == True)
-                count_stmt = count_stmt.where(User.mfa_enabled == True)
             
-            # Get total count
-            total_result = await session.execute(count_stmt)
-            total = total_result.scalar_one()
+            # Get total count (optional)
+            total = await count_rows(session, stmt, count)
             
-            # Apply pagination
-            offset = (page - 1) * size
-            stmt = stmt.offset(offset).limit(size).order_by(User.display_name)
-            
-            # Execute query
-            result = await session.execute(stmt)
-            users = result.scalars().all()
-            
-            # Calculate pagination info
-            has_next = offset + size < total
-            has_prev = page > 1
+            # Keyset pagination on (display name, id)
+            offset = 0 if cursor else (page - 1) * size
+            result_page = await fetch_keyset_page(
+                session, stmt, [(USER_SORT_NAME, False), (User.id, False)],
+                size, cursor=cursor, offset=offset
+            )
             
             # Log audit
             await audit_context.log_operation(
@@ -180,6 +197,7 @@ async def get_users(
                 details={
                     "page": page,
                     "size": size,
+                    "cursor": bool(cursor),
                     "total": total,
                     "filters": {
                         "search": search,
@@ -192,14 +210,20 @@ async def get_users(
             )
             
             return UserListResponse(
-                users=[UserResponse.from_orm(user) for user in users],
+                users=[UserResponse.from_orm(user) for user in result_page.items],
                 total=total,
                 page=page,
                 size=size,
-                has_next=has_next,
-                has_prev=has_prev
+                has_next=result_page.has_next,
+                has_prev=bool(cursor) or page > 1,
+                next_cursor=result_page.next_cursor
             )
             
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to retrieve users: {str(e)}")
         await audit_context.log_operation(
@@ -225,62 +249,35 @@ async def get_user_stats(
     **PowerShell Equivalent**: `Get-M365UserStats`
     """
     try:
-        async with db_manager.get_session() as session:
-            # Calculate statistics
-            total_users_result = await session.execute(select(func.count(User.id)))
-            total_users = total_users_result.scalar_one()
-            
-            licensed_users_result = await session.execute(
-                select(func.count(User.id)).where(User.is_licensed == True)
-            )
-            licensed_users = licensed_users_result.scalar_one()
-            
-            enabled_users_result = await session.execute(
-                select(func.count(User.id)).where(User.account_enabled == True)
-            )
-            enabled_users = enabled_users_result.scalar_one()
-            
-            mfa_enabled_users_result = await session.execute(
-                select(func.count(User.id)).where(User.mfa_enabled == True)
-            )
-            mfa_enabled_users = mfa_enabled_users_result.scalar_one()
-            
+        async def compute_stats() -> UserStatsResponse:
             # Recent signin statistics
             seven_days_ago = datetime.utcnow() - timedelta(days=7)
             thirty_days_ago = datetime.utcnow() - timedelta(days=30)
             
-            recent_7_days_result = await session.execute(
-                select(func.count(User.id)).where(User.last_signin_datetime >= seven_days_ago)
-            )
-            last_signin_7_days = recent_7_days_result.scalar_one()
-            
-            recent_30_days_result = await session.execute(
-                select(func.count(User.id)).where(User.last_signin_datetime >= thirty_days_ago)
+            # All counters in a single aggregate query (soft-deleted users excluded)
+            query = (
+                AggregateQuery(User.deleted_at.is_(None))
+                .count('total_users')
+                .count('licensed_users', User.is_licensed == True)
+                .count('enabled_users', User.account_enabled == True)
+                .count('mfa_enabled_users', User.mfa_enabled == True)
+                .count('last_signin_7_days', User.last_signin_datetime >= seven_days_ago)
+                .count('last_signin_30_days', User.last_signin_datetime >= thirty_days_ago)
+                .count('never_signed_in', User.last_signin_datetime.is_(None))
             )
-            last_signin_30_days = recent_30_days_result.scalar_one()
             
-            never_signed_in_result = await session.execute(
-                select(func.count(User.id)).where(User.last_signin_datetime.is_(None))
-            )
-            never_signed_in = never_signed_in_result.scalar_one()
-            
-            stats = UserStatsResponse(
-                total_users=total_users,
-                licensed_users=licensed_users,
-                enabled_users=enabled_users,
-                mfa_enabled_users=mfa_enabled_users,
-                last_signin_7_days=last_signin_7_days,
-                last_signin_30_days=last_signin_30_days,
-                never_signed_in=never_signed_in
-            )
-            
-            await audit_context.log_operation(
-                operation="users.stats",
-                resource_type="users",
-                details=stats.dict()
-            )
-            
-            return stats
+            async with db_manager.get_session() as session:
+                return UserStatsResponse(**await query.fetch(session))
+        
+        stats = await stats_cache.get_or_compute(('users.stats',), compute_stats)
+        
+        await audit_context.log_operation(
+            operation="users.stats",
+            resource_type="users",
+            details=stats.dict()
+        )
+        
+        return stats
             
     except Exception as e:
         logger.error(f"Failed to get user statistics: {str(e)}")
@@ -573,35 +570,24 @@ async def bulk_create_users(
     **PowerShell Equivalent**: `Import-M365Users`
     """
     try:
-        if len(users_data) > 1000:
-            raise ValidationError("Bulk creation limited to 1000 users at a time")
+        if len(users_data) > BULK_MAX_ROWS:
+            raise ValidationError(f"Bulk creation limited to {BULK_MAX_ROWS} users at a time")
         
         async with db_manager.get_session() as session:
-            created_users = []
+            created_datetime = datetime.utcnow()
+            result = await bulk_insert_new(
+                session, User,
+                [{**user_data.dict(), "created_datetime": created_datetime} for user_data in users_data],
+                key_names=["user_principal_name"],
+                conflict_columns=["user_principal_name"]
+            )
+            created_users = result.inserted
             
-            for user_data in users_data:
-                # Check for duplicates
-                existing_stmt = select(User).where(User.user_principal_name == user_data.user_principal_name)
-                existing_result = await session.execute(existing_stmt)
-                existing_user = existing_result.scalar_one_or_none()
-                
-                if existing_user:
-                    logger.warning(f"Skipping duplicate UPN: {user_data.user_principal_name}")
-                    continue
-                
-                user = User(
-                    **user_data.dict(),
-                    created_datetime=datetime.utcnow()
-                )
-                session.add(user)
-                created_users.append(user)
+            for duplicate in result.duplicates:
+                logger.warning(f"Skipping duplicate UPN: {duplicate['user_principal_name']}")
             
             await session.commit()
             
-            # Refresh all created users
-            for user in created_users:
-                await session.refresh(user)
-            
             await audit_context.log_operation(
                 operation="users.bulk_create",
                 resource_type="users",
@@ -632,36 +618,65 @@ async def bulk_create_users(
         )
 
 # Microsoft Graph integration endpoint
-@router.post("/sync", summary="Sync users from Microsoft Graph")
+def create_graph_client():
+    """Load the configuration and initialize a Graph client (blocking)."""
+    from src.core.config import Config
+    from ..graph.client import GraphClient
+    
+    config = Config()
+    config.load()
+    graph_client = GraphClient(config)
+    graph_client.initialize()
+    return graph_client
+
+async def get_user_sync_engine(request: Request, db_manager: DatabaseManager = Depends(get_db_manager)) -> UserSyncEngine:
+    """
+    User sync engine shared by all requests (created on first use).
+    
+    The Graph client is only created when the first sync job runs, in a
+    worker thread, so starting or polling a job never blocks on credentials.
+    """
+    engine = getattr(request.app.state, 'user_sync_engine', None)
+    if engine is None:
+        engine = UserSyncEngine(db_manager.get_session, lazy_graph_page_fetcher(create_graph_client))
+        request.app.state.user_sync_engine = engine
+    return engine
+
+async def run_user_sync_background(engine: UserSyncEngine, job_id: int):
+    """Background task for user synchronization."""
+    await engine.run(job_id)
+    stats_cache.invalidate('users.')
+
+@router.post("/sync", response_model=SyncJobResponse, status_code=status.HTTP_202_ACCEPTED,
+             summary="Sync users from Microsoft Graph")
 async def sync_users_from_graph(
-    force_refresh: bool = Query(False, description="Force refresh from Graph API"),
-    db_manager: DatabaseManager = Depends(get_db_manager),
-    auth_manager: AuthManager = Depends(get_auth_manager),
+    background_tasks: BackgroundTasks,
+    force_refresh: bool = Query(False, description="Ignore the stored delta link and run a full sync"),
+    engine: UserSyncEngine = Depends(get_user_sync_engine),
     audit_context = Depends(get_audit_context),
     _permission_check = Depends(require_permission("users.sync"))
-):
+) -> SyncJobResponse:
     """
     Synchronize users from Microsoft Graph API.
     
     **PowerShell Equivalent**: `Sync-M365Users`
+    
+    Runs incrementally from the delta link of the last completed sync; the
+    returned job can be polled at /users/sync/{job_id}. If a sync is already
+    running, that job is returned instead of starting another one.
     """
     try:
-        # TODO: Implement Microsoft Graph sync logic
-        # This will be implemented in the Graph integration phase
+        job, created = await engine.start_job(force_full=force_refresh)
+        if created:
+            background_tasks.add_task(run_user_sync_background, engine, job.id)
         
         await audit_context.log_operation(
             operation="users.sync",
             resource_type="users",
-            details={"force_refresh": force_refresh}
+            details={"force_refresh": force_refresh, "job_id": job.id, "mode": job.mode, "created": created}
         )
         
-        return JSONResponse(
-            status_code=status.HTTP_202_ACCEPTED,
-            content={
-                "message": "User synchronization initiated",
-                "status": "processing"
-            }
-        )
+        return SyncJobResponse.from_orm(job)
         
     except Exception as e:
         logger.error(f"Failed to sync users from Graph: {str(e)}")
@@ -674,4 +689,24 @@ async def sync_users_from_graph(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to sync users: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/sync/{job_id}", response_model=SyncJobResponse, summary="Get user sync job")
+async def get_user_sync_job(
+    job_id: int = Path(..., description="Sync job ID"),
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    _permission_check = Depends(require_permission("users.sync"))
+) -> SyncJobResponse:
+    """
+    Get the progress of a user synchronization job.
+    """
+    async with db_manager.get_session() as session:
+        job = await session.get(SyncJob, job_id)
+    
+    if not job or job.resource_type != "users":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sync job {job_id} not found"
+        )
+    
+    return SyncJobResponse.from_orm(job)
@@ -13,6 +13,7 @@ import requests
 
 from src.core.config import Config
 from src.api.graph.client import GraphClient
+from src.api.graph.reports import ReportIndex, iter_join
 from src.core.powershell_bridge import PowerShellBridge
 
 
@@ -153,27 +154,19 @@ class TeamsClient:
         try:
             # Get Teams user activity reports
             try:
-                activity_data = self.graph_client.get(f'/reports/getTeamsUserActivityUserDetail(period=\'{period}\')')
-                users_data = activity_data.get('value', [])
+                users_data = self.graph_client.get_report_index('getTeamsUserActivityUserDetail', period).rows
             except:
                 users_data = []
             
-            # Get Teams device usage
+            # Get Teams device usage (indexed by UPN)
             try:
-                device_data = self.graph_client.get(f'/reports/getTeamsDeviceUsageUserDetail(period=\'{period}\')')
-                device_users = device_data.get('value', [])
+                device_index = self.graph_client.get_report_index('getTeamsDeviceUsageUserDetail', period)
             except:
-                device_users = []
+                device_index = ReportIndex([])
             
             # Process and combine data
             usage_data = []
-            for user in users_data:
-                # Find corresponding device data
-                device_info = next(
-                    (d for d in device_users if d.get('userPrincipalName') == user.get('userPrincipalName')),
-                    {}
-                )
-                
+            for user, device_info in iter_join(users_data, device_index, 'userPrincipalName'):
                 user_usage = {
                     'ユーザー名': user.get('userDisplayName', ''),
                     'UPN': user.get('userPrincipalName', ''),
@@ -4,8 +4,10 @@
 import click
 import asyncio
 from datetime import datetime, timedelta
+from functools import partial
 from typing import List, Dict, Any
 
+from src.api.graph.report_composer import ReportComposer, ReportSection
 from src.cli.core.context import CLIContext
 from src.cli.core.output import OutputFormatter
 
@@ -98,110 +100,122 @@ async def _generate_daily_report_data(context: CLIContext,
         # Create Graph client
         graph_client = GraphClient(authenticator)
         
-        report_data = []
-        
-        # Get user signin activities
+        # Sign-in logs and users are fetched concurrently
         output = OutputFormatter(context)
-        output.output_progress("ユーザーサインイン情報を取得中...")
-        
-        # Get signin logs for the target date
-        signin_data = await graph_client.get_signin_logs(
-            start_date=target_date.strftime('%Y-%m-%d'),
-            end_date=(target_date + timedelta(days=1)).strftime('%Y-%m-%d')
-        )
+        output.output_progress("ユーザーサインイン・ユーザー情報を取得中...")
         
-        # Get user information
-        output.output_progress("ユーザー情報を取得中...")
-        users_data = await graph_client.get_users(include_inactive=include_inactive)
+        composer = ReportComposer({
+            'signins': lambda: graph_client.get_signin_logs(
+                start_date=target_date.strftime('%Y-%m-%d'),
+                end_date=(target_date + timedelta(days=1)).strftime('%Y-%m-%d')
+            ),
+            'users': lambda: graph_client.get_users(include_inactive=include_inactive),
+        })
+        result = await composer.compose_async([
+            ReportSection('daily', ('signins', 'users'), partial(
+                _build_daily_records,
+                target_date=target_date,
+                include_inactive=include_inactive,
+                security_only=security_only
+            ))
+        ])
         
-        # Process and combine data
         output.output_progress("データを処理中...")
+        return result.get('daily')
         
-        user_activities = {}
-        
-        # Process signin logs
-        for signin in signin_data:
-            user_upn = signin.get('userPrincipalName', '')
-            if user_upn not in user_activities:
-                user_activities[user_upn] = {
-                    'signin_count': 0,
-                    'successful_signin': 0,
-                    'failed_signin': 0,
-                    'risk_events': 0,
-                    'last_signin': None
-                }
-            
-            user_activities[user_upn]['signin_count'] += 1
-            
-            if signin.get('status', {}).get('errorCode') == 0:
-                user_activities[user_upn]['successful_signin'] += 1
-            else:
-                user_activities[user_upn]['failed_signin'] += 1
-            
-            # Check for risk
-            if signin.get('riskLevelDuringSignIn') in ['medium', 'high']:
-                user_activities[user_upn]['risk_events'] += 1
-            
-            # Track last signin time
-            signin_time = signin.get('createdDateTime')
-            if signin_time:
-                if not user_activities[user_upn]['last_signin'] or signin_time > user_activities[user_upn]['last_signin']:
-                    user_activities[user_upn]['last_signin'] = signin_time
-        
-        # Generate report records
-        for user in users_data:
-            user_upn = user.get('userPrincipalName', '')
-            display_name = user.get('displayName', '')
-            department = user.get('department', '不明')
-            
-            activity = user_activities.get(user_upn, {
+    except Exception as e:
+        # Fallback to sample data if API fails
+        output = OutputFormatter(context)
+        output.output_warning(f"APIアクセスに失敗しました、サンプルデータを使用します: {e}")
+        return _generate_sample_daily_data(target_date, include_inactive)
+
+def _build_daily_records(signins: List[Dict[str, Any]],
+                         users: List[Dict[str, Any]],
+                         target_date: datetime,
+                         include_inactive: bool,
+                         security_only: bool) -> List[Dict[str, Any]]:
+    """Combine sign-in logs and users into daily report records"""
+    
+    report_data = []
+    user_activities = {}
+    
+    # Process signin logs
+    for signin in signins:
+        user_upn = signin.get('userPrincipalName', '')
+        if user_upn not in user_activities:
+            user_activities[user_upn] = {
                 'signin_count': 0,
                 'successful_signin': 0,
                 'failed_signin': 0,
                 'risk_events': 0,
                 'last_signin': None
-            })
-            
-            # Determine security status
-            security_risk = "正常"
-            if activity['risk_events'] > 0:
-                security_risk = "⚠️ 高リスク"
-            elif activity['failed_signin'] > 5:
-                security_risk = "⚠️ 注意"
-            elif activity['signin_count'] == 0:
-                security_risk = "✗ 非アクティブ"
-            
-            # Skip inactive users if not requested
-            if not include_inactive and activity['signin_count'] == 0:
-                continue
-            
-            # Skip non-security data if security only
-            if security_only and security_risk == "正常":
-                continue
-            
-            report_record = {
-                'ユーザー名': display_name,
-                'ユーザープリンシパル名': user_upn,
-                '部署': department,
-                'サインイン回数': activity['signin_count'],
-                '成功回数': activity['successful_signin'],
-                '失敗回数': activity['failed_signin'],
-                'リスクイベント': activity['risk_events'],
-                '最終サインイン': activity['last_signin'] or 'なし',
-                'セキュリティリスク': security_risk,
-                'アカウント状態': user.get('accountEnabled', True) and '有効' or '無効',
-                'レポート日': target_date.strftime('%Y-%m-%d')
             }
-            
-            report_data.append(report_record)
         
-        return report_data
+        user_activities[user_upn]['signin_count'] += 1
         
-    except Exception as e:
-        # Fallback to sample data if API fails
-        output = OutputFormatter(context)
-        output.output_warning(f"APIアクセスに失敗しました、サンプルデータを使用します: {e}")
-        return _generate_sample_daily_data(target_date, include_inactive)
+        if signin.get('status', {}).get('errorCode') == 0:
+            user_activities[user_upn]['successful_signin'] += 1
+        else:
+            user_activities[user_upn]['failed_signin'] += 1
+        
+        # Check for risk
+        if signin.get('riskLevelDuringSignIn') in ['medium', 'high']:
+            user_activities[user_upn]['risk_events'] += 1
+        
+        # Track last signin time
+        signin_time = signin.get('createdDateTime')
+        if signin_time:
+            if not user_activities[user_upn]['last_signin'] or signin_time > user_activities[user_upn]['last_signin']:
+                user_activities[user_upn]['last_signin'] = signin_time
+    
+    # Generate report records
+    for user in users:
+        user_upn = user.get('userPrincipalName', '')
+        display_name = user.get('displayName', '')
+        department = user.get('department', '不明')
+        
+        activity = user_activities.get(user_upn, {
+            'signin_count': 0,
+            'successful_signin': 0,
+            'failed_signin': 0,
+            'risk_events': 0,
+            'last_signin': None
+        })
+        
+        # Determine security status
+        security_risk = "正常"
+        if activity['risk_events'] > 0:
+            security_risk = "⚠️ 高リスク"
+        elif activity['failed_signin'] > 5:
+            security_risk = "⚠️ 注意"
+        elif activity['signin_count'] == 0:
+            security_risk = "✗ 非アクティブ"
+        
+        # Skip inactive users if not requested
+        if not include_inactive and activity['signin_count'] == 0:
+            continue
+        
+        # Skip non-security data if security only
+        if security_only and security_risk == "正常":
+            continue
+        
+        report_record = {
+            'ユーザー名': display_name,
+            'ユーザープリンシパル名': user_upn,
+            '部署': department,
+            'サインイン回数': activity['signin_count'],
+            '成功回数': activity['successful_signin'],
+            '失敗回数': activity['failed_signin'],
+            'リスクイベント': activity['risk_events'],
+            '最終サインイン': activity['last_signin'] or 'なし',
+            'セキュリティリスク': security_risk,
+            'アカウント状態': user.get('accountEnabled', True) and '有効' or '無効',
+            'レポート日': target_date.strftime('%Y-%m-%d')
+        }
+        
+        report_data.append(report_record)
+    
+    return report_data
 
 def _generate_sample_daily_data(target_date: datetime, include_inactive: bool) -> List[Dict[str, Any]]:
     """Generate sample daily report data for testing"""
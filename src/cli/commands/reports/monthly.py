@@ -4,8 +4,10 @@
 import click
 import asyncio
 from datetime import datetime, timedelta
+from functools import partial
 from typing import List, Dict, Any
 
+from src.api.graph.report_composer import ReportComposer, ReportSection
 from src.cli.core.context import CLIContext
 from src.cli.core.output import OutputFormatter
 
@@ -104,77 +106,92 @@ async def _generate_monthly_report_data(context: CLIContext,
         else:
             end_date = datetime(target_month.year, target_month.month + 1, 1) - timedelta(days=1)
         
-        # Get service usage data
-        usage_data = await graph_client.get_monthly_service_usage(
-            start_date.strftime('%Y-%m-%d'),
-            end_date.strftime('%Y-%m-%d')
-        )
-        
-        # Get user details
-        users_data = await graph_client.get_users()
-        
-        report_data = []
-        
-        for user in users_data:
-            upn = user.get('userPrincipalName', '')
-            display_name = user.get('displayName', '')
-            dept = user.get('department', '不明')
-            
-            # Get usage for this user
-            user_usage = usage_data.get(upn, {})
-            
-            # Service-specific data
-            exchange_usage = user_usage.get('exchange', {})
-            teams_usage = user_usage.get('teams', {})
-            onedrive_usage = user_usage.get('onedrive', {})
-            
-            # Filter by service if specified
-            if service_filter != 'all':
-                if service_filter == 'exchange' and not exchange_usage:
-                    continue
-                elif service_filter == 'teams' and not teams_usage:
-                    continue
-                elif service_filter == 'onedrive' and not onedrive_usage:
-                    continue
-            
-            # Calculate activity score
-            activity_score = 0
-            if exchange_usage.get('emailsReceived', 0) > 0:
-                activity_score += 30
-            if teams_usage.get('meetingsAttended', 0) > 0:
-                activity_score += 35
-            if onedrive_usage.get('filesAccessed', 0) > 0:
-                activity_score += 35
-            
-            utilization_level = "低"
-            if activity_score >= 70:
-                utilization_level = "高"
-            elif activity_score >= 40:
-                utilization_level = "中"
-            
-            record = {
-                'ユーザー名': display_name,
-                'ユーザープリンシパル名': upn,
-                '部署': dept,
-                '対象月': target_month.strftime('%Y-%m'),
-                'Exchange使用': exchange_usage.get('emailsReceived', 0),
-                'Teams使用': teams_usage.get('meetingsAttended', 0),
-                'OneDrive使用': onedrive_usage.get('filesAccessed', 0),
-                '活動スコア': activity_score,
-                '利用レベル': utilization_level,
-                '最終アクセス': user_usage.get('lastActivity', 'なし'),
-                'ライセンス': user.get('assignedLicenses', [{}])[0].get('skuPartNumber', '未割り当て') if user.get('assignedLicenses') else '未割り当て'
-            }
-            
-            report_data.append(record)
+        # Service usage and users are fetched concurrently
+        composer = ReportComposer({
+            'usage': lambda: graph_client.get_monthly_service_usage(
+                start_date.strftime('%Y-%m-%d'),
+                end_date.strftime('%Y-%m-%d')
+            ),
+            'users': lambda: graph_client.get_users(),
+        })
+        result = await composer.compose_async([
+            ReportSection('monthly', ('usage', 'users'), partial(
+                _build_monthly_records,
+                target_month=target_month,
+                service_filter=service_filter
+            ))
+        ])
         
-        return report_data
+        return result.get('monthly')
         
     except Exception as e:
         output = OutputFormatter(context)
         output.output_warning(f"APIアクセスに失敗しました、サンプルデータを使用します: {e}")
         return _generate_sample_monthly_data(target_month, service_filter)
 
+def _build_monthly_records(usage: Dict[str, Dict[str, Any]],
+                           users: List[Dict[str, Any]],
+                           target_month: datetime,
+                           service_filter: str) -> List[Dict[str, Any]]:
+    """Combine users and monthly service usage into report records"""
+    
+    report_data = []
+    
+    for user in users:
+        upn = user.get('userPrincipalName', '')
+        display_name = user.get('displayName', '')
+        dept = user.get('department', '不明')
+        
+        # Get usage for this user
+        user_usage = usage.get(upn, {})
+        
+        # Service-specific data
+        exchange_usage = user_usage.get('exchange', {})
+        teams_usage = user_usage.get('teams', {})
+        onedrive_usage = user_usage.get('onedrive', {})
+        
+        # Filter by service if specified
+        if service_filter != 'all':
+            if service_filter == 'exchange' and not exchange_usage:
+                continue
+            elif service_filter == 'teams' and not teams_usage:
+                continue
+            elif service_filter == 'onedrive' and not onedrive_usage:
+                continue
+        
+        # Calculate activity score
+        activity_score = 0
+        if exchange_usage.get('emailsReceived', 0) > 0:
+            activity_score += 30
+        if teams_usage.get('meetingsAttended', 0) > 0:
+            activity_score += 35
+        if onedrive_usage.get('filesAccessed', 0) > 0:
+            activity_score += 35
+        
+        utilization_level = "低"
+        if activity_score >= 70:
+            utilization_level = "高"
+        elif activity_score >= 40:
+            utilization_level = "中"
+        
+        record = {
+            'ユーザー名': display_name,
+            'ユーザープリンシパル名': upn,
+            '部署': dept,
+            '対象月': target_month.strftime('%Y-%m'),
+            'Exchange使用': exchange_usage.get('emailsReceived', 0),
+            'Teams使用': teams_usage.get('meetingsAttended', 0),
+            'OneDrive使用': onedrive_usage.get('filesAccessed', 0),
+            '活動スコア': activity_score,
+            '利用レベル': utilization_level,
+            '最終アクセス': user_usage.get('lastActivity', 'なし'),
+            'ライセンス': user.get('assignedLicenses', [{}])[0].get('skuPartNumber', '未割り当て') if user.get('assignedLicenses') else '未割り当て'
+        }
+        
+        report_data.append(record)
+    
+    return report_data
+
 def _generate_sample_monthly_data(target_month: datetime, service_filter: str) -> List[Dict[str, Any]]:
     """Generate sample monthly report data"""
     
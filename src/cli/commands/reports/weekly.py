@@ -4,8 +4,10 @@
 import click
 import asyncio
 from datetime import datetime, timedelta
+from functools import partial
 from typing import List, Dict, Any
 
+from src.api.graph.report_composer import ReportComposer, ReportSection
 from src.cli.core.context import CLIContext
 from src.cli.core.output import OutputFormatter
 
@@ -93,70 +95,86 @@ async def _generate_weekly_report_data(context: CLIContext,
         
         output = OutputFormatter(context)
         
-        # Get weekly data
+        # Users and weekly activity are fetched concurrently
         output.output_progress("週次アクティビティデータを取得中...")
         
-        # Users with MFA status
-        users_data = await graph_client.get_users_with_mfa_status()
-        
-        # Activity data for the week
-        activity_data = await graph_client.get_weekly_activity(
-            start_date.strftime('%Y-%m-%d'),
-            end_date.strftime('%Y-%m-%d')
-        )
-        
-        report_data = []
-        
-        for user in users_data:
-            upn = user.get('userPrincipalName', '')
-            display_name = user.get('displayName', '')
-            dept = user.get('department', '不明')
-            
-            # Filter by department if specified
-            if department_filter and dept.lower() != department_filter.lower():
-                continue
-            
-            # Get activity for this user
-            user_activity = activity_data.get(upn, {})
-            
-            # MFA status
-            mfa_status = user.get('mfaEnabled', False)
-            mfa_methods = user.get('mfaMethods', [])
-            
-            # Weekly activity metrics
-            total_logins = user_activity.get('loginCount', 0)
-            unique_apps = len(user_activity.get('applicationsUsed', []))
-            last_activity = user_activity.get('lastActivity')
-            
-            # Risk assessment
-            risk_level = "低"
-            if not mfa_status:
-                risk_level = "高"
-            elif total_logins == 0:
-                risk_level = "中"
-            
-            record = {
-                'ユーザー名': display_name,
-                'ユーザープリンシパル名': upn,
-                '部署': dept,
-                '週次ログイン回数': total_logins,
-                '使用アプリ数': unique_apps,
-                'MFA状態': mfa_status and 'enabled' or 'disabled',
-                'MFA方法': ', '.join(mfa_methods) if mfa_methods else 'なし',
-                '最終アクティビティ': last_activity or 'なし',
-                'リスクレベル': risk_level,
-                '期間': f"{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}"
-            }
-            
-            report_data.append(record)
-        
-        return report_data
+        composer = ReportComposer({
+            'users': lambda: graph_client.get_users_with_mfa_status(),
+            'activity': lambda: graph_client.get_weekly_activity(
+                start_date.strftime('%Y-%m-%d'),
+                end_date.strftime('%Y-%m-%d')
+            ),
+        })
+        result = await composer.compose_async([
+            ReportSection('weekly', ('users', 'activity'), partial(
+                _build_weekly_records,
+                start_date=start_date,
+                end_date=end_date,
+                department_filter=department_filter
+            ))
+        ])
+        
+        return result.get('weekly')
         
     except Exception as e:
         output = OutputFormatter(context)
         output.output_warning(f"APIアクセスに失敗しました、サンプルデータを使用します: {e}")
         return _generate_sample_weekly_data(start_date, end_date, department_filter)
 
+def _build_weekly_records(users: List[Dict[str, Any]],
+                          activity: Dict[str, Dict[str, Any]],
+                          start_date: datetime,
+                          end_date: datetime,
+                          department_filter: str) -> List[Dict[str, Any]]:
+    """Combine users with MFA status and weekly activity into report records"""
+    
+    report_data = []
+    
+    for user in users:
+        upn = user.get('userPrincipalName', '')
+        display_name = user.get('displayName', '')
+        dept = user.get('department', '不明')
+        
+        # Filter by department if specified
+        if department_filter and dept.lower() != department_filter.lower():
+            continue
+        
+        # Get activity for this user
+        user_activity = activity.get(upn, {})
+        
+        # MFA status
+        mfa_status = user.get('mfaEnabled', False)
+        mfa_methods = user.get('mfaMethods', [])
+        
+        # Weekly activity metrics
+        total_logins = user_activity.get('loginCount', 0)
+        unique_apps = len(user_activity.get('applicationsUsed', []))
+        last_activity = user_activity.get('lastActivity')
+        
+        # Risk assessment
+        risk_level = "低"
+        if not mfa_status:
+            risk_level = "高"
+        elif total_logins == 0:
+            risk_level = "中"
+        
+        record = {
+            'ユーザー名': display_name,
+            'ユーザープリンシパル名': upn,
+            '部署': dept,
+            '週次ログイン回数': total_logins,
+            '使用アプリ数': unique_apps,
+            'MFA状態': mfa_status and 'enabled' or 'disabled',
+            'MFA方法': ', '.join(mfa_methods) if mfa_methods else 'なし',
+            '最終アクティビティ': last_activity or 'なし',
+            'リスクレベル': risk_level,
+            '期間': f"{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}"
+        }
+        
+        report_data.append(record)
+    
+    return report_data
+
 def _generate_sample_weekly_data(start_date: datetime, end_date: datetime, department_filter: str) -> List[Dict[str, Any]]:
     """Generate sample weekly report data"""
     
@@ -4,8 +4,10 @@
 import click
 import asyncio
 from datetime import datetime, timedelta
+from functools import partial
 from typing import List, Dict, Any
 
+from src.api.graph.report_composer import ReportComposer, ReportSection
 from src.cli.core.context import CLIContext
 from src.cli.core.output import OutputFormatter
 
@@ -97,70 +99,77 @@ async def _generate_yearly_report_data(context: CLIContext,
         start_date = target_year
         end_date = datetime(target_year.year + 1, 1, 1) - timedelta(days=1)
         
-        # Get comprehensive yearly data
-        yearly_stats = await graph_client.get_yearly_statistics(
-            start_date.strftime('%Y-%m-%d'),
-            end_date.strftime('%Y-%m-%d')
-        )
-        
-        # Get incident data
-        incidents = await graph_client.get_security_incidents(
-            start_date.strftime('%Y-%m-%d'),
-            end_date.strftime('%Y-%m-%d')
-        )
-        
-        # Get license information
-        license_data = await graph_client.get_license_statistics()
+        # Yearly statistics and incidents are fetched concurrently
+        period = (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        composer = ReportComposer({
+            'stats': lambda: graph_client.get_yearly_statistics(*period),
+            'incidents': lambda: graph_client.get_security_incidents(*period),
+        })
+        result = await composer.compose_async([
+            ReportSection('yearly', ('stats', 'incidents'), partial(
+                _build_yearly_records,
+                target_year=target_year,
+                cost_analysis=cost_analysis
+            ))
+        ])
         
-        report_data = []
-        
-        # Monthly breakdown
-        for month in range(1, 13):
-            month_date = datetime(target_year.year, month, 1)
-            month_stats = yearly_stats.get(f"{target_year.year}-{month:02d}", {})
-            
-            # Calculate monthly metrics
-            active_users = month_stats.get('activeUsers', 0)
-            total_logins = month_stats.get('totalLogins', 0)
-            security_incidents = len([i for i in incidents if i.get('month') == month])
-            
-            # Service adoption
-            exchange_adoption = month_stats.get('exchangeAdoption', 0.0)
-            teams_adoption = month_stats.get('teamsAdoption', 0.0)
-            onedrive_adoption = month_stats.get('onedriveAdoption', 0.0)
-            
-            # Compliance score
-            compliance_score = month_stats.get('complianceScore', 85.0)
-            
-            record = {
-                '年': target_year.year,
-                '月': month,
-                '月名': month_date.strftime('%B'),
-                'アクティブユーザー数': active_users,
-                '総ログイン回数': total_logins,
-                'セキュリティインシデント': security_incidents,
-                'Exchange導入率': f"{exchange_adoption:.1f}%",
-                'Teams導入率': f"{teams_adoption:.1f}%",
-                'OneDrive導入率': f"{onedrive_adoption:.1f}%",
-                'コンプライアンススコア': f"{compliance_score:.1f}%",
-                'ライセンス使用率': f"{month_stats.get('licenseUtilization', 75.0):.1f}%"
-            }
-            
-            if cost_analysis:
-                monthly_cost = month_stats.get('monthlyCost', 5000.0)
-                cost_per_user = monthly_cost / max(active_users, 1)
-                record['月次コスト'] = f"${monthly_cost:,.2f}"
-                record['ユーザーあたりコスト'] = f"${cost_per_user:.2f}"
-            
-            report_data.append(record)
-        
-        return report_data
+        return result.get('yearly')
         
     except Exception as e:
         output = OutputFormatter(context)
         output.output_warning(f"APIアクセスに失敗しました、サンプルデータを使用します: {e}")
         return _generate_sample_yearly_data(target_year)
 
+def _build_yearly_records(stats: Dict[str, Dict[str, Any]],
+                          incidents: List[Dict[str, Any]],
+                          target_year: datetime,
+                          cost_analysis: bool) -> List[Dict[str, Any]]:
+    """Build the monthly breakdown from yearly statistics and incidents"""
+    
+    report_data = []
+    
+    # Monthly breakdown
+    for month in range(1, 13):
+        month_date = datetime(target_year.year, month, 1)
+        month_stats = stats.get(f"{target_year.year}-{month:02d}", {})
+        
+        # Calculate monthly metrics
+        active_users = month_stats.get('activeUsers', 0)
+        total_logins = month_stats.get('totalLogins', 0)
+        security_incidents = len([i for i in incidents if i.get('month') == month])
+        
+        # Service adoption
+        exchange_adoption = month_stats.get('exchangeAdoption', 0.0)
+        teams_adoption = month_stats.get('teamsAdoption', 0.0)
+        onedrive_adoption = month_stats.get('onedriveAdoption', 0.0)
+        
+        # Compliance score
+        compliance_score = month_stats.get('complianceScore', 85.0)
+        
+        record = {
+            '年': target_year.year,
+            '月': month,
+            '月名': month_date.strftime('%B'),
+            'アクティブユーザー数': active_users,
+            '総ログイン回数': total_logins,
+            'セキュリティインシデント': security_incidents,
+            'Exchange導入率': f"{exchange_adoption:.1f}%",
+            'Teams導入率': f"{teams_adoption:.1f}%",
+            'OneDrive導入率': f"{onedrive_adoption:.1f}%",
+            'コンプライアンススコア': f"{compliance_score:.1f}%",
+            'ライセンス使用率': f"{month_stats.get('licenseUtilization', 75.0):.1f}%"
+        }
+        
+        if cost_analysis:
+            monthly_cost = month_stats.get('monthlyCost', 5000.0)
+            cost_per_user = monthly_cost / max(active_users, 1)
+            record['月次コスト'] = f"${monthly_cost:,.2f}"
+            record['ユーザーあたりコスト'] = f"${cost_per_user:.2f}"
+        
+        report_data.append(record)
+    
+    return report_data
+
 def _generate_sample_yearly_data(target_year: datetime) -> List[Dict[str, Any]]:
     """Generate sample yearly report data"""
     
@@ -0,0 +1,329 @@
+"""
+Audit Hash Chain
+監査イベントのハッシュチェーン・Merkle チェックポイント・範囲検証
+
+Each event row is linked to its predecessor:
+    chain_hash(n) = SHA-256(chain_hash(n-1) : seq : SHA-256(row values))
+and every checkpoint_interval events a Merkle root over the block's chain
+hashes is stored in audit_checkpoints, itself chained to the previous
+checkpoint. Verifying a range only reads the blocks that overlap it plus
+indexed checkpoint lookups.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# audit_events のイベント列 (INSERT / ダイジェスト計算の順序)
+EVENT_COLUMNS = (
+    "event_id", "event_type", "timestamp", "user_id", "user_name", "resource", "action", "result",
+    "severity", "source_ip", "user_agent", "session_id", "details", "compliance_standards",
+    "data_classification", "retention_period", "encrypted", "hash_value"
+)
+
+# チェーン列 (ライターがイベント列の後ろに付与)
+CHAIN_COLUMNS = ("seq", "prev_hash", "chain_hash")
+
+GENESIS_HASH = "0" * 64
+CHECKPOINT_INTERVAL = 1024
+
+# 検証結果に含める問題の上限
+MAX_REPORTED_ISSUES = 100
+
+
+def ensure_chain_schema(conn: sqlite3.Connection):
+    """チェーン列・チェックポイントテーブル作成 (既存 DB は列追加)"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(audit_events)")}
+    for column, column_type in (("seq", "INTEGER"), ("prev_hash", "TEXT"), ("chain_hash", "TEXT")):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE audit_events ADD COLUMN {column} {column_type}")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_seq ON audit_events(seq)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS audit_checkpoints (
+            checkpoint_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            start_seq INTEGER NOT NULL,
+            end_seq INTEGER NOT NULL UNIQUE,
+            merkle_root TEXT NOT NULL,
+            chain_hash TEXT NOT NULL,
+            prev_checkpoint_hash TEXT NOT NULL,
+            checkpoint_hash TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _sha256(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def record_digest(values: Sequence[Any]) -> str:
+    """イベント列の値のダイジェスト"""
+    return _sha256(json.dumps(list(values), ensure_ascii=False, separators=(",", ":"), default=str))
+
+
+def link_hash(prev_hash: str, seq: int, digest: str) -> str:
+    """チェーンハッシュ"""
+    return _sha256(f"{prev_hash}:{seq}:{digest}")
+
+
+def checkpoint_hash(prev_checkpoint_hash: str, start_seq: int, end_seq: int,
+                    merkle_root_value: str, chain_hash: str) -> str:
+    """チェックポイントハッシュ (前チェックポイントと連結)"""
+    return _sha256(f"{prev_checkpoint_hash}:{start_seq}:{end_seq}:{merkle_root_value}:{chain_hash}")
+
+
+def _merkle_parent(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _merkle_leaf(leaf: str) -> str:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(leaf)).hexdigest()
+
+
+def merkle_root(leaves: List[str]) -> str:
+    """Merkle ルート (奇数ノードはそのまま上位へ)"""
+    if not leaves:
+        return GENESIS_HASH
+    level = [_merkle_leaf(leaf) for leaf in leaves]
+    while len(level) > 1:
+        level = [_merkle_parent(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+    return level[0]
+
+
+def merkle_proof(leaves: List[str], index: int) -> List[Tuple[str, str]]:
+    """
+    包含証明
+
+    Returns:
+        (兄弟ノード, "L" / "R") のリスト (葉から根の順)
+    """
+    proof = []
+    level = [_merkle_leaf(leaf) for leaf in leaves]
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((level[sibling], "L" if sibling < index else "R"))
+        level = [_merkle_parent(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf: str, proof: List[Tuple[str, str]], root: str) -> bool:
+    """包含証明の検証 (O(log n))"""
+    node = _merkle_leaf(leaf)
+    for sibling, side in proof:
+        node = _merkle_parent(sibling, node) if side == "L" else _merkle_parent(node, sibling)
+    return node == root
+
+
+class AuditHashChain:
+    """
+    監査ハッシュチェーン
+
+    prepare_batch は AuditEventWriter のフックとして書き込みトランザクション内で
+    呼ばれ、挿入順に seq / prev_hash / chain_hash を付与する。チェーン先頭と
+    未確定ブロックはキャッシュし、DB の先頭と一致しない場合 (ロールバック後など)
+    のみ再読込する。
+    """
+
+    def __init__(self, checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        """
+        Args:
+            checkpoint_interval: チェックポイント間隔（イベント数）
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be positive")
+        self.checkpoint_interval = checkpoint_interval
+        self._head: Optional[Tuple[int, str]] = None
+        self._block: List[str] = []
+        self._last_checkpoint_hash = GENESIS_HASH
+
+    @staticmethod
+    def _read_head(conn: sqlite3.Connection) -> Tuple[int, str]:
+        row = conn.execute(
+            "SELECT seq, chain_hash FROM audit_events WHERE seq IS NOT NULL ORDER BY seq DESC LIMIT 1"
+        ).fetchone()
+        return (row[0], row[1]) if row else (0, GENESIS_HASH)
+
+    def _reload(self, conn: sqlite3.Connection, head: Tuple[int, str]):
+        """未確定ブロック (最終チェックポイント以降) の再読込"""
+        row = conn.execute(
+            "SELECT end_seq, checkpoint_hash FROM audit_checkpoints ORDER BY end_seq DESC LIMIT 1"
+        ).fetchone()
+        last_end, self._last_checkpoint_hash = row if row else (0, GENESIS_HASH)
+        self._block = [r[0] for r in conn.execute(
+            "SELECT chain_hash FROM audit_events WHERE seq > ? ORDER BY seq", (last_end,))]
+        self._head = head
+
+    def prepare_batch(self, conn: sqlite3.Connection, rows: List[Sequence[Any]]) -> List[Tuple[Any, ...]]:
+        """チェーン列付与・チェックポイント作成 (ライタースレッドで実行)"""
+        head = self._read_head(conn)
+        if head != self._head:
+            self._reload(conn, head)
+
+        seq, prev = head
+        block = list(self._block)
+        checkpoint_hash_value = self._last_checkpoint_hash
+        chained = []
+        for row in rows:
+            seq += 1
+            current = link_hash(prev, seq, record_digest(row))
+            chained.append((*row, seq, prev, current))
+            prev = current
+
+            block.append(current)
+            if len(block) == self.checkpoint_interval:
+                checkpoint_hash_value = self._insert_checkpoint(conn, seq - len(block) + 1, seq,
+                                                                block, checkpoint_hash_value)
+                block = []
+
+        # コミット失敗時は DB 先頭と一致しなくなり次回再読込される
+        self._head = (seq, prev)
+        self._block = block
+        self._last_checkpoint_hash = checkpoint_hash_value
+        return chained
+
+    @staticmethod
+    def _insert_checkpoint(conn: sqlite3.Connection, start_seq: int, end_seq: int,
+                           block: List[str], prev_checkpoint_hash: str) -> str:
+        root = merkle_root(block)
+        current = checkpoint_hash(prev_checkpoint_hash, start_seq, end_seq, root, block[-1])
+        conn.execute('''
+            INSERT INTO audit_checkpoints
+            (start_seq, end_seq, merkle_root, chain_hash, prev_checkpoint_hash, checkpoint_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (start_seq, end_seq, root, block[-1], prev_checkpoint_hash, current))
+        logger.debug(f"Audit checkpoint created for seq {start_seq}-{end_seq}")
+        return current
+
+    def verify_range(self, conn: sqlite3.Connection,
+                     start_time: Optional[str] = None,
+                     end_time: Optional[str] = None) -> Dict[str, Any]:
+        """
+        期間内イベントの完全性検証
+
+        Args:
+            start_time: 開始時刻 (ISO 形式、None は先頭から)
+            end_time: 終了時刻 (ISO 形式、None は末尾まで)
+        """
+        query = "SELECT MIN(seq), MAX(seq) FROM audit_events WHERE seq IS NOT NULL"
+        params: List[Any] = []
+        if start_time:
+            query += " AND timestamp >= ?"
+            params.append(start_time)
+        if end_time:
+            query += " AND timestamp <= ?"
+            params.append(end_time)
+        first, last = conn.execute(query, params).fetchone()
+        if first is None:
+            return self._result(None, None, 0, 0, 0, [])
+        return self.verify_seq_range(conn, first, last)
+
+    def verify_seq_range(self, conn: sqlite3.Connection, first: int, last: int) -> Dict[str, Any]:
+        """
+        seq 範囲の完全性検証
+
+        範囲を含むチェックポイントブロック単位で読み込み、チェーンの連結・
+        行ダイジェスト・Merkle ルート・チェックポイント連結を検証する。
+        全体の最小 seq より前の欠番はアーカイブ済みとして扱う。
+        """
+        interval = self.checkpoint_interval
+        lo = (first - 1) // interval * interval + 1
+        hi = (last - 1) // interval * interval + interval
+        oldest_seq = conn.execute("SELECT MIN(seq) FROM audit_events").fetchone()[0] or lo
+
+        anchor = conn.execute(
+            "SELECT chain_hash, checkpoint_hash FROM audit_checkpoints WHERE end_seq = ?", (lo - 1,)
+        ).fetchone()
+        prev_hash, prev_checkpoint_hash = anchor if anchor else (GENESIS_HASH, GENESIS_HASH)
+        issues: List[Dict[str, Any]] = []
+        if lo > 1 and not anchor:
+            prev_hash = prev_checkpoint_hash = None
+            issues.append({'seq': lo - 1, 'problem': 'checkpoint_missing'})
+
+        checkpoints = {row[1]: row for row in conn.execute('''
+            SELECT start_seq, end_seq, merkle_root, chain_hash, prev_checkpoint_hash, checkpoint_hash
+            FROM audit_checkpoints WHERE end_seq BETWEEN ? AND ? ORDER BY end_seq
+        ''', (lo, hi))}
+
+        columns = ", ".join(EVENT_COLUMNS + CHAIN_COLUMNS)
+        cursor = conn.execute(
+            f"SELECT {columns} FROM audit_events WHERE seq BETWEEN ? AND ? ORDER BY seq", (lo, hi))
+
+        events_checked = archived = checkpoints_checked = 0
+        expected = lo
+        block: List[str] = []
+        block_complete = True
+        width = len(EVENT_COLUMNS)
+
+        def close_block(end_seq: int):
+            nonlocal block, block_complete, prev_checkpoint_hash, checkpoints_checked
+            checkpoint = checkpoints.get(end_seq)
+            if checkpoint:
+                checkpoints_checked += 1
+                start_seq, _, root, chain_hash, linked_hash, stored_hash = checkpoint
+                if prev_checkpoint_hash is not None and linked_hash != prev_checkpoint_hash:
+                    issues.append({'seq': end_seq, 'problem': 'checkpoint_link_broken'})
+                if stored_hash != checkpoint_hash(linked_hash, start_seq, end_seq, root, chain_hash):
+                    issues.append({'seq': end_seq, 'problem': 'checkpoint_modified'})
+                if block_complete and (merkle_root(block) != root or block[-1] != chain_hash):
+                    issues.append({'seq': end_seq, 'problem': 'merkle_root_mismatch'})
+                prev_checkpoint_hash = stored_hash
+            else:
+                issues.append({'seq': end_seq, 'problem': 'checkpoint_missing'})
+                prev_checkpoint_hash = None
+            block, block_complete = [], True
+
+        for row in cursor:
+            values, (seq, row_prev_hash, row_chain_hash) = row[:width], row[width:]
+            while expected < seq:
+                # 欠番 (ブロック境界をまたぐ場合はブロックを確定)
+                if expected < oldest_seq:
+                    archived += 1
+                else:
+                    issues.append({'seq': expected, 'problem': 'missing'})
+                block_complete = False
+                prev_hash = None
+                if expected % interval == 0:
+                    close_block(expected)
+                expected += 1
+
+            if prev_hash is not None and row_prev_hash != prev_hash:
+                issues.append({'seq': seq, 'problem': 'broken_link'})
+            if link_hash(row_prev_hash, seq, record_digest(values)) != row_chain_hash:
+                issues.append({'seq': seq, 'problem': 'modified'})
+
+            events_checked += 1
+            block.append(row_chain_hash)
+            prev_hash = row_chain_hash
+            expected = seq + 1
+            if seq % interval == 0:
+                close_block(seq)
+
+        # チェックポイントがあるのに末尾の行が無い場合 (末尾削除)
+        for end_seq in checkpoints:
+            if end_seq >= expected:
+                issues.append({'seq': end_seq, 'problem': 'missing'})
+
+        return self._result(lo, expected - 1, events_checked, checkpoints_checked, archived, issues)
+
+    @staticmethod
+    def _result(first: Optional[int], last: Optional[int], events_checked: int,
+                checkpoints_checked: int, archived: int, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            'verified': not issues,
+            'first_seq': first,
+            'last_seq': last,
+            'events_checked': events_checked,
+            'checkpoints_checked': checkpoints_checked,
+            'archived_events': archived,
+            'issue_count': len(issues),
+            'issues': issues[:MAX_REPORTED_ISSUES]
+        }
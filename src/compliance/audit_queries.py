@@ -0,0 +1,137 @@
+"""
+Audit Queries
+コンプライアンス標準の正規化テーブル・SQL 集計
+
+compliance_standards is stored on audit_events as a JSON array for
+display; audit_event_standards holds one (standard, timestamp, event_id)
+row per standard so reports filter with an index range scan and count with
+GROUP BY instead of LIKE matching and Python-side loops.
+"""
+
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.compliance.audit_chain import EVENT_COLUMNS
+
+_EVENT_ID = EVENT_COLUMNS.index("event_id")
+_TIMESTAMP = EVENT_COLUMNS.index("timestamp")
+_STANDARDS = EVENT_COLUMNS.index("compliance_standards")
+
+INSERT_EVENT_STANDARD_SQL = (
+    "INSERT OR IGNORE INTO audit_event_standards (standard, timestamp, event_id) VALUES (?, ?, ?)"
+)
+
+# 違反として扱う重要度
+VIOLATION_SEVERITIES = ("high", "critical")
+
+
+def ensure_standards_schema(conn: sqlite3.Connection):
+    """標準別テーブル作成 (新規作成時は既存イベントから移行)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_event_standards'"
+    ).fetchone()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS audit_event_standards (
+            standard TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            event_id TEXT NOT NULL,
+            PRIMARY KEY (standard, timestamp, event_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_event_standards_event ON audit_event_standards(event_id)')
+    if not exists:
+        conn.execute('''
+            INSERT OR IGNORE INTO audit_event_standards (standard, timestamp, event_id)
+            SELECT j.value, e.timestamp, e.event_id
+            FROM audit_events e, json_each(e.compliance_standards) j
+            WHERE json_valid(e.compliance_standards)
+        ''')
+
+
+def standards_rows(rows: Sequence[Sequence[Any]]) -> List[Tuple[str, str, str]]:
+    """イベント行 (EVENT_COLUMNS 順) -> audit_event_standards 行"""
+    return [
+        (standard, row[_TIMESTAMP], row[_EVENT_ID])
+        for row in rows if row[_STANDARDS]
+        for standard in json.loads(row[_STANDARDS])
+    ]
+
+
+def _standard_filter(standard: str, start_time: Optional[str], end_time: Optional[str]) -> Tuple[str, List[Any]]:
+    clause = "s.standard = ?"
+    params: List[Any] = [standard]
+    if start_time:
+        clause += " AND s.timestamp >= ?"
+        params.append(start_time)
+    if end_time:
+        clause += " AND s.timestamp <= ?"
+        params.append(end_time)
+    return clause, params
+
+
+def compliance_counts(conn: sqlite3.Connection, standard: str,
+                      start_time: Optional[str] = None,
+                      end_time: Optional[str] = None) -> Dict[str, Any]:
+    """
+    標準別の件数集計 (種別・重要度・日別)
+
+    1 回の GROUP BY で集計するため、メモリ使用量は期間内イベント数ではなく
+    グループ数に比例する。
+    """
+    clause, params = _standard_filter(standard, start_time, end_time)
+    cursor = conn.execute(f'''
+        SELECT e.event_type, e.severity, substr(s.timestamp, 1, 10) AS day, COUNT(*)
+        FROM audit_event_standards s
+        JOIN audit_events e ON e.event_id = s.event_id
+        WHERE {clause}
+        GROUP BY e.event_type, e.severity, day
+    ''', params)
+
+    total = violations = 0
+    by_type: Dict[str, int] = {}
+    by_severity: Dict[str, int] = {}
+    by_day: Dict[str, int] = {}
+    for event_type, severity, day, count in cursor:
+        total += count
+        if severity in VIOLATION_SEVERITIES:
+            violations += count
+        by_type[event_type] = by_type.get(event_type, 0) + count
+        by_severity[severity] = by_severity.get(severity, 0) + count
+        by_day[day] = by_day.get(day, 0) + count
+
+    return {
+        'total_events': total,
+        'total_violations': violations,
+        'events_by_type': by_type,
+        'events_by_severity': by_severity,
+        'events_by_day': dict(sorted(by_day.items()))
+    }
+
+
+def recent_violations(conn: sqlite3.Connection, standard: str,
+                      start_time: Optional[str] = None,
+                      end_time: Optional[str] = None,
+                      limit: int = 100) -> List[Dict[str, Any]]:
+    """標準別の違反イベント (新しい順)"""
+    clause, params = _standard_filter(standard, start_time, end_time)
+    placeholders = ", ".join("?" for _ in VIOLATION_SEVERITIES)
+    cursor = conn.execute(f'''
+        SELECT e.event_id, e.timestamp, e.user_id, e.resource, e.action, e.severity
+        FROM audit_event_standards s
+        JOIN audit_events e ON e.event_id = s.event_id
+        WHERE {clause} AND e.severity IN ({placeholders})
+        ORDER BY s.timestamp DESC
+        LIMIT ?
+    ''', [*params, *VIOLATION_SEVERITIES, limit])
+    return [
+        {
+            'event_id': event_id,
+            'timestamp': timestamp,
+            'user_id': user_id,
+            'resource': resource,
+            'action': action,
+            'severity': severity
+        }
+        for event_id, timestamp, user_id, resource, action, severity in cursor
+    ]
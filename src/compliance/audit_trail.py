@@ -30,12 +30,28 @@ from contextlib import contextmanager
 from azure.storage.blob import BlobServiceClient
 from azure.identity import DefaultAzureCredential
 
+# Audit writer
+from src.compliance.audit_writer import AuditEventWriter
+from src.compliance.audit_chain import (
+    AuditHashChain, EVENT_COLUMNS, CHAIN_COLUMNS, CHECKPOINT_INTERVAL, ensure_chain_schema
+)
+from src.compliance.audit_queries import (
+    INSERT_EVENT_STANDARD_SQL, compliance_counts, ensure_standards_schema, recent_violations, standards_rows
+)
+from src.compliance.rule_compiler import CompiledRuleIndex, RuleSyntaxError, compile_condition
+
 # Monitoring integration
 from src.monitoring.azure_monitor_integration import AzureMonitorIntegration
 from src.auth.azure_key_vault_auth import AzureKeyVaultAuth
 
 logger = logging.getLogger(__name__)
 
+# 監査イベント INSERT (ライターが executemany で使用、チェーン列はライターが付与)
+INSERT_EVENT_SQL = (
+    f"INSERT INTO audit_events ({', '.join(EVENT_COLUMNS + CHAIN_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(EVENT_COLUMNS + CHAIN_COLUMNS))})"
+)
+
 
 class AuditEventType(Enum):
     """監査イベントタイプ"""
@@ -131,6 +147,10 @@ class AuditEvent:
         return cls(**data)
 
 
+# ルール条件で参照可能なフィールド
+RULE_CONDITION_FIELDS = frozenset(AuditEvent.__dataclass_fields__)
+
+
 @dataclass
 class ComplianceRule:
     """コンプライアンスルール"""
@@ -173,7 +193,10 @@ class AuditTrailSystem:
                  key_vault_auth: Optional[AzureKeyVaultAuth] = None,
                  enable_real_time_monitoring: bool = True,
                  batch_size: int = 100,
-                 flush_interval: int = 60):
+                 flush_interval: int = 60,
+                 max_pending_events: int = 100000,
+                 block_on_full: bool = False,
+                 checkpoint_interval: int = CHECKPOINT_INTERVAL):
         """
         Initialize Audit Trail System
         
@@ -187,6 +210,9 @@ class AuditTrailSystem:
             enable_real_time_monitoring: リアルタイム監視
             batch_size: バッチサイズ
             flush_interval: フラッシュ間隔（秒）
+            max_pending_events: 未書き込みイベントの上限
+            block_on_full: 上限到達時に log_event を待機させる (False なら破棄)
+            checkpoint_interval: Merkle チェックポイント間隔（イベント数）
         """
         self.db_path = Path(db_path)
         self.archive_path = Path(archive_path)
@@ -209,14 +235,25 @@ class AuditTrailSystem:
         
         # コンプライアンスルール
         self.compliance_rules: Dict[str, ComplianceRule] = {}
+        self.compiled_rules = CompiledRuleIndex()
         self.retention_policies: Dict[str, RetentionPolicy] = {}
         
-        # バッファリング
-        self.event_buffer: List[AuditEvent] = []
-        self.buffer_lock = threading.Lock()
+        # ハッシュチェーン (挿入順にライタースレッドで連結)
+        self.hash_chain = AuditHashChain(checkpoint_interval)
+        
+        # 書き込み専用ライター (ダブルバッファ・永続 WAL 接続)
+        self.writer = AuditEventWriter(
+            self.db_path,
+            INSERT_EVENT_SQL,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_pending=max_pending_events,
+            block_on_full=block_on_full,
+            prepare_batch=self._prepare_batch
+        )
+        self.writer.start()
         
         # バックグラウンド処理
-        self.flush_thread: Optional[threading.Thread] = None
         self.archive_thread: Optional[threading.Thread] = None
         self.running = False
         
@@ -357,6 +394,12 @@ class AuditTrailSystem:
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_severity ON audit_events(severity)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_compliance ON audit_events(compliance_standards)')
                 
+                # ハッシュチェーン列・チェックポイントテーブル
+                ensure_chain_schema(conn)
+                
+                # コンプライアンス標準の正規化テーブル
+                ensure_standards_schema(conn)
+                
                 conn.commit()
                 
             logger.info("Audit database initialized successfully")
@@ -470,6 +513,13 @@ class AuditTrailSystem:
         """コンプライアンスルール追加"""
         self.compliance_rules[rule.rule_id] = rule
         
+        # 条件は追加時に一度だけコンパイル (不正な条件のルールは評価対象外)
+        try:
+            self.compiled_rules.add(rule.rule_id, rule, compile_condition(rule.condition, RULE_CONDITION_FIELDS))
+        except RuleSyntaxError as e:
+            self.compiled_rules.remove(rule.rule_id)
+            logger.error(f"Invalid condition in compliance rule {rule.rule_id}: {str(e)}")
+        
         # データベースに保存
         try:
             with sqlite3.connect(str(self.db_path)) as conn:
@@ -540,13 +590,10 @@ class AuditTrailSystem:
             # コンプライアンスチェック
             self._check_compliance(event)
             
-            # バッファに追加
-            with self.buffer_lock:
-                self.event_buffer.append(event)
-                
-                # バッファサイズチェック
-                if len(self.event_buffer) >= self.batch_size:
-                    self._flush_buffer()
+            # ライターに追加 (書き込みはライタースレッドが実施)
+            if not self.writer.submit(self._event_row(event)):
+                logger.warning(f"Audit event dropped (writer backlog full): {event.event_id}")
+                return
             
             # 統計更新
             self.stats['total_events'] += 1
@@ -565,12 +612,12 @@ class AuditTrailSystem:
     def _check_compliance(self, event: AuditEvent):
         """コンプライアンスチェック"""
         try:
-            for rule_id, rule in self.compliance_rules.items():
+            # event_type で絞り込んだルールのみ評価
+            for rule, condition in self.compiled_rules.candidates(event.event_type.value):
                 if not rule.enabled:
                     continue
                 
-                # 条件チェック（簡易実装）
-                if self._evaluate_condition(rule.condition, event):
+                if condition(event):
                     # コンプライアンス標準追加
                     if rule.standard not in event.compliance_standards:
                         event.compliance_standards.append(rule.standard)
@@ -591,38 +638,6 @@ class AuditTrailSystem:
         except Exception as e:
             logger.error(f"Compliance check failed: {str(e)}")
     
-    def _evaluate_condition(self, condition: str, event: AuditEvent) -> bool:
-        """条件評価（簡易実装）"""
-        try:
-            # 基本的な条件評価
-            if "event_type IN" in condition:
-                # event_type IN ('login', 'logout', 'access')
-                import re
-                match = re.search(r"event_type IN \('([^']+)'(?:, '([^']+)')*\)", condition)
-                if match:
-                    types = [match.group(1)]
-                    if match.group(2):
-                        types.append(match.group(2))
-                    return event.event_type.value in types
-            
-            elif "resource LIKE" in condition:
-                # resource LIKE '%financial%'
-                import re
-                match = re.search(r"resource LIKE '([^']+)'", condition)
-                if match:
-                    pattern = match.group(1).replace('%', '.*')
-                    return re.search(pattern, event.resource, re.IGNORECASE) is not None
-            
-            elif "data_classification" in condition:
-                # data_classification = 'personal'
-                return event.data_classification in condition
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Condition evaluation failed: {str(e)}")
-            return False
-    
     def _execute_compliance_action(self, rule: ComplianceRule, event: AuditEvent):
         """コンプライアンスアクション実行"""
         try:
@@ -684,7 +699,7 @@ class AuditTrailSystem:
         try:
             # 高重要度イベントの即座処理
             if event.severity in [AuditSeverity.HIGH, AuditSeverity.CRITICAL]:
-                self._flush_buffer()
+                self.writer.request_flush()
             
             # Azure Monitor統合
             if self.azure_monitor:
@@ -700,62 +715,41 @@ class AuditTrailSystem:
         except Exception as e:
             logger.error(f"Real-time monitoring failed: {str(e)}")
     
-    def _flush_buffer(self):
-        """バッファフラッシュ"""
-        try:
-            if not self.event_buffer:
-                return
-            
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                
-                for event in self.event_buffer:
-                    cursor.execute('''
-                        INSERT INTO audit_events
-                        (event_id, event_type, timestamp, user_id, user_name, resource, action, result,
-                         severity, source_ip, user_agent, session_id, details, compliance_standards,
-                         data_classification, retention_period, encrypted, hash_value)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        event.event_id,
-                        event.event_type.value,
-                        event.timestamp.isoformat(),
-                        event.user_id,
-                        event.user_name,
-                        event.resource,
-                        event.action,
-                        event.result,
-                        event.severity.value,
-                        event.source_ip,
-                        event.user_agent,
-                        event.session_id,
-                        json.dumps(event.details),
-                        json.dumps([cs.value for cs in event.compliance_standards]),
-                        event.data_classification,
-                        event.retention_period,
-                        int(event.encrypted),
-                        event.hash_value
-                    ))
-                
-                conn.commit()
-            
-            logger.info(f"Flushed {len(self.event_buffer)} audit events to database")
-            self.event_buffer.clear()
-            self.stats['last_flush'] = datetime.utcnow()
-            
-        except Exception as e:
-            logger.error(f"Failed to flush buffer: {str(e)}")
+    @staticmethod
+    def _event_row(event: AuditEvent) -> tuple:
+        """INSERT_EVENT_SQL のパラメータ"""
+        return (
+            event.event_id,
+            event.event_type.value,
+            event.timestamp.isoformat(),
+            event.user_id,
+            event.user_name,
+            event.resource,
+            event.action,
+            event.result,
+            event.severity.value,
+            event.source_ip,
+            event.user_agent,
+            event.session_id,
+            json.dumps(event.details),
+            json.dumps([cs.value for cs in event.compliance_standards]),
+            event.data_classification,
+            event.retention_period,
+            int(event.encrypted),
+            event.hash_value
+        )
     
-    def _flush_loop(self):
-        """フラッシュループ"""
-        while self.running:
-            try:
-                time.sleep(self.flush_interval)
-                with self.buffer_lock:
-                    if self.event_buffer:
-                        self._flush_buffer()
-            except Exception as e:
-                logger.error(f"Flush loop error: {str(e)}")
+    def _prepare_batch(self, conn: sqlite3.Connection, rows: List[tuple]) -> List[tuple]:
+        """書き込みトランザクション内の前処理 (ハッシュチェーン・標準別テーブル)"""
+        chained = self.hash_chain.prepare_batch(conn, rows)
+        conn.executemany(INSERT_EVENT_STANDARD_SQL, standards_rows(rows))
+        return chained
+    
+    def _flush_buffer(self, timeout: Optional[float] = None) -> bool:
+        """受付済みイベントの書き込み完了まで待機"""
+        flushed = self.writer.flush(timeout)
+        self.stats['last_flush'] = self.writer.stats['last_flush']
+        return flushed
     
     def _archive_old_events(self):
         """古いイベントのアーカイブ"""
@@ -765,11 +759,20 @@ class AuditTrailSystem:
                 
                 # 保持期間を過ぎたイベントを取得
                 cutoff_date = datetime.utcnow() - timedelta(days=365)  # 1年前
-                cursor.execute('''
+                
+                # チェーンの先頭側のみアーカイブ (途中の欠番は改ざんとして検出されるため)
+                cursor.execute('SELECT MIN(seq) FROM audit_events WHERE timestamp >= ?', (cutoff_date.isoformat(),))
+                seq_boundary = cursor.fetchone()[0]
+                if seq_boundary is None:
+                    seq_boundary = (cursor.execute('SELECT MAX(seq) FROM audit_events').fetchone()[0] or 0) + 1
+                archive_condition = 'timestamp < ? AND (seq IS NULL OR seq < ?)'
+                archive_params = (cutoff_date.isoformat(), seq_boundary)
+                
+                cursor.execute(f'''
                     SELECT * FROM audit_events
-                    WHERE timestamp < ?
+                    WHERE {archive_condition}
                     ORDER BY timestamp
-                ''', (cutoff_date.isoformat(),))
+                ''', archive_params)
                 
                 events_to_archive = cursor.fetchall()
                 
@@ -799,7 +802,10 @@ class AuditTrailSystem:
                             'data_classification': event_row[14],
                             'retention_period': event_row[15],
                             'encrypted': event_row[16],
-                            'hash_value': event_row[17]
+                            'hash_value': event_row[17],
+                            'seq': event_row[19],
+                            'prev_hash': event_row[20],
+                            'chain_hash': event_row[21]
                         }
                         archive_data.append(event_dict)
                     
@@ -830,7 +836,11 @@ class AuditTrailSystem:
                             logger.error(f"Failed to upload to Azure Storage: {str(e)}")
                     
                     # データベースから削除
-                    cursor.execute('DELETE FROM audit_events WHERE timestamp < ?', (cutoff_date.isoformat(),))
+                    cursor.execute(f'''
+                        DELETE FROM audit_event_standards
+                        WHERE event_id IN (SELECT event_id FROM audit_events WHERE {archive_condition})
+                    ''', archive_params)
+                    cursor.execute(f'DELETE FROM audit_events WHERE {archive_condition}', archive_params)
                     conn.commit()
                     
                     logger.info(f"Archived {len(events_to_archive)} audit events")
@@ -855,9 +865,8 @@ class AuditTrailSystem:
         
         self.running = True
         
-        # フラッシュスレッド開始
-        self.flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
-        self.flush_thread.start()
+        # ライター開始 (stop 後の再開時)
+        self.writer.start()
         
         # アーカイブスレッド開始
         self.archive_thread = threading.Thread(target=self._archive_loop, daemon=True)
@@ -872,14 +881,11 @@ class AuditTrailSystem:
         
         self.running = False
         
-        # 残バッファをフラッシュ
-        with self.buffer_lock:
-            if self.event_buffer:
-                self._flush_buffer()
+        # 残イベントを書き込んでライター停止
+        self.writer.close(timeout=10)
+        self.stats['last_flush'] = self.writer.stats['last_flush']
         
         # スレッド停止
-        if self.flush_thread:
-            self.flush_thread.join(timeout=10)
         if self.archive_thread:
             self.archive_thread.join(timeout=10)
         
@@ -925,10 +931,9 @@ class AuditTrailSystem:
                 params.append(severity.value)
             
             if compliance_standards:
-                # JSON配列内の検索（簡易実装）
                 for cs in compliance_standards:
-                    query += " AND compliance_standards LIKE ?"
-                    params.append(f"%{cs.value}%")
+                    query += " AND event_id IN (SELECT event_id FROM audit_event_standards WHERE standard = ?)"
+                    params.append(cs.value)
             
             query += " ORDER BY timestamp DESC LIMIT ?"
             params.append(limit)
@@ -968,10 +973,31 @@ class AuditTrailSystem:
             logger.error(f"Failed to query events: {str(e)}")
             return []
     
+    def verify_integrity(self,
+                         start_time: Optional[datetime] = None,
+                         end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        監査ログ完全性検証
+        
+        期間に重なるチェックポイントブロックのみ読み込み、ハッシュチェーンと
+        Merkle ルートを検証する (全件走査なし)
+        """
+        try:
+            with sqlite3.connect(str(self.db_path)) as conn:
+                return self.hash_chain.verify_range(
+                    conn,
+                    start_time.isoformat() if start_time else None,
+                    end_time.isoformat() if end_time else None
+                )
+        except Exception as e:
+            logger.error(f"Failed to verify audit integrity: {str(e)}")
+            return {'verified': False, 'error': str(e)}
+    
     def get_compliance_report(self, 
                             standard: ComplianceStandard,
                             start_time: Optional[datetime] = None,
-                            end_time: Optional[datetime] = None) -> Dict[str, Any]:
+                            end_time: Optional[datetime] = None,
+                            include_integrity: bool = True) -> Dict[str, Any]:
         """コンプライアンスレポート生成"""
         try:
             # 期間設定
@@ -980,45 +1006,13 @@ class AuditTrailSystem:
             if not end_time:
                 end_time = datetime.utcnow()
             
-            # 関連イベント取得
-            events = self.query_events(
-                start_time=start_time,
-                end_time=end_time,
-                compliance_standards=[standard],
-                limit=10000
-            )
-            
-            # 統計分析
-            total_events = len(events)
-            events_by_type = {}
-            events_by_severity = {}
-            events_by_day = {}
-            
-            for event in events:
-                # イベントタイプ別
-                event_type = event.event_type.value
-                events_by_type[event_type] = events_by_type.get(event_type, 0) + 1
-                
-                # 重要度別
-                severity = event.severity.value
-                events_by_severity[severity] = events_by_severity.get(severity, 0) + 1
-                
-                # 日別
-                day = event.timestamp.strftime('%Y-%m-%d')
-                events_by_day[day] = events_by_day.get(day, 0) + 1
+            # SQL 側で集計 (期間内の全イベントを対象、行の読み込みなし)
+            with sqlite3.connect(str(self.db_path)) as conn:
+                counts = compliance_counts(conn, standard.value, start_time.isoformat(), end_time.isoformat())
+                violations = recent_violations(conn, standard.value, start_time.isoformat(), end_time.isoformat())
             
-            # 違反検出
-            violations = []
-            for event in events:
-                if event.severity in [AuditSeverity.HIGH, AuditSeverity.CRITICAL]:
-                    violations.append({
-                        'event_id': event.event_id,
-                        'timestamp': event.timestamp.isoformat(),
-                        'user_id': event.user_id,
-                        'resource': event.resource,
-                        'action': event.action,
-                        'severity': event.severity.value
-                    })
+            total_events = counts['total_events']
+            total_violations = counts['total_violations']
             
             report = {
                 'standard': standard.value,
@@ -1028,15 +1022,16 @@ class AuditTrailSystem:
                 },
                 'summary': {
                     'total_events': total_events,
-                    'total_violations': len(violations),
-                    'compliance_rate': (total_events - len(violations)) / total_events if total_events > 0 else 1.0
+                    'total_violations': total_violations,
+                    'compliance_rate': (total_events - total_violations) / total_events if total_events > 0 else 1.0
                 },
                 'statistics': {
-                    'events_by_type': events_by_type,
-                    'events_by_severity': events_by_severity,
-                    'events_by_day': events_by_day
+                    'events_by_type': counts['events_by_type'],
+                    'events_by_severity': counts['events_by_severity'],
+                    'events_by_day': counts['events_by_day']
                 },
-                'violations': violations[:100],  # 最新100件
+                'violations': violations,  # 最新100件
+                'integrity': self.verify_integrity(start_time, end_time) if include_integrity else None,
                 'generated_at': datetime.utcnow().isoformat()
             }
             
@@ -1051,13 +1046,14 @@ class AuditTrailSystem:
         return {
             'system_status': {
                 'running': self.running,
-                'buffer_size': len(self.event_buffer),
+                'buffer_size': self.writer.pending,
                 'database_path': str(self.db_path),
                 'archive_path': str(self.archive_path),
                 'encryption_enabled': self.cipher is not None,
                 'azure_storage_enabled': self.blob_client is not None
             },
             'statistics': self.stats,
+            'writer': self.writer.get_stats(),
             'compliance_rules': len(self.compliance_rules),
             'retention_policies': len(self.retention_policies)
         }
@@ -1066,6 +1062,7 @@ class AuditTrailSystem:
         """監査システム終了"""
         try:
             self.stop()
+            self.writer.close(timeout=10)
             
             # Azure Storage接続終了
             if self.blob_client:
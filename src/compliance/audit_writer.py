@@ -0,0 +1,273 @@
+"""
+Audit Event Writer
+監査イベント専用ライター - 永続 WAL 接続・executemany・ダブルバッファリング
+
+Producers only append to the active buffer under a short lock; a dedicated
+writer thread swaps the buffers and writes the full one with executemany in
+one transaction, so log_event callers never wait on disk I/O.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# (connection, rows) -> rows; runs in the writer thread inside the write transaction
+PrepareBatch = Callable[[sqlite3.Connection, List[Sequence[Any]]], List[Sequence[Any]]]
+
+
+class AuditEventWriter:
+    """
+    監査イベントライター
+
+    - 永続接続 (WAL, synchronous=NORMAL) を writer スレッドが専有
+    - バッファ 2 面を入れ替え、書き込み中も producer は空き側へ追加
+    - 未書き込み件数が max_pending に達した場合はバックプレッシャー
+      (block_on_full=True なら block_timeout まで待機、それ以外は破棄) し、
+      破棄件数をメトリクスに記録
+    """
+
+    def __init__(self,
+                 db_path: Path,
+                 insert_sql: str,
+                 batch_size: int = 100,
+                 flush_interval: float = 1.0,
+                 max_pending: int = 100000,
+                 block_on_full: bool = False,
+                 block_timeout: float = 1.0,
+                 max_retries: int = 3,
+                 prepare_batch: Optional[PrepareBatch] = None):
+        """
+        Args:
+            db_path: データベースパス
+            insert_sql: INSERT 文 (プレースホルダ付き)
+            batch_size: この件数が溜まったら即時書き込み
+            flush_interval: 最大書き込み間隔（秒）
+            max_pending: 未書き込みイベントの上限
+            block_on_full: 上限到達時に producer を待機させる
+            block_timeout: 待機の上限（秒）。超過したイベントは破棄
+            max_retries: 書き込み失敗時の再試行回数 (超過したバッチは破棄)
+            prepare_batch: 書き込み直前にバッチを加工するフック
+        """
+        self.db_path = Path(db_path)
+        self.insert_sql = insert_sql
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.block_on_full = block_on_full
+        self.block_timeout = block_timeout
+        self.max_retries = max_retries
+        self.prepare_batch = prepare_batch
+
+        # ダブルバッファ
+        self._active: List[Sequence[Any]] = []
+        self._spare: List[Sequence[Any]] = []
+        self._in_flight = 0
+        self._cond = threading.Condition(threading.Lock())
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flush_requested = False
+
+        # 統計情報 (written + failed が submitted に追いつけば flush 完了)
+        self._submitted = 0
+        self._written = 0
+        self._failed = 0
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'blocked': 0,
+            'flushes': 0,
+            'flush_errors': 0,
+            'max_pending_seen': 0,
+            'last_flush': None,
+            'last_flush_seconds': 0.0,
+            'last_batch_size': 0
+        }
+
+    @property
+    def pending(self) -> int:
+        """未書き込みイベント数"""
+        return len(self._active) + self._in_flight
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """ライタースレッド開始"""
+        with self._cond:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, row: Sequence[Any]) -> bool:
+        """
+        イベント行を追加
+
+        Returns:
+            受け付けた場合 True、上限超過で破棄した場合 False
+        """
+        with self._cond:
+            if self.pending >= self.max_pending:
+                if self.block_on_full:
+                    self.stats['blocked'] += 1
+                    deadline = time.monotonic() + self.block_timeout
+                    while self.pending >= self.max_pending and not self._stopping:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.notify_all()
+                        self._cond.wait(remaining)
+                if self.pending >= self.max_pending:
+                    self.stats['dropped'] += 1
+                    return False
+
+            self._active.append(row)
+            self._submitted += 1
+            self.stats['submitted'] += 1
+            pending = self.pending
+            if pending > self.stats['max_pending_seen']:
+                self.stats['max_pending_seen'] = pending
+            if len(self._active) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def request_flush(self):
+        """待機せずに即時書き込みを要求"""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        受付済みイベントの書き込み完了まで待機
+
+        Returns:
+            時間内に完了した場合 True
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._submitted
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._written + self._failed < target:
+                if not self.running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """残りを書き込んでライタースレッド停止"""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Audit writer did not stop within {timeout}s ({self.pending} events pending)")
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ライター統計情報"""
+        with self._cond:
+            return {**self.stats, 'pending': self.pending, 'running': self.running}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self):
+        """ライターループ"""
+        conn = None
+        retries = 0
+        try:
+            conn = self._connect()
+            while True:
+                with self._cond:
+                    if (not self._stopping and not self._flush_requested
+                            and len(self._active) < self.batch_size):
+                        self._cond.wait(self.flush_interval)
+                    # バッファ入れ替え (producer は空き側へ追加を継続)
+                    batch, self._active, self._spare = self._active, self._spare, []
+                    self._in_flight = len(batch)
+                    self._flush_requested = False
+                    stopping = self._stopping
+                    self._cond.notify_all()
+
+                if batch:
+                    error = self._write_batch(conn, batch)
+                    with self._cond:
+                        self._in_flight = 0
+                        if error is None:
+                            retries = 0
+                            self._written += len(batch)
+                        elif retries < self.max_retries and not stopping:
+                            retries += 1
+                            # 失敗したバッチを先頭に戻して次回再試行
+                            self._active[:0] = batch
+                        else:
+                            logger.error(f"Discarding {len(batch)} audit events after {retries} retries: {error}")
+                            retries = 0
+                            self._failed += len(batch)
+                            self.stats['failed'] += len(batch)
+                        batch.clear()
+                        self._spare = batch
+                        self._cond.notify_all()
+                    if error is not None and not stopping:
+                        time.sleep(min(self.flush_interval, 1.0))
+                        continue
+
+                if stopping:
+                    with self._cond:
+                        if not self._active:
+                            break
+        except Exception as e:
+            logger.error(f"Audit writer stopped unexpectedly: {str(e)}")
+        finally:
+            if conn is not None:
+                conn.close()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Sequence[Any]]) -> Optional[Exception]:
+        """1 トランザクションで executemany"""
+        start = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = self.prepare_batch(conn, batch) if self.prepare_batch else batch
+            conn.executemany(self.insert_sql, rows)
+            conn.execute("COMMIT")
+        except Exception as e:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            self.stats['flush_errors'] += 1
+            logger.error(f"Failed to write {len(batch)} audit events: {str(e)}")
+            return e
+
+        elapsed = time.perf_counter() - start
+        self.stats['written'] += len(batch)
+        self.stats['flushes'] += 1
+        self.stats['last_flush'] = datetime.utcnow()
+        self.stats['last_flush_seconds'] = elapsed
+        self.stats['last_batch_size'] = len(batch)
+        logger.debug(f"Flushed {len(batch)} audit events in {elapsed:.3f}s")
+        return None
@@ -0,0 +1,307 @@
+"""
+Compliance Rule Compiler
+コンプライアンスルール条件のコンパイル・event_type インデックス
+
+Conditions use a small SQL-like syntax and are compiled once into predicate
+closures:
+
+    event_type IN ('login', 'logout') AND NOT resource LIKE '%test%'
+    data_classification = 'personal' OR details.export_rows >= 1000
+    source_ip IS NULL
+
+Supported: AND / OR / NOT, parentheses, = != <> < <= > >=, [NOT] IN (...),
+[NOT] LIKE (% and _, case-insensitive), IS [NOT] NULL, string / number /
+TRUE / FALSE / NULL literals and details.<key> lookups.
+"""
+
+import re
+from enum import Enum
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+Predicate = Callable[[Any], bool]
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op><=|>=|<>|!=|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z0-9_]+)*)
+    )""", re.VERBOSE)
+
+_KEYWORDS = {"AND", "OR", "NOT", "IN", "LIKE", "IS", "NULL", "TRUE", "FALSE"}
+
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+# event_type の絞り込みが不可能 (全イベントが対象) を表す
+ANY_EVENT_TYPE = None
+
+
+class RuleSyntaxError(ValueError):
+    """ルール条件の構文エラー"""
+
+
+def _tokenize(condition: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    condition = condition.rstrip()
+    while position < len(condition):
+        match = _TOKEN_PATTERN.match(condition, position)
+        if not match or match.end() == position:
+            raise RuleSyntaxError(f"Unexpected character at {position}: {condition[position:position + 20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "name" and value.upper() in _KEYWORDS:
+            kind, value = "keyword", value.upper()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+def _field_getter(name: str) -> Callable[[Any], Any]:
+    """イベント属性の取得関数 (Enum は値、details.<key> は辞書参照)"""
+    if name.startswith("details."):
+        keys = name.split(".")[1:]
+
+        def get_detail(event):
+            value = getattr(event, "details", None)
+            for key in keys:
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(key)
+            return value
+        return get_detail
+
+    def get_attribute(event):
+        value = getattr(event, name, None)
+        return value.value if isinstance(value, Enum) else value
+    return get_attribute
+
+
+def like_to_regex(pattern: str) -> "re.Pattern":
+    """SQL LIKE パターン -> 正規表現 (大文字小文字を区別しない)"""
+    parts = [".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern]
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+class _Parser:
+    """再帰下降パーサー (述語クロージャと event_type 集合を同時に生成)"""
+
+    def __init__(self, tokens: List[Tuple[str, str]], fields: Optional[Iterable[str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.fields = set(fields) if fields is not None else None
+
+    def _peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _take(self, kind: Optional[str] = None, value: Optional[str] = None) -> str:
+        token_kind, token_value = self._peek()
+        if token_kind is None or (kind and token_kind != kind) or (value and token_value != value):
+            expected = value or kind or "token"
+            raise RuleSyntaxError(f"Expected {expected} but found {token_value!r}")
+        self.position += 1
+        return token_value
+
+    def _accept(self, kind: str, value: Optional[str] = None) -> bool:
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Tuple[Predicate, Optional[FrozenSet[str]]]:
+        result = self._or()
+        if self.position != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected token {self._peek()[1]!r}")
+        return result
+
+    def _or(self):
+        predicate, types = self._and()
+        while self._accept("keyword", "OR"):
+            right, right_types = self._and()
+            left = predicate
+            predicate = lambda event, left=left, right=right: left(event) or right(event)
+            types = ANY_EVENT_TYPE if types is ANY_EVENT_TYPE or right_types is ANY_EVENT_TYPE else types | right_types
+        return predicate, types
+
+    def _and(self):
+        predicate, types = self._not()
+        while self._accept("keyword", "AND"):
+            right, right_types = self._not()
+            left = predicate
+            predicate = lambda event, left=left, right=right: left(event) and right(event)
+            if types is ANY_EVENT_TYPE:
+                types = right_types
+            elif right_types is not ANY_EVENT_TYPE:
+                types = types & right_types
+        return predicate, types
+
+    def _not(self):
+        if self._accept("keyword", "NOT"):
+            inner, _ = self._not()
+            return (lambda event: not inner(event)), ANY_EVENT_TYPE
+        return self._primary()
+
+    def _primary(self):
+        if self._accept("punct", "("):
+            result = self._or()
+            self._take("punct", ")")
+            return result
+        return self._comparison()
+
+    def _literal(self) -> Any:
+        kind, value = self._peek()
+        if kind == "string":
+            self.position += 1
+            return value[1:-1].replace("''", "'")
+        if kind == "number":
+            self.position += 1
+            return float(value) if "." in value else int(value)
+        if kind == "keyword" and value in ("TRUE", "FALSE", "NULL"):
+            self.position += 1
+            return {"TRUE": True, "FALSE": False, "NULL": None}[value]
+        raise RuleSyntaxError(f"Expected a literal but found {value!r}")
+
+    def _comparison(self):
+        name = self._take("name")
+        if self.fields is not None and name.split(".")[0] not in self.fields:
+            raise RuleSyntaxError(f"Unknown field: {name}")
+        get = _field_getter(name)
+
+        negate = self._accept("keyword", "NOT")
+        kind, value = self._peek()
+
+        if kind == "keyword" and value == "IN":
+            self.position += 1
+            self._take("punct", "(")
+            values = [self._literal()]
+            while self._accept("punct", ","):
+                values.append(self._literal())
+            self._take("punct", ")")
+            members = frozenset(values)
+            if negate:
+                return (lambda event: get(event) not in members), ANY_EVENT_TYPE
+            types = frozenset(str(v) for v in members) if name == "event_type" else ANY_EVENT_TYPE
+            return (lambda event: get(event) in members), types
+
+        if kind == "keyword" and value == "LIKE":
+            self.position += 1
+            pattern = self._literal()
+            if not isinstance(pattern, str):
+                raise RuleSyntaxError("LIKE requires a string pattern")
+            match = like_to_regex(pattern).fullmatch
+
+            def like(event):
+                field_value = get(event)
+                return field_value is not None and match(str(field_value)) is not None
+            if negate:
+                return (lambda event: not like(event)), ANY_EVENT_TYPE
+            return like, ANY_EVENT_TYPE
+
+        if negate:
+            raise RuleSyntaxError("NOT must be followed by IN or LIKE")
+
+        if kind == "keyword" and value == "IS":
+            self.position += 1
+            is_not = self._accept("keyword", "NOT")
+            self._take("keyword", "NULL")
+            if is_not:
+                return (lambda event: get(event) is not None), ANY_EVENT_TYPE
+            return (lambda event: get(event) is None), ANY_EVENT_TYPE
+
+        operator = self._take("op")
+        literal = self._literal()
+        compare = _COMPARATORS[operator]
+
+        def comparison(event):
+            field_value = get(event)
+            if field_value is None or literal is None:
+                return False
+            try:
+                return compare(field_value, literal)
+            except TypeError:
+                return False
+
+        types = frozenset([str(literal)]) if name == "event_type" and operator == "=" else ANY_EVENT_TYPE
+        return comparison, types
+
+
+class CompiledCondition:
+    """コンパイル済み条件"""
+
+    __slots__ = ("source", "predicate", "event_types")
+
+    def __init__(self, source: str, predicate: Predicate, event_types: Optional[FrozenSet[str]]):
+        self.source = source
+        self.predicate = predicate
+        # 一致し得る event_type の集合 (None は全イベント)
+        self.event_types = event_types
+
+    def __call__(self, event: Any) -> bool:
+        return self.predicate(event)
+
+
+def compile_condition(condition: str, fields: Optional[Iterable[str]] = None) -> CompiledCondition:
+    """
+    条件文字列のコンパイル
+
+    Args:
+        condition: 条件式
+        fields: 使用可能なフィールド名 (None は検査しない)
+
+    Raises:
+        RuleSyntaxError: 構文エラー・未知のフィールド
+    """
+    tokens = _tokenize(condition)
+    if not tokens:
+        raise RuleSyntaxError("Empty condition")
+    predicate, event_types = _Parser(tokens, fields).parse()
+    return CompiledCondition(condition, predicate, event_types)
+
+
+class CompiledRuleIndex:
+    """
+    event_type 別ルールインデックス
+
+    登録順を保ったまま、event_type 毎に評価対象のルールリストを事前構築する。
+    """
+
+    def __init__(self):
+        self._rules: Dict[str, Tuple[int, Any, CompiledCondition]] = {}
+        self._order = 0
+        self._by_type: Dict[Optional[str], List[Tuple[Any, CompiledCondition]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add(self, rule_id: str, rule: Any, compiled: CompiledCondition):
+        """ルール登録 (同一 ID は置き換え、登録順は維持)"""
+        order = self._rules[rule_id][0] if rule_id in self._rules else self._next_order()
+        self._rules[rule_id] = (order, rule, compiled)
+        self._by_type.clear()
+
+    def remove(self, rule_id: str):
+        if self._rules.pop(rule_id, None):
+            self._by_type.clear()
+
+    def _next_order(self) -> int:
+        self._order += 1
+        return self._order
+
+    def candidates(self, event_type: str) -> List[Tuple[Any, CompiledCondition]]:
+        """event_type に対して評価が必要なルール (登録順)"""
+        candidates = self._by_type.get(event_type)
+        if candidates is None:
+            candidates = [(rule, compiled) for _, rule, compiled in sorted(self._rules.values(), key=lambda r: r[0])
+                          if compiled.event_types is ANY_EVENT_TYPE or event_type in compiled.event_types]
+            self._by_type[event_type] = candidates
+        return candidates
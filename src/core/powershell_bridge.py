@@ -13,8 +13,11 @@ from dataclasses import dataclass
 import logging
 from functools import lru_cache
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
+from .powershell_host_pool import HOST_LOOP_SCRIPT, PowerShellHostPool
+
 
 # ロガー設定
 logger = logging.getLogger(__name__)
@@ -42,17 +45,29 @@ class PowerShellBridge:
     - エラーハンドリングと再試行
     - 非同期実行サポート
     - Microsoft 365 API統合
+    - 常駐pwshホストプール（use_host_pool=True）
     """
     
-    def __init__(self, project_root: Optional[Path] = None, max_retries: int = 3):
+    def __init__(self, project_root: Optional[Path] = None, max_retries: int = 3,
+                 use_host_pool: bool = False, host_pool_size: int = 4,
+                 max_commands_per_host: int = 200,
+                 host_command_line: Optional[List[str]] = None):
         self.project_root = project_root or Path(__file__).parent.parent.parent
         self.pwsh_exe = self._find_powershell()
         self._module_cache = {}
         self._session_id = None
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.executor = ThreadPoolExecutor(max_workers=max(4, host_pool_size))
         self.max_retries = max_retries
         self._persistent_session = None
         
+        # 常駐ホストプール設定（初回利用時に起動）
+        self.use_host_pool = use_host_pool
+        self.host_pool_size = host_pool_size
+        self.max_commands_per_host = max_commands_per_host
+        self.host_command_line = host_command_line
+        self._host_pool: Optional[PowerShellHostPool] = None
+        self._host_pool_lock = threading.Lock()
+        
         # PowerShell実行時の基本設定
         self.default_params = [
             '-NoProfile',
@@ -91,8 +106,8 @@ class PowerShellBridge:
                 
         raise RuntimeError("PowerShellが見つかりません。PowerShell 7のインストールを推奨します。")
     
-    def _prepare_command(self, command: str, use_json: bool = True) -> str:
-        """コマンドを準備（JSON出力オプション付き）"""
+    def _session_preamble(self) -> str:
+        """セッション初期化スクリプト（エンコーディング・モジュールパス）"""
         # モジュールパスを追加
         module_path_cmd = ";".join([
             f"$env:PSModulePath += ';{path}'"
@@ -106,10 +121,16 @@ class PowerShellBridge:
         [Console]::OutputEncoding = [System.Text.Encoding]::UTF8
         """
         
-        # エラーハンドリングを追加
-        wrapped_command = f"""
+        return f"""
         {compatibility_settings}
         {module_path_cmd}
+        """
+    
+    def _prepare_command(self, command: str, use_json: bool = True) -> str:
+        """コマンドを準備（JSON出力オプション付き）"""
+        # エラーハンドリングを追加
+        wrapped_command = f"""
+        {self._session_preamble()}
         $ErrorActionPreference = 'Stop'
         $ProgressPreference = 'SilentlyContinue'
         try {{
@@ -192,16 +213,89 @@ class PowerShellBridge:
     
     async def execute_command_async(self, command: str, return_json: bool = True,
                                   timeout: int = 60) -> PowerShellResult:
-        """PowerShellコマンドを非同期実行"""
+        """PowerShellコマンドを非同期実行（ホストプール有効時はプールへディスパッチ）"""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
             self.executor,
-            self.execute_command,
+            self.execute_pooled if self.use_host_pool else self.execute_command,
             command,
             return_json,
             timeout
         )
     
+    # 常駐ホストプール
+    
+    @property
+    def host_pool(self) -> PowerShellHostPool:
+        """常駐ホストプール（遅延起動、複数スレッドから呼ばれても1つだけ生成）"""
+        pool = self._host_pool
+        if pool is None:
+            with self._host_pool_lock:
+                pool = self._host_pool
+                if pool is None:
+                    command_line = self.host_command_line or (
+                        [self.pwsh_exe] + self.default_params +
+                        ['-Command', self._session_preamble() + HOST_LOOP_SCRIPT]
+                    )
+                    pool = self._host_pool = PowerShellHostPool(
+                        command_line,
+                        size=self.host_pool_size,
+                        max_commands_per_host=self.max_commands_per_host
+                    )
+        return pool
+    
+    def execute_pooled(self, command: str, return_json: bool = True,
+                       timeout: int = 60) -> PowerShellResult:
+        """常駐ホストでコマンドを実行（接続・インポート済みモジュールは維持される）"""
+        try:
+            response = self.host_pool.execute(command, return_json=return_json, timeout=timeout)
+        except TimeoutError:
+            return PowerShellResult(
+                stdout="",
+                stderr="Command timed out",
+                returncode=-1,
+                success=False,
+                error_message="コマンドがタイムアウトしました"
+            )
+        except Exception as e:
+            return PowerShellResult(
+                stdout="",
+                stderr=str(e),
+                returncode=-1,
+                success=False,
+                error_message=f"実行エラー: {str(e)}"
+            )
+        
+        output = response.output or ""
+        stray = "\n".join(response.stray_output)
+        
+        if not response.success:
+            error = response.error or {}
+            ps_result = PowerShellResult(
+                stdout=stray,
+                stderr=json.dumps(error, ensure_ascii=False),
+                returncode=1,
+                success=False,
+                data=error,
+                error_message=error.get('Message', 'Unknown error')
+            )
+            logger.error(f"PowerShell command failed: {ps_result.error_message}")
+            return ps_result
+        
+        ps_result = PowerShellResult(
+            stdout=output if return_json else stray + output,
+            stderr="",
+            returncode=0,
+            success=True
+        )
+        if return_json and output.strip():
+            try:
+                ps_result.data = json.loads(output)
+            except json.JSONDecodeError as e:
+                logger.warning(f"JSON parse error: {e}")
+                ps_result.data = output
+        return ps_result
+    
     def execute_script(self, script_path: Union[str, Path], 
                       parameters: Optional[Dict[str, Any]] = None,
                       timeout: int = 300) -> PowerShellResult:
@@ -359,6 +453,12 @@ class PowerShellBridge:
     def execute_batch(self, commands: List[str], 
                      parallel: bool = False) -> List[PowerShellResult]:
         """複数のコマンドをバッチ実行"""
+        if self.use_host_pool:
+            # ホストプールへディスパッチ（同時実行数はプールサイズで制限、結果は入力順）
+            if parallel:
+                return list(self.executor.map(self.execute_pooled, commands))
+            return [self.execute_pooled(cmd) for cmd in commands]
+        
         if parallel:
             # 並列実行
             import concurrent.futures
@@ -390,6 +490,10 @@ class PowerShellBridge:
     def cleanup(self):
         """リソースのクリーンアップ"""
         self.executor.shutdown(wait=True)
+        with self._host_pool_lock:
+            pool, self._host_pool = self._host_pool, None
+        if pool is not None:
+            pool.shutdown()
         self._module_cache.clear()
         self.import_module.cache_clear()
         if self._persistent_session:
@@ -0,0 +1,342 @@
+"""
+PowerShellホストプール実装
+常駐pwshワーカープロセスを再利用し、コマンドごとのプロセス起動・
+モジュールパス設定・Exchange/Teams再接続のコストを排除する
+
+プロトコル:
+- リクエスト: stdinへ1行1JSON {"id": ..., "command": ..., "json": true}
+- レスポンス: stdoutへフレームマーカー + 1行JSON
+  {"id": ..., "success": ..., "output": ..., "error": {...}}
+- フレームマーカーで始まらない行はコマンドの標準出力として扱う
+"""
+
+import itertools
+import json
+import logging
+import queue
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+FRAME_MARKER = '<<<M365-PSHOST>>>'
+
+# 常駐ホストのリクエストループ（セッションプリアンブルの後に連結される）
+HOST_LOOP_SCRIPT = """
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+$__frameMarker = '%(marker)s'
+while ($true) {
+    $__line = [Console]::In.ReadLine()
+    if ($null -eq $__line) { break }
+    if ([string]::IsNullOrWhiteSpace($__line)) { continue }
+    $__request = $__line | ConvertFrom-Json
+    $__response = [ordered]@{ id = $__request.id; success = $true; output = $null; error = $null }
+    try {
+        $__result = . ([ScriptBlock]::Create($__request.command))
+        if ($__request.json) {
+            if ($null -ne $__result) {
+                $__response.output = $__result | ConvertTo-Json -Depth 10 -Compress
+            }
+        } else {
+            $__response.output = ($__result | Out-String)
+        }
+    } catch {
+        $__response.success = $false
+        $__response.error = @{
+            Message = $_.Exception.Message
+            Type = $_.Exception.GetType().FullName
+            StackTrace = $_.ScriptStackTrace
+            ErrorRecord = $_.ToString()
+        }
+    }
+    [Console]::Out.WriteLine($__frameMarker + ($__response | ConvertTo-Json -Depth 4 -Compress))
+    [Console]::Out.Flush()
+}
+""" % {'marker': FRAME_MARKER}
+
+
+class PowerShellHostError(RuntimeError):
+    """常駐PowerShellホストの異常"""
+
+
+@dataclass
+class HostResponse:
+    """常駐ホストからのフレーム化レスポンス"""
+    success: bool
+    output: Optional[str] = None
+    error: Optional[Dict[str, Any]] = None
+    stray_output: List[str] = field(default_factory=list)
+
+
+class PowerShellHost:
+    """
+    単一の常駐pwshワーカープロセス
+    stdin/stdoutでフレーム化JSONを交換する（同時に1コマンドのみ）
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, command_line: List[str], startup_timeout: float = 60.0):
+        self.command_line = command_line
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.commands_executed = 0
+        self.created_at = 0.0
+        self.last_used = 0.0
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stderr_tail: List[str] = []
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """ワーカープロセスを起動"""
+        self.process = subprocess.Popen(
+            self.command_line,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        self.created_at = self.last_used = time.monotonic()
+
+        threading.Thread(target=self._read_stdout, daemon=True,
+                         name=f"pshost-{self.process.pid}-out").start()
+        threading.Thread(target=self._read_stderr, daemon=True,
+                         name=f"pshost-{self.process.pid}-err").start()
+
+        # 起動完了（プリアンブル実行済み）をヘルスチェックで確認
+        if not self.ping(timeout=self.startup_timeout):
+            self.close()
+            raise PowerShellHostError("PowerShell host failed to start")
+        self.commands_executed = 0
+        logger.info(f"PowerShell host started: pid={self.process.pid}")
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            self._lines.put(line.rstrip('\r\n'))
+        self._lines.put(None)
+
+    def _read_stderr(self):
+        # パイプ詰まり防止のため常に読み捨てる（末尾のみ保持）
+        for line in self.process.stderr:
+            self._stderr_tail.append(line.rstrip('\r\n'))
+            del self._stderr_tail[:-50]
+
+    def request(self, command: str, return_json: bool = True,
+                timeout: float = 60.0) -> HostResponse:
+        """コマンドを送信しフレーム化レスポンスを待機"""
+        if not self.is_alive:
+            raise PowerShellHostError("PowerShell host is not running")
+
+        request_id = next(self._ids)
+        payload = json.dumps({'id': request_id, 'command': command, 'json': return_json})
+        try:
+            self.process.stdin.write(payload + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise PowerShellHostError(f"PowerShell host pipe closed: {e}")
+
+        stray_output = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"PowerShell host did not respond within {timeout}s")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                stderr = '\n'.join(self._stderr_tail[-5:])
+                raise PowerShellHostError(f"PowerShell host exited unexpectedly: {stderr}")
+            if not line.startswith(FRAME_MARKER):
+                stray_output.append(line)
+                continue
+
+            frame = json.loads(line[len(FRAME_MARKER):])
+            if frame.get('id') != request_id:
+                # 以前にタイムアウトしたリクエストの遅延レスポンス
+                continue
+
+            self.commands_executed += 1
+            self.last_used = time.monotonic()
+            return HostResponse(
+                success=bool(frame.get('success')),
+                output=frame.get('output'),
+                error=frame.get('error'),
+                stray_output=stray_output
+            )
+
+    def ping(self, timeout: float = 10.0) -> bool:
+        """ヘルスチェック"""
+        try:
+            response = self.request('$true', return_json=True, timeout=timeout)
+            return response.success
+        except Exception as e:
+            logger.warning(f"PowerShell host health check failed (pid={self.pid}): {e}")
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """ワーカープロセスを終了"""
+        if not self.process:
+            return
+        try:
+            if self.process.poll() is None:
+                self.process.stdin.close()
+                self.process.wait(timeout=timeout)
+        except (subprocess.TimeoutExpired, OSError):
+            self.process.kill()
+            self.process.wait()
+        logger.info(f"PowerShell host stopped: pid={self.process.pid}, "
+                    f"commands={self.commands_executed}")
+
+
+class PowerShellHostPool:
+    """
+    常駐PowerShellホストプール
+
+    主な機能:
+    - 最大同時実行数の制限（プールサイズ）
+    - N回実行後のホストリサイクル
+    - アイドルホストのヘルスチェックと自動再起動
+    """
+
+    def __init__(self,
+                 command_line: List[str],
+                 size: int = 4,
+                 max_commands_per_host: int = 200,
+                 health_check_interval: float = 300.0,
+                 startup_timeout: float = 60.0):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.command_line = command_line
+        self.size = size
+        self.max_commands_per_host = max_commands_per_host
+        self.health_check_interval = health_check_interval
+        self.startup_timeout = startup_timeout
+
+        self._idle: "queue.LifoQueue[PowerShellHost]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._hosts: List[PowerShellHost] = []
+        self._closed = False
+
+        self.stats = {
+            'hosts_started': 0,
+            'hosts_recycled': 0,
+            'hosts_failed': 0,
+            'commands_executed': 0,
+            'timeouts': 0
+        }
+
+    def _spawn(self) -> PowerShellHost:
+        host = PowerShellHost(self.command_line, startup_timeout=self.startup_timeout)
+        host.start()
+        with self._lock:
+            self._hosts.append(host)
+            self.stats['hosts_started'] += 1
+        return host
+
+    def _discard(self, host: PowerShellHost, reason: str):
+        with self._lock:
+            if host in self._hosts:
+                self._hosts.remove(host)
+            self.stats[reason] += 1
+        host.close()
+
+    def _acquire(self, timeout: Optional[float]) -> PowerShellHost:
+        if self._closed:
+            raise PowerShellHostError("PowerShell host pool is closed")
+        if not self._slots.acquire(timeout=timeout if timeout is not None else -1):
+            raise TimeoutError("No PowerShell host available")
+        try:
+            while True:
+                try:
+                    host = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._spawn()
+
+                if not host.is_alive:
+                    self._discard(host, 'hosts_failed')
+                    continue
+                idle_for = time.monotonic() - host.last_used
+                if idle_for >= self.health_check_interval and not host.ping():
+                    self._discard(host, 'hosts_failed')
+                    continue
+                return host
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, host: PowerShellHost, healthy: bool = True):
+        try:
+            if not healthy or not host.is_alive:
+                self._discard(host, 'hosts_failed')
+            elif host.commands_executed >= self.max_commands_per_host:
+                self._discard(host, 'hosts_recycled')
+            elif self._closed:
+                self._discard(host, 'hosts_recycled')
+            else:
+                self._idle.put(host)
+        finally:
+            self._slots.release()
+
+    def execute(self, command: str, return_json: bool = True,
+                timeout: float = 60.0) -> HostResponse:
+        """空きホストでコマンドを実行（空きがなければ待機）"""
+        host = self._acquire(timeout=timeout)
+        healthy = True
+        try:
+            response = host.request(command, return_json=return_json, timeout=timeout)
+            with self._lock:
+                self.stats['commands_executed'] += 1
+            return response
+        except TimeoutError:
+            # 実行中のコマンドを中断できないためホストごと破棄
+            healthy = False
+            with self._lock:
+                self.stats['timeouts'] += 1
+            raise
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self._release(host, healthy=healthy)
+
+    def warm_up(self, count: Optional[int] = None):
+        """ホストを事前起動"""
+        hosts = [self._acquire(timeout=None) for _ in range(min(count or self.size, self.size))]
+        for host in hosts:
+            self._release(host)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['hosts_alive'] = len(self._hosts)
+        stats['hosts_idle'] = self._idle.qsize()
+        stats['size'] = self.size
+        return stats
+
+    def shutdown(self):
+        """全ホストを終了"""
+        self._closed = True
+        with self._lock:
+            hosts = list(self._hosts)
+            self._hosts.clear()
+        for host in hosts:
+            host.close()
+        while not self._idle.empty():
+            self._idle.get_nowait()
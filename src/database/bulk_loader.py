@@ -0,0 +1,337 @@
+# Microsoft 365 Management Tools - Bulk Data Loader
+# Vectorised PowerShell record transformation and PostgreSQL COPY ingest
+
+import io
+import logging
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Sequence
+
+import pandas as pd
+from sqlalchemy.engine import Engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Target fields that receive special conversion
+DATETIME_FIELDS = ('creation_date', 'last_sign_in', 'signin_datetime', 'last_access')
+NUMERIC_FIELDS = ('total_size_mb', 'quota_mb', 'utilization_rate', 'monthly_cost')
+POWERSHELL_DATETIME_FORMATS = ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S')
+
+# NULL marker used in the COPY CSV stream
+COPY_NULL = '\\N'
+
+
+def transform_record(source_record: Dict[str, Any], field_mappings: Dict[str, str]) -> Dict[str, Any]:
+    """Transform a single PowerShell record to Python model format."""
+    transformed = {}
+
+    for source_field, target_field in field_mappings.items():
+        if source_field in source_record:
+            value = source_record[source_field]
+
+            # Handle special transformations
+            if target_field in DATETIME_FIELDS:
+                # Convert PowerShell datetime strings to Python datetime
+                if value and value != 'N/A' and str(value).strip():
+                    try:
+                        # Try common PowerShell datetime formats
+                        for fmt in POWERSHELL_DATETIME_FORMATS:
+                            try:
+                                transformed[target_field] = datetime.strptime(str(value), fmt)
+                                break
+                            except ValueError:
+                                continue
+                        else:
+                            # If no format matches, try pandas conversion
+                            transformed[target_field] = pd.to_datetime(value, errors='coerce').to_pydatetime()
+                    except:
+                        transformed[target_field] = None
+                else:
+                    transformed[target_field] = None
+
+            elif target_field in NUMERIC_FIELDS:
+                # Convert numeric fields
+                if value and value != 'N/A':
+                    try:
+                        # Remove common PowerShell formatting
+                        clean_value = str(value).replace(',', '').replace(' MB', '').replace(' GB', '').replace('$', '')
+                        transformed[target_field] = float(clean_value)
+                    except (ValueError, TypeError):
+                        transformed[target_field] = 0.0
+                else:
+                    transformed[target_field] = 0.0
+
+            elif target_field == 'account_status':
+                # Convert boolean to status string
+                if isinstance(value, bool):
+                    transformed[target_field] = '有効' if value else '無効'
+                else:
+                    transformed[target_field] = str(value) if value else '無効'
+
+            else:
+                # Default string conversion
+                transformed[target_field] = str(value) if value and value != 'N/A' else None
+
+    # Add metadata fields
+    transformed['created_at'] = datetime.utcnow()
+    transformed['updated_at'] = datetime.utcnow()
+
+    return transformed
+
+
+def _blank_mask(series: pd.Series) -> pd.Series:
+    """Values treated as empty in PowerShell exports (NaN, blank, 'N/A', 0, False)."""
+    if pd.api.types.is_bool_dtype(series):
+        return ~series.astype(bool)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.isna() | (series == 0)
+    return series.isna() | series.astype(str).str.strip().isin(['', 'N/A'])
+
+
+def _to_naive_utc(text: pd.Series, **kwargs) -> pd.Series:
+    """Parse datetime strings; offset-aware values ('Z', '+09:00') are converted to naive UTC."""
+    return pd.to_datetime(text, utc=True, errors='coerce', **kwargs).dt.tz_convert(None)
+
+
+def _transform_datetime(series: pd.Series) -> pd.Series:
+    blank = _blank_mask(series)
+    text = series.astype(str).where(~blank)
+    result = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    for fmt in POWERSHELL_DATETIME_FORMATS:
+        pending = result.isna() & ~blank
+        if not pending.any():
+            break
+        result[pending] = _to_naive_utc(text[pending], format=fmt)
+    pending = result.isna() & ~blank
+    if pending.any():
+        # Remaining values (fractional seconds, offsets, ...) go through pandas' generic parser
+        result[pending] = _to_naive_utc(text[pending], format='mixed')
+    return result.astype(object).where(result.notna(), None)
+
+
+def _transform_numeric(series: pd.Series) -> pd.Series:
+    blank = _blank_mask(series)
+    text = (series.astype(str)
+            .str.replace(',', '', regex=False)
+            .str.replace(' MB', '', regex=False)
+            .str.replace(' GB', '', regex=False)
+            .str.replace('$', '', regex=False))
+    return pd.to_numeric(text, errors='coerce').where(~blank).fillna(0.0).astype(float)
+
+
+def _transform_account_status(series: pd.Series) -> pd.Series:
+    blank = _blank_mask(series)
+    values = series.astype(object)
+    result = values.map(lambda v: ('有効' if v else '無効') if isinstance(v, bool) else str(v))
+    return result.where(~blank, '無効')
+
+
+def _transform_text(series: pd.Series) -> pd.Series:
+    blank = _blank_mask(series)
+    return series.astype(object).map(str).astype(object).where(~blank, None)
+
+
+def transform_frame(chunk_df: pd.DataFrame, field_mappings: Dict[str, str]) -> pd.DataFrame:
+    """
+    Transform a whole chunk of PowerShell records to Python model format.
+
+    Column-wise equivalent of transform_record(); missing or unparseable
+    values become NULL (datetime/text) or 0.0 (numeric).
+    """
+    columns = {}
+    for source_field, target_field in field_mappings.items():
+        if source_field not in chunk_df.columns:
+            continue
+        series = chunk_df[source_field]
+
+        if target_field in DATETIME_FIELDS:
+            columns[target_field] = _transform_datetime(series)
+        elif target_field in NUMERIC_FIELDS:
+            columns[target_field] = _transform_numeric(series)
+        elif target_field == 'account_status':
+            columns[target_field] = _transform_account_status(series)
+        else:
+            columns[target_field] = _transform_text(series)
+
+    transformed = pd.DataFrame(columns, index=chunk_df.index)
+
+    # Add metadata fields
+    now = datetime.utcnow()
+    transformed['created_at'] = now
+    transformed['updated_at'] = now
+
+    return transformed
+
+
+class BulkCopyLoader:
+    """
+    PostgreSQL COPY based bulk loader.
+
+    Each chunk is streamed with COPY into a temporary staging table cloned
+    from the target table and then moved into the target with a single
+    INSERT ... SELECT. With conflict columns the insert is an upsert
+    (ON CONFLICT DO UPDATE); duplicates inside a chunk keep the last row.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.stats = {
+            'chunks_loaded': 0,
+            'chunks_failed': 0,
+            'rows_loaded': 0,
+            'load_seconds': 0.0
+        }
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @staticmethod
+    def _copy_field(series: pd.Series) -> pd.Series:
+        """
+        COPY CSV text of one column.
+
+        Text values are always quoted, so a literal '\\N' or an empty string is
+        never read back as NULL; NULLs are written as the unquoted marker.
+        """
+        null = series.isna()
+        if pd.api.types.is_datetime64_any_dtype(series):
+            text = series.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        elif pd.api.types.is_bool_dtype(series):
+            text = series.map({True: 'true', False: 'false'})
+        elif pd.api.types.is_numeric_dtype(series):
+            text = series.astype(str)
+        else:
+            text = '"' + series.astype(str).str.replace('"', '""', regex=False) + '"'
+        return text.where(~null, COPY_NULL)
+
+    @classmethod
+    def to_copy_buffer(cls, frame: pd.DataFrame) -> io.StringIO:
+        """Serialize a frame as a COPY CSV stream."""
+        buffer = io.StringIO()
+        if len(frame) and len(frame.columns):
+            fields = [cls._copy_field(frame[column]) for column in frame.columns]
+            lines = fields[0].str.cat(fields[1:], sep=',') if len(fields) > 1 else fields[0]
+            buffer.write('\n'.join(lines))
+            buffer.write('\n')
+        buffer.seek(0)
+        return buffer
+
+    def build_merge_sql(self, table_name: str, staging_table: str, columns: Sequence[str],
+                        conflict_columns: Optional[Sequence[str]] = None) -> str:
+        """Build the INSERT ... SELECT statement moving staging rows into the target."""
+        column_list = ', '.join(self._quote(c) for c in columns)
+        target = self._quote(table_name)
+        staging = self._quote(staging_table)
+
+        if not conflict_columns:
+            return f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging}"
+
+        key_list = ', '.join(self._quote(c) for c in conflict_columns)
+        updates = ', '.join(
+            f"{self._quote(c)} = EXCLUDED.{self._quote(c)}"
+            for c in columns if c not in conflict_columns and c != 'created_at'
+        )
+        action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+        return (
+            f"INSERT INTO {target} ({column_list}) "
+            f"SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging} "
+            f"ORDER BY {key_list}, _stg_row DESC "
+            f"ON CONFLICT ({key_list}) {action}"
+        )
+
+    def load(self, frame: pd.DataFrame, table_name: str,
+             conflict_columns: Optional[Sequence[str]] = None) -> int:
+        """
+        Load a transformed chunk into a table in one transaction.
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        if frame.empty:
+            return 0
+
+        started = time.perf_counter()
+        columns = list(frame.columns)
+        staging_table = f"_stg_{table_name}"
+        column_list = ', '.join(self._quote(c) for c in columns)
+
+        raw_connection = self.engine.raw_connection()
+        try:
+            cursor = raw_connection.cursor()
+            try:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {self._quote(staging_table)} "
+                    f"(LIKE {self._quote(table_name)} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                cursor.execute(
+                    f"ALTER TABLE {self._quote(staging_table)} ADD COLUMN _stg_row BIGSERIAL"
+                )
+                cursor.copy_expert(
+                    f"COPY {self._quote(staging_table)} ({column_list}) FROM STDIN "
+                    f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                    self.to_copy_buffer(frame)
+                )
+                cursor.execute(self.build_merge_sql(table_name, staging_table, columns, conflict_columns))
+                affected = cursor.rowcount
+            finally:
+                cursor.close()
+            raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            self.stats['chunks_failed'] += 1
+            raise
+        finally:
+            raw_connection.close()
+
+        self.stats['chunks_loaded'] += 1
+        self.stats['rows_loaded'] += len(frame)
+        self.stats['load_seconds'] += time.perf_counter() - started
+        return affected if affected is not None and affected >= 0 else len(frame)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loader statistics including throughput."""
+        stats = dict(self.stats)
+        stats['rows_per_second'] = (
+            round(stats['rows_loaded'] / stats['load_seconds'], 1) if stats['load_seconds'] else 0.0
+        )
+        return stats
+
+
+def benchmark_transform(row_count: int = 100000,
+                        field_mappings: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """
+    Measure rows/sec of the per-record and the vectorised transformation
+    on a synthetic PowerShell user export.
+    """
+    field_mappings = field_mappings or {
+        'DisplayName': 'display_name',
+        'UserPrincipalName': 'user_principal_name',
+        'AccountEnabled': 'account_status',
+        'CreatedDateTime': 'creation_date',
+        'TotalItemSize': 'total_size_mb'
+    }
+    frame = pd.DataFrame({
+        'DisplayName': [f'ユーザー{i}' for i in range(row_count)],
+        'UserPrincipalName': [f'user{i}@contoso.com' for i in range(row_count)],
+        'AccountEnabled': [i % 3 != 0 for i in range(row_count)],
+        'CreatedDateTime': [f'2024-01-{i % 28 + 1:02d}T09:00:00Z' for i in range(row_count)],
+        'TotalItemSize': [f'{i % 5000:,} MB' for i in range(row_count)]
+    })
+
+    started = time.perf_counter()
+    for _, row in frame.iterrows():
+        transform_record(row.to_dict(), field_mappings)
+    row_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    transform_frame(frame, field_mappings)
+    frame_seconds = time.perf_counter() - started
+
+    return {
+        'rows': row_count,
+        'row_path_rows_per_second': round(row_count / row_seconds, 1),
+        'bulk_path_rows_per_second': round(row_count / frame_seconds, 1),
+        'speedup': round(row_seconds / frame_seconds, 1)
+    }
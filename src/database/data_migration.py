@@ -8,7 +8,7 @@ import json
 import csv
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Union, Iterator
+from typing import Optional, Dict, Any, List, Union, Iterator, Tuple, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from sqlalchemy.orm import Session
@@ -16,6 +16,7 @@ from sqlalchemy import text, inspect
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from .engine import get_database_engine, get_session
+from .bulk_loader import BulkCopyLoader, transform_frame, transform_record
 from .models import (
     Base, User, MFAStatus, SignInLog, Mailbox, MailFlowAnalysis,
     TeamsUsage, OneDriveStorageAnalysis, LicenseAnalysis, 
@@ -35,7 +36,10 @@ MIGRATION_CONFIG = {
     'dry_run_mode': os.getenv('MIGRATION_DRY_RUN', 'false').lower() == 'true',
     'preserve_timestamps': os.getenv('MIGRATION_PRESERVE_TIMESTAMPS', 'true').lower() == 'true',
     'error_threshold_percent': float(os.getenv('MIGRATION_ERROR_THRESHOLD', '5.0')),
-    'powershell_csv_encoding': os.getenv('POWERSHELL_CSV_ENCODING', 'utf-8-sig')
+    'powershell_csv_encoding': os.getenv('POWERSHELL_CSV_ENCODING', 'utf-8-sig'),
+    'bulk_copy_enabled': os.getenv('MIGRATION_BULK_COPY', 'true').lower() == 'true',
+    'bulk_chunk_size': int(os.getenv('MIGRATION_BULK_CHUNK_SIZE', '50000')),
+    'checkpoint_path': os.getenv('MIGRATION_CHECKPOINT_PATH', './Backups/migration/checkpoints')
 }
 
 @dataclass
@@ -70,12 +74,14 @@ class PowerShellDataMigrator:
         self.source_path = Path(MIGRATION_CONFIG['source_data_path'])
         self.backup_path = Path(MIGRATION_CONFIG['backup_path'])
         self.backup_path.mkdir(parents=True, exist_ok=True)
+        self.bulk_loader = BulkCopyLoader(self.engine)
         
         # PowerShell report mappings to Python models
         self.table_mappings = {
             'users': {
                 'model': User,
                 'csv_patterns': ['*users*.csv', '*user_list*.csv', '*entra_users*.csv'],
+                'conflict_columns': ['user_principal_name'],
                 'field_mappings': {
                     'DisplayName': 'display_name',
                     'UserPrincipalName': 'user_principal_name',
@@ -123,6 +129,7 @@ class PowerShellDataMigrator:
             'mailboxes': {
                 'model': Mailbox,
                 'csv_patterns': ['*mailbox*.csv', '*exchange*.csv'],
+                'conflict_columns': ['email'],
                 'field_mappings': {
                     'PrimarySmtpAddress': 'email',
                     'DisplayName': 'display_name',
@@ -286,68 +293,28 @@ class PowerShellDataMigrator:
     
     def transform_record(self, source_record: Dict[str, Any], field_mappings: Dict[str, str]) -> Dict[str, Any]:
         """Transform PowerShell record to Python model format."""
-        transformed = {}
-        
         try:
-            for source_field, target_field in field_mappings.items():
-                if source_field in source_record:
-                    value = source_record[source_field]
-                    
-                    # Handle special transformations
-                    if target_field in ['creation_date', 'last_sign_in', 'signin_datetime', 'last_access']:
-                        # Convert PowerShell datetime strings to Python datetime
-                        if value and value != 'N/A' and str(value).strip():
-                            try:
-                                # Try common PowerShell datetime formats
-                                for fmt in ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S']:
-                                    try:
-                                        transformed[target_field] = datetime.strptime(str(value), fmt)
-                                        break
-                                    except ValueError:
-                                        continue
-                                else:
-                                    # If no format matches, try pandas conversion
-                                    transformed[target_field] = pd.to_datetime(value, errors='coerce').to_pydatetime()
-                            except:
-                                transformed[target_field] = None
-                        else:
-                            transformed[target_field] = None
-                    
-                    elif target_field in ['total_size_mb', 'quota_mb', 'utilization_rate', 'monthly_cost']:
-                        # Convert numeric fields
-                        if value and value != 'N/A':
-                            try:
-                                # Remove common PowerShell formatting
-                                clean_value = str(value).replace(',', '').replace(' MB', '').replace(' GB', '').replace('$', '')
-                                transformed[target_field] = float(clean_value)
-                            except (ValueError, TypeError):
-                                transformed[target_field] = 0.0
-                        else:
-                            transformed[target_field] = 0.0
-                    
-                    elif target_field == 'account_status':
-                        # Convert boolean to status string
-                        if isinstance(value, bool):
-                            transformed[target_field] = '有効' if value else '無効'
-                        else:
-                            transformed[target_field] = str(value) if value else '無効'
-                    
-                    else:
-                        # Default string conversion
-                        transformed[target_field] = str(value) if value and value != 'N/A' else None
-            
-            # Add metadata fields
-            transformed['created_at'] = datetime.utcnow()
-            transformed['updated_at'] = datetime.utcnow()
-            
-            return transformed
-            
+            return transform_record(source_record, field_mappings)
         except Exception as e:
             logger.error(f"Record transformation failed: {e}")
             return {}
     
-    def migrate_table_data(self, table_name: str, source_files: List[Path]) -> MigrationResult:
-        """Migrate data for a specific table."""
+    def transform_chunk(self, chunk_df: pd.DataFrame, field_mappings: Dict[str, str]) -> pd.DataFrame:
+        """Transform a chunk of PowerShell records to Python model format (vectorised)."""
+        return transform_frame(chunk_df, field_mappings)
+    
+    def migrate_table_data(self, table_name: str, source_files: List[Path],
+                           backup: bool = True, start_row: int = 0,
+                           on_chunk_committed: Optional[Callable[[Path, int], None]] = None) -> MigrationResult:
+        """
+        Migrate data for a specific table.
+        
+        Args:
+            start_row: Data rows of each source file that are already migrated
+                (resuming an interrupted file)
+            on_chunk_committed: Called as (source_file, rows of the file committed
+                so far) after every committed chunk
+        """
         start_time = datetime.utcnow()
         errors = []
         records_processed = 0
@@ -376,7 +343,7 @@ class PowerShellDataMigrator:
             field_mappings = mapping['field_mappings']
             
             # Backup existing data if not in dry run mode
-            if not MIGRATION_CONFIG['dry_run_mode']:
+            if backup and not MIGRATION_CONFIG['dry_run_mode']:
                 if not self.backup_existing_data(table_name):
                     errors.append("Failed to backup existing data")
             
@@ -394,60 +361,49 @@ class PowerShellDataMigrator:
                         continue
                     
                     # Read CSV data in batches
-                    chunk_size = MIGRATION_CONFIG['batch_size']
+                    use_bulk = MIGRATION_CONFIG['bulk_copy_enabled'] and not MIGRATION_CONFIG['dry_run_mode']
+                    chunk_size = MIGRATION_CONFIG['bulk_chunk_size'] if use_bulk else MIGRATION_CONFIG['batch_size']
+                    
+                    file_rows = start_row
+                    if start_row:
+                        logger.info(f"Resuming {source_file} for table {table_name} after row {start_row}")
                     
                     with get_session() as session:
                         for chunk_df in pd.read_csv(
                             source_file,
                             encoding=MIGRATION_CONFIG['powershell_csv_encoding'],
-                            chunksize=chunk_size
+                            chunksize=chunk_size,
+                            # Keep the header line, skip the rows already migrated
+                            skiprows=range(1, start_row + 1) if start_row else None
                         ):
-                            # Process each record in the chunk
-                            for _, row in chunk_df.iterrows():
-                                records_processed += 1
-                                
-                                try:
-                                    # Transform record
-                                    transformed = self.transform_record(row.to_dict(), field_mappings)
-                                    
-                                    if not transformed:
-                                        records_skipped += 1
-                                        continue
-                                    
-                                    # Create model instance
-                                    if not MIGRATION_CONFIG['dry_run_mode']:
-                                        instance = model_class(**transformed)
-                                        session.add(instance)
-                                        session.flush()  # Flush to catch integrity errors
-                                    
-                                    records_migrated += 1
-                                    
-                                    # Commit in batches
-                                    if records_migrated % chunk_size == 0:
-                                        if not MIGRATION_CONFIG['dry_run_mode']:
-                                            session.commit()
-                                        logger.info(f"Migrated {records_migrated} records for {table_name}")
-                                
-                                except IntegrityError as e:
-                                    session.rollback()
-                                    records_failed += 1
-                                    error_msg = f"Integrity error for record {records_processed}: {str(e)[:200]}"
-                                    errors.append(error_msg)
-                                    logger.warning(error_msg)
-                                
-                                except Exception as e:
-                                    records_failed += 1
-                                    error_msg = f"Error processing record {records_processed}: {str(e)[:200]}"
-                                    errors.append(error_msg)
-                                    logger.error(error_msg)
+                            row_offset = file_rows
+                            records_processed += len(chunk_df)
+                            file_rows += len(chunk_df)
                             
-                            # Final commit for remaining records
-                            if not MIGRATION_CONFIG['dry_run_mode']:
+                            loaded = False
+                            if use_bulk:
                                 try:
-                                    session.commit()
+                                    records_migrated += self._migrate_chunk_bulk(chunk_df, table_name, mapping)
+                                    logger.info(f"Migrated {records_migrated} records for {table_name} (bulk)")
+                                    loaded = True
                                 except Exception as e:
-                                    session.rollback()
-                                    errors.append(f"Final commit failed: {e}")
+                                    # Only failing chunks fall back to per-row isolation
+                                    logger.warning(
+                                        f"Bulk load failed for rows {row_offset + 1}-{file_rows} "
+                                        f"of {table_name}, retrying row by row: {str(e)[:200]}"
+                                    )
+                            
+                            if not loaded:
+                                # Commits the chunk before returning
+                                migrated, skipped, failed = self._migrate_chunk_rows(
+                                    session, chunk_df, model_class, field_mappings, row_offset, errors
+                                )
+                                records_migrated += migrated
+                                records_skipped += skipped
+                                records_failed += failed
+                            
+                            if on_chunk_committed and not MIGRATION_CONFIG['dry_run_mode']:
+                                on_chunk_committed(source_file, file_rows)
                 
                 except Exception as e:
                     error_msg = f"Error processing file {source_file}: {e}"
@@ -491,8 +447,85 @@ class PowerShellDataMigrator:
                 errors=[str(e)]
             )
     
-    def run_full_migration(self) -> List[MigrationResult]:
-        """Run complete data migration from PowerShell CSV files."""
+    def _migrate_chunk_bulk(self, chunk_df: pd.DataFrame, table_name: str,
+                            mapping: Dict[str, Any]) -> int:
+        """Load a chunk through COPY into a staging table followed by an upsert."""
+        transformed = self.transform_chunk(chunk_df, mapping['field_mappings'])
+        self.bulk_loader.load(
+            transformed,
+            mapping['model'].__tablename__,
+            conflict_columns=mapping.get('conflict_columns')
+        )
+        return len(transformed)
+    
+    def _migrate_chunk_rows(self, session: Session, chunk_df: pd.DataFrame, model_class,
+                            field_mappings: Dict[str, str], row_offset: int,
+                            errors: List[str]) -> Tuple[int, int, int]:
+        """Migrate a chunk record by record, isolating per-row errors."""
+        batch_size = MIGRATION_CONFIG['batch_size']
+        migrated = skipped = failed = 0
+        
+        for position, (_, row) in enumerate(chunk_df.iterrows(), start=row_offset + 1):
+            try:
+                # Transform record
+                transformed = self.transform_record(row.to_dict(), field_mappings)
+                
+                if not transformed:
+                    skipped += 1
+                    continue
+                
+                # Create model instance
+                if not MIGRATION_CONFIG['dry_run_mode']:
+                    instance = model_class(**transformed)
+                    session.add(instance)
+                    session.flush()  # Flush to catch integrity errors
+                
+                migrated += 1
+                
+                # Commit in batches
+                if migrated % batch_size == 0:
+                    if not MIGRATION_CONFIG['dry_run_mode']:
+                        session.commit()
+                    logger.info(f"Migrated {migrated} records for {model_class.__tablename__}")
+            
+            except IntegrityError as e:
+                session.rollback()
+                failed += 1
+                error_msg = f"Integrity error for record {position}: {str(e)[:200]}"
+                errors.append(error_msg)
+                logger.warning(error_msg)
+            
+            except Exception as e:
+                failed += 1
+                error_msg = f"Error processing record {position}: {str(e)[:200]}"
+                errors.append(error_msg)
+                logger.error(error_msg)
+        
+        # Final commit for remaining records
+        if not MIGRATION_CONFIG['dry_run_mode']:
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                errors.append(f"Final commit failed: {e}")
+        
+        return migrated, skipped, failed
+    
+    def run_full_migration(self, resume: bool = True,
+                           progress_callback=None) -> List[MigrationResult]:
+        """
+        Run complete data migration from PowerShell CSV files.
+        
+        Tables are scheduled in foreign key order; independent tables run
+        concurrently in worker processes (MIGRATION_WORKERS). Completed
+        files are checkpointed so an interrupted migration resumes.
+        
+        Args:
+            resume: Skip files recorded in the checkpoint of a previous run
+            progress_callback: Called as (table_name, status, completed, total)
+        """
+        from .migration_scheduler import MigrationScheduler
+        
         logger.info("Starting full data migration from PowerShell CSV files...")
         migration_results = []
         
@@ -504,21 +537,21 @@ class PowerShellDataMigrator:
                 logger.warning("No source files discovered for migration")
                 return migration_results
             
-            # Process each table
-            for table_name, source_files in discovered_files.items():
-                if not source_files:
-                    logger.info(f"No files found for table: {table_name}")
-                    continue
-                
-                logger.info(f"Migrating {len(source_files)} files for table: {table_name}")
-                
-                # Migrate table data
-                result = self.migrate_table_data(table_name, source_files)
-                migration_results.append(result)
-                
-                # Log result summary
+            scheduler = MigrationScheduler(
+                self,
+                max_workers=MIGRATION_CONFIG['parallel_workers'],
+                checkpoint_dir=Path(MIGRATION_CONFIG['checkpoint_path']),
+                progress_callback=progress_callback
+            )
+            if not resume:
+                scheduler.checkpoint.clear()
+            
+            migration_results = scheduler.run(discovered_files)
+            
+            # Log result summary
+            for result in migration_results:
                 logger.info(
-                    f"Migration completed for {table_name}: "
+                    f"Migration completed for {result.target_table}: "
                     f"{result.records_migrated}/{result.records_processed} records "
                     f"(Success rate: {result.success_rate:.1f}%)"
                 )
@@ -570,6 +603,7 @@ class PowerShellDataMigrator:
                     }
                     for r in results
                 ],
+                'bulk_load': self.bulk_loader.get_stats(),
                 'configuration': MIGRATION_CONFIG
             }
             
@@ -0,0 +1,331 @@
+# Microsoft 365 Management Tools - Parallel Migration Scheduler
+# Foreign key ordered, resumable per-table migration across worker processes
+
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set, Tuple, Callable
+
+from .data_migration import MigrationResult, PowerShellDataMigrator, MIGRATION_CONFIG
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Result statuses that block tables depending on the failed one
+BLOCKING_STATUSES = ('error', 'failed_high_error_rate', 'skipped_dependency_failed')
+
+
+def build_dependency_graph(table_mappings: Dict[str, Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """
+    Build the table dependency graph from the models' foreign keys.
+
+    Returns:
+        Mapping of migration table name to the migration tables it references
+    """
+    by_table_name = {mapping['model'].__tablename__: name for name, mapping in table_mappings.items()}
+    graph = {}
+
+    for name, mapping in table_mappings.items():
+        dependencies = set()
+        for foreign_key in mapping['model'].__table__.foreign_keys:
+            referenced = by_table_name.get(foreign_key.column.table.name)
+            if referenced and referenced != name:
+                dependencies.add(referenced)
+        graph[name] = dependencies
+
+    return graph
+
+
+def topological_levels(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Group tables into levels; every table only depends on earlier levels."""
+    remaining = {name: set(deps) for name, deps in graph.items()}
+    levels = []
+
+    while remaining:
+        level = [name for name, deps in remaining.items() if not deps]
+        if not level:
+            raise ValueError(f"Circular table dependencies: {sorted(remaining)}")
+        levels.append(level)
+        for name in level:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(level)
+
+    return levels
+
+
+class MigrationCheckpoint:
+    """
+    Per-file migration checkpoint.
+
+    One JSON file per table, written only by the worker migrating that table.
+    A source file is identified by its path, size and modification time, so
+    a changed file is migrated again. Files still being migrated record the
+    number of rows committed so far, so an interrupted file resumes after
+    its last committed chunk instead of loading those rows a second time.
+    """
+
+    def __init__(self, checkpoint_dir: Path):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self._lock = threading.Lock()
+
+    def _path(self, table_name: str) -> Path:
+        return self.checkpoint_dir / f"{table_name}.json"
+
+    @staticmethod
+    def file_key(source_file: Path) -> str:
+        stat = source_file.stat()
+        return f"{source_file.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def _load_state(self, table_name: str) -> Dict[str, Any]:
+        path = self._path(table_name)
+        if not path.exists():
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return {}
+
+    def _save_state(self, table_name: str, state: Dict[str, Any]):
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(table_name)
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'table': table_name, **state}, f, indent=2, ensure_ascii=False)
+        temp_path.replace(path)
+
+    def load(self, table_name: str) -> Dict[str, Any]:
+        """Completed files of a table."""
+        return self._load_state(table_name).get('files', {})
+
+    def has_state(self, table_name: str) -> bool:
+        state = self._load_state(table_name)
+        return bool(state.get('files') or state.get('in_progress'))
+
+    def is_done(self, table_name: str, source_file: Path) -> bool:
+        return self.file_key(source_file) in self.load(table_name)
+
+    def rows_done(self, table_name: str, source_file: Path) -> int:
+        """Rows of an unfinished file committed by an earlier run."""
+        entry = self._load_state(table_name).get('in_progress', {}).get(self.file_key(source_file))
+        return entry['rows'] if entry else 0
+
+    def mark_progress(self, table_name: str, source_file: Path, rows: int):
+        with self._lock:
+            state = self._load_state(table_name)
+            state.setdefault('in_progress', {})[self.file_key(source_file)] = {
+                'rows': rows,
+                'updated_at': datetime.utcnow().isoformat()
+            }
+            self._save_state(table_name, state)
+
+    def mark_done(self, table_name: str, source_file: Path, result: MigrationResult):
+        with self._lock:
+            state = self._load_state(table_name)
+            key = self.file_key(source_file)
+            state.get('in_progress', {}).pop(key, None)
+            state.setdefault('files', {})[key] = {
+                'records_migrated': result.records_migrated,
+                'records_failed': result.records_failed,
+                'status': result.status,
+                'completed_at': result.end_time.isoformat()
+            }
+            self._save_state(table_name, state)
+
+    def clear(self, table_name: Optional[str] = None):
+        paths = [self._path(table_name)] if table_name else self.checkpoint_dir.glob('*.json')
+        for path in paths:
+            if path.exists():
+                path.unlink()
+
+
+def migrate_table_files(table_name: str, source_files: List[str],
+                        checkpoint_dir: str) -> Tuple[List[MigrationResult], Dict[str, Any]]:
+    """
+    Migrate the files of one table, file by file with checkpoints.
+
+    Runs in a worker process: the migrator (and therefore the engine and its
+    connection pool) is created inside the worker.
+    """
+    migrator = PowerShellDataMigrator()
+    checkpoint = MigrationCheckpoint(Path(checkpoint_dir))
+    results = []
+    backup = not checkpoint.has_state(table_name)
+
+    def chunk_committed(source_file: Path, rows: int):
+        checkpoint.mark_progress(table_name, source_file, rows)
+
+    for source_file in map(Path, source_files):
+        if checkpoint.is_done(table_name, source_file):
+            logger.info(f"Skipping checkpointed file {source_file} for {table_name}")
+            continue
+
+        result = migrator.migrate_table_data(
+            table_name, [source_file], backup=backup,
+            start_row=checkpoint.rows_done(table_name, source_file),
+            on_chunk_committed=chunk_committed
+        )
+        backup = False
+        results.append(result)
+
+        if result.status in BLOCKING_STATUSES:
+            break
+        if not MIGRATION_CONFIG['dry_run_mode']:
+            checkpoint.mark_done(table_name, source_file, result)
+
+    return results, migrator.bulk_loader.get_stats()
+
+
+def merge_results(table_name: str, results: List[MigrationResult],
+                  status: Optional[str] = None) -> MigrationResult:
+    """Combine per-file results into one result for the table."""
+    now = datetime.utcnow()
+    if not results:
+        return MigrationResult(
+            source_file='',
+            target_table=table_name,
+            records_processed=0,
+            records_migrated=0,
+            records_skipped=0,
+            records_failed=0,
+            start_time=now,
+            end_time=now,
+            status=status or 'resumed',
+            errors=[]
+        )
+
+    statuses = [r.status for r in results]
+    if status is None:
+        status = next((s for s in BLOCKING_STATUSES if s in statuses), None)
+    if status is None:
+        status = 'completed_with_errors' if 'completed_with_errors' in statuses else statuses[-1]
+
+    return MigrationResult(
+        source_file=', '.join(r.source_file for r in results if r.source_file),
+        target_table=table_name,
+        records_processed=sum(r.records_processed for r in results),
+        records_migrated=sum(r.records_migrated for r in results),
+        records_skipped=sum(r.records_skipped for r in results),
+        records_failed=sum(r.records_failed for r in results),
+        start_time=min(r.start_time for r in results),
+        end_time=max(r.end_time for r in results),
+        status=status,
+        errors=[e for r in results for e in r.errors]
+    )
+
+
+class MigrationScheduler:
+    """
+    Parallel per-table migration scheduler.
+
+    A table is submitted as soon as every table it references through a
+    foreign key has finished; independent tables run concurrently in a
+    process pool whose workers open their own database connections.
+    """
+
+    def __init__(self, migrator: PowerShellDataMigrator,
+                 max_workers: int = 4,
+                 checkpoint_dir: Optional[Path] = None,
+                 progress_callback: Optional[Callable[[str, str, int, int], None]] = None,
+                 executor_factory: Optional[Callable[[int], Executor]] = None):
+        self.migrator = migrator
+        self.max_workers = max(1, max_workers)
+        self.checkpoint = MigrationCheckpoint(checkpoint_dir or Path(MIGRATION_CONFIG['checkpoint_path']))
+        self.progress_callback = progress_callback
+        self.executor_factory = executor_factory or self._default_executor
+        self.graph = build_dependency_graph(migrator.table_mappings)
+
+    @staticmethod
+    def _default_executor(max_workers: int) -> Executor:
+        # spawn: workers must not inherit the parent's engine or open sockets
+        return ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+
+    def _report(self, table_name: str, status: str, completed: int, total: int):
+        logger.info(f"[{completed}/{total}] {table_name}: {status}")
+        if self.progress_callback:
+            try:
+                self.progress_callback(table_name, status, completed, total)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    def _merge_loader_stats(self, stats: Dict[str, Any]):
+        for key, value in stats.items():
+            if key in self.migrator.bulk_loader.stats:
+                self.migrator.bulk_loader.stats[key] += value
+
+    def run(self, discovered_files: Dict[str, List[Path]]) -> List[MigrationResult]:
+        """
+        Migrate all tables with discovered files.
+
+        Returns:
+            One result per table that had source files, in completion order
+        """
+        topological_levels(self.graph)  # fail fast on cycles
+
+        pending = {name: set(self.graph.get(name, ())) for name in discovered_files}
+        for deps in pending.values():
+            deps.intersection_update(pending)
+        total = sum(1 for files in discovered_files.values() if files)
+        completed = 0
+        results: List[MigrationResult] = []
+        failed: Set[str] = set()
+        running: Dict[Future, str] = {}
+
+        def finish(table_name: str, result: Optional[MigrationResult]):
+            nonlocal completed
+            del pending[table_name]
+            for deps in pending.values():
+                deps.discard(table_name)
+            if result is None:
+                return
+            completed += 1
+            results.append(result)
+            if result.status in BLOCKING_STATUSES:
+                failed.add(table_name)
+            self._report(table_name, result.status, completed, total)
+
+        with self.executor_factory(self.max_workers) as executor:
+            while pending:
+                ready = [name for name, deps in pending.items()
+                         if not deps and name not in running.values()]
+                for table_name in ready:
+                    files = discovered_files[table_name]
+                    if not files:
+                        finish(table_name, None)
+                        continue
+
+                    blocked_by = self.graph.get(table_name, set()) & failed
+                    if blocked_by:
+                        finish(table_name, merge_results(table_name, [], status='skipped_dependency_failed'))
+                        logger.error(f"Skipping {table_name}: dependency failed ({', '.join(sorted(blocked_by))})")
+                        continue
+
+                    future = executor.submit(migrate_table_files, table_name,
+                                             [str(f) for f in files], str(self.checkpoint.checkpoint_dir))
+                    running[future] = table_name
+                    self._report(table_name, 'running', completed, total)
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    table_name = running.pop(future)
+                    try:
+                        table_results, loader_stats = future.result()
+                        self._merge_loader_stats(loader_stats)
+                        result = merge_results(table_name, table_results)
+                    except Exception as e:
+                        logger.error(f"Migration worker failed for {table_name}: {e}")
+                        result = merge_results(table_name, [], status='error')
+                        result.errors.append(str(e))
+                    finish(table_name, result)
+
+        return results
@@ -0,0 +1,310 @@
+"""
+Ring-buffer log model shared by the GUI log viewers.
+Appends are queued and applied once per timer tick, the oldest lines are
+evicted in O(1) and level filtering happens in the model, so logging cost no
+longer grows with the number of lines already shown. Views are QListView
+based with uniform row heights, so only the visible rows are ever painted.
+"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, pyqtSlot
+from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtWidgets import QAbstractItemView, QListView
+
+DEFAULT_CAPACITY = 10000
+FLUSH_INTERVAL_MS = 50
+
+LEVEL_COLORS = {
+    "INFO": "#17a2b8",
+    "SUCCESS": "#28a745",
+    "WARNING": "#ffc107",
+    "ERROR": "#dc3545",
+    "CRITICAL": "#dc3545",
+    "DEBUG": "#6f42c1"
+}
+
+LEVEL_ICONS = {
+    "INFO": "ℹ️",
+    "SUCCESS": "✅",
+    "WARNING": "⚠️",
+    "ERROR": "❌",
+    "DEBUG": "🔍"
+}
+
+
+class LogRecord(NamedTuple):
+    """A single log line."""
+    timestamp: str
+    level: str
+    message: str
+    source: str = ""
+
+
+def format_record(record: LogRecord) -> str:
+    """'[timestamp] icon LEVEL (source) message'"""
+    icon = LEVEL_ICONS.get(record.level.upper(), "📝")
+    source = f" ({record.source})" if record.source else ""
+    return f"[{record.timestamp}] {icon} {record.level}{source} {record.message}"
+
+
+def format_message(record: LogRecord) -> str:
+    return record.message
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO with O(1) append, popleft and indexing."""
+
+    __slots__ = ("_items", "_start", "_count")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._items: List[Optional[LogRecord]] = [None] * capacity
+        self._start = 0
+        self._count = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._items)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> LogRecord:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._items[(self._start + index) % len(self._items)]
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        for index in range(self._count):
+            yield self[index]
+
+    def append(self, item: LogRecord) -> Optional[LogRecord]:
+        """Append an item; returns the evicted oldest item when full."""
+        capacity = len(self._items)
+        if self._count < capacity:
+            self._items[(self._start + self._count) % capacity] = item
+            self._count += 1
+            return None
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % capacity
+        return evicted
+
+    def popleft(self) -> LogRecord:
+        if not self._count:
+            raise IndexError("pop from an empty ring buffer")
+        item = self._items[self._start]
+        self._items[self._start] = None
+        self._start = (self._start + 1) % len(self._items)
+        self._count -= 1
+        return item
+
+    def clear(self):
+        self._items = [None] * len(self._items)
+        self._start = 0
+        self._count = 0
+
+
+class LogBuffer:
+    """
+    Retained log records and the level-filtered rows shown from them.
+
+    The filtered rows are a second ring buffer holding the accepted records in
+    order, so evicting the oldest record only ever touches its first row.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY,
+                 levels: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()):
+        self.records = RingBuffer(capacity)
+        self.rows = RingBuffer(capacity)
+        self.levels = frozenset(level.upper() for level in levels) if levels is not None else None
+        self.exclude = frozenset(level.upper() for level in exclude)
+
+    @property
+    def capacity(self) -> int:
+        return self.records.capacity
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, row: int) -> LogRecord:
+        return self.rows[row]
+
+    def accepts(self, record: LogRecord) -> bool:
+        level = record.level.upper()
+        return (self.levels is None or level in self.levels) and level not in self.exclude
+
+    def overflow(self, incoming: int) -> int:
+        """Number of retained records that appending `incoming` more would evict."""
+        return max(0, len(self.records) + incoming - self.capacity)
+
+    def rows_among_oldest(self, count: int) -> int:
+        """How many of the `count` oldest records are shown as rows."""
+        return sum(1 for index in range(min(count, len(self.records))) if self.accepts(self.records[index]))
+
+    def drop_oldest(self, count: int):
+        for _ in range(min(count, len(self.records))):
+            self._evicted(self.records.popleft())
+
+    def _evicted(self, record: LogRecord):
+        if len(self.rows) and self.rows[0] is record:
+            self.rows.popleft()
+
+    def extend(self, records: Iterable[LogRecord]):
+        for record in records:
+            evicted = self.records.append(record)
+            if evicted is not None:
+                self._evicted(evicted)
+            if self.accepts(record):
+                self.rows.append(record)
+
+    def set_levels(self, levels: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()):
+        """Change the level filter and rebuild the rows from the retained records."""
+        self.levels = frozenset(level.upper() for level in levels) if levels is not None else None
+        self.exclude = frozenset(level.upper() for level in exclude)
+        self.rows.clear()
+        for record in self.records:
+            if self.accepts(record):
+                self.rows.append(record)
+
+    def clear(self):
+        self.records.clear()
+        self.rows.clear()
+
+
+class LogListModel(QAbstractListModel):
+    """
+    List model over a LogBuffer.
+
+    append() only queues the record; queued records are applied in one batch
+    per timer tick (one rowsRemoved / rowsInserted pair per batch).
+    """
+
+    RecordRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY,
+                 levels: Optional[Iterable[str]] = None,
+                 exclude: Iterable[str] = (),
+                 formatter=format_record,
+                 colors: Optional[Dict[str, QColor]] = None,
+                 default_color: Optional[QColor] = None,
+                 flush_interval_ms: int = FLUSH_INTERVAL_MS,
+                 parent=None):
+        super().__init__(parent)
+        self.buffer = LogBuffer(capacity, levels, exclude)
+        self.formatter = formatter
+        self.colors = colors or {level: QColor(color) for level, color in LEVEL_COLORS.items()}
+        self.default_color = default_color or QColor("#ffffff")
+        self._pending: List[LogRecord] = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.buffer)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.buffer):
+            return None
+        record = self.buffer[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.formatter(record)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.colors.get(record.level.upper(), self.default_color)
+        if role == self.RecordRole:
+            return record
+        return None
+
+    def append(self, record: LogRecord):
+        """Queue a record for the next flush."""
+        self._pending.append(record)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def append_entry(self, timestamp: str, level: str, message: str, source: str = ""):
+        self.append(LogRecord(timestamp, level, message, source))
+
+    @pyqtSlot()
+    def flush(self) -> int:
+        """Apply queued records; returns the number of records applied."""
+        self._timer.stop()
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, []
+        buffer = self.buffer
+
+        if len(batch) >= buffer.capacity:
+            self.beginResetModel()
+            buffer.clear()
+            buffer.extend(batch[-buffer.capacity:])
+            self.endResetModel()
+            return len(batch)
+
+        evict = buffer.overflow(len(batch))
+        removed = buffer.rows_among_oldest(evict)
+        if removed:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+        buffer.drop_oldest(evict)
+        if removed:
+            self.endRemoveRows()
+
+        added = sum(1 for record in batch if buffer.accepts(record))
+        first = len(buffer)
+        if added:
+            self.beginInsertRows(QModelIndex(), first, first + added - 1)
+        buffer.extend(batch)
+        if added:
+            self.endInsertRows()
+        return len(batch)
+
+    def set_levels(self, levels: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()):
+        """Filter rows by level (None shows every level)."""
+        self.flush()
+        self.beginResetModel()
+        self.buffer.set_levels(levels, exclude)
+        self.endResetModel()
+
+    def clear(self):
+        self._timer.stop()
+        self._pending.clear()
+        self.beginResetModel()
+        self.buffer.clear()
+        self.endResetModel()
+
+    def to_plain_text(self) -> str:
+        self.flush()
+        return "".join(f"{self.formatter(record)}\n" for record in self.buffer.rows)
+
+
+class LogListView(QListView):
+    """Virtualized read-only view of a LogListModel."""
+
+    def __init__(self, model: LogListModel, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setFont(QFont("Consolas", 9))
+        self.auto_scroll = True
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.modelReset.connect(self._on_rows_inserted)
+
+    def _on_rows_inserted(self, *args):
+        if self.auto_scroll:
+            self.scrollToBottom()
+
+    def toPlainText(self) -> str:
+        """All shown lines, one per line (QTextEdit compatible)."""
+        return self.model().to_plain_text()
+
+    def clear(self):
+        self.model().clear()
@@ -3,19 +3,38 @@ Log viewer widget for real-time log display.
 Maintains compatibility with PowerShell Write-GuiLog functionality.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QTabWidget
-from PyQt6.QtCore import Qt, pyqtSlot
-from PyQt6.QtGui import QFont, QTextCursor, QTextCharFormat, QColor
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTabWidget
+from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtGui import QColor
+
+from .log_model import LogListModel, LogListView, LogRecord, format_message
+
+# Color mapping similar to PowerShell implementation
+LOG_COLORS = {
+    'INFO': QColor(0, 255, 255),      # Cyan
+    'SUCCESS': QColor(0, 255, 0),     # Lime Green
+    'WARNING': QColor(255, 165, 0),   # Orange
+    'ERROR': QColor(255, 0, 0),       # Red
+    'CRITICAL': QColor(255, 0, 0),    # Red
+    'DEBUG': QColor(255, 0, 255),     # Magenta
+}
+
+ERROR_LEVELS = ('ERROR', 'CRITICAL')
 
 
 class LogViewerWidget(QWidget):
     """
     Log viewer widget with color-coded log levels.
     Similar to PowerShell GUI's RichTextBox implementation.
+    
+    Each tab is a virtualized view over a ring-buffered LogListModel that
+    filters by level, so bulk logging appends in batches instead of
+    re-laying out a growing text document.
     """
     
-    def __init__(self):
+    def __init__(self, max_lines: int = 10000):
         super().__init__()
+        self.max_lines = max_lines
         self._init_ui()
         
     def _init_ui(self):
@@ -27,35 +46,42 @@ class LogViewerWidget(QWidget):
         self.tab_widget = QTabWidget()
         
         # Execution log tab
-        self.execution_log = self._create_log_text_edit()
+        self.execution_log = self._create_log_view(exclude=ERROR_LEVELS)
         self.tab_widget.addTab(self.execution_log, "📋 実行ログ")
         
         # Error log tab
-        self.error_log = self._create_log_text_edit()
+        self.error_log = self._create_log_view(levels=ERROR_LEVELS)
         self.tab_widget.addTab(self.error_log, "❌ エラーログ")
         
         # PowerShell prompt tab (for compatibility)
-        self.prompt_log = self._create_log_text_edit()
+        self.prompt_log = self._create_log_view()
         self.tab_widget.addTab(self.prompt_log, "💻 PowerShellプロンプト")
         
         layout.addWidget(self.tab_widget)
         
-    def _create_log_text_edit(self) -> QTextEdit:
-        """Create a styled text edit for logs."""
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setFont(QFont("Consolas", 9))
+    def _create_log_view(self, levels=None, exclude=()) -> LogListView:
+        """Create a styled log view filtered to the given levels."""
+        model = LogListModel(
+            capacity=self.max_lines,
+            levels=levels,
+            exclude=exclude,
+            formatter=format_message,
+            colors=LOG_COLORS,
+            default_color=QColor(212, 212, 212),
+            parent=self
+        )
+        view = LogListView(model)
         
         # Dark theme similar to PowerShell
-        text_edit.setStyleSheet("""
-            QTextEdit {
+        view.setStyleSheet("""
+            QListView {
                 background-color: #1E1E1E;
                 color: #D4D4D4;
                 border: none;
             }
         """)
         
-        return text_edit
+        return view
     
     @pyqtSlot(str, str)
     def add_log(self, message: str, level: str):
@@ -66,46 +92,10 @@ class LogViewerWidget(QWidget):
             message: Log message
             level: Log level (INFO, SUCCESS, WARNING, ERROR, DEBUG)
         """
-        # Color mapping similar to PowerShell implementation
-        color_map = {
-            'INFO': QColor(0, 255, 255),      # Cyan
-            'SUCCESS': QColor(0, 255, 0),     # Lime Green
-            'WARNING': QColor(255, 165, 0),   # Orange
-            'ERROR': QColor(255, 0, 0),       # Red
-            'CRITICAL': QColor(255, 0, 0),    # Red
-            'DEBUG': QColor(255, 0, 255),     # Magenta
-        }
-        
-        # Get color for level
-        color = color_map.get(level, QColor(212, 212, 212))
-        
-        # Determine target log
-        if level in ['ERROR', 'CRITICAL']:
-            target_log = self.error_log
-        else:
-            target_log = self.execution_log
-            
-        # Also add to prompt log
-        self._append_colored_text(self.prompt_log, message, color)
-        
-        # Append to appropriate log
-        self._append_colored_text(target_log, message, color)
-    
-    def _append_colored_text(self, text_edit: QTextEdit, text: str, color: QColor):
-        """Append colored text to a QTextEdit."""
-        cursor = text_edit.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        
-        # Create format with color
-        format = QTextCharFormat()
-        format.setForeground(color)
-        
-        # Insert text with format
-        cursor.insertText(text + '\n', format)
-        
-        # Scroll to bottom
-        text_edit.setTextCursor(cursor)
-        text_edit.ensureCursorVisible()
+        # Each tab's model decides by level whether the record is shown
+        record = LogRecord('', level, message)
+        for view in (self.execution_log, self.error_log, self.prompt_log):
+            view.model().append(record)
     
     def clear_logs(self):
         """Clear all logs."""
@@ -54,6 +54,8 @@ except ImportError as e:
     print("インストール: pip install PyQt6 PyQt6-Charts")
     sys.exit(1)
 
+from src.gui.components.log_model import LogListModel, LogListView, LEVEL_ICONS
+
 
 class DashboardDataType(Enum):
     """ダッシュボードデータタイプ"""
@@ -299,25 +301,24 @@ class MetricCard(QFrame):
         self.animation.start()
 
 
-class RealTimeLogViewer(QTextEdit):
+class RealTimeLogViewer(LogListView):
     """
     Real-timeログビューア（強化版）
     WebSocketからのログストリーミング対応
+    
+    リングバッファのログモデル上の仮想化ビュー。追加はタイマー単位でまとめて反映し、
+    レベル絞り込みはモデル側で行う。
     """
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, max_log_lines: int = 1000):
+        self.max_log_lines = max_log_lines
+        super().__init__(LogListModel(capacity=max_log_lines))
         self.init_ui()
-        self.log_buffer = []
-        self.max_log_lines = 1000
-        self.auto_scroll = True
         
     def init_ui(self):
         """UI初期化"""
-        self.setReadOnly(True)
-        self.setFont(QFont("Consolas", 9))
         self.setStyleSheet("""
-            QTextEdit {
+            QListView {
                 background-color: #1e1e1e;
                 color: #ffffff;
                 border: 1px solid #3c3c3c;
@@ -327,54 +328,16 @@ class RealTimeLogViewer(QTextEdit):
         """)
         
     def append_log_entry(self, timestamp: str, level: str, message: str, source: str = ""):
-        """ログエントリ追加（Real-time対応）"""
-        # ログレベルに応じた色設定
-        level_colors = {
-            "INFO": "#17a2b8",
-            "SUCCESS": "#28a745",
-            "WARNING": "#ffc107",
-            "ERROR": "#dc3545",
-            "DEBUG": "#6f42c1"
-        }
-        
-        color = level_colors.get(level.upper(), "#ffffff")
-        icon = self.get_level_icon(level)
-        
-        # HTMLフォーマット
-        log_html = f"""
-        <div style="margin-bottom: 4px;">
-            <span style="color: #6c757d;">[{timestamp}]</span>
-            <span style="color: {color}; font-weight: bold;">{icon} {level}</span>
-            {f'<span style="color: #adb5bd;">({source})</span>' if source else ''}
-            <span style="color: #ffffff;">{message}</span>
-        </div>
-        """
-        
-        # ログバッファに追加
-        self.log_buffer.append(log_html)
-        
-        # バッファサイズ制限
-        if len(self.log_buffer) > self.max_log_lines:
-            self.log_buffer = self.log_buffer[-self.max_log_lines:]
-            
-        # UI更新
-        self.setHtml(''.join(self.log_buffer))
-        
-        # 自動スクロール
-        if self.auto_scroll:
-            scrollbar = self.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+        """ログエントリ追加（Real-time対応、次のタイマー周期でまとめて表示）"""
+        self.model().append_entry(timestamp, level, message, source)
     
     def get_level_icon(self, level: str) -> str:
         """ログレベルアイコン取得"""
-        icons = {
-            "INFO": "ℹ️",
-            "SUCCESS": "✅",
-            "WARNING": "⚠️",
-            "ERROR": "❌",
-            "DEBUG": "🔍"
-        }
-        return icons.get(level.upper(), "📝")
+        return LEVEL_ICONS.get(level.upper(), "📝")
+    
+    def set_level_filter(self, levels: Optional[List[str]] = None):
+        """表示ログレベル絞り込み（None は全レベル）"""
+        self.model().set_levels(levels)
     
     def toggle_auto_scroll(self, enabled: bool):
         """自動スクロール切り替え"""
@@ -382,7 +345,6 @@ class RealTimeLogViewer(QTextEdit):
     
     def clear_logs(self):
         """ログクリア"""
-        self.log_buffer.clear()
         self.clear()
 
 
@@ -7,7 +7,7 @@ import pytest
 import sys
 import os
 from unittest.mock import Mock, patch, MagicMock
-from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QTextEdit, QTabWidget
+from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QTabWidget, QAbstractItemView
 from PyQt6.QtCore import Qt
 from PyQt6.QtTest import QTest
 
@@ -15,6 +15,7 @@ from PyQt6.QtTest import QTest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 from src.gui.components.log_viewer import LogViewerWidget
+from src.gui.components.log_model import LogListView
 from src.gui.components.report_buttons import ReportButtonsWidget
 from src.gui.components.enhanced_status_bar import EnhancedStatusBar
 from src.gui.components.accessibility_helper import AccessibilityHelper
@@ -59,15 +60,14 @@ class TestLogViewerWidget:
         assert hasattr(log_viewer, 'error_log')
         assert hasattr(log_viewer, 'prompt_log')
         
-        # Check if they are QTextEdit instances
-        assert isinstance(log_viewer.execution_log, QTextEdit)
-        assert isinstance(log_viewer.error_log, QTextEdit)
-        assert isinstance(log_viewer.prompt_log, QTextEdit)
+        # Check if they are log views
+        assert isinstance(log_viewer.execution_log, LogListView)
+        assert isinstance(log_viewer.error_log, LogListView)
+        assert isinstance(log_viewer.prompt_log, LogListView)
         
         # Check if they are read-only
-        assert log_viewer.execution_log.isReadOnly()
-        assert log_viewer.error_log.isReadOnly()
-        assert log_viewer.prompt_log.isReadOnly()
+        for view in (log_viewer.execution_log, log_viewer.error_log, log_viewer.prompt_log):
+            assert view.editTriggers() == QAbstractItemView.EditTrigger.NoEditTriggers
     
     def test_add_log_message(self, log_viewer):
         """Test adding log messages."""
@@ -364,10 +364,10 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
-    """Comprehensive health check endpoint"""
+    """Comprehensive health check endpoint (reads the background sampler's snapshot)"""
     try:
         if hasattr(app.state, 'health_manager'):
-            health_status = await app.state.health_manager.check_all()
+            health_status = app.state.health_manager.current_health()
         else:
             health_status = {
                 'status': 'healthy',
@@ -399,6 +399,14 @@ async def health_check():
         )
 
 
+@app.get("/health/live", tags=["Health"])
+async def liveness_check():
+    """Liveness probe: answers without evaluating any health check"""
+    if hasattr(app.state, 'health_manager'):
+        return app.state.health_manager.liveness()
+    return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
+
+
 @app.get("/operations/status", tags=["Operations"])
 async def operations_status():
     """24/7 Operations monitoring status"""
@@ -33,6 +33,7 @@ except ImportError:
     redis = None
 
 from src.core.config import get_settings
+from src.monitoring.health_snapshot import CheckSnapshot, HealthSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +81,14 @@ class HealthCheck:
     success_count: int = 0
     failure_count: int = 0
     enabled: bool = True
+    # Seconds a result stays current (None: two intervals plus the timeout)
+    max_age: Optional[float] = None
+    
+    @property
+    def staleness_budget(self) -> float:
+        if self.max_age is not None:
+            return self.max_age
+        return self.interval * 2 + self.timeout
 
 
 class HealthCheckManager:
@@ -92,10 +101,16 @@ class HealthCheckManager:
         self.running = False
         self.background_task: Optional[asyncio.Task] = None
         self.settings = get_settings()
+        self._start_time = datetime.utcnow()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._snapshot_sequence = 0
+        self._snapshot = HealthSnapshot.build([], started_at=self._start_time)
         
     async def initialize(self):
         """Initialize health check manager"""
         try:
+            # Prime the CPU counter so later non-blocking samples are meaningful
+            psutil.cpu_percent(interval=None)
             await self.register_default_checks()
             await self.start_background_monitoring()
             logger.info("HealthCheckManager initialized")
@@ -117,7 +132,8 @@ class HealthCheckManager:
                       interval: int = 60,
                       timeout: int = 30,
                       critical: bool = False,
-                      tags: Optional[Set[str]] = None) -> None:
+                      tags: Optional[Set[str]] = None,
+                      max_age: Optional[float] = None) -> None:
         """Register a health check"""
         health_check = HealthCheck(
             name=name,
@@ -125,16 +141,19 @@ class HealthCheckManager:
             interval=interval,
             timeout=timeout,
             critical=critical,
-            tags=tags or set()
+            tags=tags or set(),
+            max_age=max_age
         )
         
         self.checks[name] = health_check
+        self._publish_snapshot()
         logger.info(f"Registered health check: {name}")
     
     def unregister_check(self, name: str) -> None:
         """Unregister a health check"""
         if name in self.checks:
             del self.checks[name]
+            self._publish_snapshot()
             logger.info(f"Unregistered health check: {name}")
     
     async def run_check(self, name: str) -> HealthCheckResult:
@@ -292,6 +311,8 @@ class HealthCheckManager:
         if len(self.results_history) > self.max_history:
             self.results_history = self.results_history[-self.max_history:]
         
+        self._publish_snapshot()
+        
         return {
             "status": overall_status.value,
             "timestamp": datetime.utcnow().isoformat(),
@@ -304,7 +325,52 @@ class HealthCheckManager:
                 "critical": len(critical_failures),
                 "critical_services": critical_failures
             },
-            "uptime_seconds": int((datetime.utcnow() - self._start_time).total_seconds()) if hasattr(self, '_start_time') else 0
+            "uptime_seconds": int((datetime.utcnow() - self._start_time).total_seconds())
+        }
+    
+    def _publish_snapshot(self) -> HealthSnapshot:
+        """Replace the published snapshot with the latest check results"""
+        checks = []
+        for name, check in self.checks.items():
+            if not check.enabled:
+                continue
+            result = check.last_result
+            checks.append(CheckSnapshot(
+                name=name,
+                status=result.status.value if result else "unknown",
+                message=result.message if result else "Not checked yet",
+                critical=check.critical,
+                checked_at=check.last_run if result else None,
+                max_age=check.staleness_budget,
+                duration_ms=result.duration_ms if result else None,
+                details=dict(result.details) if result else {}
+            ))
+        
+        self._snapshot_sequence += 1
+        # Readers pick up the new object with a single reference swap
+        self._snapshot = HealthSnapshot.build(
+            checks, sequence=self._snapshot_sequence, started_at=self._start_time
+        )
+        return self._snapshot
+    
+    def get_snapshot(self) -> HealthSnapshot:
+        """Latest published snapshot (never blocks, never runs checks)"""
+        return self._snapshot
+    
+    def current_health(self) -> Dict[str, Any]:
+        """Health summary from the latest snapshot, with staleness applied"""
+        return self._snapshot.view()
+    
+    def liveness(self) -> Dict[str, Any]:
+        """Liveness fast path: process and sampler state only"""
+        now = datetime.utcnow()
+        sampler_alive = bool(self.background_task and not self.background_task.done())
+        return {
+            "status": "alive",
+            "timestamp": now.isoformat(),
+            "uptime_seconds": int((now - self._start_time).total_seconds()),
+            "sampler_running": self.running and sampler_alive,
+            "snapshot_age_seconds": (now - self._snapshot.generated_at).total_seconds()
         }
     
     async def get_check_history(self, name: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
@@ -341,25 +407,37 @@ class HealthCheckManager:
                     await self.background_task
                 except asyncio.CancelledError:
                     pass
+            for task in list(self._in_flight.values()):
+                task.cancel()
+            self._in_flight.clear()
             logger.info("Background health monitoring stopped")
     
+    def _sample_done(self, name: str, task: asyncio.Task) -> None:
+        """Publish a new snapshot as soon as a sampled check finishes"""
+        if self._in_flight.get(name) is task:
+            del self._in_flight[name]
+        if not task.cancelled():
+            self._publish_snapshot()
+    
     async def _background_monitor(self):
-        """Background monitoring task"""
+        """Background sampler: runs due checks and publishes snapshots"""
         while self.running:
             try:
                 # Check if any checks need to run
                 current_time = datetime.utcnow()
                 
-                for name, check in self.checks.items():
-                    if not check.enabled:
+                for name, check in list(self.checks.items()):
+                    if not check.enabled or name in self._in_flight:
                         continue
                     
                     # Check if it's time to run this check
                     if (check.last_run is None or 
                         (current_time - check.last_run).total_seconds() >= check.interval):
                         
-                        # Run check in background
-                        asyncio.create_task(self.run_check(name))
+                        # Run check in background (one run per check at a time)
+                        task = asyncio.create_task(self.run_check(name))
+                        self._in_flight[name] = task
+                        task.add_done_callback(lambda t, name=name: self._sample_done(name, t))
                 
                 # Sleep for 10 seconds before next cycle
                 await asyncio.sleep(10)
@@ -423,8 +501,8 @@ class HealthCheckManager:
     async def _check_system_resources(self) -> HealthCheckResult:
         """Check system resources"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous sample (non-blocking)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory usage
             memory = psutil.virtual_memory()
@@ -0,0 +1,169 @@
+"""
+Health Snapshot
+Immutable, pre-evaluated view of the latest health check results.
+
+The background sampler in HealthCheckManager publishes a new snapshot after
+every check run; request handlers only read the current one. Each check
+carries a staleness budget: a result older than its budget is reported as
+"unknown" instead of its last status, so a stuck sampler cannot keep
+reporting healthy. The evaluated payload is computed once at publish time
+and stays valid until the earliest fresh result expires, so reads are O(1).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+HEALTHY = "healthy"
+WARNING = "warning"
+CRITICAL = "critical"
+UNKNOWN = "unknown"
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class CheckSnapshot:
+    """Last result of one health check"""
+    name: str
+    status: str
+    message: str
+    critical: bool = False
+    checked_at: Optional[datetime] = None
+    # Seconds a result stays current (None never goes stale)
+    max_age: Optional[float] = None
+    duration_ms: Optional[float] = None
+    details: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        if self.checked_at is None or self.max_age is None:
+            return None
+        return self.checked_at + timedelta(seconds=self.max_age)
+
+    def is_stale(self, now: datetime) -> bool:
+        """Never run, or older than its staleness budget"""
+        if self.checked_at is None:
+            return True
+        expires_at = self.expires_at
+        return expires_at is not None and now >= expires_at
+
+    def to_dict(self, stale: bool = False) -> Dict[str, Any]:
+        return {
+            "status": UNKNOWN if stale else self.status,
+            "message": self.message,
+            "details": dict(self.details),
+            "timestamp": self.checked_at.isoformat() if self.checked_at else None,
+            "duration_ms": self.duration_ms,
+            "stale": stale
+        }
+
+
+def evaluate(checks: Iterable[CheckSnapshot], now: datetime) -> Dict[str, Any]:
+    """
+    Overall status of a set of check results at a point in time.
+
+    Critical checks failing make the service critical; warnings, and critical
+    checks without a current result, make it a warning.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    critical_failures: List[str] = []
+    stale: List[str] = []
+    healthy_count = warning_count = 0
+    critical_unknown = False
+
+    for check in checks:
+        is_stale = check.is_stale(now)
+        result = check.to_dict(stale=is_stale)
+        results[check.name] = result
+        status = result["status"]
+
+        if is_stale:
+            stale.append(check.name)
+        if status == HEALTHY:
+            healthy_count += 1
+        elif status == WARNING:
+            warning_count += 1
+        elif status == CRITICAL:
+            if check.critical:
+                critical_failures.append(check.name)
+        elif check.critical:
+            critical_unknown = True
+
+    if critical_failures:
+        overall = CRITICAL
+    elif warning_count > 0 or critical_unknown:
+        overall = WARNING
+    else:
+        overall = HEALTHY
+
+    return {
+        "status": overall,
+        "services": {name: result["status"] for name, result in results.items()},
+        "details": results,
+        "summary": {
+            "total": len(results),
+            "healthy": healthy_count,
+            "warning": warning_count,
+            "critical": len(critical_failures),
+            "critical_services": critical_failures,
+            "stale_services": stale
+        }
+    }
+
+
+@dataclass(frozen=True)
+class HealthSnapshot:
+    """Published health state (replaced, never mutated)"""
+    sequence: int
+    generated_at: datetime
+    started_at: datetime
+    checks: Mapping[str, CheckSnapshot]
+    # The evaluated payload is valid until this time (None: indefinitely)
+    fresh_until: Optional[datetime] = None
+    payload: Mapping[str, Any] = field(default_factory=lambda: _EMPTY, repr=False)
+
+    @classmethod
+    def build(cls, checks: Iterable[CheckSnapshot], sequence: int = 0,
+              started_at: Optional[datetime] = None,
+              now: Optional[datetime] = None) -> "HealthSnapshot":
+        now = now or datetime.utcnow()
+        checks = MappingProxyType({check.name: check for check in checks})
+
+        # Stale results stay stale, so only fresh ones bound the payload's validity
+        expiries = [check.expires_at for check in checks.values()
+                    if not check.is_stale(now) and check.expires_at is not None]
+        return cls(
+            sequence=sequence,
+            generated_at=now,
+            started_at=started_at or now,
+            checks=checks,
+            fresh_until=min(expiries) if expiries else None,
+            payload=MappingProxyType(evaluate(checks.values(), now))
+        )
+
+    def view(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Health response for the current time.
+
+        Returns the pre-evaluated payload while every fresh result is within
+        its budget; only a lagging sampler causes re-evaluation. The nested
+        services/details dicts are shared between reads and must not be modified.
+        """
+        now = now or datetime.utcnow()
+        if self.fresh_until is None or now < self.fresh_until:
+            payload = self.payload
+        else:
+            payload = evaluate(self.checks.values(), now)
+
+        return {
+            **payload,
+            "timestamp": now.isoformat(),
+            "snapshot": {
+                "sequence": self.sequence,
+                "generated_at": self.generated_at.isoformat(),
+                "age_seconds": (now - self.generated_at).total_seconds()
+            },
+            "uptime_seconds": int((now - self.started_at).total_seconds())
+        }
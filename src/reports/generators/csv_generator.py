@@ -3,20 +3,105 @@ CSV report generator with PowerShell compatibility.
 Maintains UTF8-BOM encoding and field formats for compatibility.
 """
 
+import asyncio
 import csv
+import itertools
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, AsyncIterable, Callable, Sequence, Union
 import os
 
 
+def _format_none(value: Any) -> str:
+    return ""
+
+
+def _format_bool(value: bool) -> str:
+    # Convert boolean to Japanese text for compatibility
+    return "はい" if value else "いいえ"
+
+
+def _format_int(value: int) -> str:
+    return str(value)
+
+
+def _format_float(value: float) -> str:
+    # Format floats with appropriate decimal places
+    if value.is_integer():
+        return str(int(value))
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+
+def _format_sequence(value: Union[list, tuple]) -> str:
+    return ", ".join(str(item) for item in value)
+
+
+def _format_dict(value: dict) -> str:
+    return str(value)
+
+
+def _format_text(value: Any) -> str:
+    # String values - remove newlines and excessive whitespace
+    return str(value).replace('\n', ' ').replace('\r', '').strip()
+
+
+def format_value(value: Any) -> str:
+    """Format a single cell value for CSV compatibility."""
+    if value is None:
+        return _format_none(value)
+    elif isinstance(value, bool):
+        return _format_bool(value)
+    elif isinstance(value, float):
+        return _format_float(value)
+    elif isinstance(value, int):
+        return _format_int(value)
+    elif isinstance(value, (list, tuple)):
+        return _format_sequence(value)
+    elif isinstance(value, dict):
+        return _format_dict(value)
+    return _format_text(value)
+
+
+# Exact-type dispatch table; subclasses fall back to format_value
+_FORMATTERS: Dict[type, Callable[[Any], str]] = {
+    type(None): _format_none,
+    bool: _format_bool,
+    int: _format_int,
+    float: _format_float,
+    list: _format_sequence,
+    tuple: _format_sequence,
+    dict: _format_dict,
+    str: _format_text,
+}
+
+
+def compile_formatter(column_type: Optional[type] = None) -> Callable[[Any], str]:
+    """
+    Build a formatter for one column.
+    
+    With a known column type the formatter is resolved once; otherwise it
+    dispatches on the exact value type with a single dictionary lookup.
+    None is always formatted as an empty string.
+    """
+    if column_type is not None and column_type in _FORMATTERS:
+        typed = _FORMATTERS[column_type]
+        return lambda value: "" if value is None else (
+            typed(value) if type(value) is column_type else format_value(value))
+    
+    lookup = _FORMATTERS.get
+    return lambda value: (lookup(type(value)) or format_value)(value)
+
+
 class CSVGenerator:
     """
     CSV report generator with PowerShell compatibility.
     Generates CSV files with UTF8-BOM encoding for Excel compatibility.
     """
     
+    # Rows per buffered write in streaming mode
+    STREAM_CHUNK_SIZE = 1000
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
@@ -92,41 +177,134 @@ class CSVGenerator:
     
     def _clean_row_data(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Clean row data for CSV compatibility."""
-        cleaned = {}
+        return {key: format_value(value) for key, value in row.items()}
+    
+    def generate_stream(self, rows: Iterable[Dict[str, Any]], output_path: str,
+                        columns: Optional[Sequence[str]] = None,
+                        column_types: Optional[Dict[str, type]] = None,
+                        title: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+                        chunk_size: Optional[int] = None) -> str:
+        """
+        Generate CSV report from an iterator of rows without materializing it.
+        
+        Output is identical to generate() for the same rows. Rows are formatted
+        with precompiled per-column formatters and written in chunks, so memory
+        use does not depend on the number of rows.
+        
+        Args:
+            rows: Iterable of dictionaries containing report data
+            output_path: Path to save the CSV file
+            columns: Column names (defaults to the keys of the first row);
+                keys not listed are ignored, missing keys are written empty
+            column_types: Optional known value type per column
+            title: Optional title for the report
+            metadata: Optional metadata to include in header
+            chunk_size: Rows per buffered write
+            
+        Returns:
+            Path to generated CSV file
+        """
+        iterator = iter(rows)
+        first = next(iterator, None)
+        output_file, csvfile = self._open_stream(output_path)
+        try:
+            if first is None:
+                self.logger.warning("No data provided for CSV generation")
+                csvfile.write("# No data available\n")
+                return str(output_file)
+            
+            writer, to_row = self._begin_stream(csvfile, first, columns, column_types, title, metadata)
+            chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+            count = 0
+            pending = itertools.chain([first], iterator)
+            while True:
+                chunk = [to_row(row) for row in itertools.islice(pending, chunk_size)]
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                count += len(chunk)
+            
+            self.logger.info(f"CSV report generated: {output_file} ({count} rows)")
+            return str(output_file)
+        except Exception as e:
+            self.logger.error(f"Failed to generate CSV report: {e}")
+            raise
+        finally:
+            csvfile.close()
+    
+    async def generate_stream_async(self, rows: AsyncIterable[Dict[str, Any]], output_path: str,
+                                    columns: Optional[Sequence[str]] = None,
+                                    column_types: Optional[Dict[str, type]] = None,
+                                    title: Optional[str] = None,
+                                    metadata: Optional[Dict[str, Any]] = None,
+                                    chunk_size: Optional[int] = None) -> str:
+        """
+        Generate CSV report from an async iterator of rows.
+        
+        Same output as generate_stream(); chunk writes run in a worker thread
+        so the event loop is not blocked by file I/O.
+        """
+        iterator = rows.__aiter__()
+        try:
+            first = await iterator.__anext__()
+        except StopAsyncIteration:
+            first = None
+        output_file, csvfile = self._open_stream(output_path)
+        try:
+            if first is None:
+                self.logger.warning("No data provided for CSV generation")
+                csvfile.write("# No data available\n")
+                return str(output_file)
+            
+            writer, to_row = self._begin_stream(csvfile, first, columns, column_types, title, metadata)
+            chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+            count = 0
+            chunk = [to_row(first)]
+            async for row in iterator:
+                chunk.append(to_row(row))
+                if len(chunk) >= chunk_size:
+                    await asyncio.to_thread(writer.writerows, chunk)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                await asyncio.to_thread(writer.writerows, chunk)
+                count += len(chunk)
+            
+            self.logger.info(f"CSV report generated: {output_file} ({count} rows)")
+            return str(output_file)
+        except Exception as e:
+            self.logger.error(f"Failed to generate CSV report: {e}")
+            raise
+        finally:
+            csvfile.close()
+    
+    def _open_stream(self, output_path: str):
+        """Open the output file for streaming with a large write buffer."""
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        # UTF8-BOM for PowerShell compatibility
+        csvfile = open(output_file, 'w', encoding='utf-8-sig', newline='', buffering=1024 * 1024)
+        return output_file, csvfile
+    
+    def _begin_stream(self, csvfile, first: Dict[str, Any], columns: Optional[Sequence[str]],
+                      column_types: Optional[Dict[str, type]], title: Optional[str],
+                      metadata: Optional[Dict[str, Any]]):
+        """Write the header block and build the row formatter for a stream."""
+        if title or metadata:
+            self._write_header(csvfile, title, metadata)
+        
+        fieldnames = list(columns) if columns is not None else list(first.keys())
+        column_types = column_types or {}
+        formatters = [(name, compile_formatter(column_types.get(name))) for name in fieldnames]
+        
+        writer = csv.writer(csvfile, quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+        writer.writerow(fieldnames)
         
-        for key, value in row.items():
-            # Convert None to empty string
-            if value is None:
-                cleaned[key] = ""
-            
-            # Convert boolean to Japanese text for compatibility
-            elif isinstance(value, bool):
-                cleaned[key] = "はい" if value else "いいえ"
-            
-            # Convert numbers with proper formatting
-            elif isinstance(value, (int, float)):
-                if isinstance(value, float):
-                    # Format floats with appropriate decimal places
-                    if value.is_integer():
-                        cleaned[key] = str(int(value))
-                    else:
-                        cleaned[key] = f"{value:.2f}".rstrip('0').rstrip('.')
-                else:
-                    cleaned[key] = str(value)
-            
-            # Handle lists and complex types
-            elif isinstance(value, (list, tuple)):
-                cleaned[key] = ", ".join(str(item) for item in value)
-            
-            # Handle dictionaries
-            elif isinstance(value, dict):
-                cleaned[key] = str(value)
-            
-            # String values - remove newlines and excessive whitespace
-            else:
-                cleaned[key] = str(value).replace('\n', ' ').replace('\r', '').strip()
+        def to_row(row: Dict[str, Any]) -> List[str]:
+            get = row.get
+            return [fmt(get(name)) for name, fmt in formatters]
         
-        return cleaned
+        return writer, to_row
     
     def generate_summary_csv(self, data: List[Dict[str, Any]], output_path: str,
                            summary_fields: List[str]) -> str:
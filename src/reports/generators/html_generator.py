@@ -3,8 +3,9 @@ HTML report generator with PowerShell compatibility.
 Maintains responsive design and Japanese formatting.
 """
 
+import itertools
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Sequence
 from pathlib import Path
 from datetime import datetime
 import html
@@ -17,12 +18,18 @@ class HTMLGenerator:
     Generates responsive HTML reports with Japanese formatting.
     """
     
+    # Row count above which generate() switches to the large-report mode
+    LARGE_REPORT_THRESHOLD = 5000
+    # Rows per <script> payload chunk in large-report mode
+    LARGE_REPORT_CHUNK_SIZE = 2000
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
     def generate(self, data: List[Dict[str, Any]], output_path: str, 
                  action: str, title: Optional[str] = None,
-                 metadata: Optional[Dict[str, Any]] = None) -> str:
+                 metadata: Optional[Dict[str, Any]] = None,
+                 large_mode: Optional[bool] = None) -> str:
         """
         Generate HTML report from data.
         
@@ -32,10 +39,17 @@ class HTMLGenerator:
             action: Action that generated this report
             title: Optional title for the report
             metadata: Optional metadata to include
+            large_mode: Force (True) or disable (False) the large-report mode;
+                by default it is used above LARGE_REPORT_THRESHOLD rows
             
         Returns:
             Path to generated HTML file
         """
+        if large_mode is None:
+            large_mode = len(data) > self.LARGE_REPORT_THRESHOLD
+        if large_mode and data:
+            return self.generate_large(data, output_path, action, title=title, metadata=metadata)
+        
         try:
             # Ensure output directory exists
             output_file = Path(output_path)
@@ -200,10 +214,11 @@ class HTMLGenerator:
         return title_map.get(action, f'📋 {action}')
     
     def _generate_metadata_section(self, metadata: Optional[Dict[str, Any]], 
-                                 data_count: int, field_count: int) -> str:
+                                 data_count: Optional[int], field_count: int) -> str:
         """Generate metadata section HTML."""
         if not metadata:
             metadata = {}
+        count_text = f"{data_count:,}" if data_count is not None else "-"
         
         return f"""
         <div class="report-summary">
@@ -212,7 +227,7 @@ class HTMLGenerator:
                 <div class="summary-grid">
                     <div class="summary-item">
                         <span class="label">総レコード数:</span>
-                        <span class="value">{data_count:,}</span>
+                        <span class="value" data-record-count>{count_text}</span>
                     </div>
                     <div class="summary-item">
                         <span class="label">データ項目数:</span>
@@ -240,15 +255,7 @@ class HTMLGenerator:
             cells = []
             
             for header in headers:
-                value = record.get(header, '')
-                
-                # Format different data types
-                if isinstance(value, (list, dict)):
-                    value = str(value)
-                elif value is None:
-                    value = ''
-                else:
-                    value = str(value)
+                value = self._format_cell(record.get(header, ''))
                 
                 # Add status styling for specific columns
                 cell_class = ""
@@ -266,6 +273,270 @@ class HTMLGenerator:
         
         return "\\n".join(rows)
     
+    @staticmethod
+    def _format_cell(value: Any) -> str:
+        """Format a cell value as display text."""
+        if value is None:
+            return ''
+        return str(value)
+    
+    def generate_large(self, rows: Iterable[Dict[str, Any]], output_path: str,
+                       action: str, headers: Optional[Sequence[str]] = None,
+                       title: Optional[str] = None,
+                       metadata: Optional[Dict[str, Any]] = None,
+                       page_size: int = 100,
+                       chunk_size: Optional[int] = None) -> str:
+        """
+        Generate a large HTML report with client-side paging.
+        
+        Rows are not rendered as <tr> elements. They are written as compact
+        columnar JSON chunks (one array per row) while the iterable is consumed,
+        and the browser renders one page of the table at a time. The document
+        is written to disk piece by piece, so generation time and memory scale
+        linearly with the row count.
+        
+        Args:
+            rows: Iterable of dictionaries containing report data
+            output_path: Path to save the HTML file
+            action: Action that generated this report
+            headers: Column names (defaults to the keys of the first row)
+            title: Optional title for the report
+            metadata: Optional metadata to include
+            page_size: Initial number of rows per page
+            chunk_size: Rows per payload chunk
+            
+        Returns:
+            Path to generated HTML file
+        """
+        try:
+            output_file = Path(output_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            iterator = iter(rows)
+            first = next(iterator, None)
+            if first is None:
+                self.logger.warning("No data provided for HTML generation")
+                with open(output_file, 'w', encoding='utf-8') as htmlfile:
+                    htmlfile.write(self._generate_empty_html(action, title))
+                return str(output_file)
+            
+            headers = list(headers) if headers is not None else list(first.keys())
+            report_title = title or self._get_report_title(action)
+            chunk_size = chunk_size or self.LARGE_REPORT_CHUNK_SIZE
+            total = len(rows) if hasattr(rows, '__len__') else None
+            
+            with open(output_file, 'w', encoding='utf-8', buffering=1024 * 1024) as htmlfile:
+                htmlfile.write(self._generate_large_html_head(report_title, headers, metadata,
+                                                              total, page_size))
+                
+                count = 0
+                pending = itertools.chain([first], iterator)
+                while True:
+                    chunk = [[self._format_cell(record.get(header, '')) for header in headers]
+                             for record in itertools.islice(pending, chunk_size)]
+                    if not chunk:
+                        break
+                    count += len(chunk)
+                    htmlfile.write('<script>__reportChunks.push(')
+                    htmlfile.write(self._to_script_json(chunk))
+                    htmlfile.write(');</script>\n')
+                
+                htmlfile.write(self._generate_large_html_tail())
+            
+            self.logger.info(f"HTML report generated: {output_file} ({count} rows, large-report mode)")
+            return str(output_file)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to generate HTML report: {e}")
+            raise
+    
+    @staticmethod
+    def _to_script_json(value: Any) -> str:
+        """Serialize a value for embedding inside a <script> element."""
+        # Escaping '<' keeps '</script>' and '<!--' in values from ending the element
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+    
+    def _generate_large_html_head(self, report_title: str, headers: List[str],
+                                  metadata: Optional[Dict[str, Any]],
+                                  total: Optional[int], page_size: int) -> str:
+        """Generate the document part that precedes the row payload."""
+        count_text = f"{total:,}" if total is not None else "-"
+        metadata_html = self._generate_metadata_section(metadata, total, len(headers))
+        
+        return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(report_title)}</title>
+    <style>
+        {self._get_css_styles()}
+        {self._get_large_report_css_styles()}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header class="report-header">
+            <h1><i class="icon">🚀</i> {html.escape(report_title)}</h1>
+            <div class="report-info">
+                <span class="generated-time">生成日時: {datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}</span>
+                <span class="record-count">件数: <span data-record-count>{count_text}</span> 件</span>
+                <span class="source">Python GUI版</span>
+            </div>
+        </header>
+        
+        {metadata_html}
+        
+        <div class="table-container">
+            <div class="table-toolbar">
+                <input type="search" class="table-filter" placeholder="🔍 絞り込み">
+                <select class="page-size">
+                    {"".join(f'<option value="{size}"{" selected" if size == page_size else ""}>{size} 件/ページ</option>'
+                             for size in sorted({50, 100, 500, 1000, page_size}))}
+                </select>
+            </div>
+            <table class="data-table">
+                <thead>
+                    <tr>
+                        {"".join(f'<th>{html.escape(str(header))}</th>' for header in headers)}
+                    </tr>
+                </thead>
+                <tbody></tbody>
+            </table>
+            <div class="table-pager">
+                <button type="button" class="page-prev">◀ 前へ</button>
+                <span class="page-info"></span>
+                <button type="button" class="page-next">次へ ▶</button>
+            </div>
+        </div>
+        
+        <footer class="report-footer">
+            <p>🐍 Microsoft 365 統合管理ツール - Python Edition</p>
+            <p>Powered by PyQt6 & Microsoft Graph API</p>
+        </footer>
+    </div>
+    
+    <script>
+        const __reportColumns = {self._to_script_json(headers)};
+        const __reportChunks = [];
+    </script>
+"""
+    
+    def _generate_large_html_tail(self) -> str:
+        """Generate the document part that follows the row payload."""
+        return f"""    <script>
+        {self._get_javascript()}
+        {self._get_large_report_javascript()}
+    </script>
+</body>
+</html>"""
+    
+    def _get_large_report_css_styles(self) -> str:
+        """Get additional CSS styles for the large-report mode."""
+        return """
+        .table-toolbar,
+        .table-pager {
+            display: flex;
+            align-items: center;
+            gap: 15px;
+            margin-top: 20px;
+        }
+        
+        .table-pager {
+            justify-content: center;
+        }
+        
+        .table-filter {
+            flex: 1;
+            padding: 8px 12px;
+            border: 1px solid #dee2e6;
+            border-radius: 5px;
+        }
+        
+        .page-size,
+        .table-pager button {
+            padding: 8px 12px;
+            border: 1px solid #dee2e6;
+            border-radius: 5px;
+            background: white;
+            cursor: pointer;
+        }
+        
+        .table-pager button:disabled {
+            cursor: default;
+            opacity: 0.5;
+        }
+        """
+    
+    def _get_large_report_javascript(self) -> str:
+        """Get JavaScript that renders the paged table from the row payload."""
+        return """
+        // Paged rendering of the columnar row payload
+        (function() {
+            const rows = [].concat.apply([], __reportChunks);
+            __reportChunks.length = 0;
+            const statusColumns = __reportColumns
+                .map((name, index) => (name === 'ステータス' || name === 'Status') ? index : -1)
+                .filter(index => index >= 0);
+            const tbody = document.querySelector('.data-table tbody');
+            const filterInput = document.querySelector('.table-filter');
+            const pageSizeSelect = document.querySelector('.page-size');
+            const pageInfo = document.querySelector('.page-info');
+            const prevButton = document.querySelector('.page-prev');
+            const nextButton = document.querySelector('.page-next');
+            let view = rows;
+            let page = 0;
+            
+            document.querySelectorAll('[data-record-count]').forEach(el => {
+                el.textContent = rows.length.toLocaleString();
+            });
+            
+            function statusClass(value) {
+                if (value.includes('正常') || value.includes('Success')) return 'status-success';
+                if (value.includes('警告') || value.includes('Warning')) return 'status-warning';
+                if (value.includes('異常') || value.includes('Error')) return 'status-error';
+                return '';
+            }
+            
+            function render() {
+                const pageSize = parseInt(pageSizeSelect.value, 10);
+                const pageCount = Math.max(1, Math.ceil(view.length / pageSize));
+                page = Math.min(page, pageCount - 1);
+                const start = page * pageSize;
+                const fragment = document.createDocumentFragment();
+                view.slice(start, start + pageSize).forEach((row, i) => {
+                    const tr = document.createElement('tr');
+                    tr.className = (start + i) % 2 === 0 ? 'row-even' : 'row-odd';
+                    row.forEach((value, column) => {
+                        const td = document.createElement('td');
+                        td.textContent = value;
+                        if (value && statusColumns.includes(column)) {
+                            const cls = statusClass(value);
+                            if (cls) td.className = cls;
+                        }
+                        tr.appendChild(td);
+                    });
+                    fragment.appendChild(tr);
+                });
+                tbody.replaceChildren(fragment);
+                pageInfo.textContent = `${page + 1} / ${pageCount} ページ（${view.length.toLocaleString()} 件）`;
+                prevButton.disabled = page === 0;
+                nextButton.disabled = page >= pageCount - 1;
+            }
+            
+            filterInput.addEventListener('input', function() {
+                const term = this.value.trim().toLowerCase();
+                view = term ? rows.filter(row => row.some(v => v.toLowerCase().includes(term))) : rows;
+                page = 0;
+                render();
+            });
+            pageSizeSelect.addEventListener('change', function() { page = 0; render(); });
+            prevButton.addEventListener('click', function() { page--; render(); });
+            nextButton.addEventListener('click', function() { page++; render(); });
+            render();
+        })();
+        """
+    
     def _get_css_styles(self) -> str:
         """Get CSS styles for the report."""
         return """